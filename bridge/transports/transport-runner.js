@@ -17,9 +17,16 @@ const rl = readline.createInterface({
 
 // Handle incoming requests from Python
 rl.on('line', async (line) => {
+    // Echoed back so the adapter can match responses to concurrent calls
+    let id;
+    const started = process.hrtime.bigint();
+    // Milliseconds spent handling the call, so the adapter can tell pipe
+    // overhead from time spent in the transport and server
+    const elapsed = () => Number(process.hrtime.bigint() - started) / 1e6;
     try {
         const request = JSON.parse(line);
         const { method, args } = request;
+        id = request.id;
         
         let result;
         
@@ -51,12 +58,12 @@ rl.on('line', async (line) => {
         }
         
         // Send response
-        const response = { result };
+        const response = { id, result, elapsed: elapsed() };
         console.log(JSON.stringify(response));
         
     } catch (error) {
         // Send error response
-        const response = { error: error.message };
+        const response = { id, error: error.message, elapsed: elapsed() };
         console.log(JSON.stringify(response));
     }
 });
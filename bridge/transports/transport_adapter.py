@@ -5,22 +5,84 @@
 import os
 import sys
 import json
+import itertools
 import subprocess
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
 
 # Add mcp-local-setup to path for contract import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
 from contracts.transport_contract import TransportContract
 
+# Seconds a call waits for the runner to answer before it fails
+DEFAULT_CALL_TIMEOUT = 60.0
+
+
+class _PendingCalls:
+    """Calls waiting for a runner response, shared with the reader thread"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.runner_exited = False
+
+
+def _read_responses(process, pending):
+    """Hand each runner response to the call waiting for it
+    
+    Runs in the reader thread, which holds only the process and the pending
+    calls: referencing the adapter would keep it alive, and ``__del__``
+    would never stop the runner.
+    """
+    for response_line in process.stdout:
+        # Skip console.log output and empty lines
+        response_line = response_line.strip()
+        if not response_line or not response_line.startswith('{'):
+            continue
+        
+        try:
+            response = json.loads(response_line)
+        except json.JSONDecodeError:
+            # Not valid JSON, probably console output
+            continue
+        
+        with pending.lock:
+            # None if the call has already timed out
+            call = pending.calls.pop(response.get('id'), None)
+        if call is not None:
+            call['response'] = response
+            call['done'].set()
+    
+    # Runner exited: wake every call still waiting
+    with pending.lock:
+        pending.runner_exited = True
+        calls = list(pending.calls.values())
+        pending.calls.clear()
+    for call in calls:
+        call['done'].set()
+
+
 class TransportAdapter(TransportContract):
     """Python adapter that delegates to JavaScript transport implementations"""
     
-    def __init__(self):
+    def __init__(self, call_timeout: float = DEFAULT_CALL_TIMEOUT):
         # Path to the Node.js transport runner
         self.runner_path = os.path.join(os.path.dirname(__file__), 'transport-runner.js')
         self.node_process = None
         self.initialized = False
-        
+        # Seconds each call waits for the runner (None waits forever)
+        self.call_timeout = call_timeout
+        # Calls carry an ID that the runner echoes back, so several can be
+        # in flight at once (e.g. requests to different server replicas)
+        self._io_lock = threading.Lock()
+        self._call_ids = itertools.count(1)
+        self._pending = _PendingCalls()
+        # Optional callback(method, seconds, failed, runner_seconds) timing
+        # every call into the runner, e.g. for gateway metrics and tracing;
+        # runner_seconds is the part spent inside the runner (None if unknown)
+        self.call_observer: Optional[Callable[[str, float, bool, Optional[float]], None]] = None
+    
     def _ensure_runner(self):
         """Ensure the Node.js runner process is started"""
         if self.node_process is None:
@@ -31,37 +93,54 @@ class TransportAdapter(TransportContract):
                 stderr=subprocess.PIPE,
                 text=True
             )
+            reader = threading.Thread(target=_read_responses,
+                                      args=(self.node_process, self._pending), daemon=True)
+            reader.start()
     
     def _call_js(self, method: str, args: Dict[str, Any]) -> Any:
         """Call a method in the JavaScript transport"""
-        self._ensure_runner()
-        
+        call_id = next(self._call_ids)
         request = {
+            'id': call_id,
             'method': method,
             'args': args
         }
+        call = {'done': threading.Event(), 'response': None}
+        started = time.monotonic()
         
-        # Send request
-        self.node_process.stdin.write(json.dumps(request) + '\n')
-        self.node_process.stdin.flush()
-        
-        # Read response, skipping any console.log output
-        while True:
-            response_line = self.node_process.stdout.readline()
-            if not response_line:
-                raise RuntimeError("Node.js process terminated unexpectedly")
+        with self._io_lock:
+            self._ensure_runner()
+            with self._pending.lock:
+                if self._pending.runner_exited:
+                    raise RuntimeError("Node.js process terminated unexpectedly")
+                self._pending.calls[call_id] = call
             
-            # Skip console.log output and empty lines
-            response_line = response_line.strip()
-            if not response_line or not response_line.startswith('{'):
-                continue
-                
+            # Send request
             try:
-                response = json.loads(response_line)
-                break
-            except json.JSONDecodeError:
-                # Not valid JSON, probably console output
-                continue
+                self.node_process.stdin.write(json.dumps(request) + '\n')
+                self.node_process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                with self._pending.lock:
+                    self._pending.calls.pop(call_id, None)
+                raise RuntimeError("Node.js process terminated unexpectedly")
+        
+        # Wait for the reader thread to deliver the matching response
+        if not call['done'].wait(self.call_timeout):
+            with self._pending.lock:
+                timed_out = self._pending.calls.pop(call_id, None) is not None
+            if timed_out:
+                if self.call_observer is not None:
+                    self.call_observer(method, time.monotonic() - started, True, None)
+                raise TimeoutError(f"Node.js runner did not answer {method} "
+                                   f"within {self.call_timeout:g}s")
+        response = call['response']
+        if self.call_observer is not None:
+            elapsed = response.get('elapsed') if response is not None else None
+            self.call_observer(method, time.monotonic() - started,
+                               response is None or bool(response.get('error')),
+                               elapsed / 1000 if elapsed is not None else None)
+        if response is None:
+            raise RuntimeError("Node.js process terminated unexpectedly")
         
         if response.get('error'):
             raise RuntimeError(response['error'])
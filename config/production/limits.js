@@ -414,4 +414,9 @@ module.exports = {
   checkLimit: limitUtils.checkLimit.bind(limitUtils),
   getRateLimitConfig: limitUtils.getRateLimitConfig.bind(limitUtils),
   getQuotaForTier: limitUtils.getQuotaForTier.bind(limitUtils),
-};
\ No newline at end of file
+};
+// Print the resolved limits as JSON (e.g. for the Python gateway's
+// rate_limits option): node config/production/limits.js > limits.json
+if (require.main === module) {
+  process.stdout.write(JSON.stringify(limits, null, 2) + '\n');
+}
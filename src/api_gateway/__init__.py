@@ -1,5 +1,6 @@
 """API Gateway module for MCP server management."""
 
 from .gateway import APIGateway
+from .sharding import ShardedGateway
 
-__all__ = ['APIGateway']
\ No newline at end of file
+__all__ = ['APIGateway', 'ShardedGateway']
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""Per-server admission control: concurrency limit, bounded queue, queue timeout."""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .scheduler import DEFAULT_PRIORITY, WeightedFairQueue
+from .utils import parse_duration
+
+
+# Queue wait used when a server limits concurrency but sets no queueTimeout
+DEFAULT_QUEUE_TIMEOUT = 30.0
+
+
+class OverloadedError(Exception):
+    """Raised when a request cannot be admitted to a server."""
+    
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class _Waiter:
+    """A queued request waiting for a concurrency slot."""
+    
+    __slots__ = ('priority', 'granted', 'event')
+    
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.granted = False
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Bound the concurrency and queue depth of requests to one server.
+    
+    Up to ``max_concurrency`` requests run at once. Further requests wait in
+    a queue of at most ``max_queue_depth`` entries for up to
+    ``queue_timeout`` seconds; anything beyond that is rejected immediately
+    with ``OverloadedError`` so callers fail fast instead of piling up
+    behind a slow server. Freed slots are handed directly to the next
+    waiter so new arrivals cannot overtake the queue. The queue is
+    weighted-fair across priority classes and FIFO within each class.
+    """
+    
+    def __init__(self, max_concurrency: int, max_queue_depth: int = 0,
+                 queue_timeout: Optional[float] = None,
+                 weights: Optional[Dict[str, int]] = None):
+        """Initialize the controller.
+        
+        Args:
+            max_concurrency: Requests allowed to run at once
+            max_queue_depth: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait (None waits forever)
+            weights: Priority class weights for the wait queue
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.queue_timeout = queue_timeout
+        
+        self._lock = threading.Lock()
+        self._queue = WeightedFairQueue(weights)
+        self.active = 0
+        self.admitted = 0
+        self.admitted_by_priority = {name: 0 for name in self._queue.weights}
+        self.rejected = {'queue_full': 0, 'queue_timeout': 0}
+    
+    @classmethod
+    def from_config(cls, limits: Dict[str, Any],
+                    defaults: Optional[Dict[str, Any]] = None) -> Optional['AdmissionController']:
+        """Build a controller from a catalog ``limits`` block.
+        
+        Args:
+            limits: Catalog limits (maxConcurrency, maxQueueDepth, queueTimeout)
+            defaults: Gateway-wide fallbacks (max_concurrency, max_queue_depth,
+                queue_timeout, priority_weights)
+        
+        Returns:
+            Controller, or None if the server has no concurrency limit
+        """
+        defaults = defaults or {}
+        max_concurrency = limits.get('maxConcurrency', defaults.get('max_concurrency'))
+        if not max_concurrency:
+            return None
+        
+        return cls(
+            int(max_concurrency),
+            int(limits.get('maxQueueDepth', defaults.get('max_queue_depth', 0))),
+            parse_duration(limits.get('queueTimeout', defaults.get('queue_timeout')),
+                           DEFAULT_QUEUE_TIMEOUT),
+            defaults.get('priority_weights')
+        )
+    
+    @property
+    def queue_depth(self) -> int:
+        """Requests currently waiting for a slot."""
+        return len(self._queue)
+    
+    def acquire(self, priority: str = DEFAULT_PRIORITY) -> None:
+        """Take a concurrency slot, waiting in the queue if necessary.
+        
+        Args:
+            priority: Priority class of the request
+        
+        Raises:
+            OverloadedError: If the queue is full or the wait timed out
+        """
+        with self._lock:
+            if self.active < self.max_concurrency and not self._queue:
+                self.active += 1
+                self._count_admitted(priority)
+                return
+            
+            if len(self._queue) >= self.max_queue_depth:
+                self.rejected['queue_full'] += 1
+                raise OverloadedError(
+                    f"Server overloaded: {self.active} requests running and "
+                    f"{len(self._queue)} queued",
+                    'queue_full'
+                )
+            
+            waiter = _Waiter(priority)
+            self._queue.push(waiter, priority)
+        
+        waiter.event.wait(self.queue_timeout)
+        
+        with self._lock:
+            if waiter.granted:
+                self._count_admitted(priority)
+                return
+            self._queue.remove(waiter, priority)
+            self.rejected['queue_timeout'] += 1
+        
+        raise OverloadedError(
+            f"Server overloaded: no slot freed within {self.queue_timeout:g}s",
+            'queue_timeout'
+        )
+    
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free now, never queueing.
+        
+        Meant for extra work done on behalf of an admitted request, such
+        as a hedged copy, so it is not counted as an admitted request and
+        does not overtake queued ones.
+        
+        Returns:
+            True if a slot was taken and must be released
+        """
+        with self._lock:
+            if self.active < self.max_concurrency and not self._queue:
+                self.active += 1
+                return True
+            return False
+    
+    def _count_admitted(self, priority: str) -> None:
+        self.admitted += 1
+        self.admitted_by_priority[priority] += 1
+    
+    def release(self) -> None:
+        """Return a slot, handing it to the next waiter if there is one."""
+        with self._lock:
+            if self._queue and self.active <= self.max_concurrency:
+                self._grant_next()
+            else:
+                self.active -= 1
+    
+    def _grant_next(self) -> None:
+        waiter = self._queue.pop()
+        waiter.granted = True
+        waiter.event.set()
+    
+    def resize(self, max_concurrency: int) -> None:
+        """Change the concurrency limit, e.g. when replicas are added.
+        
+        Extra slots go to queued requests right away; when shrinking,
+        running requests finish and freed slots are retired until the
+        active count fits the new limit.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        with self._lock:
+            self.max_concurrency = max_concurrency
+            while self._queue and self.active < self.max_concurrency:
+                self.active += 1
+                self._grant_next()
+    
+    @contextmanager
+    def slot(self, priority: str = DEFAULT_PRIORITY) -> Iterator[None]:
+        """Context manager holding a slot for the duration of a request."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Admission counters for metrics."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self.active,
+            "queue_depth": len(self._queue),
+            "queue_depth_by_priority": self._queue.depth_by_priority(),
+            "admitted": self.admitted,
+            "admitted_by_priority": dict(self.admitted_by_priority),
+            "rejected": dict(self.rejected)
+        }
@@ -0,0 +1,467 @@
+"""ASGI front-end serving a gateway at /mcp, /servers, /metrics and /health."""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+try:
+    import uvicorn
+except ImportError:  # optional: only needed by serve_http
+    uvicorn = None
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+except ImportError:  # optional: /metrics falls back to JSON
+    CollectorRegistry = None
+
+from .async_gateway import DEFAULT_MAX_WORKERS, AsyncAPIGateway
+from .gateway import APIGateway
+
+
+# Same address and port as the Node gateway, so clients work unchanged
+DEFAULT_HTTP_ADDR = '127.0.0.1'
+DEFAULT_HTTP_PORT = 8090
+# Seconds an idle keep-alive connection stays open
+DEFAULT_KEEP_ALIVE = 30
+# Responses smaller than this are sent uncompressed
+DEFAULT_GZIP_MIN_SIZE = 1024
+# Larger bodies are compressed off the event loop
+_GZIP_OFFLOAD_SIZE = 256 * 1024
+_GZIP_LEVEL = 5
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+# Seconds between SSE comments that keep a waiting stream open
+DEFAULT_SSE_KEEPALIVE = 15.0
+
+# JSON-RPC errors answered by the front-end itself
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+INVALID_PARAMS = -32602
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class _Request:
+    """Headers, query and caller identity of one HTTP request."""
+    
+    __slots__ = ('method', 'path', 'headers', 'query')
+    
+    def __init__(self, scope: Dict[str, Any]):
+        self.method = scope['method']
+        self.path = scope['path'].rstrip('/') or '/'
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', ())}
+        self.query = {name: values[-1] for name, values in
+                      parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    
+    def header(self, name: str) -> Optional[str]:
+        return self.headers.get(name)
+    
+    @property
+    def api_key(self) -> Optional[str]:
+        key = self.headers.get('x-api-key')
+        if key is None:
+            authorization = self.headers.get('authorization', '')
+            if authorization.lower().startswith('bearer '):
+                key = authorization[7:].strip()
+        return key or self.query.get('api_key')
+    
+    def accepts(self, media_type: str) -> bool:
+        return media_type in self.headers.get('accept', '')
+    
+    @property
+    def accepts_gzip(self) -> bool:
+        return 'gzip' in self.headers.get('accept-encoding', '')
+
+
+def split_tool_name(name: str) -> Tuple[Optional[str], str]:
+    """Server and tool of a namespaced tool name.
+    
+    Accepts the Node gateway's ``server:tool`` and ``mcp__server__tool``
+    forms.
+    
+    Returns:
+        (server ID, tool name), or (None, name) if the name has no server
+    """
+    if name.startswith('mcp__'):
+        server_id, _, tool = name[5:].partition('__')
+        if server_id and tool:
+            return server_id, tool
+    server_id, separator, tool = name.partition(':')
+    if separator and server_id and tool:
+        return server_id, tool
+    return None, name
+
+
+def route_message(message: Dict[str, Any],
+                  server_id: Optional[str]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Server a message goes to, and the message as it should be sent.
+    
+    The ``X-MCP-Server`` header (``server_id``) wins; otherwise a
+    ``tools/call`` with a namespaced tool name goes to that server, with
+    the name stripped to the tool's own.
+    """
+    if server_id:
+        return server_id, message
+    params = message.get('params')
+    if message.get('method') == 'tools/call' and isinstance(params, dict):
+        name = params.get('name')
+        if isinstance(name, str):
+            target, tool = split_tool_name(name)
+            if target is not None:
+                return target, {**message, 'params': {**params, 'name': tool}}
+    return None, message
+
+
+def _error(message_id: Any, code: int, text: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": message_id, "error": {"code": code, "message": text}}
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def _sse(event: str, payload: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode()
+
+
+class GatewayApp:
+    """ASGI application exposing a gateway over HTTP.
+    
+    Routes:
+        POST /mcp      JSON-RPC requests and batches, routed by the
+                       ``X-MCP-Server`` header or a namespaced tool name
+        GET /servers   Server listing (running, transport, category, tag,
+                       cursor and limit query parameters)
+        GET /metrics   Gateway metrics (Prometheus text for scrapers when
+                       prometheus-client is installed, JSON otherwise)
+        GET /health    Liveness and server counts
+    
+    The app is plain ASGI and runs under any ASGI server. Every response
+    but a stream has a ``Content-Length``, so connections are kept alive
+    between requests; bodies of at least ``gzip_min_size`` bytes are gzipped
+    for clients that accept it.
+    """
+    
+    def __init__(self, gateway: Any, api_keys: Optional[Iterable[str]] = None,
+                 gzip_min_size: int = DEFAULT_GZIP_MIN_SIZE,
+                 max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+                 sse_keepalive: float = DEFAULT_SSE_KEEPALIVE,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize the app.
+        
+        Args:
+            gateway: ``APIGateway``, ``ShardedGateway`` or ``AsyncAPIGateway``
+            api_keys: Keys accepted in ``X-API-Key`` (or a bearer token);
+                None to accept any caller. ``/health`` is always open.
+            gzip_min_size: Smallest response body to compress
+            max_body_size: Largest request body accepted
+            sse_keepalive: Seconds between keep-alive comments on streams
+            max_workers: Gateway calls in progress at once, when the
+                gateway is not already wrapped
+        """
+        if not isinstance(gateway, AsyncAPIGateway):
+            gateway = AsyncAPIGateway(gateway, max_workers)
+        self.gateway = gateway
+        self.api_keys = frozenset(api_keys) if api_keys is not None else None
+        self.gzip_min_size = gzip_min_size
+        self.max_body_size = max_body_size
+        self.sse_keepalive = sse_keepalive
+        self._prometheus = None
+        self._routes = {
+            '/mcp': ('POST', self._mcp),
+            '/servers': ('GET', self._servers),
+            '/metrics': ('GET', self._metrics),
+            '/health': ('GET', self._health)
+        }
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            if scope['type'] == 'websocket':
+                await send({'type': 'websocket.close', 'code': 1003})
+            return
+        
+        request = _Request(scope)
+        route = self._routes.get(request.path)
+        if route is None:
+            await self._json(send, request, 404, {"error": {"message": "Not found"}})
+            return
+        method, handler = route
+        if request.method != method:
+            await self._json(send, request, 405, {"error": {"message": "Method not allowed"}},
+                             [(b'allow', method.encode())])
+            return
+        if (self.api_keys is not None and request.path != '/health' and
+                request.api_key not in self.api_keys):
+            # Same body as the Node gateway's
+            await self._json(send, request, 401, {"error": {
+                "code": -32001, "message": "Invalid or missing API key"
+            }})
+            return
+        await handler(request, receive, send)
+    
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _mcp(self, request: _Request, receive: Receive, send: Send) -> None:
+        body = await self._read_body(receive)
+        if body is None:
+            await self._json(send, request, 413, _error(None, INVALID_REQUEST, "Request too large"))
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            await self._json(send, request, 400, _error(None, PARSE_ERROR, "Parse error"))
+            return
+        
+        batch = isinstance(payload, list)
+        messages = payload if batch else [payload]
+        if not messages:
+            await self._json(send, request, 400,
+                             _error(None, INVALID_REQUEST, "Invalid Request: empty batch"))
+            return
+        
+        context = (request.header('x-mcp-server') or request.query.get('server'),
+                   request.api_key, request.header('mcp-session-id'))
+        calls = [self._call(message, *context) for message in messages]
+        
+        token = _progress_token(messages)
+        if request.accepts('text/event-stream') and (len(messages) > 1 or token is not None):
+            await self._stream(send, calls, token)
+            return
+        
+        responses = [response for response in await asyncio.gather(*calls)
+                     if response is not None]
+        if not responses:
+            # Only notifications: nothing to answer
+            await self._send(send, request, 202, b'', b'application/json')
+        elif batch:
+            await self._json(send, request, 200, responses)
+        else:
+            await self._json(send, request, 200, responses[0])
+    
+    async def _call(self, message: Any, server_id: Optional[str], api_key: Optional[str],
+                    session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Answer one JSON-RPC message (None for a notification)."""
+        if (not isinstance(message, dict) or message.get('jsonrpc') != '2.0' or
+                not isinstance(message.get('method'), str)):
+            message_id = message.get('id') if isinstance(message, dict) else None
+            return _error(message_id, INVALID_REQUEST, "Invalid Request")
+        
+        server_id, message = route_message(message, server_id)
+        if server_id is None:
+            response = _error(message.get('id'), INVALID_PARAMS,
+                              "No server selected: send X-MCP-Server or a namespaced tool name")
+        else:
+            response = await self.gateway.send_request(server_id, message, api_key=api_key,
+                                                       session_id=session_id)
+        return response if 'id' in message else None
+    
+    async def _stream(self, send: Send, calls: List[Awaitable[Any]],
+                      token: Optional[Any]) -> None:
+        """Answer as server-sent events, each response as soon as it is ready.
+        
+        With a progress token, ``notifications/progress`` events count the
+        completed messages.
+        """
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')
+        ]})
+        pending = {asyncio.ensure_future(call) for call in calls}
+        total, done_count = len(pending), 0
+        try:
+            if token is not None:
+                await self._event(send, _progress(token, 0, total))
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self.sse_keepalive,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n',
+                                'more_body': True})
+                    continue
+                for task in done:
+                    done_count += 1
+                    if token is not None:
+                        await self._event(send, _progress(token, done_count, total))
+                    response = task.result()
+                    if response is not None:
+                        await self._event(send, response)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            # The client went away: stop waiting for the rest
+            for task in pending:
+                task.cancel()
+    
+    async def _event(self, send: Send, message: Dict[str, Any]) -> None:
+        await send({'type': 'http.response.body', 'body': _sse('message', message),
+                    'more_body': True})
+    
+    async def _servers(self, request: _Request, receive: Receive, send: Send) -> None:
+        query = request.query
+        running = query.get('running')
+        try:
+            limit = int(query['limit']) if 'limit' in query else None
+        except ValueError:
+            await self._json(send, request, 400, {"error": {"message": "limit must be an integer"}})
+            return
+        servers = await self.gateway.list_servers(
+            filter_running=None if running is None else running.lower() in ('1', 'true', 'yes'),
+            transport=query.get('transport'), category=query.get('category'),
+            tag=query.get('tag'), cursor=query.get('cursor'), limit=limit
+        )
+        next_cursor = servers[-1]['id'] if limit and len(servers) == limit else None
+        await self._json(send, request, 200, {"servers": servers, "nextCursor": next_cursor})
+    
+    async def _metrics(self, request: _Request, receive: Receive, send: Send) -> None:
+        registry = self._prometheus_registry() if request.accepts('text/plain') else None
+        if registry is not None:
+            body = await self.gateway.run(generate_latest, registry)
+            await self._send(send, request, 200, body, CONTENT_TYPE_LATEST.encode())
+            return
+        await self._json(send, request, 200, await self.gateway.get_metrics())
+    
+    def _prometheus_registry(self) -> Optional[Any]:
+        # The collector reads a single gateway's tables
+        if CollectorRegistry is None or not isinstance(self.gateway.gateway, APIGateway):
+            return None
+        if self._prometheus is None:
+            from .exporter import metrics_registry
+            self._prometheus = metrics_registry(self.gateway.gateway)
+        return self._prometheus
+    
+    async def _health(self, request: _Request, receive: Receive, send: Send) -> None:
+        metrics = await self.gateway.get_metrics()
+        await self._json(send, request, 200, {
+            "status": "healthy",
+            "uptime": metrics['uptime'],
+            "servers": metrics['servers_by_status']
+        })
+    
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+    
+    async def _json(self, send: Send, request: _Request, status: int, payload: Any,
+                    headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        await self._send(send, request, status, _encode(payload), b'application/json', headers)
+    
+    async def _send(self, send: Send, request: _Request, status: int, body: bytes,
+                    content_type: bytes,
+                    headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        headers = [(b'content-type', content_type)] + list(headers or ())
+        if len(body) >= self.gzip_min_size and request.accepts_gzip:
+            if len(body) >= _GZIP_OFFLOAD_SIZE:
+                body = await asyncio.get_running_loop().run_in_executor(
+                    None, gzip.compress, body, _GZIP_LEVEL
+                )
+            else:
+                body = gzip.compress(body, _GZIP_LEVEL)
+            headers += [(b'content-encoding', b'gzip'), (b'vary', b'accept-encoding')]
+        headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def _progress_token(messages: List[Any]) -> Optional[Any]:
+    for message in messages:
+        params = message.get('params') if isinstance(message, dict) else None
+        meta = params.get('_meta') if isinstance(params, dict) else None
+        if isinstance(meta, dict) and meta.get('progressToken') is not None:
+            return meta['progressToken']
+    return None
+
+
+def _progress(token: Any, progress: int, total: int) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "method": "notifications/progress",
+        "params": {"progressToken": token, "progress": progress, "total": total}
+    }
+
+
+def create_app(gateway: Optional[Any] = None, **kwargs: Any) -> GatewayApp:
+    """Build the ASGI app, with a default ``APIGateway`` if none is given.
+    
+    Usable as a factory: ``uvicorn --factory api_gateway.asgi:create_app``.
+    Keyword arguments are those of ``GatewayApp``.
+    """
+    return GatewayApp(gateway if gateway is not None else APIGateway(), **kwargs)
+
+
+def serve_http(gateway: Any, host: str = DEFAULT_HTTP_ADDR, port: int = DEFAULT_HTTP_PORT,
+               api_keys: Optional[Iterable[str]] = None, **config: Any) -> None:
+    """Serve a gateway over HTTP with uvicorn until interrupted.
+    
+    Args:
+        gateway: Gateway to serve
+        host: Address to bind (loopback by default)
+        port: Port to listen on
+        api_keys: Accepted API keys (None to accept any caller)
+        **config: Further uvicorn settings, e.g. ``timeout_keep_alive``
+    
+    Raises:
+        ImportError: If uvicorn is not installed
+    """
+    if uvicorn is None:
+        raise ImportError("uvicorn is required to serve the gateway over HTTP "
+                          "(pip install uvicorn)")
+    config.setdefault('timeout_keep_alive', DEFAULT_KEEP_ALIVE)
+    uvicorn.run(GatewayApp(gateway, api_keys=api_keys), host=host, port=port, **config)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: ``python -m api_gateway.asgi``."""
+    parser = argparse.ArgumentParser(description="Serve the MCP gateway over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HTTP_ADDR)
+    parser.add_argument('--port', type=int, default=DEFAULT_HTTP_PORT)
+    parser.add_argument('--catalog', help="Server catalog (default: the registry's)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Gateway worker processes (more than one shards servers)")
+    parser.add_argument('--api-key', action='append', dest='api_keys',
+                        help="Accepted API key (repeatable; default $GATEWAY_API_KEY)")
+    args = parser.parse_args(argv)
+    
+    options = {'catalog_path': args.catalog} if args.catalog else {}
+    api_keys = args.api_keys
+    if api_keys is None and os.environ.get('GATEWAY_API_KEY'):
+        api_keys = [os.environ['GATEWAY_API_KEY']]
+    
+    if args.workers > 1:
+        from .sharding import ShardedGateway
+        gateway = ShardedGateway(workers=args.workers, options=options)
+    else:
+        gateway = APIGateway(options=options)
+    try:
+        serve_http(gateway, host=args.host, port=args.port, api_keys=api_keys)
+    finally:
+        gateway.close()
+
+
+if __name__ == '__main__':
+    main()
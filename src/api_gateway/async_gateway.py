@@ -0,0 +1,63 @@
+"""Asyncio interface to a gateway whose calls block."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+
+# Gateway calls that may block at once (each waits on a transport round trip
+# or a server start)
+DEFAULT_MAX_WORKERS = 64
+
+
+class AsyncAPIGateway:
+    """Awaitable wrapper around an ``APIGateway`` or ``ShardedGateway``.
+    
+    Gateway calls block on transport round trips and server starts, so each
+    one runs on a thread pool; the event loop stays free to parse, route
+    and stream other requests meanwhile. The gateway is thread-safe, so
+    concurrent calls proceed in parallel up to ``max_workers``.
+    """
+    
+    def __init__(self, gateway: Any, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize the wrapper.
+        
+        Args:
+            gateway: Gateway to call
+            max_workers: Gateway calls in progress at once
+        """
+        self.gateway = gateway
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='mcp-gateway-call')
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the gateway's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def start_server(self, server_id: str) -> Dict[str, Any]:
+        return await self.run(self.gateway.start_server, server_id)
+    
+    async def stop_server(self, server_id: str) -> Dict[str, Any]:
+        return await self.run(self.gateway.stop_server, server_id)
+    
+    async def send_request(self, server_id: str, request: Dict[str, Any],
+                           **kwargs: Any) -> Dict[str, Any]:
+        """Send a request; keyword arguments are those of the gateway's."""
+        return await self.run(self.gateway.send_request, server_id, request, **kwargs)
+    
+    async def get_server_info(self, server_id: str) -> Dict[str, Any]:
+        return await self.run(self.gateway.get_server_info, server_id)
+    
+    async def list_servers(self, **filters: Any) -> List[Dict[str, Any]]:
+        return await self.run(self.gateway.list_servers, **filters)
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        return await self.run(self.gateway.get_metrics)
+    
+    async def close(self, close_gateway: bool = True) -> None:
+        """Stop the thread pool, and the gateway unless told otherwise."""
+        if close_gateway:
+            await self.run(self.gateway.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,145 @@
+"""Load-driven replica count decisions for autoscaled servers."""
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .utils import parse_duration
+
+
+DEFAULT_TARGET_IN_FLIGHT = 1.0
+DEFAULT_SCALE_UP_COOLDOWN = 10.0
+DEFAULT_SCALE_DOWN_COOLDOWN = 120.0
+
+
+class ScalingPolicy:
+    """Pick a server's replica count from its in-flight, queued and latency load.
+    
+    The desired count is the outstanding requests (in flight plus queued)
+    divided by ``target_in_flight`` per replica, rounded up. When
+    ``target_latency`` is set and the average replica latency exceeds it
+    while every replica is busy, one more replica is asked for. The result
+    is clamped to ``min_replicas``..``max_replicas``.
+    
+    Bursts are absorbed quickly: scale-ups jump straight to the desired
+    count, at most once per ``scale_up_cooldown``. Scale-downs are
+    deliberately slow to avoid flapping: the count only drops if every
+    recommendation over the last ``scale_down_cooldown`` was lower, one
+    replica at a time, and no sooner than ``scale_down_cooldown`` after
+    the previous change.
+    """
+    
+    def __init__(self, min_replicas: int = 1, max_replicas: int = 1,
+                 target_in_flight: float = DEFAULT_TARGET_IN_FLIGHT,
+                 target_latency: Optional[float] = None,
+                 scale_up_cooldown: float = DEFAULT_SCALE_UP_COOLDOWN,
+                 scale_down_cooldown: float = DEFAULT_SCALE_DOWN_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the policy.
+        
+        Args:
+            min_replicas: Fewest replicas to keep running
+            max_replicas: Most replicas to run
+            target_in_flight: Outstanding requests each replica should carry
+            target_latency: Average latency in seconds above which a busy
+                server gets another replica (None disables the trigger)
+            scale_up_cooldown: Seconds between scale-ups
+            scale_down_cooldown: Seconds of lower load required before
+                removing a replica
+            clock: Monotonic time source
+        """
+        if max_replicas < min_replicas:
+            raise ValueError("max_replicas must not be below min_replicas")
+        
+        self.min_replicas = max(1, min_replicas)
+        self.max_replicas = max_replicas
+        self.target_in_flight = target_in_flight
+        self.target_latency = target_latency
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_cooldown = scale_down_cooldown
+        self.clock = clock
+        
+        self._recommendations: Deque[Tuple[float, int]] = deque()
+        self._last_scale_up = -math.inf
+        self._last_change = clock()
+    
+    @classmethod
+    def from_config(cls, scaling: Dict[str, Any],
+                    defaults: Optional[Dict[str, Any]] = None) -> Optional['ScalingPolicy']:
+        """Build a policy from a catalog ``scaling`` block.
+        
+        Args:
+            scaling: Catalog settings (minReplicas, maxReplicas,
+                targetInFlight, targetLatency, scaleUpCooldown,
+                scaleDownCooldown)
+            defaults: Gateway-wide fallbacks using the same keys
+        
+        Returns:
+            Policy, or None if the server is not autoscaled
+        """
+        settings = dict(defaults or {}, **scaling)
+        min_replicas = int(settings.get('minReplicas', settings.get('replicas', 1)))
+        max_replicas = int(settings.get('maxReplicas', min_replicas))
+        if max_replicas <= min_replicas:
+            return None
+        
+        return cls(
+            min_replicas=min_replicas,
+            max_replicas=max_replicas,
+            target_in_flight=float(settings.get('targetInFlight', DEFAULT_TARGET_IN_FLIGHT)),
+            target_latency=parse_duration(settings.get('targetLatency')),
+            scale_up_cooldown=parse_duration(settings.get('scaleUpCooldown'),
+                                             DEFAULT_SCALE_UP_COOLDOWN),
+            scale_down_cooldown=parse_duration(settings.get('scaleDownCooldown'),
+                                               DEFAULT_SCALE_DOWN_COOLDOWN)
+        )
+    
+    def desired_replicas(self, current: int, in_flight: int, queue_depth: int,
+                         latency: Optional[float] = None) -> int:
+        """Replicas needed for the given load, ignoring cooldowns."""
+        load = in_flight + queue_depth
+        desired = math.ceil(load / self.target_in_flight)
+        
+        if (self.target_latency is not None and latency is not None and
+                latency > self.target_latency and load >= current):
+            desired = max(desired, current + 1)
+        
+        return min(self.max_replicas, max(self.min_replicas, desired))
+    
+    def decide(self, current: int, in_flight: int, queue_depth: int,
+               latency: Optional[float] = None) -> int:
+        """Replica count to run now, applying cooldowns.
+        
+        Args:
+            current: Replicas currently running
+            in_flight: Requests being handled by the replicas
+            queue_depth: Requests waiting for a concurrency slot
+            latency: Average replica latency in seconds, if known
+        
+        Returns:
+            The new replica count (``current`` if nothing should change)
+        """
+        now = self.clock()
+        desired = self.desired_replicas(current, in_flight, queue_depth, latency)
+        
+        self._recommendations.append((now, desired))
+        while self._recommendations[0][0] < now - self.scale_down_cooldown:
+            self._recommendations.popleft()
+        
+        if current < self.min_replicas:
+            return self.min_replicas
+        
+        if desired > current:
+            if now - self._last_scale_up < self.scale_up_cooldown:
+                return current
+            self._last_scale_up = now
+            self._last_change = now
+            return desired
+        
+        stable = max(recommended for _, recommended in self._recommendations)
+        if stable < current and now - self._last_change >= self.scale_down_cooldown:
+            self._last_change = now
+            return current - 1
+        
+        return current
@@ -0,0 +1,264 @@
+"""Sampled capture of gateway traffic to a JSON-lines file, for replay."""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lifecycle import PeriodicTask
+from .utils import parse_duration
+
+
+# Bump when the record layout changes
+CAPTURE_VERSION = 1
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Records held between flushes before new ones are dropped
+DEFAULT_BUFFER_SIZE = 10000
+
+
+class TrafficCapture:
+    """Requests and responses, appended to a JSON-lines file in the background.
+    
+    ``record`` encodes the request (the caller may change or reuse it once
+    it is answered), keeps a reference to the response and returns; a
+    background thread encodes the responses and appends the records every
+    ``flush_interval``, so requests never wait for the disk. A share
+    ``sample_rate`` of requests is kept, and requests are dropped (and
+    counted) while ``buffer_size`` records are waiting to be written, once
+    the file reaches ``max_bytes``, after ``close`` and when a message
+    cannot be encoded.
+    
+    Each capture session starts with a header line (version, start time,
+    sample rate). Records hold the request, its server, when it arrived
+    (seconds since the session started), the gateway's latency, the
+    response's error code and size, and, with ``responses``, the response
+    itself. API keys are never written.
+    """
+    
+    def __init__(self, path: str, sample_rate: float = DEFAULT_SAMPLE_RATE,
+                 responses: bool = False, max_bytes: Optional[int] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Initialize the capture.
+        
+        Args:
+            path: Capture file, appended to
+            sample_rate: Share of requests captured (0.0 to 1.0)
+            responses: Write whole responses, not just their error and size
+            max_bytes: File size at which capturing stops (None for no limit)
+            flush_interval: Seconds between background writes
+            buffer_size: Records waiting to be written before new ones are
+                dropped
+        """
+        self.path = os.path.abspath(path)
+        self.sample_rate = sample_rate
+        self.responses = responses
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        # Serializes file writes, which happen outside ``_lock``
+        self._write_lock = threading.Lock()
+        self._pending: List[Tuple[str, str, Dict[str, Any], float, float]] = []
+        self._origin = time.monotonic()
+        self._started_at = time.time()
+        self._header_written = False
+        self._bytes = 0
+        self._closed = False
+        self._flusher = PeriodicTask(self.flush, flush_interval, name='mcp-traffic-capture')
+        
+        self.captured = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.full = False
+    
+    @classmethod
+    def from_config(cls, config: Any, default_path: str) -> Optional['TrafficCapture']:
+        """Build a capture from the ``capture`` gateway option.
+        
+        Args:
+            config: A file path, True for ``default_path``, or a dict with
+                path, sampleRate, responses, maxBytes, flushInterval
+                (duration) and bufferSize
+            default_path: File used when the config names none
+        
+        Returns:
+            TrafficCapture, or None if capture is off
+        """
+        if not config:
+            return None
+        if isinstance(config, str):
+            config = {'path': config}
+        settings = config if isinstance(config, dict) else {}
+        if not settings.get('enabled', True):
+            return None
+        
+        max_bytes = settings.get('maxBytes')
+        return cls(
+            settings.get('path') or default_path,
+            sample_rate=float(settings.get('sampleRate', DEFAULT_SAMPLE_RATE)),
+            responses=bool(settings.get('responses', False)),
+            max_bytes=int(max_bytes) if max_bytes is not None else None,
+            flush_interval=parse_duration(settings.get('flushInterval'), DEFAULT_FLUSH_INTERVAL),
+            buffer_size=int(settings.get('bufferSize', DEFAULT_BUFFER_SIZE))
+        )
+    
+    def record(self, server_id: str, request: Dict[str, Any], response: Dict[str, Any],
+               started: float, latency: float) -> None:
+        """Capture one answered request, if it is sampled.
+        
+        Args:
+            server_id: Target server
+            request: JSON-RPC request
+            response: The gateway's response
+            started: ``time.monotonic()`` when the request arrived
+            latency: Seconds the gateway took to answer
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if self._closed or self.full or len(self._pending) >= self.buffer_size:
+                self.dropped += 1
+                return
+        try:
+            encoded_request = _encode(request)[:-1]
+        except (TypeError, ValueError, RecursionError):
+            encoded_request = None
+        with self._lock:
+            # Unencodable, or closed while the request was being encoded
+            if encoded_request is None or self._closed:
+                self.dropped += 1
+                return
+            self._pending.append((server_id, encoded_request, response, started, latency))
+    
+    def flush(self) -> int:
+        """Write pending records.
+        
+        Returns:
+            Number of records written
+        """
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending and self._header_written:
+                return 0
+            
+            lines = [] if self._header_written else [_encode({
+                'version': CAPTURE_VERSION, 'startedAt': self._started_at,
+                'sampleRate': self.sample_rate, 'responses': self.responses
+            })]
+            unencodable = 0
+            for entry in pending:
+                try:
+                    lines.append(self._line(*entry))
+                except (TypeError, ValueError, RecursionError):
+                    unencodable += 1
+            written = len(pending) - unencodable
+            data = ''.join(lines)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+                    self._bytes = f.tell()
+            except OSError:
+                with self._lock:
+                    self.dropped += len(pending)
+                    self.write_errors += 1
+                return 0
+            
+            with self._lock:
+                self._header_written = True
+                self.captured += written
+                self.dropped += unencodable
+                if self.max_bytes is not None and self._bytes >= self.max_bytes:
+                    self.full = True
+            return written
+    
+    def _line(self, server_id: str, request: str, response: Dict[str, Any],
+              started: float, latency: float) -> str:
+        encoded_response = _encode(response)[:-1]
+        error = response.get('error') if isinstance(response, dict) else None
+        # Spliced around the request, which was encoded when it was recorded
+        head = _encode({'t': round(started - self._origin, 6), 'server': server_id})
+        tail = _encode({
+            'latencyMs': round(latency * 1000, 3),
+            'error': error.get('code') if isinstance(error, dict) else None,
+            'responseBytes': len(encoded_response)
+        })
+        line = head[:-2] + ',"request":' + request + ',' + tail[1:-2]
+        if self.responses:
+            line += ',"response":' + encoded_response
+        return line + '}\n'
+    
+    def start(self) -> None:
+        """Start writing in a background thread."""
+        self._flusher.start()
+    
+    def close(self) -> None:
+        """Stop the background thread and write what is pending.
+        
+        Records arriving afterwards are dropped.
+        """
+        with self._lock:
+            self._closed = True
+        self._flusher.stop()
+        self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Capture counters for metrics."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "sample_rate": self.sample_rate,
+                "captured": self.captured,
+                "pending": len(self._pending),
+                "dropped": self.dropped,
+                "bytes": self._bytes,
+                "full": self.full,
+                "closed": self._closed,
+                "write_errors": self.write_errors
+            }
+
+
+def load_capture(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Read a capture file.
+    
+    Sessions appended one after another are joined: each one's arrival
+    times continue from the end of the one before. Lines torn by a crash
+    are skipped.
+    
+    Returns:
+        The first session's header and the records in arrival order
+    """
+    header: Dict[str, Any] = {}
+    records: List[Dict[str, Any]] = []
+    offset = 0.0
+    session_end = 0.0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            if 'version' in entry:
+                if entry['version'] != CAPTURE_VERSION:
+                    raise ValueError(f"Unsupported capture version {entry['version']} in {path}")
+                header = header or entry
+                offset = session_end
+                continue
+            if 'request' not in entry or 't' not in entry:
+                continue
+            entry['t'] = float(entry['t']) + offset
+            session_end = max(session_end, entry['t'])
+            records.append(entry)
+    records.sort(key=lambda entry: entry['t'])
+    return header, records
+
+
+def _encode(entry: Any) -> str:
+    # Unencodable values (which JSON-RPC does not send) are written as text
+    return json.dumps(entry, separators=(',', ':'), default=str) + '\n'
@@ -0,0 +1,123 @@
+"""Watch the server catalog file and report when it changes."""
+
+import os
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import inotify_simple
+except ImportError:  # optional: fall back to polling the file's mtime
+    inotify_simple = None
+
+from .lifecycle import PeriodicTask
+
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class CatalogWatcher:
+    """Call ``on_change`` after the catalog file has been modified.
+    
+    Uses inotify (through the optional ``inotify_simple`` package) when it
+    is available and polls the file's modification time otherwise. Changes
+    are recognised by the file's inode, mtime and size, so several events
+    for one save trigger a single reload, and so does an editor replacing
+    the file instead of writing it in place. If ``on_change`` raises (e.g.
+    the file was read while half written), the change is retried on the
+    next event or poll.
+    """
+    
+    def __init__(self, path: str, on_change: Callable[[], Any],
+                 interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: Optional[bool] = None):
+        """Initialize the watcher.
+        
+        Args:
+            path: Catalog file to watch
+            on_change: Callback run from the watcher thread after a change
+            interval: Seconds between polls (and the longest wait for an
+                inotify event before checking for a stop request)
+            use_inotify: Force inotify on or off (default: when installed)
+        """
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        if use_inotify is None:
+            use_inotify = inotify_simple is not None
+        self.use_inotify = use_inotify
+        
+        self._signature = self._stat()
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._poller = PeriodicTask(self.check, interval, name='mcp-catalog-watcher')
+    
+    @property
+    def running(self) -> bool:
+        """Whether the watcher thread is alive."""
+        if self.use_inotify:
+            return self._thread is not None and self._thread.is_alive()
+        return self._poller.running
+    
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        if self.running:
+            return
+        if not self.use_inotify:
+            self._poller.start()
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='mcp-catalog-watcher',
+                                        daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop watching and wait for the thread to exit."""
+        self._poller.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+    
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def check(self) -> bool:
+        """Run ``on_change`` if the file changed since the last check.
+        
+        Returns:
+            Whether a change was handled
+        """
+        with self._check_lock:
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return False
+            self.on_change()
+            # Only a handled change is remembered, so failures are retried
+            self._signature = signature
+            return True
+    
+    def _watch(self) -> None:
+        inotify = inotify_simple.INotify()
+        flags = inotify_simple.flags
+        # Watch the directory: editors often replace the file on save
+        inotify.add_watch(os.path.dirname(self.path),
+                          flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+        name = os.path.basename(self.path)
+        try:
+            while not self._stop.is_set():
+                events = inotify.read(timeout=int(self.interval * 1000))
+                if not events or any(event.name == name for event in events):
+                    # A quiet interval doubles as a poll, in case events
+                    # were missed (e.g. on network filesystems)
+                    try:
+                        self.check()
+                    except Exception:
+                        pass
+        finally:
+            inotify.close()
@@ -0,0 +1,226 @@
+"""Per-server circuit breaker with half-open probing."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .utils import parse_duration
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast while a server is erroring or too slow.
+    
+    Outcomes of the last ``window_size`` calls are tracked. Once at least
+    ``min_calls`` have been seen, the circuit opens when the failure rate
+    reaches ``failure_rate`` or the share of calls slower than
+    ``slow_call_threshold`` reaches ``slow_call_rate``. While open every
+    call is rejected immediately. After ``open_duration`` the circuit goes
+    half-open and lets up to ``half_open_probes`` calls through: if they
+    all succeed it closes again, and any failed or slow probe reopens it.
+    """
+    
+    def __init__(self, window_size: int = 20, min_calls: int = 10,
+                 failure_rate: float = 0.5,
+                 slow_call_threshold: Optional[float] = None,
+                 slow_call_rate: float = 1.0,
+                 open_duration: float = 30.0, half_open_probes: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker.
+        
+        Args:
+            window_size: Number of recent calls considered
+            min_calls: Calls required in the window before the breaker can trip
+            failure_rate: Failure share that trips the breaker
+            slow_call_threshold: Seconds after which a call counts as slow
+                (None disables the latency trigger)
+            slow_call_rate: Slow-call share that trips the breaker
+            open_duration: Seconds to stay open before probing
+            half_open_probes: Probe calls allowed while half-open
+            clock: Monotonic time source
+        """
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._window: Deque[Tuple[bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+    
+    @classmethod
+    def from_config(cls, config: Any,
+                    defaults: Any = None) -> Optional['CircuitBreaker']:
+        """Build a breaker from a catalog ``circuitBreaker`` block.
+        
+        Breakers are off unless the catalog entry or the gateway-wide
+        defaults ask for one.
+        
+        Args:
+            config: Catalog settings (enabled, windowSize, minCalls,
+                failureRate, slowCallThreshold, slowCallRate, openDuration,
+                halfOpenProbes), True for the defaults, or None
+            defaults: Gateway-wide fallbacks using the same keys, or True
+                to give every server a breaker with the built-in settings
+        
+        Returns:
+            Breaker, or None if disabled for this server
+        """
+        if config is None and not defaults:
+            return None
+        settings = dict(defaults if isinstance(defaults, dict) else {},
+                        **(config if isinstance(config, dict) else {}))
+        if config is False or not settings.get('enabled', True):
+            return None
+        
+        return cls(
+            window_size=int(settings.get('windowSize', 20)),
+            min_calls=int(settings.get('minCalls', 10)),
+            failure_rate=float(settings.get('failureRate', 0.5)),
+            slow_call_threshold=parse_duration(settings.get('slowCallThreshold')),
+            slow_call_rate=float(settings.get('slowCallRate', 1.0)),
+            open_duration=parse_duration(settings.get('openDuration'), 30.0),
+            half_open_probes=int(settings.get('halfOpenProbes', 3))
+        )
+    
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the wait is over."""
+        with self._lock:
+            self._refresh()
+            return self._state
+    
+    def peek_state(self) -> str:
+        """Current state without locking, for scrape-time metrics."""
+        state = self._state
+        if state == OPEN and self.clock() - self._opened_at >= self.open_duration:
+            return HALF_OPEN
+        return state
+    
+    def _refresh(self) -> None:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_duration:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+    
+    def allow(self) -> None:
+        """Admit a call or reject it.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                probe slots taken
+        """
+        with self._lock:
+            self._refresh()
+            
+            if self._state == CLOSED:
+                return
+            
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return
+            
+            self.rejected += 1
+            retry_after = max(0.0, self.open_duration - (self.clock() - self._opened_at))
+            raise CircuitOpenError(f"Circuit {self._state.replace('_', '-')}", retry_after)
+    
+    def cancel(self) -> None:
+        """Give back an admitted call that never reached the server."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+    
+    def record_success(self, latency: float) -> None:
+        """Record a completed call and its latency in seconds."""
+        slow = self.slow_call_threshold is not None and latency >= self.slow_call_threshold
+        self._record(failed=False, slow=slow)
+    
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._record(failed=True, slow=False)
+    
+    def _record(self, failed: bool, slow: bool) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._trip()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._reset()
+                return
+            
+            if self._state == OPEN:
+                # Late result of a call admitted before the circuit opened
+                return
+            
+            self._window.append((failed, slow))
+            self._failures += failed
+            self._slow += slow
+            if len(self._window) > self.window_size:
+                old_failed, old_slow = self._window.popleft()
+                self._failures -= old_failed
+                self._slow -= old_slow
+            
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            if (self._failures / calls >= self.failure_rate or
+                    (self.slow_call_threshold is not None and
+                     self._slow / calls >= self.slow_call_rate)):
+                self._trip()
+    
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self.times_opened += 1
+    
+    def _reset(self) -> None:
+        self._state = CLOSED
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker state and counters for server info and metrics."""
+        with self._lock:
+            self._refresh()
+            calls = len(self._window)
+            stats = {
+                "state": self._state,
+                "failure_rate": self._failures / calls if calls else 0.0,
+                "slow_call_rate": self._slow / calls if calls else 0.0,
+                "window_calls": calls,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+            if self._state != CLOSED:
+                stats["retry_after"] = max(
+                    0.0, self.open_duration - (self.clock() - self._opened_at)
+                )
+            return stats
@@ -0,0 +1,102 @@
+"""Request coalescing: identical in-flight reads share one upstream call."""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .singleflight import SingleFlight
+
+
+class RequestCoalescer:
+    """Share one upstream call among identical concurrent requests.
+    
+    Only methods explicitly opted in are coalesced, since it is only safe
+    for read-only requests. Two requests are identical when they target the
+    same server with the same method and params, on behalf of the same
+    caller (API key) and client session, so one tenant or session never
+    gets an answer meant for another; the JSON-RPC ``id`` and
+    ``params._meta`` are ignored. Every caller receives the leader's
+    response with its own ``id`` written back in.
+    """
+    
+    def __init__(self, methods: Optional[Iterable[str]] = None):
+        """Initialize the coalescer.
+        
+        Args:
+            methods: JSON-RPC methods eligible for coalescing
+        """
+        self.methods = frozenset(methods or ())
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced = 0
+    
+    def enabled_for(self, request: Dict[str, Any]) -> bool:
+        """Whether a request may share an upstream call."""
+        # Notifications have no id and expect no response
+        return request.get('method') in self.methods and 'id' in request
+    
+    def key(self, server_id: str, request: Dict[str, Any],
+            scope: Tuple[Optional[str], ...] = ()) -> Optional[Tuple[Any, ...]]:
+        """Build the identity of a request, or None if it cannot be keyed.
+        
+        Args:
+            server_id: Target server
+            request: JSON-RPC request
+            scope: Who is asking, e.g. (API key, session ID); requests only
+                coalesce with others of the same scope
+        """
+        params = request.get('params')
+        if isinstance(params, dict) and '_meta' in params:
+            params = {k: v for k, v in params.items() if k != '_meta'}
+        
+        try:
+            encoded = json.dumps(params, sort_keys=True, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+        
+        return (server_id, request['method'], encoded) + tuple(scope)
+    
+    def execute(self, server_id: str, request: Dict[str, Any],
+                send: Callable[[Dict[str, Any]], Dict[str, Any]],
+                scope: Tuple[Optional[str], ...] = ()) -> Dict[str, Any]:
+        """Send a request, joining an identical in-flight call if there is one.
+        
+        Args:
+            server_id: Target server
+            request: JSON-RPC request
+            send: Callable performing the upstream call
+            scope: Who is asking (see ``key``)
+        
+        Returns:
+            JSON-RPC response carrying the caller's request id
+        """
+        key = self.key(server_id, request, scope)
+        if key is None:
+            return send(request)
+        
+        def upstream() -> Dict[str, Any]:
+            with self._lock:
+                self.upstream_calls += 1
+            return send(request)
+        
+        response, shared = self._flights.do(key, upstream)
+        if not shared:
+            return response
+        
+        with self._lock:
+            self.coalesced += 1
+        # Shallow copy: the result payload is shared between callers
+        return dict(response, id=request['id'])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters for metrics."""
+        with self._lock:
+            upstream_calls, coalesced = self.upstream_calls, self.coalesced
+        total = upstream_calls + coalesced
+        return {
+            "methods": sorted(self.methods),
+            "upstream_calls": upstream_calls,
+            "coalesced": coalesced,
+            "hit_rate": coalesced / total if total else 0.0
+        }
@@ -0,0 +1,398 @@
+"""Prometheus exposition of gateway metrics, collected at scrape time."""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from prometheus_client import CollectorRegistry, ProcessCollector, start_http_server
+    from prometheus_client.core import (
+        CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+    )
+except ImportError:  # optional: only needed to serve /metrics
+    CollectorRegistry = None
+
+from .circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from .lifecycle import PeriodicTask
+from .metrics import LatencyHistogram
+from .registry_cache import get_stats as registry_cache_stats
+
+
+DEFAULT_METRICS_PORT = 9464
+# Loopback only by default: metrics name servers, tools and processes
+DEFAULT_METRICS_ADDR = '127.0.0.1'
+# Upper bounds in seconds of the exported latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BREAKER_STATES = (CLOSED, OPEN, HALF_OPEN)
+BYTES_PER_MB = 1024 * 1024
+# Seconds between refreshes of the server process snapshot
+DEFAULT_PROCESS_INTERVAL = 15.0
+
+
+def histogram_buckets(histogram: LatencyHistogram) -> Tuple[List[Tuple[str, int]], float]:
+    """Cumulative Prometheus buckets and sum of a latency histogram."""
+    cumulative, count, total = histogram.cumulative_counts(LATENCY_BUCKETS)
+    buckets = [(str(bound), seen) for bound, seen in zip(LATENCY_BUCKETS, cumulative)]
+    buckets.append(('+Inf', count))
+    return buckets, total
+
+
+class GatewayCollector:
+    """Prometheus collector that reads an APIGateway's state on each scrape.
+    
+    Nothing is added to the request path: the collector reads the counters
+    and histograms the gateway already keeps, without taking the locks
+    requests use, so a slow scrape never delays traffic. Label values are
+    bounded: servers come from the catalog, methods are capped per server
+    by ``metrics_max_methods`` and replicas by ``maxReplicas``. Server
+    process CPU and memory come from a snapshot refreshed in the
+    background, so scrapes make no process manager calls either.
+    """
+    
+    def __init__(self, gateway: Any, process_metrics: bool = True,
+                 process_interval: float = DEFAULT_PROCESS_INTERVAL):
+        """Initialize the collector.
+        
+        Args:
+            gateway: APIGateway to read
+            process_metrics: Also report CPU and memory of server processes
+                (one process manager call per replica per refresh)
+            process_interval: Seconds between refreshes of the server
+                process snapshot; the first scrape takes it directly
+        
+        Raises:
+            ImportError: If prometheus-client is not installed
+        """
+        if CollectorRegistry is None:
+            raise ImportError(
+                "prometheus-client is required for the metrics endpoint "
+                "(pip install prometheus-client)"
+            )
+        self.gateway = gateway
+        self.process_metrics = process_metrics
+        # (server, replica, cpu percent, resident bytes), replaced as a whole
+        self._process_stats: Optional[List[Tuple[str, str, float, float]]] = None
+        self._process_refresh = PeriodicTask(self.refresh_processes, process_interval,
+                                             name='mcp-metrics-processes')
+    
+    def describe(self) -> List[Any]:
+        # Metric families are discovered on each scrape
+        return []
+    
+    def collect(self) -> Iterator[Any]:
+        """Build every metric family from the gateway's current state."""
+        servers = list(self.gateway.servers.items())
+        transports = {
+            server_id: server.get('transport', 'unknown') for server_id, server in servers
+        }
+        
+        yield from self._requests(transports)
+        yield from self._ipc()
+        yield from self._servers()
+        yield from self._admission()
+        yield from self._breakers()
+        yield from self._hedging()
+        yield from self._coalescing()
+        yield from self._registry_cache()
+        yield from self._warm_pool()
+        if self.process_metrics:
+            yield from self._processes()
+    
+    def close(self) -> None:
+        """Stop refreshing the server process snapshot."""
+        self._process_refresh.stop()
+    
+    def _requests(self, transports: Dict[str, str]) -> Iterator[Any]:
+        labels = ['server', 'transport', 'method']
+        requests = CounterMetricFamily(
+            'mcp_gateway_requests', 'Requests answered by the gateway', labels=labels
+        )
+        errors = CounterMetricFamily(
+            'mcp_gateway_request_errors', 'Requests answered with a JSON-RPC error',
+            labels=labels
+        )
+        latency = HistogramMetricFamily(
+            'mcp_gateway_request_duration_seconds',
+            'Time from a request reaching the gateway to its response', labels=labels
+        )
+        
+        for server_id, method, stats in self.gateway._request_metrics.method_stats():
+            values = [server_id, transports.get(server_id, 'unknown'), method]
+            requests.add_metric(values, stats.requests)
+            errors.add_metric(values, stats.errors)
+            buckets, total = histogram_buckets(stats.latency)
+            latency.add_metric(values, buckets, total)
+        
+        yield requests
+        yield errors
+        yield latency
+    
+    def _ipc(self) -> Iterator[Any]:
+        ipc_metrics = self.gateway._ipc_metrics
+        if ipc_metrics is None:
+            return
+        
+        errors = CounterMetricFamily(
+            'mcp_gateway_ipc_errors', 'Failed calls into the transport bridge',
+            labels=['call']
+        )
+        latency = HistogramMetricFamily(
+            'mcp_gateway_ipc_duration_seconds',
+            'Round trip of calls into the transport bridge', labels=['call']
+        )
+        for _, call, stats in ipc_metrics.method_stats():
+            errors.add_metric([call], stats.errors)
+            buckets, total = histogram_buckets(stats.latency)
+            latency.add_metric([call], buckets, total)
+        
+        yield errors
+        yield latency
+    
+    def _servers(self) -> Iterator[Any]:
+        by_status = self.gateway.servers.counts('status')
+        
+        status_gauge = GaugeMetricFamily(
+            'mcp_gateway_servers', 'Catalog servers by status', labels=['status']
+        )
+        for status, count in sorted(by_status.items()):
+            status_gauge.add_metric([status], count)
+        
+        in_flight = GaugeMetricFamily(
+            'mcp_gateway_in_flight_requests', 'Requests being handled per server',
+            labels=['server']
+        )
+        for server_id, count in list(self.gateway._in_flight.items()):
+            in_flight.add_metric([server_id], count)
+        
+        replicas = GaugeMetricFamily(
+            'mcp_gateway_replicas', 'Replicas serving each server', labels=['server']
+        )
+        replica_in_flight = GaugeMetricFamily(
+            'mcp_gateway_replica_in_flight_requests', 'Requests in flight per replica',
+            labels=['server', 'replica']
+        )
+        for server_id, pool in list(self.gateway._pools.items()):
+            pool_replicas = pool.peek()
+            replicas.add_metric([server_id], len(pool_replicas))
+            for replica in pool_replicas:
+                replica_in_flight.add_metric([server_id, str(replica.index)], replica.in_flight)
+        
+        yield status_gauge
+        yield in_flight
+        yield replicas
+        yield replica_in_flight
+    
+    def _admission(self) -> Iterator[Any]:
+        active = GaugeMetricFamily(
+            'mcp_gateway_admission_active', 'Requests holding an admission slot',
+            labels=['server']
+        )
+        limit = GaugeMetricFamily(
+            'mcp_gateway_admission_max_concurrency', 'Admission slots per server',
+            labels=['server']
+        )
+        queue_depth = GaugeMetricFamily(
+            'mcp_gateway_queue_depth', 'Requests waiting for an admission slot',
+            labels=['server', 'priority']
+        )
+        rejected = CounterMetricFamily(
+            'mcp_gateway_admission_rejected', 'Requests rejected by admission control',
+            labels=['server', 'reason']
+        )
+        
+        for server_id, admission in list(self.gateway._admission.items()):
+            if admission is None:
+                continue
+            active.add_metric([server_id], admission.active)
+            limit.add_metric([server_id], admission.max_concurrency)
+            for priority, depth in admission._queue.depth_by_priority().items():
+                queue_depth.add_metric([server_id, priority], depth)
+            for reason, count in list(admission.rejected.items()):
+                rejected.add_metric([server_id, reason], count)
+        
+        yield active
+        yield limit
+        yield queue_depth
+        yield rejected
+    
+    def _breakers(self) -> Iterator[Any]:
+        state = GaugeMetricFamily(
+            'mcp_gateway_circuit_breaker_state',
+            'Circuit breaker state per server (1 for the current state)',
+            labels=['server', 'state']
+        )
+        opened = CounterMetricFamily(
+            'mcp_gateway_circuit_breaker_opened', 'Times each circuit has opened',
+            labels=['server']
+        )
+        rejected = CounterMetricFamily(
+            'mcp_gateway_circuit_breaker_rejected', 'Requests rejected by an open circuit',
+            labels=['server']
+        )
+        
+        for server_id, breaker in list(self.gateway._breakers.items()):
+            if breaker is None:
+                continue
+            current = breaker.peek_state()
+            for name in BREAKER_STATES:
+                state.add_metric([server_id, name], 1 if name == current else 0)
+            opened.add_metric([server_id], breaker.times_opened)
+            rejected.add_metric([server_id], breaker.rejected)
+        
+        yield state
+        yield opened
+        yield rejected
+    
+    def _hedging(self) -> Iterator[Any]:
+        hedged = CounterMetricFamily(
+            'mcp_gateway_hedged_requests', 'Requests sent a second time to another replica',
+            labels=['server']
+        )
+        wins = CounterMetricFamily(
+            'mcp_gateway_hedge_wins', 'Hedges answered before the original request',
+            labels=['server']
+        )
+        exhausted = CounterMetricFamily(
+            'mcp_gateway_hedge_budget_exhausted', 'Hedges skipped for lack of budget',
+            labels=['server']
+        )
+        
+        for server_id, policy in list(self.gateway._hedging.items()):
+            if policy is None:
+                continue
+            hedged.add_metric([server_id], policy.hedged)
+            wins.add_metric([server_id], policy.hedge_wins)
+            exhausted.add_metric([server_id], policy.budget_exhausted)
+        
+        yield hedged
+        yield wins
+        yield exhausted
+    
+    def _coalescing(self) -> Iterator[Any]:
+        coalescer = self.gateway._coalescer
+        upstream = CounterMetricFamily(
+            'mcp_gateway_coalescing_upstream_calls',
+            'Coalescable requests that were sent upstream'
+        )
+        upstream.add_metric([], coalescer.upstream_calls)
+        coalesced = CounterMetricFamily(
+            'mcp_gateway_coalesced_requests',
+            'Requests answered by sharing an identical in-flight call'
+        )
+        coalesced.add_metric([], coalescer.coalesced)
+        
+        yield upstream
+        yield coalesced
+    
+    def _registry_cache(self) -> Iterator[Any]:
+        stats = registry_cache_stats()
+        lookups = CounterMetricFamily(
+            'mcp_gateway_registry_cache_lookups',
+            'Catalog loads answered from memory or a snapshot file, or missed',
+            labels=['level', 'result']
+        )
+        for level in ('memo', 'snapshot'):
+            lookups.add_metric([level, 'hit'], stats[f'{level}_hits'])
+            lookups.add_metric([level, 'miss'], stats[f'{level}_misses'])
+        
+        yield lookups
+    
+    def _warm_pool(self) -> Iterator[Any]:
+        warm_pool = self.gateway._warm_pool
+        if warm_pool is None:
+            return
+        
+        claims = CounterMetricFamily(
+            'mcp_gateway_warm_pool_claims', 'Replicas started from a warm pool process'
+        )
+        claims.add_metric([], warm_pool.claims)
+        misses = CounterMetricFamily(
+            'mcp_gateway_warm_pool_misses', 'Replica starts that found no warm process'
+        )
+        misses.add_metric([], warm_pool.misses)
+        
+        yield claims
+        yield misses
+    
+    def _processes(self) -> Iterator[Any]:
+        if self._process_stats is None:
+            self.refresh_processes()
+            self._process_refresh.start()
+        
+        labels = ['server', 'replica']
+        cpu = GaugeMetricFamily(
+            'mcp_gateway_process_cpu_percent', 'CPU use of server processes',
+            labels=labels
+        )
+        memory = GaugeMetricFamily(
+            'mcp_gateway_process_resident_memory_bytes',
+            'Resident memory of server processes', labels=labels
+        )
+        for server_id, index, cpu_percent, resident in self._process_stats:
+            cpu.add_metric([server_id, index], cpu_percent)
+            memory.add_metric([server_id, index], resident)
+        
+        yield cpu
+        yield memory
+    
+    def refresh_processes(self) -> None:
+        """Take a new snapshot of server process CPU and memory."""
+        stats = []
+        for server_id, server in list(self.gateway.servers.items()):
+            if server.get('status') != 'running':
+                continue
+            pool = self.gateway._pools.get(server_id)
+            replicas = pool.peek() if pool is not None else []
+            process_ids = [(str(replica.index), replica.process_id) for replica in replicas]
+            if not process_ids and server.get('processId'):
+                process_ids = [('0', server['processId'])]
+            
+            for index, process_id in process_ids:
+                if not process_id:
+                    continue
+                try:
+                    status = self.gateway.process_manager.get_process_status(process_id)
+                except Exception:
+                    continue
+                stats.append((server_id, index, float(status.get('cpu') or 0),
+                              float(status.get('memory') or 0) * BYTES_PER_MB))
+        self._process_stats = stats
+
+
+def metrics_registry(gateway: Any) -> Any:
+    """A new registry with a gateway's metrics and its own process's.
+    
+    Besides ``GatewayCollector`` it holds prometheus-client's
+    ``ProcessCollector``, which reports the gateway process's CPU time,
+    resident memory and open files as the standard ``process_*`` metrics.
+    """
+    registry = CollectorRegistry()
+    registry.register(GatewayCollector(gateway))
+    ProcessCollector(registry=registry)
+    return registry
+
+
+def start_metrics_server(gateway: Any, port: int = DEFAULT_METRICS_PORT,
+                         addr: str = DEFAULT_METRICS_ADDR,
+                         registry: Optional[Any] = None) -> Any:
+    """Serve a gateway's metrics at ``http://addr:port/metrics``.
+    
+    The HTTP server runs on a daemon thread; metrics are collected when
+    Prometheus scrapes.
+    
+    Args:
+        gateway: APIGateway to export
+        port: Port to listen on
+        addr: Address to bind (loopback by default)
+        registry: Registry to add the collector to (by default a new one
+            from ``metrics_registry``, so the process-wide default registry
+            is left alone)
+    
+    Returns:
+        The registry being served
+    """
+    if registry is None:
+        registry = metrics_registry(gateway)
+    else:
+        registry.register(GatewayCollector(gateway))
+    start_http_server(port, addr=addr, registry=registry)
+    return registry
@@ -1,8 +1,13 @@
 """API Gateway implementation for unified MCP server management."""
 
-import time
-from typing import Any, Dict, List, Optional
+import itertools
 import json
+import queue
+import signal
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
 import os
 import sys
 
@@ -15,25 +20,209 @@ from contracts.process_manager_contract import ProcessManagerContract
 from contracts.transport_stub import TransportStub
 from contracts.process_manager_stub import ProcessManagerStub
 
+from .admission import AdmissionController, OverloadedError
+from .autoscaler import ScalingPolicy
+from .capture import TrafficCapture
+from .catalog_watcher import DEFAULT_POLL_INTERVAL, CatalogWatcher
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .coalescing import RequestCoalescer
+from .hedging import HedgePolicy
+from .lifecycle import IdleReaper, PeriodicTask, wait_until_ready
+from .metrics import DEFAULT_MAX_METHODS, RequestMetrics
+from .profiling import (DEFAULT_ALLOCATION_FRAMES, DEFAULT_PROFILE_DURATION,
+                        DEFAULT_REQUEST_COUNT, DEFAULT_SAMPLE_INTERVAL, DEFAULT_TOP,
+                        AllocationTracker, RequestProfiler, StackSampler)
+from .rate_limit import (DEFAULT_MAX_KEYS, MethodRules, RateLimitedError, RateLimiter,
+                         checks_for, load_rate_limits, tenant_rules)
+from .registry_cache import default_cache_dir, load_servers
+from .registry_cache import get_stats as registry_cache_stats
+from .replicas import Replica, ReplicaPool
+from .scheduler import normalize_priority, priority_weights
+from .server_table import ServerTable
+from .singleflight import SingleFlight
+from .state_journal import (DEFAULT_FLUSH_INTERVAL, StateJournal, config_digest,
+                            process_command_line, stop_saved_process)
+from . import tracing
+from .tracing import Tracer
+from .transport_detection import detect_transport
+from .utils import expand_placeholders, parse_duration
+from .warm_pool import DEFAULT_REFILL_INTERVAL, WarmPool
+
+
+_REGISTRY_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup', 'registry')
+DEFAULT_CATALOG_PATH = os.path.join(_REGISTRY_DIR, 'enhanced-catalog.json')
+# Explicit transport blocks (type, URL, headers, timeouts) by server ID,
+# read from beside the catalog
+TRANSPORT_CATALOG_NAME = 'transport-catalog.json'
+# State journal file in the cache directory when none is given
+STATE_JOURNAL_NAME = 'gateway-state.jsonl'
+# Traffic capture file in the cache directory when none is given
+CAPTURE_NAME = 'gateway-capture.jsonl'
+# Directory in the cache directory for profiles written without a path
+PROFILES_DIR_NAME = 'profiles'
+
+# Defaults for on-demand (scale-to-zero) servers
+DEFAULT_STARTUP_TIMEOUT = 60.0
+DEFAULT_IDLE_TIMEOUT = 600.0
+DEFAULT_REAPER_INTERVAL = 5.0
+
+# Defaults for replica autoscaling
+DEFAULT_AUTOSCALE_INTERVAL = 5.0
+DEFAULT_DRAIN_TIMEOUT = 30.0
+# Threads shared by hedged requests, one per attempt in flight
+DEFAULT_HEDGE_WORKERS = 32
+# Server key under which transport bridge calls are recorded
+IPC_METRICS_KEY = 'transport'
+
+# JSON-RPC error returned when admission control rejects a request
+SERVER_OVERLOADED = -32003
+# JSON-RPC error returned while a server's circuit breaker is open
+CIRCUIT_OPEN = -32004
+# JSON-RPC error returned when a caller exceeds a rate limit
+RATE_LIMITED = -32005
+
 
 class APIGateway(APIGatewayContract):
     """Unified API Gateway for managing MCP servers across all transport types."""
     
     def __init__(self, transport: Optional[TransportContract] = None, 
-                 process_manager: Optional[ProcessManagerContract] = None):
+                 process_manager: Optional[ProcessManagerContract] = None,
+                 options: Optional[Dict[str, Any]] = None):
         """Initialize API Gateway with transport and process manager.
         
         Args:
             transport: Transport adapter instance
             process_manager: Process manager instance
+            options: Gateway options:
+                - on_demand: Start stopped servers on first request and stop
+                  them when idle (per-server ``lifecycle.onDemand`` overrides)
+                - idle_timeout: Default quiet period before an on-demand
+                  server is stopped (per-server ``lifecycle.idleTimeout``)
+                - reaper_interval: Seconds between idle sweeps
+                - coalesce_methods: Read-only JSON-RPC methods (e.g.
+                  ``tools/list``, ``resources/read``) whose identical
+                  in-flight requests share one upstream call
+                - max_concurrency, max_queue_depth, queue_timeout: Default
+                  admission limits for servers whose catalog entry has no
+                  ``limits`` block (unlimited when unset)
+                - priority_weights: Overrides for the interactive/normal/bulk
+                  scheduling weights
+                - api_key_priorities: Default priority class per API key
+                - rate_limits: Rate limit settings (global, perUser tiers,
+                  methods), or the path of a JSON export of limits.js
+                - api_key_tiers: Rate limit tier (a perUser entry) per API key
+                - rate_limit_max_keys: Rate limit buckets kept in memory
+                - default_priority: Priority for requests that set none
+                - circuit_breaker: Default circuit breaker settings, merged
+                  under each catalog entry's ``circuitBreaker`` block; setting
+                  it gives every server a breaker (only servers with a
+                  ``circuitBreaker`` block get one when unset)
+                - replicas: Default number of replicas per server (per-server
+                  ``scaling.replicas`` overrides)
+                - autoscaling: Default autoscaling settings, merged under each
+                  catalog entry's ``scaling`` block
+                - autoscale_interval: Seconds between autoscaler runs
+                - drain_timeout: Longest wait for a removed replica's requests
+                  to finish before it is stopped
+                - hedging: Default hedged-request settings, merged under each
+                  catalog entry's ``hedging`` block
+                - hedge_workers: Threads shared by hedged requests; reads
+                  arriving while all are busy are sent once, unhedged
+                - metrics_max_methods: Distinct methods (and tools) tracked
+                  per server before the rest are counted together
+                - tracing: True, or tracing settings (sampleRate,
+                  slowThreshold, bufferSize); off by default
+                - catalog_path: Server catalog to load (defaults to the
+                  registry's enhanced-catalog.json)
+                - transport_catalog_path: Catalog of explicit transport
+                  blocks (defaults to transport-catalog.json beside the
+                  catalog; False to use only the catalog's own)
+                - registry_cache: Directory for compiled catalog snapshots,
+                  or False to keep them in memory only
+                - watch_catalog: Reload the catalog whenever the file changes
+                - catalog_poll_interval: Seconds between catalog checks when
+                  inotify is not available
+                - warm_pool: True, or warm pool settings (size,
+                  memoryLimit in MB, refillInterval) for pre-spawned stdio
+                  processes; off by default
+                - state_journal: Journal file of running servers to
+                  re-attach to after a restart, or True for one in the
+                  cache directory; off by default
+                - state_flush_interval: Seconds between journal writes
+                - capture: Capture file of requests and responses for
+                  replay, True for one in the cache directory, or capture
+                  settings (path, sampleRate, responses, maxBytes,
+                  flushInterval, bufferSize); off by default
+                - profiling_signal: Signal (True for SIGUSR2, or a name
+                  such as ``SIGUSR1``) that starts a CPU profile window of
+                  ``profile_duration`` seconds written to the cache
+                  directory; only installed from the main thread
+                - profile_duration: Seconds a signalled CPU profile lasts
         """
         self.transport = transport or TransportStub()
         self.process_manager = process_manager or ProcessManagerStub()
+        self.options = dict(options or {})
         
         # Track active servers and connections
-        self.servers = {}
+        self.servers = ServerTable()
         self.connections = {}
         
+        # Guards request accounting against concurrent lifecycle changes
+        self._lock = threading.RLock()
+        self._in_flight: Dict[str, int] = {}
+        self._last_activity: Dict[str, float] = {}
+        # Servers the idle reaper is stopping; requests to them are refused
+        self._stopping: Set[str] = set()
+        
+        # On-demand lifecycle: concurrent first requests share one start
+        self._starts = SingleFlight()
+        self._reaper = IdleReaper(
+            self.reap_idle_servers,
+            interval=parse_duration(self.options.get('reaper_interval'),
+                                    DEFAULT_REAPER_INTERVAL)
+        )
+        
+        # Single-flight sharing of identical read-only requests (opt-in)
+        self._coalescer = RequestCoalescer(self.options.get('coalesce_methods'))
+        
+        # Per-server admission controllers (None when unlimited); weights
+        # are checked now rather than on a server's first request
+        self._admission: Dict[str, Optional[AdmissionController]] = {}
+        priority_weights(self.options.get('priority_weights'))
+        
+        # Per-server circuit breakers (None when disabled)
+        self._breakers: Dict[str, Optional[CircuitBreaker]] = {}
+        
+        # Per-server hedged-request policies (None when not hedged)
+        self._hedging: Dict[str, Optional[HedgePolicy]] = {}
+        # Shared by all hedged requests; one worker per attempt in flight
+        hedge_workers = int(self.options.get('hedge_workers', DEFAULT_HEDGE_WORKERS))
+        self._hedge_executor = ThreadPoolExecutor(max_workers=hedge_workers,
+                                                  thread_name_prefix='mcp-hedge')
+        self._hedge_workers = threading.BoundedSemaphore(hedge_workers)
+        
+        # Token buckets per API key, (key, server) and (key, server, method)
+        self._rate_settings = load_rate_limits(self.options.get('rate_limits'))
+        self._tenant_rule, self._tier_rules = tenant_rules(self._rate_settings)
+        self._rate_rules: Dict[str, MethodRules] = {}
+        self._rate_limiter = RateLimiter(
+            int(self.options.get('rate_limit_max_keys', DEFAULT_MAX_KEYS))
+        )
+        
+        # Replica pools of running servers
+        self._pools: Dict[str, ReplicaPool] = {}
+        
+        # Autoscaling policies (None when fixed size) and replicas being
+        # drained before they are stopped:
+        # (server_id, replica, deadline, server record)
+        self._scaling: Dict[str, Optional[ScalingPolicy]] = {}
+        self._draining: List[Any] = []
+        self._autoscaler = PeriodicTask(
+            self.autoscale,
+            parse_duration(self.options.get('autoscale_interval'), DEFAULT_AUTOSCALE_INTERVAL),
+            name='mcp-autoscaler'
+        )
+        
         # Metrics tracking
         self.metrics = {
             'requests_total': 0,
@@ -46,34 +235,277 @@ class APIGateway(APIGatewayContract):
             'startup_time': time.time()
         }
         
+        # Per-server, per-method request counts and latency histograms
+        self._request_metrics = RequestMetrics(
+            int(self.options.get('metrics_max_methods', DEFAULT_MAX_METHODS))
+        )
+        
+        # Round trips into the transport bridge, for transports that report
+        # them (the Node.js TransportAdapter), keyed by bridge call
+        self._ipc_metrics: Optional[RequestMetrics] = None
+        if hasattr(self.transport, 'call_observer'):
+            self._ipc_metrics = RequestMetrics()
+            self.transport.call_observer = self._record_ipc
+        
+        # Sampled request traces (None when tracing is off)
+        self._tracer = Tracer.from_config(self.options.get('tracing'))
+        
+        # Sampled requests and responses for replay (None when off)
+        self._capture = self._start_capture(self.options.get('capture'))
+        
+        # On-demand profilers, each None until asked for
+        self._stack_sampler: Optional[StackSampler] = None
+        self._request_profiler: Optional[RequestProfiler] = None
+        self._allocations: Optional[AllocationTracker] = None
+        self._profiling_signal: Optional[int] = None
+        self._previous_handler: Any = None
+        if self.options.get('profiling_signal'):
+            self._install_profiling_signal(self.options['profiling_signal'])
+        
+        # Catalog hot reload: IDs loaded from the catalog, so servers added
+        # at runtime are not mistaken for removed entries
+        self._catalog_ids: Set[str] = set()
+        self._transport_specs: Optional[Dict[str, Dict[str, Any]]] = None
+        self._reload_lock = threading.Lock()
+        self._catalog_watcher = None
+        if self.options.get('watch_catalog'):
+            # Created before loading so no edit in between goes unnoticed
+            self._catalog_watcher = CatalogWatcher(
+                self._catalog_path(), self.reload_catalog,
+                interval=parse_duration(self.options.get('catalog_poll_interval'),
+                                        DEFAULT_POLL_INTERVAL)
+            )
+        
+        # Pre-spawned stdio replicas (None when the warm pool is off)
+        self._warm_pool: Optional[WarmPool] = None
+        self._warm_ids = itertools.count(1)
+        warm_settings = self.options.get('warm_pool')
+        if warm_settings:
+            warm_settings = warm_settings if isinstance(warm_settings, dict) else {}
+            memory_limit = warm_settings.get('memoryLimit')
+            self._warm_pool = WarmPool(
+                self._spawn_warm, self._stop_warm, self._process_alive,
+                memory_limit=float(memory_limit) if memory_limit is not None else None,
+                interval=parse_duration(warm_settings.get('refillInterval'),
+                                        DEFAULT_REFILL_INTERVAL)
+            )
+        
+        # Running servers' replicas, written behind for re-attaching after
+        # a restart (None when off)
+        self._journal: Optional[StateJournal] = None
+        # Keeps journal records in order without holding up requests
+        self._journal_lock = threading.Lock()
+        self._restored: Dict[str, List[str]] = {"reattached": [], "restarted": [], "stopped": []}
+        journal_path = self.options.get('state_journal')
+        if journal_path:
+            if journal_path is True:
+                journal_path = os.path.join(default_cache_dir(), STATE_JOURNAL_NAME)
+            self._journal = StateJournal(
+                journal_path,
+                parse_duration(self.options.get('state_flush_interval'), DEFAULT_FLUSH_INTERVAL)
+            )
+        
         # Load server configurations
         self._load_server_configs()
+        if self._catalog_watcher is not None:
+            self._catalog_watcher.start()
         
         # Initialize transport
         self.transport.initialize()
+        
+        if self._journal is not None:
+            self._restore_state(self._journal.load())
+            self._journal.start()
+        
+        if self._warm_pool is not None:
+            for server_id in list(self.servers):
+                self._update_warm_target(server_id)
+            self._warm_pool.start()
+        
+        if self.options.get('on_demand'):
+            self._reaper.start()
     
     def _load_server_configs(self):
         """Load server configurations from registry."""
-        # Load from enhanced catalog
-        catalog_path = os.path.join(
-            os.path.dirname(__file__), 
-            '..', '..', 'mcp-local-setup', 'registry', 'enhanced-catalog.json'
-        )
-        
         try:
-            with open(catalog_path, 'r') as f:
-                catalog = json.load(f)
-                for server in catalog.get('servers', []):
-                    self.servers[server['id']] = {
-                        'config': server,
-                        'status': 'stopped',
-                        'transport': self._detect_transport(server),
-                        'connectionId': None,
-                        'processId': None
-                    }
+            table = self._load_catalog()
         except FileNotFoundError:
             # Fallback to basic server definitions
             self._add_default_servers()
+            return
+        
+        self.servers.update(table)
+        self._catalog_ids = set(table)
+    
+    def _catalog_path(self) -> str:
+        return self.options.get('catalog_path') or DEFAULT_CATALOG_PATH
+    
+    def _transport_catalog_path(self) -> Optional[str]:
+        path = self.options.get('transport_catalog_path')
+        if path is None:
+            path = os.path.join(os.path.dirname(self._catalog_path()), TRANSPORT_CATALOG_NAME)
+        return path or None
+    
+    def _load_catalog(self) -> Dict[str, Dict[str, Any]]:
+        """Server records of the catalog, via its compiled snapshot when current."""
+        cache_dir = self.options.get('registry_cache')
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        
+        transport_catalog = self._transport_catalog_path()
+        # Read again by the first entry compiled, if the snapshot is stale
+        self._transport_specs = None
+        return load_servers(self._catalog_path(), self._compile_server, cache_dir or None,
+                            dependencies=[transport_catalog] if transport_catalog else [])
+    
+    def _transport_spec(self, server_id: str) -> Optional[Dict[str, Any]]:
+        """Transport block declared for a server in the transport catalog."""
+        if self._transport_specs is None:
+            specs = {}
+            path = self._transport_catalog_path()
+            if path and os.path.exists(path):
+                with open(path) as f:
+                    for entry in json.load(f).get('servers', []):
+                        if isinstance(entry.get('transport'), dict):
+                            specs[entry.get('id')] = entry['transport']
+            self._transport_specs = specs
+        return self._transport_specs.get(server_id)
+    
+    def reload_catalog(self) -> Dict[str, List[str]]:
+        """Apply catalog changes without disturbing unchanged servers.
+        
+        New entries are added (stopped). Changed entries take effect at
+        once for stopped servers; running ones are restarted one replica at
+        a time, each old replica draining its in-flight requests. Removed
+        entries stop receiving requests and are stopped once drained.
+        Unchanged servers, running or not, are left alone.
+        
+        Returns:
+            IDs of the added, changed and removed servers
+        """
+        with self._reload_lock:
+            table = self._load_catalog()
+            
+            added, changed = [], []
+            for server_id, record in table.items():
+                server = self.servers.get(server_id)
+                if server is None:
+                    self.servers[server_id] = record
+                    added.append(server_id)
+                elif server.get('config') != record['config']:
+                    changed.append(server_id)
+            removed = [server_id for server_id in self._catalog_ids
+                       if server_id not in table and server_id in self.servers]
+            self._catalog_ids = set(table)
+            
+            for server_id in changed:
+                self._apply_catalog_change(server_id, table[server_id])
+            for server_id in removed:
+                self._remove_server(server_id)
+            self.stop_drained_replicas()
+            
+            return {"added": added, "changed": changed, "removed": sorted(removed)}
+    
+    def _apply_catalog_change(self, server_id: str, record: Dict[str, Any]) -> None:
+        """Switch a server to a changed catalog entry."""
+        server = self.servers[server_id]
+        running = server['status'] == 'running'
+        
+        if running and record['transport'] != server['transport']:
+            # Old and new replicas cannot share a pool across transports
+            self.stop_server(server_id)
+            running = False
+            restart = True
+        else:
+            restart = False
+        
+        server['config'] = record['config']
+        server['transport'] = record['transport']
+        self.servers.reindex(server_id)
+        if self._warm_pool is not None:
+            # Idle processes were started from the old entry
+            self._warm_pool.discard(server_id)
+            self._update_warm_target(server_id)
+        # Limits, breaker, hedging and scaling are rebuilt from the new entry;
+        # requests already admitted finish under the old limits
+        for table in (self._admission, self._breakers, self._hedging, self._scaling,
+                      self._rate_rules):
+            table.pop(server_id, None)
+        
+        if running:
+            self._rolling_restart(server_id)
+        elif restart:
+            self.start_server(server_id)
+    
+    def _rolling_restart(self, server_id: str) -> None:
+        """Replace a running server's replicas one at a time.
+        
+        A new replica is started before each old one is drained, so the
+        server keeps serving throughout. If a new replica fails to start,
+        the remaining old replicas are kept.
+        """
+        server = self.servers[server_id]
+        pool = self._pool_for(server_id)
+        pool.stateful = bool(server['config'].get('scaling', {}).get('stateful', False))
+        
+        for old in pool.replicas:
+            if not self.add_replica(server_id)['success']:
+                break
+            pool.remove(old)
+            self._drain(server_id, server, old)
+            
+            primary = pool.replicas[0]
+            server['connectionId'] = primary.connection_id
+            if primary.process_id is not None:
+                server['processId'] = primary.process_id
+        
+        # The new entry may ask for a different number of replicas
+        target = self._replica_count(server)
+        while len(pool) < target and self.add_replica(server_id)['success']:
+            pass
+        while len(pool) > target and self.remove_replica(server_id)['success']:
+            pass
+        
+        with self._lock:
+            self._resize_admission(server_id)
+        if self._scaling_policy_for(server_id) is not None:
+            self._autoscaler.start()
+        self._save_state(server_id)
+    
+    def _remove_server(self, server_id: str) -> None:
+        """Drop a server, draining its replicas before they are stopped."""
+        with self._lock:
+            server = self.servers.pop(server_id)
+            pool = self._pools.pop(server_id, None)
+        
+        if server['status'] == 'running':
+            for replica in self._replicas_of(server, pool):
+                self._drain(server_id, server, replica)
+        
+        for table in (self._admission, self._breakers, self._hedging, self._scaling,
+                      self._rate_rules):
+            table.pop(server_id, None)
+        if self._warm_pool is not None:
+            self._warm_pool.set_target(server_id, 0)
+        self._save_state(server_id)
+    
+    def _compile_server(self, server: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the server table record of a catalog entry.
+        
+        Entries without a transport block of their own take the one the
+        transport catalog declares for their ID.
+        """
+        if not isinstance(server.get('transport'), dict):
+            spec = self._transport_spec(server.get('id'))
+            if spec is not None:
+                server = dict(server, transport=spec)
+        return {
+            'config': server,
+            'status': 'stopped',
+            'transport': self._detect_transport(server),
+            'connectionId': None,
+            'processId': None
+        }
     
     def _add_default_servers(self):
         """Add default server configurations."""
@@ -134,31 +566,7 @@ class APIGateway(APIGatewayContract):
         Returns:
             Transport type string
         """
-        # Check environment variable first
-        env = server_config.get('config', {}).get('environment', {})
-        mcp_mode = env.get('MCP_MODE', '').lower()
-        
-        if mcp_mode in ['http', 'websocket', 'sse']:
-            return mcp_mode
-        
-        # Check for stdio indicators
-        source = server_config.get('source', {})
-        if source.get('type') == 'npm':
-            package = source.get('package', '')
-            if 'stdio' in package or 'snap' in package:
-                return 'stdio'
-        
-        # Check server ID patterns
-        server_id = server_config.get('id', '').lower()
-        if 'stdio' in server_id or 'snap' in server_id:
-            return 'stdio'
-        elif 'websocket' in server_id or 'ws' in server_id:
-            return 'websocket'
-        elif 'sse' in server_id or 'stream' in server_id:
-            return 'sse'
-        
-        # Default to http
-        return 'http'
+        return detect_transport(server_config)
     
     def start_server(self, server_id: str) -> Dict[str, Any]:
         """Start an MCP server through unified API."""
@@ -181,32 +589,33 @@ class APIGateway(APIGatewayContract):
                 "message": f"Server {server_id} is already running"
             }
         
+        scaling = server.get('config', {}).get('scaling', {})
+        pool = ReplicaPool(stateful=bool(scaling.get('stateful', False)))
+        
         try:
-            # Create connection configuration
-            conn_config = self._create_connection_config(server)
+            # Start every replica; the first one is the server's primary
+            for index in range(self._replica_count(server)):
+                connection_id, process_id = (
+                    self._claim_warm(server_id) or self._start_replica(server_id, index)
+                )
+                pool.add(connection_id, process_id)
             
-            # Create transport connection
-            connection_id = self.transport.create_connection(conn_config)
-            
-            # For stdio transport, spawn process
-            if server['transport'] == 'stdio':
-                process_config = self._create_process_config(server)
-                process_id = self.process_manager.spawn_process(process_config)
-                server['processId'] = process_id
-            
-            # Update server state
-            server['status'] = 'running'
-            server['connectionId'] = connection_id
-            self.connections[connection_id] = server_id
+            self._activate(server_id, pool)
             
             return {
                 "success": True,
-                "connectionId": connection_id,
+                "connectionId": pool.replicas[0].connection_id,
                 "transport": server['transport'],
                 "message": f"Server {server_id} started successfully"
             }
-            
+        
         except Exception as e:
+            # Don't leave already started replicas behind
+            for replica in pool.replicas:
+                try:
+                    self._stop_replica(server, replica)
+                except Exception:
+                    pass
             return {
                 "success": False,
                 "connectionId": None,
@@ -214,6 +623,292 @@ class APIGateway(APIGatewayContract):
                 "message": f"Failed to start server {server_id}: {str(e)}"
             }
     
+    def _activate(self, server_id: str, pool: ReplicaPool) -> None:
+        """Mark a server running on a pool of started replicas."""
+        server = self.servers[server_id]
+        primary = pool.replicas[0]
+        
+        # Update server state
+        self.servers.set_status(server_id, 'running')
+        server['connectionId'] = primary.connection_id
+        if primary.process_id is not None:
+            server['processId'] = primary.process_id
+        self._pools[server_id] = pool
+        
+        # Idle time counts from the start, however the server was started
+        if self._is_on_demand(server):
+            with self._lock:
+                self._last_activity[server_id] = time.monotonic()
+            self._reaper.start()
+        
+        # A fresh connection starts with a closed circuit
+        self._breakers.pop(server_id, None)
+        
+        self._scaling.pop(server_id, None)
+        if self._scaling_policy_for(server_id) is not None:
+            self._autoscaler.start()
+        
+        # A started server is hot: keep spares ready for its next start
+        self._update_warm_target(server_id, hot=True)
+        self._save_state(server_id)
+    
+    def _save_state(self, server_id: str) -> None:
+        """Record a server's replicas in the state journal.
+        
+        Must not be called with ``self._lock`` held: resolving each
+        replica's PID and command line calls the process manager.
+        """
+        if self._journal is None:
+            return
+        # Saves are serialized so records land in order, but the replicas
+        # are only copied under the request lock
+        with self._journal_lock:
+            with self._lock:
+                server = self.servers.get(server_id)
+                running = server is not None and server['status'] == 'running'
+                draining = [(entry[1], entry[3]) for entry in self._draining
+                            if entry[0] == server_id]
+                pool = self._pools.get(server_id)
+                replicas = self._replicas_of(server, pool) if running else []
+            if not running and not draining:
+                self._journal.record(server_id, None)
+                return
+            
+            # A removed server's replicas may still be draining
+            record = server if server is not None else draining[0][1]
+            self._journal.record(server_id, {
+                'transport': record['transport'],
+                'configDigest': config_digest(record['config']),
+                'connection': self._create_connection_config(record),
+                'replicas': [self._replica_state(record, replica) for replica in replicas],
+                'draining': [self._replica_state(record, replica) for replica, _ in draining]
+            })
+    
+    def _replica_state(self, server: Dict[str, Any], replica: Replica) -> Dict[str, Any]:
+        pid = command_line = None
+        if replica.process_id is not None:
+            pid = self.process_manager.get_process_status(replica.process_id).get('pid')
+            # Kept only if the process runs the server's command, so that a
+            # restarted gateway never stops an unrelated process by its PID
+            command_line = process_command_line(pid)
+            command = os.path.basename(str(self._create_process_config(server)['command']))
+            if command_line is not None and command not in command_line:
+                command_line = None
+        return {'connectionId': replica.connection_id, 'processId': replica.process_id,
+                'pid': pid, 'commandLine': command_line}
+    
+    def _restore_state(self, saved: Dict[str, Dict[str, Any]]) -> None:
+        """Re-attach to the replicas a previous gateway left running.
+        
+        Replicas whose connection (and, for stdio servers, process) is still
+        alive are adopted as they are; servers reached over HTTP whose
+        endpoint is still up get a new connection. Replicas of entries that
+        changed or left the catalog, and ones that cannot be adopted, are
+        stopped. That includes stdio processes the process manager lost
+        track of because it restarted too: their pipes are gone, so they
+        are stopped by their recorded PID. A server that lost every replica
+        is started afresh, unless it is started on demand anyway.
+        """
+        for server_id, state in saved.items():
+            server = self.servers.get(server_id)
+            usable = (server is not None and server['status'] != 'running' and
+                      state.get('transport') == server['transport'] and
+                      state.get('configDigest') == config_digest(server['config']))
+            
+            adopted = []
+            for entry in state.get('replicas', ()):
+                ids = self._reattach(state, entry) if usable else None
+                if ids is not None:
+                    adopted.append(ids)
+                else:
+                    self._stop_saved(state, entry)
+            for entry in state.get('draining', ()):
+                self._stop_saved(state, entry)
+            
+            if adopted:
+                scaling = server['config'].get('scaling', {})
+                pool = ReplicaPool(stateful=bool(scaling.get('stateful', False)))
+                for connection_id, process_id in adopted:
+                    pool.add(connection_id, process_id)
+                    self.connections[connection_id] = server_id
+                self._activate(server_id, pool)
+                # Replace the replicas that were lost
+                while (len(pool) < self._replica_count(server) and
+                       self.add_replica(server_id)['success']):
+                    pass
+                self._restored['reattached'].append(server_id)
+            elif (server is not None and not self._is_on_demand(server) and
+                  self.start_server(server_id)['success']):
+                self._restored['restarted'].append(server_id)
+            else:
+                self._restored['stopped'].append(server_id)
+            self._save_state(server_id)
+    
+    def _reattach(self, state: Dict[str, Any],
+                  entry: Dict[str, Any]) -> Optional[Tuple[str, Optional[str]]]:
+        """Connection and process ID of a saved replica, if it is still usable."""
+        try:
+            process_id = entry.get('processId')
+            if process_id is not None:
+                status = self.process_manager.get_process_status(process_id)
+                if status.get('status') != 'running':
+                    return None
+            
+            connection_id = entry.get('connectionId')
+            try:
+                connected = bool(connection_id) and (
+                    self.transport.get_status(connection_id).get('status') == 'connected')
+            except Exception:
+                # A restarted transport does not know the old connection
+                connected = False
+            if connected:
+                return connection_id, process_id
+            if state['transport'] == 'stdio':
+                # The process's pipes belonged to the lost connection
+                return None
+            
+            # The endpoint may still be up even though the connection is gone
+            connection_id = self.transport.create_connection(dict(state['connection']))
+            if self.transport.get_status(connection_id).get('status') != 'connected':
+                self.transport.close_connection(connection_id)
+                return None
+            return connection_id, None
+        except Exception:
+            return None
+    
+    def _stop_saved(self, state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """Stop a saved replica that is not being adopted."""
+        process_id = entry.get('processId')
+        known = False
+        if process_id is not None:
+            try:
+                status = self.process_manager.get_process_status(process_id)
+                known = status.get('status') == 'running'
+            except Exception:
+                pass
+        replica = Replica(0, entry.get('connectionId'), process_id if known else None)
+        try:
+            self._stop_replica({'transport': state.get('transport')}, replica)
+        except Exception:
+            pass
+        if process_id is not None and not known:
+            # Left behind by a process manager that restarted with the gateway
+            stop_saved_process(entry.get('pid'), entry.get('commandLine'))
+    
+    def _warm_target(self, server: Dict[str, Any], hot: bool) -> int:
+        """Idle processes to keep ready for a server.
+        
+        Only stdio servers are pooled, and not those whose catalog entry
+        sets ``warmPool.poolable`` to false. An entry's ``warmPool.size``
+        applies from the start; other servers get the gateway default
+        once they have been started.
+        """
+        warm = server.get('config', {}).get('warmPool', {})
+        if server.get('transport') != 'stdio' or not warm.get('poolable', True):
+            return 0
+        if 'size' in warm:
+            return max(0, int(warm['size']))
+        if not hot:
+            return 0
+        settings = self.options.get('warm_pool')
+        return int(settings.get('size', 1)) if isinstance(settings, dict) else 1
+    
+    def _update_warm_target(self, server_id: str, hot: bool = False) -> None:
+        if self._warm_pool is None:
+            return
+        server = self.servers[server_id]
+        hot = hot or self._warm_pool.target(server_id) > 0
+        self._warm_pool.set_target(
+            server_id, self._warm_target(server, hot),
+            server['config'].get('warmPool', {}).get('memory')
+        )
+    
+    def _claim_warm(self, server_id: str):
+        """Take a pre-spawned replica of a server, if one is ready."""
+        if self._warm_pool is None:
+            return None
+        return self._warm_pool.claim(server_id)
+    
+    def _spawn_warm(self, server_id: str):
+        """Start a spare replica for the warm pool and wait until it is ready.
+        
+        Returns:
+            Tuple of connection ID, process ID and process memory in MB
+        """
+        server = self.servers[server_id]
+        connection_id, process_id = self._start_replica(server_id, f"warm{next(self._warm_ids)}")
+        
+        lifecycle = server['config'].get('lifecycle', {})
+        timeout = parse_duration(lifecycle.get('startupTimeout'), DEFAULT_STARTUP_TIMEOUT)
+        ready = wait_until_ready(
+            lambda: self.transport.get_status(connection_id).get('status') == 'connected',
+            timeout
+        )
+        if not ready:
+            self._stop_warm(server_id, connection_id, process_id)
+            raise TimeoutError(f"Warm replica of {server_id} not ready after {timeout:g}s")
+        
+        memory = None
+        if process_id is not None:
+            memory = self.process_manager.get_process_status(process_id).get('memory')
+        return connection_id, process_id, memory
+    
+    def _stop_warm(self, server_id: str, connection_id: str,
+                   process_id: Optional[str]) -> None:
+        # Only stdio servers are pooled; the record may be gone already
+        self._stop_replica({'transport': 'stdio'}, Replica(0, connection_id, process_id))
+    
+    def _process_alive(self, process_id: Optional[str]) -> bool:
+        if process_id is None:
+            return True
+        return self.process_manager.get_process_status(process_id).get('status') == 'running'
+    
+    def _replica_count(self, server: Dict[str, Any]) -> int:
+        """Number of replicas to start for a server."""
+        scaling = server['config'].get('scaling', {})
+        replicas = int(scaling.get('replicas', self.options.get('replicas', 1)))
+        return max(1, replicas, int(scaling.get('minReplicas', 1)))
+    
+    def _start_replica(self, server_id: str, index: Any):
+        """Open one replica's connection (and process for stdio servers).
+        
+        Args:
+            server_id: Server identifier
+            index: Replica index, or label of a warm pool spare
+        
+        Returns:
+            Tuple of connection ID and process ID (None unless stdio)
+        """
+        server = self.servers[server_id]
+        
+        # Create connection configuration
+        conn_config = self._create_connection_config(server)
+        if index:
+            conn_config['replica'] = index
+        
+        # Create transport connection
+        connection_id = self.transport.create_connection(conn_config)
+        self.connections[connection_id] = server_id
+        
+        # For stdio transport, spawn process
+        process_id = None
+        if server['transport'] == 'stdio':
+            process_config = self._create_process_config(server)
+            if index:
+                process_config['id'] = f"{process_config['id']}-{index}"
+            process_id = self.process_manager.spawn_process(process_config)
+        
+        return connection_id, process_id
+    
+    def _stop_replica(self, server: Dict[str, Any], replica: Replica) -> None:
+        """Close one replica's connection and stop its process."""
+        if replica.connection_id:
+            self.transport.close_connection(replica.connection_id)
+            self.connections.pop(replica.connection_id, None)
+        
+        if server['transport'] == 'stdio' and replica.process_id:
+            self.process_manager.stop_process(replica.process_id)
+    
     def _create_connection_config(self, server: Dict[str, Any]) -> Dict[str, Any]:
         """Create connection configuration for transport."""
         config = server['config']
@@ -238,9 +933,29 @@ class APIGateway(APIGatewayContract):
             conn_config['url'] = f"http://localhost:{port}"
             if transport == 'websocket':
                 conn_config['url'] = f"ws://localhost:{port}"
-            
+            elif transport == 'sse':
+                conn_config['transport'] = 'sse'
+        
+        # Explicit settings (URL, headers, timeouts, ...) override the guesses
+        settings = self._transport_settings(server)
+        if settings is not None:
+            env = settings.pop('env', None)
+            conn_config.update(settings)
+            if env:
+                conn_config['env'] = {**conn_config.get('env', {}), **env}
+        
         return conn_config
     
+    @staticmethod
+    def _transport_settings(server: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Explicit settings for the server's transport, placeholders expanded."""
+        config = server['config']
+        spec = config.get('transport')
+        settings = spec.get(server['transport']) if isinstance(spec, dict) else None
+        if not isinstance(settings, dict):
+            return None
+        return expand_placeholders(settings, {'port': config.get('config', {}).get('port', 3000)})
+    
     def _create_process_config(self, server: Dict[str, Any]) -> Dict[str, Any]:
         """Create process configuration for process manager."""
         config = server['config']
@@ -256,6 +971,14 @@ class APIGateway(APIGatewayContract):
             }
         }
         
+        # The command the transport was told about is the one to run
+        settings = self._transport_settings(server)
+        if settings is not None:
+            for key in ('command', 'args', 'workingDir'):
+                if key in settings:
+                    process_config[key] = settings[key]
+            process_config['env'].update(settings.get('env') or {})
+        
         return process_config
     
     def stop_server(self, server_id: str) -> Dict[str, Any]:
@@ -275,19 +998,20 @@ class APIGateway(APIGatewayContract):
             }
         
         try:
-            # Close transport connection
-            if server['connectionId']:
-                self.transport.close_connection(server['connectionId'])
-                del self.connections[server['connectionId']]
-            
-            # Stop process for stdio transport
-            if server['transport'] == 'stdio' and server['processId']:
-                self.process_manager.stop_process(server['processId'])
+            # Close every replica's connection and process
+            pool = self._pools.pop(server_id, None)
+            with self._lock:
+                draining = [entry for entry in self._draining if entry[0] == server_id]
+                self._draining = [entry for entry in self._draining if entry[0] != server_id]
+            for replica in self._replicas_of(server, pool) + [entry[1] for entry in draining]:
+                self._stop_replica(server, replica)
             
             # Update server state
-            server['status'] = 'stopped'
+            self.servers.set_status(server_id, 'stopped')
             server['connectionId'] = None
             server['processId'] = None
+            self._last_activity.pop(server_id, None)
+            self._save_state(server_id)
             
             return {
                 "success": True,
@@ -300,49 +1024,693 @@ class APIGateway(APIGatewayContract):
                 "message": f"Failed to stop server {server_id}: {str(e)}"
             }
     
-    def send_request(self, server_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Send request to server via appropriate transport."""
+    def _record_ipc(self, method: str, latency: float, failed: bool,
+                    runner_latency: Optional[float] = None) -> None:
+        """Transport bridge callback timing one call into the runner."""
+        self._ipc_metrics.record_method(IPC_METRICS_KEY, method, latency, failed)
+        
+        trace, parent = tracing.current()
+        if trace is None:
+            return
+        end_ns = time.time_ns()
+        ipc = trace.start_span('bridge.ipc', parent, {'call': method},
+                               start_ns=end_ns - int(latency * 1e9))
+        ipc.end(failed, end_ns)
+        if runner_latency is not None:
+            # Time inside the runner: the transport and the server itself.
+            # Pipe transit is assumed to be the same in both directions.
+            start_ns = ipc.start_ns + int((latency - runner_latency) / 2 * 1e9)
+            server = trace.start_span('server', ipc, start_ns=start_ns)
+            server.end(failed, start_ns + int(runner_latency * 1e9))
+    
+    def _replicas_of(self, server: Dict[str, Any],
+                     pool: Optional[ReplicaPool]) -> List[Replica]:
+        """Replicas of a server, or its single connection if it has no pool."""
+        if pool is not None and len(pool):
+            return pool.replicas
+        if server.get('connectionId'):
+            return [Replica(0, server['connectionId'], server.get('processId'))]
+        return []
+    
+    def send_request(self, server_id: str, request: Dict[str, Any],
+                     api_key: Optional[str] = None,
+                     session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send request to server via appropriate transport.
+        
+        Args:
+            server_id: Server identifier
+            request: JSON-RPC request; ``params._meta.priority`` selects the
+                priority class (interactive, normal or bulk)
+            api_key: Caller's API key, used for its default priority class
+            session_id: Client session, pinned to one replica of stateful
+                servers (defaults to ``params._meta.sessionId``)
+        """
         if server_id not in self.servers:
-            return {
-                "jsonrpc": "2.0",
-                "id": request.get("id", 1),
-                "error": {
-                    "code": -32001,
-                    "message": f"Server {server_id} not found"
-                }
-            }
+            return self._error_response(request, -32001, f"Server {server_id} not found")
+        
+        trace = None
+        if self._tracer is not None:
+            trace = self._tracer.start(
+                'gateway.request', self._request_meta(request).get('traceparent'),
+                {'server': server_id, 'method': RequestMetrics.method_key(request)}
+            )
+            previous = tracing.current()
+            tracing.activate(trace)
         
+        started = time.monotonic()
+        response = None
+        try:
+            profiler = self._request_profiler
+            if profiler is not None and profiler.matches(server_id, request):
+                response = profiler.run(server_id, request, lambda: self._send(
+                    server_id, request, api_key, session_id
+                ))
+            else:
+                response = self._send(server_id, request, api_key, session_id)
+            return response
+        finally:
+            # Also when _send raised, so the caller's thread is not left
+            # carrying this request's trace
+            latency = time.monotonic() - started
+            failed = response is None or 'error' in response
+            self._request_metrics.record(server_id, request, latency, failed)
+            capture = self._capture
+            if capture is not None and response is not None:
+                capture.record(server_id, request, response, started, latency)
+            
+            if trace is not None:
+                tracing.activate(*previous)
+                self._tracer.finish(trace, failed)
+    
+    def _send(self, server_id: str, request: Dict[str, Any], api_key: Optional[str],
+              session_id: Optional[str]) -> Dict[str, Any]:
+        """Deliver a request to a registered server and return its response."""
         server = self.servers[server_id]
         
-        if server['status'] != 'running':
-            return {
-                "jsonrpc": "2.0",
-                "id": request.get("id", 1),
-                "error": {
-                    "code": -32002,
-                    "message": f"Server {server_id} is not running"
-                }
-            }
+        # Rejected before anything else, so limited callers cost the least
+        checks = self._rate_checks(server_id, request, api_key)
+        if checks:
+            try:
+                self._rate_limiter.acquire(checks)
+            except RateLimitedError as e:
+                return self._error_response(
+                    request, RATE_LIMITED, str(e),
+                    {"retryAfter": round(e.retry_after, 3)}
+                )
+        
+        # Scale-to-zero: the first request to a stopped server starts it
+        if server['status'] != 'running' and self._is_on_demand(server):
+            started = self._ensure_started(server_id)
+            if not started['success']:
+                return self._error_response(
+                    request, -32002,
+                    f"Server {server_id} is not running: {started['message']}"
+                )
+        
+        with self._lock:
+            if server['status'] != 'running' or server_id in self._stopping:
+                return self._error_response(
+                    request, -32002, f"Server {server_id} is not running"
+                )
+            self._in_flight[server_id] = self._in_flight.get(server_id, 0) + 1
         
         try:
             # Update metrics
             self.metrics['requests_total'] += 1
             self.metrics['requests_per_transport'][server['transport']] += 1
             
-            # Send through transport
-            response = self.transport.send_message(server['connectionId'], request)
+            pool = self._pool_for(server_id)
+            admission = self._admission_for(server_id)
+            breaker = self._breaker_for(server_id)
+            hedging = self._hedging_for(server_id)
+            priority = self._resolve_priority(request, api_key)
+            if session_id is None:
+                session_id = self._request_meta(request).get('sessionId')
             
-            return response
+            def forward(message: Dict[str, Any]) -> Dict[str, Any]:
+                # Hedging needs a second replica and no session affinity
+                if (hedging is not None and hedging.enabled_for(message) and
+                        len(pool) > 1 and not pool.stateful):
+                    return self._forward_hedged(pool, message, breaker, hedging,
+                                                admission)
+                return self._forward(pool, session_id, message, breaker, hedging)
+            
+            def send(message: Dict[str, Any]) -> Dict[str, Any]:
+                if breaker is not None:
+                    breaker.allow()
+                try:
+                    if admission is None:
+                        return forward(message)
+                    with tracing.span(tracing.current()[0], 'gateway.queue',
+                                      {'priority': priority}):
+                        admission.acquire(priority)
+                    try:
+                        return forward(message)
+                    finally:
+                        admission.release()
+                except OverloadedError:
+                    if breaker is not None:
+                        breaker.cancel()
+                    raise
             
+            # Send through transport, sharing identical in-flight reads of
+            # the same caller and session
+            if self._coalescer.enabled_for(request):
+                response = self._coalescer.execute(server_id, request, send,
+                                                   (api_key, session_id))
+            else:
+                response = send(request)
+            
+            return response
+        
+        except OverloadedError as e:
+            return self._error_response(
+                request, SERVER_OVERLOADED, str(e), {"reason": e.reason}
+            )
+        
+        except CircuitOpenError as e:
+            return self._error_response(
+                request, CIRCUIT_OPEN,
+                f"Server {server_id} is unavailable: {str(e)}",
+                {"retryAfter": round(e.retry_after, 3)}
+            )
+        
         except Exception as e:
+            return self._error_response(request, -32603, f"Internal error: {str(e)}")
+        
+        finally:
+            with self._lock:
+                self._in_flight[server_id] -= 1
+                self._last_activity[server_id] = time.monotonic()
+    
+    def _forward(self, pool: ReplicaPool, session_id: Optional[str],
+                 message: Dict[str, Any], breaker: Optional[CircuitBreaker],
+                 hedging: Optional[HedgePolicy] = None) -> Dict[str, Any]:
+        """Send a message to the least busy replica, recording the outcome."""
+        replica = pool.acquire(session_id)
+        started = time.monotonic()
+        try:
+            response = self._transport_send(replica, message)
+        except Exception:
+            pool.release(replica, failed=True)
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        
+        latency = time.monotonic() - started
+        pool.release(replica, latency)
+        if breaker is not None:
+            breaker.record_success(latency)
+        if hedging is not None:
+            hedging.record(message.get('method'), latency)
+        return response
+    
+    def _forward_hedged(self, pool: ReplicaPool, message: Dict[str, Any],
+                        breaker: Optional[CircuitBreaker], hedging: HedgePolicy,
+                        admission: Optional[AdmissionController] = None) -> Dict[str, Any]:
+        """Send a read, racing a copy on a second replica if it is slow.
+        
+        The first successful response wins and the slower copy is sent an
+        MCP ``notifications/cancelled``. Until the method has enough
+        latency samples, or while every hedging worker is busy, the request
+        is sent once, like any other. On a server with admission limits
+        the copy needs a slot of its own and is skipped if none is free.
+        """
+        delay = hedging.delay(message['method'])
+        hedging.count_request()
+        if delay is None or not self._hedge_workers.acquire(blocking=False):
+            return self._forward(pool, None, message, breaker, hedging)
+        
+        results: 'queue.Queue' = queue.Queue()
+        trace, parent = tracing.current()
+        
+        def attempt(replica: Replica, admitted: bool) -> None:
+            tracing.activate(trace, parent)
+            started = time.monotonic()
+            try:
+                response = self._transport_send(replica, message)
+            except Exception as e:
+                pool.release(replica, failed=True)
+                results.put((replica, None, e))
+                return
+            finally:
+                self._hedge_workers.release()
+                if admitted:
+                    admission.release()
+            latency = time.monotonic() - started
+            pool.release(replica, latency)
+            hedging.record(message['method'], latency)
+            results.put((replica, response, None))
+        
+        def reserve_hedge() -> bool:
+            if not self._hedge_workers.acquire(blocking=False):
+                return False
+            if admission is None or admission.try_acquire():
+                if hedging.try_hedge():
+                    return True
+                if admission is not None:
+                    admission.release()
+            self._hedge_workers.release()
+            return False
+        
+        started = time.monotonic()
+        attempts = [pool.acquire()]
+        self._hedge_executor.submit(attempt, attempts[0], False)
+        try:
+            outcome = results.get(timeout=delay)
+        except queue.Empty:
+            if reserve_hedge():
+                attempts.append(pool.acquire(exclude=attempts[0]))
+                self._hedge_executor.submit(attempt, attempts[1], admission is not None)
+            outcome = results.get()
+        
+        # A failed copy only decides the request if no other copy is left
+        pending = len(attempts) - 1
+        while outcome[2] is not None and pending:
+            outcome = results.get()
+            pending -= 1
+        
+        replica, response, error = outcome
+        if pending:
+            self._cancel(next(r for r in attempts if r is not replica), message)
+        
+        if error is not None:
+            if breaker is not None:
+                breaker.record_failure()
+            raise error
+        
+        if replica is not attempts[0]:
+            hedging.count_hedge_win()
+        if breaker is not None:
+            breaker.record_success(time.monotonic() - started)
+        return response
+    
+    def _transport_send(self, replica: Replica, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send to one replica, traced and carrying the trace context if any."""
+        trace = tracing.current()[0]
+        with tracing.span(trace, 'transport.send', {'replica': replica.index}) as span:
+            if span is not None:
+                message = tracing.with_traceparent(message, trace.traceparent(span))
+            return self.transport.send_message(replica.connection_id, message)
+    
+    def _cancel(self, replica: Replica, message: Dict[str, Any]) -> None:
+        """Tell a replica to abandon a request whose answer is no longer needed."""
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "notifications/cancelled",
+            "params": {
+                "requestId": message['id'],
+                "reason": "Superseded by a hedged request"
+            }
+        }
+        
+        def send() -> None:
+            try:
+                self.transport.send_message(replica.connection_id, notification)
+            except Exception:
+                pass
+        
+        threading.Thread(target=send, name='mcp-hedge-cancel', daemon=True).start()
+    
+    def _error_response(self, request: Dict[str, Any], code: int, message: str,
+                        data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a JSON-RPC error response for a request."""
+        error = {
+            "code": code,
+            "message": message
+        }
+        if data is not None:
+            error["data"] = data
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request.get("id", 1),
+            "error": error
+        }
+    
+    def _request_meta(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The request's ``params._meta`` block, or an empty dict."""
+        params = request.get('params')
+        meta = params.get('_meta') if isinstance(params, dict) else None
+        return meta if isinstance(meta, dict) else {}
+    
+    def _resolve_priority(self, request: Dict[str, Any], api_key: Optional[str]) -> str:
+        """Pick a request's priority class: request field, then API key default."""
+        priority = self._request_meta(request).get('priority')
+        
+        if priority is None and api_key is not None:
+            priority = self.options.get('api_key_priorities', {}).get(api_key)
+        
+        return normalize_priority(priority or self.options.get('default_priority'))
+    
+    def _pool_for(self, server_id: str) -> ReplicaPool:
+        """Get a running server's replica pool.
+        
+        Servers registered as running without going through
+        ``start_server`` get a single-replica pool over their connection.
+        """
+        pool = self._pools.get(server_id)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(server_id)
+                if pool is None:
+                    server = self.servers[server_id]
+                    scaling = server.get('config', {}).get('scaling', {})
+                    pool = ReplicaPool(stateful=bool(scaling.get('stateful', False)))
+                    pool.add(server['connectionId'], server.get('processId'))
+                    self._pools[server_id] = pool
+        return pool
+    
+    def _admission_for(self, server_id: str) -> Optional[AdmissionController]:
+        """Get the admission controller for a server, creating it on first use."""
+        if server_id not in self._admission:
+            with self._lock:
+                if server_id not in self._admission:
+                    limits = self.servers[server_id].get('config', {}).get('limits', {})
+                    self._admission[server_id] = AdmissionController.from_config(
+                        limits, self.options
+                    )
+                    self._resize_admission(server_id)
+        return self._admission[server_id]
+    
+    def _resize_admission(self, server_id: str) -> None:
+        """Scale a server's concurrency limit with its replica count.
+        
+        ``limits.maxConcurrency`` applies per replica, so adding a replica
+        adds capacity for queued requests.
+        """
+        admission = self._admission.get(server_id)
+        pool = self._pools.get(server_id)
+        if admission is None or pool is None or not len(pool):
+            return
+        
+        limits = self.servers[server_id].get('config', {}).get('limits', {})
+        per_replica = int(limits.get('maxConcurrency', self.options.get('max_concurrency')))
+        admission.resize(per_replica * len(pool))
+    
+    def _scaling_policy_for(self, server_id: str) -> Optional[ScalingPolicy]:
+        """Get the autoscaling policy for a server, creating it on first use.
+        
+        Only stdio servers are autoscaled: extra connections to a network
+        server do not add capacity.
+        """
+        if server_id not in self._scaling:
+            with self._lock:
+                if server_id not in self._scaling:
+                    server = self.servers[server_id]
+                    policy = None
+                    if server.get('transport') == 'stdio':
+                        policy = ScalingPolicy.from_config(
+                            server.get('config', {}).get('scaling', {}),
+                            self.options.get('autoscaling')
+                        )
+                    self._scaling[server_id] = policy
+        return self._scaling[server_id]
+    
+    def add_replica(self, server_id: str) -> Dict[str, Any]:
+        """Start one more replica of a running server."""
+        server = self.servers.get(server_id)
+        if server is None or server['status'] != 'running':
+            return {"success": False, "message": f"Server {server_id} is not running"}
+        
+        pool = self._pool_for(server_id)
+        try:
+            connection_id, process_id = (
+                self._claim_warm(server_id) or self._start_replica(server_id, pool.next_index)
+            )
+        except Exception as e:
+            return {"success": False, "message": f"Failed to add replica: {str(e)}"}
+        
+        with self._lock:
+            # The server may have been stopped while the replica started
+            if server['status'] == 'running' and self._pools.get(server_id) is pool:
+                pool.add(connection_id, process_id)
+                self._resize_admission(server_id)
+                added = len(pool)
+            else:
+                added = None
+        
+        if added is not None:
+            self._save_state(server_id)
             return {
-                "jsonrpc": "2.0",
-                "id": request.get("id", 1),
-                "error": {
-                    "code": -32603,
-                    "message": f"Internal error: {str(e)}"
-                }
+                "success": True,
+                "connectionId": connection_id,
+                "message": f"Server {server_id} now has {added} replicas"
             }
+        
+        self._stop_replica(server, Replica(0, connection_id, process_id))
+        return {"success": False, "message": f"Server {server_id} stopped while scaling"}
+    
+    def remove_replica(self, server_id: str) -> Dict[str, Any]:
+        """Take the least busy non-primary replica out of rotation.
+        
+        The replica receives no new requests and is stopped once its
+        in-flight requests finish, or after the drain timeout.
+        """
+        pool = self._pools.get(server_id)
+        if pool is None or len(pool) <= 1:
+            return {"success": False, "message": f"Server {server_id} has no replica to remove"}
+        
+        # Keep the primary so server['connectionId'] stays valid
+        victim = min(pool.replicas[1:], key=lambda r: (r.in_flight, -r.index))
+        pool.remove(victim)
+        
+        with self._lock:
+            self._resize_admission(server_id)
+        self._drain(server_id, self.servers[server_id], victim)
+        self.stop_drained_replicas()
+        self._save_state(server_id)
+        
+        return {
+            "success": True,
+            "connectionId": victim.connection_id,
+            "message": f"Server {server_id} now has {len(pool)} replicas"
+        }
+    
+    def _drain(self, server_id: str, server: Dict[str, Any], replica: Replica) -> None:
+        """Queue a replica taken out of rotation to be stopped once idle."""
+        drain_timeout = parse_duration(self.options.get('drain_timeout'), DEFAULT_DRAIN_TIMEOUT)
+        with self._lock:
+            self._draining.append((server_id, replica, time.monotonic() + drain_timeout, server))
+    
+    def stop_drained_replicas(self, now: Optional[float] = None) -> int:
+        """Stop removed replicas that are idle or past their drain timeout.
+        
+        Returns:
+            Number of replicas stopped
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            done = [entry for entry in self._draining
+                    if entry[1].in_flight <= 0 or now >= entry[2]]
+            self._draining = [entry for entry in self._draining if entry not in done]
+        
+        for _, replica, _, server in done:
+            try:
+                self._stop_replica(server, replica)
+            except Exception:
+                pass
+        for server_id in {entry[0] for entry in done}:
+            self._save_state(server_id)
+        return len(done)
+    
+    def autoscale(self) -> Dict[str, int]:
+        """Resize the replica pools of autoscaled servers to their load.
+        
+        Returns:
+            New replica count of each server that was resized
+        """
+        resized = {}
+        
+        for server_id, server in list(self.servers.items()):
+            if server.get('status') != 'running':
+                continue
+            policy = self._scaling_policy_for(server_id)
+            if policy is None:
+                continue
+            
+            pool = self._pool_for(server_id)
+            admission = self._admission.get(server_id)
+            replicas = pool.replicas
+            latencies = [r.latency_ewma for r in replicas if r.latency_ewma is not None]
+            
+            current = len(replicas)
+            target = policy.decide(
+                current,
+                pool.in_flight,
+                admission.queue_depth if admission is not None else 0,
+                sum(latencies) / len(latencies) if latencies else None
+            )
+            
+            for _ in range(target - current):
+                if not self.add_replica(server_id)['success']:
+                    break
+            for _ in range(current - target):
+                if not self.remove_replica(server_id)['success']:
+                    break
+            
+            if len(pool) != current:
+                resized[server_id] = len(pool)
+        
+        self.stop_drained_replicas()
+        return resized
+    
+    def _breaker_for(self, server_id: str) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker for a server, creating it on first use."""
+        if server_id not in self._breakers:
+            with self._lock:
+                if server_id not in self._breakers:
+                    config = self.servers[server_id].get('config', {}).get('circuitBreaker')
+                    self._breakers[server_id] = CircuitBreaker.from_config(
+                        config, self.options.get('circuit_breaker')
+                    )
+        return self._breakers[server_id]
+    
+    def _hedging_for(self, server_id: str) -> Optional[HedgePolicy]:
+        """Get the hedged-request policy for a server, creating it on first use."""
+        if server_id not in self._hedging:
+            with self._lock:
+                if server_id not in self._hedging:
+                    config = self.servers[server_id].get('config', {}).get('hedging', {})
+                    self._hedging[server_id] = HedgePolicy.from_config(
+                        config, self.options.get('hedging')
+                    )
+        return self._hedging[server_id]
+    
+    def _rate_rules_for(self, server_id: str) -> MethodRules:
+        """Get the rate rules of a server, creating them on first use."""
+        if server_id not in self._rate_rules:
+            with self._lock:
+                if server_id not in self._rate_rules:
+                    limits = self.servers[server_id].get('config', {}).get('limits', {})
+                    self._rate_rules[server_id] = MethodRules.from_config(
+                        limits.get('rateLimit'), self._rate_settings.get('methods')
+                    )
+        return self._rate_rules[server_id]
+    
+    def _rate_checks(self, server_id: str, request: Dict[str, Any],
+                     api_key: Optional[str]) -> List[Any]:
+        """Rate limit buckets a request must draw from (empty when unlimited)."""
+        tenant = self._tenant_rule
+        tier = self.options.get('api_key_tiers', {}).get(api_key)
+        if tier in self._tier_rules:
+            tenant = self._tier_rules[tier]
+        
+        rules = self._rate_rules_for(server_id)
+        if tenant is None and rules.server is None and not rules.methods:
+            return []
+        method = request.get('method')
+        return checks_for(api_key, server_id, method if isinstance(method, str) else '',
+                          RequestMetrics.method_key(request), tenant, rules)
+    
+    def _is_on_demand(self, server: Dict[str, Any]) -> bool:
+        """Whether a server is started lazily and stopped when idle."""
+        lifecycle = server.get('config', {}).get('lifecycle', {})
+        return bool(lifecycle.get('onDemand', self.options.get('on_demand', False)))
+    
+    def _ensure_started(self, server_id: str) -> Dict[str, Any]:
+        """Start an on-demand server and wait until its connection is ready.
+        
+        Concurrent callers share a single start: only the first one calls
+        ``start_server``, the rest wait for its outcome.
+        """
+        server = self.servers[server_id]
+        lifecycle = server['config'].get('lifecycle', {})
+        timeout = parse_duration(lifecycle.get('startupTimeout'), DEFAULT_STARTUP_TIMEOUT)
+        
+        def start() -> Dict[str, Any]:
+            if server['status'] == 'running':
+                return {"success": True, "message": f"Server {server_id} is running"}
+            
+            result = self.start_server(server_id)
+            if not result['success']:
+                return result
+            
+            connection_id = result['connectionId']
+            ready = wait_until_ready(
+                lambda: self.transport.get_status(connection_id).get('status') == 'connected',
+                timeout
+            )
+            if not ready:
+                self.stop_server(server_id)
+                return {
+                    "success": False,
+                    "message": f"Server {server_id} not ready after {timeout:g}s"
+                }
+            
+            return result
+        
+        try:
+            result, _ = self._starts.do(server_id, start, timeout=timeout)
+        except TimeoutError:
+            return {"success": False, "message": f"Timed out waiting for {server_id} to start"}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+        return result
+    
+    def reap_idle_servers(self, now: Optional[float] = None) -> List[str]:
+        """Stop on-demand servers that have been idle past their timeout.
+        
+        Args:
+            now: Monotonic timestamp to evaluate against (defaults to now)
+        
+        Returns:
+            IDs of the servers that were stopped
+        """
+        now = time.monotonic() if now is None else now
+        default_timeout = parse_duration(self.options.get('idle_timeout'), DEFAULT_IDLE_TIMEOUT)
+        stopped = []
+        
+        for server_id, server in list(self.servers.items()):
+            if server.get('status') != 'running' or not self._is_on_demand(server):
+                continue
+            
+            lifecycle = server['config'].get('lifecycle', {})
+            idle_timeout = parse_duration(lifecycle.get('idleTimeout'), default_timeout)
+            
+            # Claimed under the lock so no request can slip in between check
+            # and stop; the stop itself runs outside it, not to hold up
+            # requests to other servers
+            with self._lock:
+                if self._in_flight.get(server_id, 0) > 0 or server_id in self._stopping:
+                    continue
+                last_activity = self._last_activity.get(server_id, now)
+                if now - last_activity < idle_timeout:
+                    continue
+                self._stopping.add(server_id)
+            try:
+                if self.stop_server(server_id)['success']:
+                    stopped.append(server_id)
+            finally:
+                with self._lock:
+                    self._stopping.discard(server_id)
+        
+        return stopped
+    
+    def close(self) -> None:
+        """Stop background gateway threads."""
+        self._reaper.stop()
+        self._autoscaler.stop()
+        self._hedge_executor.shutdown(wait=False)
+        if self._catalog_watcher is not None:
+            self._catalog_watcher.stop()
+        if self._warm_pool is not None:
+            self._warm_pool.close()
+        if self._journal is not None:
+            self._journal.close()
+        self.stop_capture()
+        if self._stack_sampler is not None:
+            self._stack_sampler.stop()
+        if self._request_profiler is not None:
+            self._request_profiler.stop()
+        self.stop_allocation_tracing()
+        if self._profiling_signal is not None:
+            try:
+                signal.signal(self._profiling_signal, self._previous_handler)
+            except ValueError:
+                # Not the main thread; the handler stays, on a closed gateway
+                pass
+            self._profiling_signal = None
     
     def get_server_info(self, server_id: str) -> Dict[str, Any]:
         """Get server information and status."""
@@ -364,56 +1732,278 @@ class APIGateway(APIGatewayContract):
         if server['status'] == 'running' and server['connectionId']:
             try:
                 conn_status = self.transport.get_status(server['connectionId'])
-                metrics = {
-                    "uptime": conn_status.get('uptime', 0),
-                    "requests": 10,  # Placeholder
-                    "errors": 0,
-                    "latency_ms": 45
-                }
+                metrics["uptime"] = conn_status.get('uptime', 0)
             except:
                 pass
         
+        metrics.update(self._request_metrics.server_summary(server_id))
+        
+        admission = self._admission.get(server_id)
+        if admission is not None:
+            metrics["admission"] = admission.get_stats()
+        
+        breaker = self._breakers.get(server_id)
+        pool = self._pools.get(server_id)
+        
         return {
             "id": server_id,
             "name": config.get('name', server_id.replace('-', ' ').title()),
             "transport": server['transport'],
             "status": server['status'],
             "connectionId": server['connectionId'],
-            "metrics": metrics
+            "metrics": metrics,
+            "circuitBreaker": breaker.get_stats() if breaker is not None else {"state": "closed"},
+            "replicas": pool.get_stats() if pool is not None else [],
+            "draining": len([entry for entry in self._draining if entry[0] == server_id])
         }
     
-    def list_servers(self, filter_running: Optional[bool] = None) -> List[Dict[str, Any]]:
-        """List all registered servers."""
-        result = []
+    def list_servers(self, filter_running: Optional[bool] = None,
+                     transport: Optional[str] = None,
+                     category: Optional[str] = None,
+                     tag: Optional[str] = None,
+                     cursor: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List registered servers, in ID order.
         
-        for server_id, server in self.servers.items():
-            status = server['status']
-            
-            if filter_running is None:
-                result.append({
-                    "id": server_id,
-                    "transport": server['transport'],
-                    "status": status
-                })
-            elif filter_running and status == 'running':
-                result.append({
-                    "id": server_id,
-                    "transport": server['transport'],
-                    "status": status
-                })
-            elif not filter_running and status == 'stopped':
-                result.append({
-                    "id": server_id,
-                    "transport": server['transport'],
-                    "status": status
-                })
+        Filters are answered from the server table's indexes, so a page
+        costs its own size rather than the size of the registry.
+        
+        Args:
+            filter_running: If True, only running servers; if False, only stopped
+            transport: Only servers using this transport
+            category: Only servers in this catalog category
+            tag: Only servers with this catalog tag
+            cursor: ID of the last server of the previous page
+            limit: Most servers to return (default all)
+        
+        Returns:
+            List of server info dictionaries
+        """
+        status = None
+        if filter_running is not None:
+            status = 'running' if filter_running else 'stopped'
+        
+        result = []
+        for server_id in self.servers.select(limit=limit, after=cursor, status=status,
+                                             transport=transport, category=category, tag=tag):
+            server = self.servers.get(server_id)
+            if server is None:
+                # Removed by a catalog reload meanwhile
+                continue
+            result.append({
+                "id": server_id,
+                "transport": server['transport'],
+                "status": server['status']
+            })
         
         return result
     
+    def serve_metrics(self, port: Optional[int] = None,
+                      addr: Optional[str] = None) -> Any:
+        """Serve Prometheus metrics at ``/metrics`` (needs prometheus-client).
+        
+        Args:
+            port: Port to listen on (default 9464)
+            addr: Address to bind (default 127.0.0.1)
+        
+        Returns:
+            The prometheus_client registry being served
+        """
+        from .exporter import DEFAULT_METRICS_ADDR, DEFAULT_METRICS_PORT, start_metrics_server
+        return start_metrics_server(
+            self,
+            port=port if port is not None else DEFAULT_METRICS_PORT,
+            addr=addr or DEFAULT_METRICS_ADDR
+        )
+    
+    def export_traces(self, path: Optional[str] = None,
+                      format: str = 'json') -> Any:
+        """Export buffered trace spans.
+        
+        Args:
+            path: File to write (the spans are only returned if omitted)
+            format: ``json`` for a flat list of spans, ``otlp`` for
+                OpenTelemetry's OTLP/JSON layout
+        
+        Returns:
+            The exported spans, or None if tracing is off
+        """
+        if self._tracer is None:
+            return None
+        if format == 'otlp':
+            return self._tracer.export_otlp(path)
+        return self._tracer.export_json(path)
+    
+    def _start_capture(self, config: Any) -> Optional[TrafficCapture]:
+        capture = TrafficCapture.from_config(
+            config, os.path.join(default_cache_dir(), CAPTURE_NAME)
+        )
+        if capture is not None:
+            capture.start()
+        return capture
+    
+    def start_capture(self, config: Any = True) -> Optional[Dict[str, Any]]:
+        """Start capturing traffic, replacing any capture in progress.
+        
+        Args:
+            config: Like the ``capture`` option: a path, True, or settings
+        
+        Returns:
+            The new capture's stats, or None if the config turns it off
+        """
+        self.stop_capture()
+        self._capture = self._start_capture(config)
+        return self._capture.get_stats() if self._capture is not None else None
+    
+    def stop_capture(self) -> Optional[Dict[str, Any]]:
+        """Stop capturing traffic and write what is pending.
+        
+        Returns:
+            The stopped capture's final stats, or None if none was running
+        """
+        capture, self._capture = self._capture, None
+        if capture is None:
+            return None
+        capture.close()
+        return capture.get_stats()
+    
+    def _profile_path(self, suffix: str) -> str:
+        name = f"gateway-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}"
+        return os.path.join(default_cache_dir(), PROFILES_DIR_NAME, name)
+    
+    def profile_cpu(self, duration: float = DEFAULT_PROFILE_DURATION,
+                    path: Optional[str] = None, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                    wait: bool = True) -> Dict[str, Any]:
+        """Sample every thread's stack for a while and write collapsed stacks.
+        
+        Args:
+            duration: Seconds to sample
+            path: Collapsed-stack file, flamegraph input (defaults to a
+                timestamped ``.collapsed`` file in the cache directory)
+            interval: Seconds between samples
+            wait: Return when the window ends; otherwise return at once
+                and write the file when it ends
+        
+        Returns:
+            Output path and, once finished, sample and stack counts
+        """
+        with self._lock:
+            if self._stack_sampler is not None and self._stack_sampler.running:
+                raise RuntimeError("A CPU profile is already running")
+            sampler = self._stack_sampler = StackSampler(interval)
+        path = path or self._profile_path('.collapsed')
+        sampler.start(duration, lambda done: done.write(path))
+        if not wait:
+            return {"path": path, "running": True}
+        sampler.wait()
+        return {"path": path, "running": False, **sampler.get_stats()}
+    
+    def profile_requests(self, server_id: Optional[str] = None, method: Optional[str] = None,
+                         count: int = DEFAULT_REQUEST_COUNT, path: Optional[str] = None,
+                         top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Run cProfile on the next requests matching a server and method.
+        
+        Replaces any request profiling in progress. Results accumulate in
+        ``get_request_profiles()``; the combined profile is written once
+        ``count`` requests were profiled or on ``stop_request_profiling()``.
+        
+        Args:
+            server_id: Only requests to this server (any if None)
+            method: Only this method, or ``tools/call:<tool>`` (any if None)
+            count: Requests to profile
+            path: Combined pstats file (defaults to a timestamped ``.prof``
+                file in the cache directory)
+            top: Functions listed per request
+        """
+        self.stop_request_profiling()
+        self._request_profiler = RequestProfiler(
+            server_id, method, count, path or self._profile_path('.prof'), top
+        )
+        return self._request_profiler.get_results()
+    
+    def get_request_profiles(self) -> Optional[Dict[str, Any]]:
+        """Progress and per-request summaries of request profiling, if any."""
+        profiler = self._request_profiler
+        return profiler.get_results() if profiler is not None else None
+    
+    def stop_request_profiling(self) -> Optional[Dict[str, Any]]:
+        """Stop request profiling and write the combined profile.
+        
+        Returns:
+            The final results, or None if no request profiling was set up
+        """
+        profiler, self._request_profiler = self._request_profiler, None
+        return profiler.stop() if profiler is not None else None
+    
+    def allocation_snapshot(self, top: int = DEFAULT_TOP,
+                            frames: int = DEFAULT_ALLOCATION_FRAMES) -> Dict[str, Any]:
+        """Top allocation sites from tracemalloc, starting tracing if needed.
+        
+        The first snapshot starts tracing, which slows allocation until
+        ``stop_allocation_tracing()``; later snapshots add the sites that
+        grew most since the one before.
+        
+        Args:
+            top: Allocation sites listed
+            frames: Frames recorded per allocation when tracing starts
+        """
+        with self._lock:
+            if self._allocations is None:
+                self._allocations = AllocationTracker(frames)
+            allocations = self._allocations
+        return allocations.snapshot(top)
+    
+    def stop_allocation_tracing(self) -> None:
+        """Stop tracemalloc tracing started by ``allocation_snapshot``."""
+        allocations, self._allocations = self._allocations, None
+        if allocations is not None:
+            allocations.stop()
+    
+    def _install_profiling_signal(self, setting: Any) -> None:
+        name = setting if isinstance(setting, str) else 'SIGUSR2'
+        signum = getattr(signal, name, None)
+        if signum is None:
+            # e.g. SIGUSR2 on Windows
+            return
+        try:
+            self._previous_handler = signal.signal(signum, self._on_profiling_signal)
+        except ValueError:
+            # signal.signal only works in the main thread
+            return
+        self._profiling_signal = signum
+    
+    def _on_profiling_signal(self, signum: int, frame: Any) -> None:
+        try:
+            self.profile_cpu(
+                parse_duration(self.options.get('profile_duration'), DEFAULT_PROFILE_DURATION),
+                wait=False
+            )
+        except RuntimeError:
+            # A window is already running
+            pass
+    
+    def _profiling_stats(self) -> Dict[str, Any]:
+        sampler = self._stack_sampler
+        profiler = self._request_profiler
+        stats: Dict[str, Any] = {
+            "signal": None,
+            "cpu": None,
+            "requests": None,
+            "allocation_tracing": self._allocations is not None
+        }
+        if self._profiling_signal is not None:
+            stats["signal"] = signal.Signals(self._profiling_signal).name
+        if sampler is not None:
+            stats["cpu"] = {"running": sampler.running, **sampler.get_stats()}
+        if profiler is not None:
+            stats["requests"] = profiler.get_results()
+            # Per-request summaries are in get_request_profiles()
+            del stats["requests"]["requests"]
+        return stats
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Get gateway metrics."""
-        active_connections = len([s for s in self.servers.values() 
-                                if s['status'] == 'running'])
+        active_connections = self.servers.count('status', 'running')
         
         uptime = int(time.time() - self.metrics['startup_time'])
         
@@ -421,5 +2011,32 @@ class APIGateway(APIGatewayContract):
             "requests_total": self.metrics['requests_total'],
             "requests_per_transport": dict(self.metrics['requests_per_transport']),
             "active_connections": active_connections,
-            "uptime": uptime
+            "servers_by_status": self.servers.counts('status'),
+            "uptime": uptime,
+            "servers": self._request_metrics.get_stats(),
+            "coalescing": self._coalescer.get_stats(),
+            "admission": {
+                server_id: admission.get_stats()
+                for server_id, admission in list(self._admission.items())
+                if admission is not None
+            },
+            "hedging": {
+                server_id: hedging.get_stats()
+                for server_id, hedging in list(self._hedging.items())
+                if hedging is not None
+            },
+            "transport_ipc": (
+                self._ipc_metrics.server_summary(IPC_METRICS_KEY)["methods"]
+                if self._ipc_metrics is not None else {}
+            ),
+            "rate_limits": self._rate_limiter.get_stats(),
+            "tracing": self._tracer.get_stats() if self._tracer is not None else None,
+            "warm_pool": self._warm_pool.get_stats() if self._warm_pool is not None else None,
+            "registry_cache": registry_cache_stats(),
+            "state_journal": (
+                {**self._journal.get_stats(), "restored": self._restored}
+                if self._journal is not None else None
+            ),
+            "capture": self._capture.get_stats() if self._capture is not None else None,
+            "profiling": self._profiling_stats()
         }
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""Hedged requests: race a second copy of a slow read on another replica."""
+
+import bisect
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .utils import parse_duration
+
+
+DEFAULT_HEDGE_QUANTILE = 0.95
+# Share of eligible requests that may be hedged
+DEFAULT_HEDGE_BUDGET = 0.05
+# Latency samples needed before a method is hedged on its observed quantile
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW_SIZE = 500
+# Unused budget that can be saved up for a burst of slow requests
+DEFAULT_MAX_TOKENS = 10.0
+
+
+class LatencyWindow:
+    """The most recent latencies of one method, kept sorted for quantiles."""
+    
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE):
+        self.size = size
+        self._order: Deque[float] = deque()
+        self._sorted: List[float] = []
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def record(self, latency: float) -> None:
+        """Add a sample, dropping the oldest once the window is full."""
+        self._order.append(latency)
+        bisect.insort(self._sorted, latency)
+        if len(self._order) > self.size:
+            oldest = self._order.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency below which a share ``q`` of the samples fall."""
+        if not self._sorted:
+            return None
+        index = min(len(self._sorted) - 1, int(q * len(self._sorted)))
+        return self._sorted[index]
+
+
+class HedgePolicy:
+    """Decide when a read to one server is worth a second copy.
+    
+    A request for a hedged method that is still outstanding after the
+    method's observed latency quantile (p95 by default), or after a fixed
+    per-method ``delay``, is sent again to another replica and the first
+    response wins. Hedges are paid for from a token budget: each eligible
+    request adds ``budget`` tokens and each hedge spends one, so extra
+    load stays below that share of traffic even when the server is slow
+    across the board.
+    """
+    
+    def __init__(self, methods: Dict[str, Dict[str, Any]],
+                 budget: float = DEFAULT_HEDGE_BUDGET,
+                 min_samples: int = DEFAULT_MIN_SAMPLES,
+                 window_size: int = DEFAULT_WINDOW_SIZE,
+                 max_tokens: float = DEFAULT_MAX_TOKENS):
+        """Initialize the policy.
+        
+        Args:
+            methods: Hedged JSON-RPC methods mapped to their settings
+                (``delay`` fixes the hedge delay, ``quantile`` picks the
+                latency quantile, default 0.95)
+            budget: Share of eligible requests that may be hedged
+            min_samples: Samples needed before quantile-based hedging starts
+            window_size: Latency samples kept per method
+            max_tokens: Cap on saved-up budget
+        """
+        self.methods = methods
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.max_tokens = max_tokens
+        
+        self._lock = threading.Lock()
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._tokens = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    defaults: Optional[Dict[str, Any]] = None) -> Optional['HedgePolicy']:
+        """Build a policy from a catalog ``hedging`` block.
+        
+        Args:
+            config: Catalog settings (methods as a list or a map of
+                per-method settings, budget, minSamples, windowSize)
+            defaults: Gateway-wide fallbacks using the same keys
+        
+        Returns:
+            Policy, or None if no method is hedged
+        """
+        settings = dict(defaults or {}, **config)
+        methods = settings.get('methods') or {}
+        if not isinstance(methods, dict):
+            methods = {method: {} for method in methods}
+        methods = {
+            method: dict(options or {}) for method, options in methods.items()
+            if (options or {}).get('enabled', True)
+        }
+        if not methods:
+            return None
+        
+        return cls(
+            methods,
+            budget=float(settings.get('budget', DEFAULT_HEDGE_BUDGET)),
+            min_samples=int(settings.get('minSamples', DEFAULT_MIN_SAMPLES)),
+            window_size=int(settings.get('windowSize', DEFAULT_WINDOW_SIZE))
+        )
+    
+    def enabled_for(self, request: Dict[str, Any]) -> bool:
+        """Whether a request's method is hedged."""
+        # Notifications have no id and expect no response
+        return request.get('method') in self.methods and 'id' in request
+    
+    def record(self, method: str, latency: float) -> None:
+        """Record how long a call to a hedged method took."""
+        if method not in self.methods:
+            return
+        with self._lock:
+            window = self._windows.get(method)
+            if window is None:
+                window = self._windows[method] = LatencyWindow(self.window_size)
+            window.record(latency)
+    
+    def delay(self, method: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if not known yet."""
+        with self._lock:
+            return self._delay(method)
+    
+    def _delay(self, method: str) -> Optional[float]:
+        settings = self.methods[method]
+        if 'delay' in settings:
+            return parse_duration(settings['delay'])
+        
+        window = self._windows.get(method)
+        if window is None or len(window) < self.min_samples:
+            return None
+        return window.quantile(float(settings.get('quantile', DEFAULT_HEDGE_QUANTILE)))
+    
+    def count_request(self) -> None:
+        """Count an eligible request, earning budget for future hedges."""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.budget)
+    
+    def try_hedge(self) -> bool:
+        """Spend budget on a hedge; False if the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1.0:
+                self.budget_exhausted += 1
+                return False
+            self._tokens -= 1.0
+            self.hedged += 1
+            return True
+    
+    def count_hedge_win(self) -> None:
+        """Count a hedge that answered before the original request."""
+        with self._lock:
+            self.hedge_wins += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedging counters and current hedge delays for metrics."""
+        with self._lock:
+            delays = {method: self._delay(method) for method in self.methods}
+            return {
+                "methods": sorted(self.methods),
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "budget_exhausted": self.budget_exhausted,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "delay_ms": {
+                    method: round(delay * 1000, 3) if delay is not None else None
+                    for method, delay in delays.items()
+                }
+            }
@@ -0,0 +1,98 @@
+"""Server lifecycle helpers: readiness waits and background sweeps."""
+
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+
+def wait_until_ready(probe: Callable[[], bool], timeout: float,
+                     initial_delay: float = 0.01, max_delay: float = 0.5) -> bool:
+    """Poll ``probe`` with exponential backoff until it returns True.
+    
+    Exceptions raised by the probe are treated as "not ready yet".
+    
+    Args:
+        probe: Callable returning True once the server is ready
+        timeout: Seconds to keep polling
+        initial_delay: First backoff interval in seconds
+        max_delay: Upper bound for the backoff interval
+    
+    Returns:
+        True if the probe succeeded before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    
+    while True:
+        try:
+            if probe():
+                return True
+        except Exception:
+            pass
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+class PeriodicTask:
+    """Background thread that runs a callable at a fixed interval."""
+    
+    def __init__(self, task: Callable[[], Any], interval: float, name: str):
+        """Initialize the task.
+        
+        Args:
+            task: Callable to run every interval
+            interval: Seconds between runs
+            name: Thread name
+        """
+        self.task = task
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the background thread if it is not already running."""
+        if self.running:
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the background thread and wait for it to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.task()
+            except Exception:
+                # A failed run must not kill the thread; retry next interval
+                pass
+
+
+class IdleReaper(PeriodicTask):
+    """Background thread that periodically stops idle on-demand servers."""
+    
+    def __init__(self, reap: Callable[[], List[str]], interval: float = 5.0):
+        """Initialize the reaper.
+        
+        Args:
+            reap: Callable that stops idle servers and returns their IDs
+            interval: Seconds between sweeps
+        """
+        super().__init__(reap, interval, name='mcp-idle-reaper')
@@ -0,0 +1,536 @@
+"""Open- and closed-loop load generator for the gateway.
+
+Sends a weighted mix of requests to a gateway's ``/mcp`` endpoint, or to a
+gateway in this process, and reports throughput, latency percentiles and
+errors by kind as JSON.
+
+A closed loop keeps a fixed number of requests in flight, each worker
+sending its next request when the last one is answered. An open loop
+sends at a fixed rate whether or not earlier requests were answered, the
+way independent clients do. Open-loop latency is measured from when each
+request was due rather than when it went out, so time spent queued behind
+a slow gateway counts. Closed-loop latency is corrected for the requests
+a stalled worker never sent, as HdrHistogram does. Without these, a stall
+would hide most of its own cost (coordinated omission).
+
+    python -m api_gateway.loadgen --url http://127.0.0.1:8090/mcp --server filesystem \\
+        --rate 500 --duration 30 --mix 'tools/call:read_file=9,tools/list=1'
+    python -m api_gateway.loadgen --catalog catalog.json --server filesystem --concurrency 16
+"""
+
+import argparse
+import bisect
+import http.client
+import itertools
+import json
+import os
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .gateway import APIGateway
+from .metrics import LatencyHistogram
+
+
+DEFAULT_DURATION = 10.0
+DEFAULT_CONCURRENCY = 8
+# Open-loop requests sent at once before later ones wait their turn
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MIX = 'tools/list'
+# Allowed change against a previous report before --compare fails
+DEFAULT_THRESHOLD = 0.2
+PERCENTILES = (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('p999', 0.999))
+
+
+class HTTPStatusError(Exception):
+    """Raised when the gateway answers with an HTTP error status."""
+    
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class Operation:
+    """One kind of request in the mix."""
+    
+    __slots__ = ('name', 'method', 'params', 'server', 'weight')
+    
+    def __init__(self, method: str, params: Optional[Dict[str, Any]] = None,
+                 server: Optional[str] = None, weight: float = 1.0,
+                 name: Optional[str] = None):
+        if weight <= 0:
+            raise ValueError(f"Weight of {method} must be positive")
+        self.method = method
+        self.params = params
+        self.server = server
+        self.weight = weight
+        tool = params.get('name') if method == 'tools/call' and params else None
+        self.name = name or (f"{method}:{tool}" if tool else method)
+    
+    def message(self, request_id: int) -> Dict[str, Any]:
+        message = {"jsonrpc": "2.0", "id": request_id, "method": self.method}
+        if self.params is not None:
+            message['params'] = self.params
+        return message
+    
+    def __repr__(self) -> str:
+        return f"Operation({self.name!r}, server={self.server!r}, weight={self.weight:g})"
+
+
+def parse_mix(spec: str, server: Optional[str] = None) -> List[Operation]:
+    """Read a request mix.
+    
+    Args:
+        spec: Comma-separated ``method[:tool][@server][=weight]`` items,
+            e.g. ``tools/call:echo=9,tools/list=1``, or the path of a JSON
+            file listing objects with ``method`` and optionally ``tool``,
+            ``arguments``, ``params``, ``server``, ``weight`` and ``name``
+        server: Server for operations that name none
+    """
+    if spec.endswith('.json') and os.path.isfile(spec):
+        with open(spec) as f:
+            entries = json.load(f)
+        operations = []
+        for entry in entries:
+            params = entry.get('params')
+            if entry.get('tool'):
+                params = {"name": entry['tool'], "arguments": entry.get('arguments', {})}
+            operations.append(Operation(entry['method'], params, entry.get('server', server),
+                                        float(entry.get('weight', 1)), entry.get('name')))
+        return operations
+    
+    operations = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        item, _, weight = item.partition('=')
+        item, _, item_server = item.partition('@')
+        method, _, tool = item.partition(':')
+        if tool and method != 'tools/call':
+            raise ValueError(f"Only tools/call takes a tool name: {item}")
+        params = {"name": tool, "arguments": {}} if tool else None
+        operations.append(Operation(method, params, item_server or server,
+                                    float(weight) if weight else 1.0))
+    if not operations:
+        raise ValueError("The request mix is empty")
+    return operations
+
+
+class Mix:
+    """Weighted random choice among operations."""
+    
+    def __init__(self, operations: Sequence[Operation]):
+        self.operations = list(operations)
+        self._cumulative = list(itertools.accumulate(op.weight for op in self.operations))
+    
+    def pick(self, rng: random.Random) -> Operation:
+        point = rng.random() * self._cumulative[-1]
+        return self.operations[bisect.bisect_right(self._cumulative, point)]
+
+
+class GatewayTarget:
+    """Sends requests straight to a gateway object in this process."""
+    
+    name = 'in-process'
+    
+    def __init__(self, gateway: Any, api_key: Optional[str] = None):
+        self.gateway = gateway
+        self.api_key = api_key
+    
+    def send(self, server_id: Optional[str], message: Dict[str, Any]) -> Dict[str, Any]:
+        return self.gateway.send_request(server_id, message, api_key=self.api_key)
+    
+    def close(self) -> None:
+        pass
+
+
+class HTTPTarget:
+    """Posts requests to a gateway's ``/mcp`` endpoint.
+    
+    Each sending thread keeps its own keep-alive connection. The server is
+    named in the ``X-MCP-Server`` header.
+    """
+    
+    def __init__(self, url: str, api_key: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Not an HTTP URL: {url}")
+        self.name = url
+        self._connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                                  else http.client.HTTPConnection)
+        self._netloc = parts.netloc
+        self._path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self._headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if api_key:
+            self._headers['X-API-Key'] = api_key
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+    
+    def _connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection, True
+        connection = self._connection_class(self._netloc, timeout=self.timeout)
+        self._local.connection = connection
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection, False
+    
+    def send(self, server_id: Optional[str], message: Dict[str, Any]) -> Dict[str, Any]:
+        body = json.dumps(message).encode()
+        headers = dict(self._headers, **({'X-MCP-Server': server_id} if server_id else {}))
+        while True:
+            connection, reused = self._connection()
+            try:
+                connection.request('POST', self._path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                self._local.connection = None
+                # The server may have closed an idle keep-alive connection
+                if not reused or isinstance(e, socket.timeout):
+                    raise
+        
+        if response.status >= 400:
+            raise HTTPStatusError(response.status)
+        return json.loads(data) if data else {}
+    
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+
+def classify(response: Any = None, error: Optional[BaseException] = None) -> Optional[str]:
+    """Kind of failure of a request, or None if it succeeded.
+    
+    Kinds are ``jsonrpc:<code>``, ``http:<status>``, ``timeout`` and
+    ``exception:<type>``.
+    """
+    if error is not None:
+        if isinstance(error, HTTPStatusError):
+            return f"http:{error.status}"
+        if isinstance(error, (socket.timeout, TimeoutError)):
+            return 'timeout'
+        return f"exception:{type(error).__name__}"
+    if isinstance(response, dict) and isinstance(response.get('error'), dict):
+        return f"jsonrpc:{response['error'].get('code')}"
+    return None
+
+
+class _Stats:
+    __slots__ = ('requests', 'errors', 'latency', 'service')
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        # From when the request was due, and from when it was sent
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+    
+    def record(self, latency: float, service_time: float, failed: bool) -> None:
+        self.requests += 1
+        self.errors += failed
+        self.latency.record(latency)
+        self.service.record(service_time)
+
+
+class Recorder:
+    """Latencies and errors of a run, overall and per operation."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = _Stats()
+        self.operations: Dict[str, _Stats] = {}
+        self.errors: Counter = Counter()
+        self.last_done = 0.0
+    
+    def record(self, operation: Operation, latency: float, service_time: float,
+               kind: Optional[str], done: float) -> None:
+        with self._lock:
+            stats = self.operations.get(operation.name)
+            if stats is None:
+                stats = self.operations[operation.name] = _Stats()
+            failed = kind is not None
+            stats.record(latency, service_time, failed)
+            self.total.record(latency, service_time, failed)
+            if failed:
+                self.errors[kind] += 1
+            self.last_done = max(self.last_done, done)
+
+
+def summarize_latency(histogram: LatencyHistogram) -> Dict[str, float]:
+    """Mean, percentiles and maximum in milliseconds."""
+    summary = {"mean": round(histogram.mean * 1000, 3)}
+    for label, q in PERCENTILES:
+        summary[label] = round(histogram.quantile(q) * 1000, 3)
+    summary['max'] = round(histogram.max_us / 1000, 3)
+    return summary
+
+
+class LoadGenerator:
+    """Runs a request mix against a target.
+    
+    A target is anything with ``send(server_id, message)`` returning the
+    JSON-RPC response: ``HTTPTarget``, ``GatewayTarget``, or your own.
+    """
+    
+    def __init__(self, target: Any, operations: Sequence[Operation],
+                 seed: Optional[int] = None, clock=time.perf_counter):
+        self.target = target
+        self.mix = Mix(operations)
+        self.seed = seed
+        self.clock = clock
+        self._ids = itertools.count(1)
+    
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(None if self.seed is None else self.seed + index)
+    
+    def _send(self, operation: Operation) -> Tuple[Optional[str], float]:
+        message = operation.message(next(self._ids))
+        try:
+            response = self.target.send(operation.server, message)
+        except Exception as e:
+            return classify(error=e), self.clock()
+        return classify(response), self.clock()
+    
+    def closed_loop(self, concurrency: int = DEFAULT_CONCURRENCY,
+                    duration: float = DEFAULT_DURATION, warmup: float = 0.0,
+                    expected_interval: Optional[float] = None) -> Dict[str, Any]:
+        """Keep ``concurrency`` requests in flight for ``duration`` seconds.
+        
+        Args:
+            concurrency: Workers, each sending its next request when the
+                last one is answered
+            duration: Seconds recorded
+            warmup: Seconds run first without recording
+            expected_interval: Usual seconds between a worker's requests,
+                for the coordinated-omission correction (default: the
+                median service time)
+        """
+        recorder = Recorder()
+        start = self.clock()
+        record_from = start + warmup
+        end = record_from + duration
+        
+        def worker(index: int) -> None:
+            rng = self._rng(index)
+            while True:
+                began = self.clock()
+                if began >= end:
+                    return
+                operation = self.mix.pick(rng)
+                kind, done = self._send(operation)
+                if began >= record_from:
+                    recorder.record(operation, done - began, done - began, kind, done)
+        
+        _run_threads(worker, concurrency)
+        
+        interval = expected_interval
+        if interval is None:
+            interval = recorder.total.service.quantile(0.5)
+        report = self._report('closed', recorder, record_from, lambda histogram:
+                              histogram.corrected(interval))
+        report.update(concurrency=concurrency, expected_interval_ms=round(interval * 1000, 3))
+        return report
+    
+    def open_loop(self, rate: float, duration: float = DEFAULT_DURATION, warmup: float = 0.0,
+                  max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                  arrivals: str = 'constant', drain_timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+        """Send ``rate`` requests per second for ``duration`` seconds.
+        
+        Args:
+            rate: Requests per second
+            duration: Seconds recorded
+            warmup: Seconds run first without recording
+            max_in_flight: Requests sent at once; later ones wait, and
+                the wait counts toward their latency
+            arrivals: ``constant`` spacing or ``poisson`` (random spacing
+                with the same mean, like independent clients)
+            drain_timeout: Longest wait for requests still in flight at
+                the end; any left are reported as ``unfinished``
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if arrivals not in ('constant', 'poisson'):
+            raise ValueError(f"Unknown arrival process: {arrivals}")
+        recorder = Recorder()
+        jobs: 'queue.Queue[Optional[Tuple[float, Operation]]]' = queue.Queue()
+        start = self.clock()
+        record_from = start + warmup
+        end = record_from + duration
+        scheduled = 0
+        
+        def worker(index: int) -> None:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                due, operation = job
+                began = self.clock()
+                kind, done = self._send(operation)
+                if due >= record_from:
+                    recorder.record(operation, done - due, done - began, kind, done)
+        
+        threads = _start_threads(worker, max_in_flight)
+        rng = self._rng(0)
+        due = start
+        while due < end:
+            delay = due - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            jobs.put((due, self.mix.pick(rng)))
+            if due >= record_from:
+                scheduled += 1
+            due += rng.expovariate(rate) if arrivals == 'poisson' else 1 / rate
+        for _ in threads:
+            jobs.put(None)
+        deadline = time.monotonic() + drain_timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        
+        report = self._report('open', recorder, record_from, lambda histogram: histogram)
+        report.update(rate=rate, arrivals=arrivals, max_in_flight=max_in_flight,
+                      scheduled=scheduled,
+                      unfinished=scheduled - recorder.total.requests)
+        return report
+    
+    def _report(self, mode: str, recorder: Recorder, record_from: float,
+                latency_of) -> Dict[str, Any]:
+        total = recorder.total
+        window = max(recorder.last_done - record_from, 1e-9)
+        return {
+            "mode": mode,
+            "target": getattr(self.target, 'name', type(self.target).__name__),
+            "duration_s": round(window, 3),
+            "requests": total.requests,
+            "errors": total.errors,
+            "error_rate": round(total.errors / total.requests, 6) if total.requests else 0.0,
+            "throughput_rps": round(total.requests / window, 2) if total.requests else 0.0,
+            "latency_ms": summarize_latency(latency_of(total.latency)),
+            "service_time_ms": summarize_latency(total.service),
+            "errors_by_kind": dict(recorder.errors.most_common()),
+            "operations": {
+                name: {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "latency_ms": summarize_latency(latency_of(stats.latency))
+                }
+                for name, stats in sorted(recorder.operations.items())
+            }
+        }
+
+
+def _start_threads(target, count: int) -> List[threading.Thread]:
+    threads = [threading.Thread(target=target, args=(index,), daemon=True,
+                                name=f'mcp-loadgen-{index}') for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _run_threads(target, count: int) -> None:
+    for thread in _start_threads(target, count):
+        thread.join()
+
+
+def compare_reports(baseline: Dict[str, Any], report: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Regressions of a report against an earlier one.
+    
+    Returns:
+        One line per regression: throughput down, p99 latency or error
+        rate up by more than ``threshold`` (a fraction; the error rate is
+        compared in percentage points)
+    """
+    findings = []
+    old, new = baseline['throughput_rps'], report['throughput_rps']
+    if old and new < old * (1 - threshold):
+        findings.append(f"throughput {old:g} -> {new:g} req/s")
+    old, new = baseline['latency_ms']['p99'], report['latency_ms']['p99']
+    if old and new > old * (1 + threshold):
+        findings.append(f"p99 latency {old:g} -> {new:g} ms")
+    old, new = baseline['error_rate'], report['error_rate']
+    if new > old + threshold / 100:
+        findings.append(f"error rate {old:.2%} -> {new:.2%}")
+    return findings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m api_gateway.loadgen``."""
+    parser = argparse.ArgumentParser(description="Generate load against the MCP gateway")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="Gateway /mcp endpoint to load over HTTP")
+    target.add_argument('--catalog', help="Load a gateway in this process built from this "
+                                          "catalog (the default, with the registry's)")
+    parser.add_argument('--server', help="Server for requests whose mix entry names none")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help="Weighted requests, e.g. 'tools/call:echo=9,tools/list=1', "
+                             "or a JSON file")
+    loop = parser.add_mutually_exclusive_group()
+    loop.add_argument('--rate', type=float, help="Open loop: requests per second")
+    loop.add_argument('--concurrency', type=int,
+                      help=f"Closed loop: requests in flight (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--arrivals', choices=('constant', 'poisson'), default='constant')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--warmup', type=float, default=0.0)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--api-key', default=os.environ.get('GATEWAY_API_KEY'))
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--compare', help="Earlier JSON report; exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+    
+    operations = parse_mix(args.mix, args.server)
+    gateway = None
+    if args.url:
+        load_target = HTTPTarget(args.url, args.api_key, args.timeout)
+    else:
+        gateway = APIGateway(options={'catalog_path': args.catalog} if args.catalog else {})
+        for server_id in {op.server for op in operations if op.server}:
+            gateway.start_server(server_id)
+        load_target = GatewayTarget(gateway, args.api_key)
+    
+    generator = LoadGenerator(load_target, operations, seed=args.seed)
+    try:
+        if args.rate:
+            report = generator.open_loop(args.rate, args.duration, args.warmup,
+                                         args.max_in_flight, args.arrivals, args.timeout)
+        else:
+            report = generator.closed_loop(args.concurrency or DEFAULT_CONCURRENCY,
+                                           args.duration, args.warmup)
+    finally:
+        load_target.close()
+        if gateway is not None:
+            gateway.close()
+    
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    
+    if args.compare:
+        with open(args.compare) as f:
+            findings = compare_reports(json.load(f), report, args.threshold)
+        for finding in findings:
+            print(f"Regression: {finding}", file=sys.stderr)
+        return 1 if findings else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
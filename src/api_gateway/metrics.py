@@ -0,0 +1,323 @@
+"""Per-server, per-method request counters and latency histograms."""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+# Histogram resolution: latencies are recorded in whole microseconds, with
+# 2**SUB_BUCKET_BITS exact buckets at the bottom and each power of two
+# above that split into 2**(SUB_BUCKET_BITS - 1) equal buckets
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS >> 1
+# Largest recordable latency (about 71 minutes); anything slower is clamped
+MAX_LATENCY_US = (1 << 32) - 1
+BUCKET_COUNT = SUB_BUCKETS + (32 - SUB_BUCKET_BITS) * HALF_SUB_BUCKETS
+
+# Distinct method keys tracked per server before new ones share one bucket
+DEFAULT_MAX_METHODS = 256
+OVERFLOW_METHOD = '(other)'
+# Seconds covered by requests_per_second
+RATE_WINDOW = 60
+
+
+class LatencyHistogram:
+    """Fixed-bucket, log-linear latency histogram in the style of HdrHistogram.
+    
+    Every power of two is split into equal buckets, so any recorded value
+    is off by at most about 3% at every scale from microseconds to an
+    hour. Counts live in one preallocated array of 64-bit counters:
+    recording is a few integer operations with no allocation, and each
+    histogram takes the same few kilobytes no matter how much traffic it
+    sees.
+    """
+    
+    __slots__ = ('counts', 'count', 'total_us', 'max_us')
+    
+    def __init__(self):
+        self.counts = array('Q', [0]) * BUCKET_COUNT
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+    
+    @staticmethod
+    def bucket_index(value_us: int) -> int:
+        """Bucket holding a latency in microseconds."""
+        if value_us < SUB_BUCKETS:
+            return value_us
+        shift = value_us.bit_length() - SUB_BUCKET_BITS
+        return SUB_BUCKETS + (shift - 1) * HALF_SUB_BUCKETS + (value_us >> shift) - HALF_SUB_BUCKETS
+    
+    @staticmethod
+    def bucket_bounds(index: int):
+        """Lowest and highest microsecond values that land in a bucket."""
+        if index < SUB_BUCKETS:
+            return index, index
+        shift, sub = divmod(index - SUB_BUCKETS, HALF_SUB_BUCKETS)
+        shift += 1
+        low = (sub + HALF_SUB_BUCKETS) << shift
+        return low, low + (1 << shift) - 1
+    
+    def record(self, latency: float) -> None:
+        """Record a latency in seconds."""
+        value_us = min(MAX_LATENCY_US, max(0, int(latency * 1_000_000)))
+        self.counts[self.bucket_index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+    
+    def quantile(self, q: float) -> float:
+        """Latency in seconds at quantile ``q`` (0.0 if nothing recorded)."""
+        if not self.count:
+            return 0.0
+        
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min((low + high) / 2, self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+    
+    @property
+    def mean(self) -> float:
+        """Mean latency in seconds."""
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+    
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add another histogram's recordings to this one."""
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+    
+    def corrected(self, expected_interval: float) -> 'LatencyHistogram':
+        """Copy corrected for coordinated omission.
+        
+        A caller that waits for each response before sending its next
+        request sends nothing during a stall, so the requests it would
+        have sent are missing from the record. As in HdrHistogram, each
+        latency longer than ``expected_interval`` (the usual time between
+        requests) is joined by the latencies those requests would have
+        seen: itself less one interval, less two, and so on.
+        """
+        result = LatencyHistogram()
+        result.merge(self)
+        expected_us = int(expected_interval * 1_000_000)
+        if expected_us <= 0:
+            return result
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            low, high = self.bucket_bounds(index)
+            missing = (low + high) // 2 - expected_us
+            while missing >= expected_us:
+                result.counts[self.bucket_index(missing)] += bucket_count
+                result.count += bucket_count
+                result.total_us += missing * bucket_count
+                missing -= expected_us
+        return result
+    
+    def cumulative_counts(self, bounds: Sequence[float]) -> Tuple[List[int], int, float]:
+        """Re-bucket onto coarser upper bounds, e.g. for Prometheus.
+        
+        Reads a copy of the counts without locking, so it can run while
+        requests are being recorded; the result may miss a request that is
+        being recorded at that moment.
+        
+        Args:
+            bounds: Ascending upper bounds in seconds
+        
+        Returns:
+            Count of latencies at or below each bound, total count, and sum
+            of latencies in seconds
+        """
+        counts = self.counts[:]
+        total_us = self.total_us
+        
+        cumulative = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < BUCKET_COUNT and self.bucket_bounds(index)[1] <= limit:
+                seen += counts[index]
+                index += 1
+            cumulative.append(seen)
+        return cumulative, sum(counts), total_us / 1_000_000
+
+
+class RateCounter:
+    """Events per second over a sliding window of one-second slots."""
+    
+    __slots__ = ('window', '_counts', '_seconds')
+    
+    def __init__(self, window: int = RATE_WINDOW):
+        self.window = window
+        self._counts = array('Q', [0]) * window
+        self._seconds = array('q', [-1]) * window
+    
+    def add(self, now: float) -> None:
+        """Count one event at monotonic time ``now``."""
+        second = int(now)
+        slot = second % self.window
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+    
+    def rate(self, now: float) -> float:
+        """Average events per second over the window ending at ``now``."""
+        second = int(now)
+        total = sum(
+            count for count, stamp in zip(self._counts, self._seconds)
+            if 0 <= second - stamp < self.window
+        )
+        return total / self.window
+
+
+class MethodStats:
+    """Request and error counts plus a latency histogram."""
+    
+    __slots__ = ('requests', 'errors', 'latency')
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+    
+    def record(self, latency: float, error: bool) -> None:
+        self.requests += 1
+        self.errors += error
+        self.latency.record(latency)
+    
+    def summary(self) -> Dict[str, Any]:
+        histogram = self.latency
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "latency_ms": round(histogram.mean * 1000, 3),
+            "latency_percentiles_ms": {
+                "p50": round(histogram.quantile(0.50) * 1000, 3),
+                "p90": round(histogram.quantile(0.90) * 1000, 3),
+                "p99": round(histogram.quantile(0.99) * 1000, 3),
+                "max": round(histogram.max_us / 1000, 3)
+            }
+        }
+
+
+class _ServerStats:
+    __slots__ = ('total', 'methods', 'rate')
+    
+    def __init__(self):
+        self.total = MethodStats()
+        self.methods: Dict[str, MethodStats] = {}
+        self.rate = RateCounter()
+
+
+class RequestMetrics:
+    """Latency and error statistics for every request, by server and method.
+    
+    Requests are keyed by JSON-RPC method, with ``tools/call`` further split
+    by tool name (``tools/call:<name>``). Each server tracks at most
+    ``max_methods`` keys; requests for further methods are counted under
+    ``(other)`` so memory stays bounded however many tools servers expose.
+    """
+    
+    def __init__(self, max_methods: int = DEFAULT_MAX_METHODS,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize empty statistics.
+        
+        Args:
+            max_methods: Method keys tracked per server
+            clock: Monotonic time source for request rates
+        """
+        self.max_methods = max_methods
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._servers: Dict[str, _ServerStats] = {}
+    
+    @staticmethod
+    def method_key(request: Dict[str, Any]) -> str:
+        """Statistics key of a request: its method, or tool for tools/call."""
+        method = request.get('method')
+        if not isinstance(method, str):
+            return OVERFLOW_METHOD
+        if method == 'tools/call':
+            params = request.get('params')
+            name = params.get('name') if isinstance(params, dict) else None
+            if isinstance(name, str):
+                return f"tools/call:{name}"
+        return method
+    
+    def record(self, server_id: str, request: Dict[str, Any], latency: float,
+               error: bool) -> None:
+        """Record one completed request.
+        
+        Args:
+            server_id: Target server
+            request: JSON-RPC request
+            latency: Seconds the gateway took to answer
+            error: Whether the response was a JSON-RPC error
+        """
+        self.record_method(server_id, self.method_key(request), latency, error)
+    
+    def record_method(self, server_id: str, key: str, latency: float,
+                      error: bool) -> None:
+        """Record one completed call under an explicit method key."""
+        now = self.clock()
+        
+        with self._lock:
+            server = self._servers.get(server_id)
+            if server is None:
+                server = self._servers[server_id] = _ServerStats()
+            
+            stats = server.methods.get(key)
+            if stats is None:
+                if len(server.methods) >= self.max_methods:
+                    key = OVERFLOW_METHOD
+                stats = server.methods.get(key)
+                if stats is None:
+                    stats = server.methods[key] = MethodStats()
+            
+            server.total.record(latency, error)
+            stats.record(latency, error)
+            server.rate.add(now)
+    
+    def server_summary(self, server_id: str) -> Dict[str, Any]:
+        """Totals, request rate and per-method statistics of one server."""
+        with self._lock:
+            server = self._servers.get(server_id)
+            if server is None:
+                server = _ServerStats()
+            
+            summary = server.total.summary()
+            summary["requests_per_second"] = round(server.rate.rate(self.clock()), 3)
+            summary["methods"] = {
+                key: stats.summary() for key, stats in sorted(server.methods.items())
+            }
+            return summary
+    
+    def method_stats(self) -> Iterator[Tuple[str, str, MethodStats]]:
+        """Live (server, method key, stats) entries, read without locking.
+        
+        For scrape-time collectors: snapshots of the dicts are taken
+        atomically, so recording never waits on a scrape.
+        """
+        for server_id, server in list(self._servers.items()):
+            for key, stats in list(server.methods.items()):
+                yield server_id, key, stats
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries of every server that has received requests."""
+        with self._lock:
+            server_ids = list(self._servers)
+        return {server_id: self.server_summary(server_id) for server_id in server_ids}
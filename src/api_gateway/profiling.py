@@ -0,0 +1,316 @@
+"""On-demand profiling: sampled stacks, per-request cProfile and allocations.
+
+Nothing here runs until it is asked for. A stack sampling window runs in a
+thread of its own and stops by itself; request profiling covers only the
+requests it was armed for; allocation tracing runs from the first snapshot
+until it is stopped.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import RequestMetrics
+
+
+DEFAULT_PROFILE_DURATION = 10.0
+# Seconds between stack samples (100 Hz, like py-spy)
+DEFAULT_SAMPLE_INTERVAL = 0.01
+DEFAULT_REQUEST_COUNT = 10
+# Functions or allocation sites listed in summaries
+DEFAULT_TOP = 20
+# Frames kept per allocation; more show callers but cost more while tracing
+DEFAULT_ALLOCATION_FRAMES = 1
+
+
+def _label(filename: str, line: int, name: str) -> str:
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class StackSampler:
+    """Samples every thread's stack into collapsed-stack counts.
+    
+    The output is ``thread;outer;...;leaf count`` lines, the input format
+    of flamegraph.pl, inferno and speedscope. Samples are wall-clock: a
+    thread waiting on a lock or socket is sampled like one that runs, so
+    idle worker threads show up as wide wait frames.
+    """
+    
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """Initialize the sampler.
+        
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether a background window is in progress."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def sample(self) -> None:
+        """Record the current stack of every other thread once."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                labels.append(_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}").replace(';', '_'))
+            self.stacks[';'.join(reversed(labels))] += 1
+        self.samples += 1
+    
+    def run(self, duration: float) -> None:
+        """Sample in the calling thread for ``duration`` seconds or until stopped."""
+        started = time.monotonic()
+        end = started + duration
+        next_sample = started
+        while not self._stop.is_set() and time.monotonic() < end:
+            self.sample()
+            next_sample += self.interval
+            self._stop.wait(max(0.0, min(next_sample, end) - time.monotonic()))
+        self.duration = time.monotonic() - started
+    
+    def start(self, duration: float, on_done: Optional[Callable[['StackSampler'], Any]] = None) -> None:
+        """Sample for ``duration`` seconds in a background thread.
+        
+        Args:
+            duration: Seconds to sample
+            on_done: Called with the sampler when the window ends
+        """
+        def window() -> None:
+            self.run(duration)
+            if on_done is not None:
+                on_done(self)
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=window, name='mcp-stack-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """End a background window early and wait for it to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background window to end."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def collapsed(self) -> str:
+        """Collapsed stacks, most sampled first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+    
+    def write(self, path: str) -> None:
+        """Write the collapsed stacks to a file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {"samples": self.samples, "stacks": len(self.stacks),
+                "duration": round(self.duration, 3), "interval": self.interval}
+
+
+def top_functions(stats: pstats.Stats, top: int = DEFAULT_TOP) -> List[Dict[str, Any]]:
+    """The ``top`` functions of a profile by cumulative time."""
+    stats.sort_stats('cumulative')
+    result = []
+    for function in stats.fcn_list[:top]:
+        _, calls, total, cumulative, _ = stats.stats[function]
+        result.append({
+            "function": _label(*function),
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3)
+        })
+    return result
+
+
+class RequestProfiler:
+    """cProfile of the next ``count`` requests matching a server and method.
+    
+    One request is profiled at a time; matching requests that arrive while
+    another is being profiled run unprofiled and are counted as skipped.
+    cProfile sees only the thread that handles the request, so work handed
+    to other threads (hedged attempts, transport bridge readers) shows up
+    as time spent waiting for it.
+    """
+    
+    def __init__(self, server: Optional[str] = None, method: Optional[str] = None,
+                 count: int = DEFAULT_REQUEST_COUNT, path: Optional[str] = None,
+                 top: int = DEFAULT_TOP):
+        """Initialize the profiler.
+        
+        Args:
+            server: Only requests to this server (any if None)
+            method: Only requests with this method, or tool as
+                ``tools/call:<tool>`` (any if None)
+            count: Requests to profile before stopping
+            path: File for the combined profile (pstats format, for
+                ``python -m pstats`` or snakeviz), written when done
+            top: Functions listed per request
+        """
+        self.server = server
+        self.method = method
+        self.count = count
+        self.path = path
+        self.top = top
+        self.done = False
+        self.skipped = 0
+        self.profiles: List[Dict[str, Any]] = []
+        self._combined: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+    
+    def matches(self, server_id: str, request: Dict[str, Any]) -> bool:
+        """Whether a request should be profiled."""
+        if self.done or (self.server is not None and server_id != self.server):
+            return False
+        return (self.method is None or request.get('method') == self.method or
+                RequestMetrics.method_key(request) == self.method)
+    
+    def run(self, server_id: str, request: Dict[str, Any],
+            call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Handle a matching request, profiling it if no other is being profiled."""
+        if not self._lock.acquire(blocking=False):
+            self.skipped += 1
+            return call()
+        try:
+            if self.done:
+                return call()
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (or a debugger) holds the profiling hook
+                self.skipped += 1
+                return call()
+            started = time.monotonic()
+            try:
+                response = call()
+            finally:
+                profile.disable()
+            latency = time.monotonic() - started
+            
+            stats = pstats.Stats(profile)
+            self.profiles.append({
+                "server": server_id,
+                "method": RequestMetrics.method_key(request),
+                "latency_ms": round(latency * 1000, 3),
+                "functions": top_functions(stats, self.top)
+            })
+            if self._combined is None:
+                self._combined = pstats.Stats(profile)
+            else:
+                self._combined.add(profile)
+            if len(self.profiles) >= self.count:
+                self._finish()
+            return response
+        finally:
+            self._lock.release()
+    
+    def stop(self) -> Dict[str, Any]:
+        """Stop profiling further requests and write the combined profile."""
+        with self._lock:
+            if not self.done:
+                self._finish()
+        return self.get_results()
+    
+    def _finish(self) -> None:
+        self.done = True
+        if self.path and self._combined is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._combined.dump_stats(self.path)
+    
+    def get_results(self) -> Dict[str, Any]:
+        """Filter, progress and the per-request summaries so far."""
+        return {
+            "server": self.server,
+            "method": self.method,
+            "count": self.count,
+            "profiled": len(self.profiles),
+            "skipped": self.skipped,
+            "done": self.done,
+            "path": self.path if self.done and self._combined is not None else None,
+            "requests": list(self.profiles)
+        }
+
+
+class AllocationTracker:
+    """tracemalloc snapshots with the top allocation sites.
+    
+    Tracing starts with the first snapshot, so that snapshot shows what
+    was allocated since; later ones also show growth since the one before.
+    Tracing slows allocation-heavy code noticeably, so stop it when done.
+    """
+    
+    def __init__(self, frames: int = DEFAULT_ALLOCATION_FRAMES):
+        self.frames = frames
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._started = False
+    
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+    
+    def snapshot(self, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        """Take a snapshot and summarize it.
+        
+        Returns:
+            Traced and peak bytes, the ``top`` allocation sites by size,
+            and (after the first snapshot) the ``top`` sites by growth
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+        ))
+        key = 'traceback' if self.frames > 1 else 'lineno'
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [_allocation(stat) for stat in snapshot.statistics(key)[:top]]
+        }
+        if self._previous is not None:
+            report["growth"] = [_allocation(stat, diff=True)
+                                for stat in snapshot.compare_to(self._previous, key)[:top]]
+        self._previous = snapshot
+        return report
+    
+    def stop(self) -> None:
+        """Stop tracing, if this tracker started it, and drop the snapshots."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+        self._previous = None
+
+
+def _allocation(stat: Any, diff: bool = False) -> Dict[str, Any]:
+    # Tracebacks run from the oldest frame; list the allocating line first
+    frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}"
+              for frame in reversed(stat.traceback)]
+    entry = {"location": ' <- '.join(frames), "size": stat.size, "count": stat.count}
+    if diff:
+        entry["size_diff"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
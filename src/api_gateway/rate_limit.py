@@ -0,0 +1,287 @@
+"""Token-bucket rate limiting per API key, server and method."""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .utils import parse_duration
+
+
+# Buckets kept before the least recently used are dropped
+DEFAULT_MAX_KEYS = 100000
+# Method rules remembered per server before lookups go uncached
+_MAX_CACHED_METHODS = 1024
+
+
+class RateLimitedError(Exception):
+    """Raised when a call exceeds a rate limit."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateRule:
+    """Sustained rate and burst size of one limit."""
+    
+    __slots__ = ('rate', 'burst')
+    
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+    
+    @classmethod
+    def from_config(cls, config: Any) -> Optional['RateRule']:
+        """Build a rule from a limit block.
+        
+        Accepts the ``limits.js`` form (``windowMs`` or ``window`` with
+        ``maxRequests``, where the whole window's requests may come in one
+        burst) and the token-bucket form (``requestsPerSecond`` with an
+        optional ``burst``).
+        
+        Returns:
+            RateRule, or None for no limit (missing, ``skip``, or -1)
+        
+        Raises:
+            ValueError: If a value is not a number or the window is not
+                positive
+        """
+        if not isinstance(config, dict) or config.get('skip'):
+            return None
+        
+        if 'requestsPerSecond' in config:
+            rate = _number(config, 'requestsPerSecond')
+            if rate < 0:
+                return None
+            return cls(rate, _number(config, 'burst', max(1.0, rate)))
+        
+        if config.get('maxRequests') is None:
+            return None
+        max_requests = _number(config, 'maxRequests')
+        if max_requests < 0:
+            return None
+        if 'windowMs' in config:
+            window = _number(config, 'windowMs') / 1000
+        else:
+            window = parse_duration(config.get('window'), 1.0)
+        if window <= 0:
+            raise ValueError(f"Rate limit window must be positive, got {window:g}s")
+        return cls(max_requests / window, _number(config, 'burst', max_requests))
+    
+    def __repr__(self) -> str:
+        return f"RateRule(rate={self.rate:g}/s, burst={self.burst:g})"
+
+
+def _number(config: Dict[str, Any], key: str, default: Optional[float] = None) -> float:
+    """A numeric limit setting, or ``default`` if it is missing."""
+    value = config.get(key, default)
+    if not isinstance(value, bool):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError(f"Rate limit {key} must be a number, got {value!r}")
+
+
+class _Bucket:
+    """Tokens left for one key, refilled lazily when next used."""
+    
+    __slots__ = ('tokens', 'updated', 'full_at')
+    
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.full_at = now
+
+
+class RateLimiter:
+    """Token buckets keyed by arbitrary hashable keys.
+    
+    A bucket holds up to ``burst`` tokens and regains ``rate`` per second;
+    the refill is computed from the elapsed time when the bucket is next
+    used, so a check is a dictionary lookup and a little arithmetic.
+    Buckets live in least-recently-used order: ones that have refilled
+    completely are equivalent to new ones and are dropped as soon as they
+    reach the old end, and at most ``max_keys`` are kept in any case.
+    """
+    
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the limiter.
+        
+        Args:
+            max_keys: Buckets kept before the least recently used are
+                dropped (a dropped key that is still busy starts over with a
+                full bucket)
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.max_keys = max_keys
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets: 'OrderedDict[Hashable, _Bucket]' = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+    
+    def acquire(self, checks: Sequence[Tuple[Hashable, RateRule]], cost: float = 1.0) -> None:
+        """Take ``cost`` tokens from every bucket, or from none of them.
+        
+        Args:
+            checks: (key, rule) pairs that must all allow the call
+            cost: Tokens the call uses
+        
+        Raises:
+            RateLimitedError: If any bucket is short; ``retry_after`` is
+                the time until all of them could allow the call
+        """
+        with self._lock:
+            now = self.clock()
+            buckets = []
+            wait = 0.0
+            for key, rule in checks:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = _Bucket(rule.burst, now)
+                else:
+                    self._buckets.move_to_end(key)
+                    elapsed = now - bucket.updated
+                    if elapsed > 0:
+                        bucket.tokens = min(rule.burst, bucket.tokens + elapsed * rule.rate)
+                        bucket.updated = now
+                if bucket.tokens < cost:
+                    wait = max(wait, (cost - bucket.tokens) / rule.rate)
+                buckets.append((bucket, rule))
+            
+            if wait > 0:
+                self.rejected += 1
+                self._evict(now)
+                raise RateLimitedError("Rate limit exceeded", wait)
+            
+            for bucket, rule in buckets:
+                bucket.tokens -= cost
+                bucket.full_at = now + (rule.burst - bucket.tokens) / rule.rate
+            self.allowed += 1
+            self._evict(now)
+    
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if len(buckets) <= self.max_keys and bucket.full_at > now:
+                break
+            del buckets[key]
+            self.evicted += 1
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Limiter counters for metrics."""
+        return {
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted
+        }
+
+
+class MethodRules:
+    """Rate rules of one server: overall and by method pattern."""
+    
+    def __init__(self, server: Optional[RateRule],
+                 methods: Sequence[Tuple[str, RateRule]]):
+        self.server = server
+        self.methods = list(methods)
+        self._cache: Dict[str, Optional[Tuple[str, RateRule]]] = {}
+    
+    @classmethod
+    def from_config(cls, config: Any, defaults: Any = None) -> 'MethodRules':
+        """Build rules from a catalog ``limits.rateLimit`` block.
+        
+        Args:
+            config: Limit for the server, with an optional ``methods`` map
+                of method patterns (``tools/*``, ``tools/call:search``) to
+                limits
+            defaults: Gateway-wide ``methods`` map used for patterns the
+                server does not set
+        """
+        config = config if isinstance(config, dict) else {}
+        patterns = dict(defaults or {})
+        patterns.update(config.get('methods') or {})
+        methods = []
+        for pattern, limit in patterns.items():
+            rule = RateRule.from_config(limit)
+            if rule is not None:
+                methods.append((pattern, rule))
+        return cls(RateRule.from_config(config), methods)
+    
+    def for_method(self, method: str, key: str) -> Optional[Tuple[str, RateRule]]:
+        """First (pattern, rule) matching a request's method or statistics key."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        
+        match = None
+        for pattern, rule in self.methods:
+            if fnmatchcase(key, pattern) or fnmatchcase(method, pattern):
+                match = (pattern, rule)
+                break
+        if len(self._cache) < _MAX_CACHED_METHODS:
+            self._cache[key] = match
+        return match
+
+
+def load_rate_limits(source: Any) -> Dict[str, Any]:
+    """Read rate limit settings.
+    
+    Args:
+        source: Settings dict, or path of a JSON file; either may be the
+            whole ``limits.js`` export (``node limits.js > limits.json``),
+            whose ``rateLimit`` section is used
+    
+    Returns:
+        Settings with ``global``, ``perUser`` tiers and ``methods``
+    """
+    if not source:
+        return {}
+    if isinstance(source, str):
+        with open(source) as f:
+            source = json.load(f)
+    if isinstance(source.get('limits'), dict):
+        source = source['limits']
+    if isinstance(source.get('rateLimit'), dict):
+        source = source['rateLimit']
+    return source
+
+
+def tenant_rules(settings: Dict[str, Any]) -> Tuple[Optional[RateRule], Dict[str, RateRule]]:
+    """Default per-key rule and per-tier rules of rate limit settings."""
+    tiers = {}
+    for tier, limit in (settings.get('perUser') or {}).items():
+        rule = RateRule.from_config(limit)
+        if rule is not None:
+            tiers[tier] = rule
+    return RateRule.from_config(settings.get('global')), tiers
+
+
+def checks_for(api_key: Optional[str], server_id: str, method: str, key: str,
+               tenant: Optional[RateRule], rules: MethodRules) -> List[Tuple[Hashable, RateRule]]:
+    """Buckets a request draws from: key, key and server, key and method.
+    
+    Each method matching a pattern has its own bucket.
+    """
+    checks: List[Tuple[Hashable, RateRule]] = []
+    if tenant is not None:
+        checks.append(((api_key,), tenant))
+    if rules.server is not None:
+        checks.append(((api_key, server_id), rules.server))
+    method_rule = rules.for_method(method, key)
+    if method_rule is not None:
+        checks.append(((api_key, server_id, key), method_rule[1]))
+    return checks
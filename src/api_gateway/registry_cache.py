@@ -0,0 +1,181 @@
+"""Compiled snapshots of the server catalog for fast gateway construction."""
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+
+# Bump when the compiled entry layout or transport detection changes, so
+# snapshots written by older code are rebuilt
+CACHE_VERSION = 2
+# Snapshots from another interpreter version or marshal format are ignored
+_FORMAT = (CACHE_VERSION, marshal.version, sys.version_info[:2])
+
+# Compiled tables already loaded in this process: path -> (stamp, payload),
+# oldest first; beyond MAX_LOADED_CATALOGS the oldest is dropped
+MAX_LOADED_CATALOGS = 8
+_loaded: Dict[str, Tuple[Tuple[Any, ...], bytes]] = {}
+_loaded_lock = threading.Lock()
+# Lookups answered from memory or from a snapshot file, and those that missed
+# (a snapshot miss means the catalog was parsed and compiled)
+_stats = {'memo_hits': 0, 'memo_misses': 0, 'snapshot_hits': 0, 'snapshot_misses': 0}
+
+
+def get_stats() -> Dict[str, int]:
+    """Hit and miss counters of this process's catalog loads."""
+    with _loaded_lock:
+        return dict(_stats)
+
+
+def clear_loaded() -> None:
+    """Forget the tables loaded in this process; snapshot files are kept."""
+    with _loaded_lock:
+        _loaded.clear()
+
+
+def _count(name: str) -> None:
+    with _loaded_lock:
+        _stats[name] += 1
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory for registry snapshots."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'mcp-platform')
+
+
+def _snapshot_path(cache_dir: str, catalog_path: str) -> str:
+    name = hashlib.sha1(os.path.abspath(catalog_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"registry-{name}.bin")
+
+
+def _read_snapshot(path: str) -> Optional[Tuple[Tuple[Any, ...], bytes]]:
+    try:
+        with open(path, 'rb') as f:
+            header = marshal.load(f)
+            payload = f.read()
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(header, tuple) or len(header) != 3 or header[0] != _FORMAT:
+        return None
+    return header, payload
+
+
+def _write_snapshot(path: str, header: Tuple[Any, ...], payload: bytes) -> None:
+    # Written beside the target and renamed, so readers never see half a file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            marshal.dump(header, f)
+            f.write(payload)
+        os.replace(temp_path, path)
+    except OSError:
+        # A read-only or full cache directory only costs speed
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _stamp(paths: Sequence[str]) -> Tuple[Any, ...]:
+    """Modification time and size of each file (None for missing ones)."""
+    stamp = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def _digest(paths: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            digest.update(b'\0missing')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_servers(catalog_path: str,
+                 compile_server: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 cache_dir: Optional[str] = None,
+                 dependencies: Sequence[str] = ()) -> Dict[str, Dict[str, Any]]:
+    """Load the compiled server table of a catalog.
+    
+    The table maps each server ID to ``compile_server(entry)``. It is kept
+    as a marshal snapshot keyed by the modification time and size of the
+    catalog and its dependencies, backed by a hash of their contents: an unchanged catalog is never
+    parsed again, and a catalog that was only touched (e.g. by a checkout)
+    is recognised by its hash. Within a process the snapshots of the last
+    few catalogs loaded are kept in memory, so later gateways only
+    unmarshal them. Every call returns fresh
+    objects that the caller may modify.
+    
+    Args:
+        catalog_path: Path of the catalog JSON file
+        compile_server: Builds the table entry for one catalog server; its
+            result must contain only JSON-compatible values
+        cache_dir: Directory for snapshot files (None to keep them in
+            memory only)
+        dependencies: Other files ``compile_server`` reads; changing (or
+            creating) one of them invalidates the snapshot too
+    
+    Returns:
+        Compiled entries by server ID, in catalog order
+    
+    Raises:
+        FileNotFoundError: If the catalog does not exist
+    """
+    key = os.path.abspath(catalog_path)
+    paths = [key] + [os.path.abspath(path) for path in dependencies]
+    stamp = _stamp(paths)
+    if stamp[0] is None:
+        raise FileNotFoundError(f"Catalog not found: {catalog_path}")
+    
+    with _loaded_lock:
+        loaded = _loaded.get(key)
+        hit = loaded is not None and loaded[0] == stamp
+        _stats['memo_hits' if hit else 'memo_misses'] += 1
+    if hit:
+        return marshal.loads(loaded[1])
+    
+    snapshot_path = _snapshot_path(cache_dir, key) if cache_dir else None
+    snapshot = _read_snapshot(snapshot_path) if snapshot_path else None
+    
+    if snapshot is not None and snapshot[0][1] == stamp:
+        _count('snapshot_hits')
+        payload = snapshot[1]
+    else:
+        digest = _digest(paths)
+        if snapshot is not None and snapshot[0][2] == digest:
+            # Same contents under new timestamps: only the header is stale
+            _count('snapshot_hits')
+            payload = snapshot[1]
+        else:
+            _count('snapshot_misses')
+            with open(key, 'rb') as f:
+                catalog = json.load(f)
+            payload = marshal.dumps({
+                server['id']: compile_server(server)
+                for server in catalog.get('servers', [])
+            })
+        if snapshot_path:
+            _write_snapshot(snapshot_path, (_FORMAT, stamp, digest), payload)
+    
+    with _loaded_lock:
+        _loaded.pop(key, None)
+        _loaded[key] = (stamp, payload)
+        while len(_loaded) > MAX_LOADED_CATALOGS:
+            del _loaded[next(iter(_loaded))]
+    return marshal.loads(payload)
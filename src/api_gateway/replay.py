@@ -0,0 +1,229 @@
+"""Replay captured gateway traffic and compare latencies with the capture.
+
+Re-sends the requests of a capture file (the ``capture`` gateway option)
+in their original order and spacing, or ``--speed`` times faster, and
+reports the replayed latencies next to the captured ones, overall and
+per server and method:
+
+    python -m api_gateway.replay capture.jsonl --url http://127.0.0.1:8091/mcp --speed 2
+    python -m api_gateway.replay capture.jsonl --catalog catalog.json --output replay.json
+
+Captured latencies were measured inside the gateway. Replaying to a
+gateway in this process (``--catalog``) measures the same thing; over
+HTTP the replayed latencies also include the network and HTTP handling.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .capture import load_capture
+from .gateway import APIGateway
+from .loadgen import (DEFAULT_MAX_IN_FLIGHT, DEFAULT_TIMEOUT, GatewayTarget, HTTPTarget,
+                      classify, summarize_latency)
+from .metrics import LatencyHistogram, RequestMetrics
+
+
+def operation_key(record: Dict[str, Any]) -> str:
+    """Report key of a captured request: server and method (or tool)."""
+    return f"{record['server']} {RequestMetrics.method_key(record['request'])}"
+
+
+def _same_outcome(captured: Dict[str, Any], replayed: Any) -> bool:
+    if not isinstance(replayed, dict):
+        return False
+    if 'error' in captured or 'error' in replayed:
+        return ((captured.get('error') or {}).get('code') ==
+                (replayed.get('error') or {}).get('code'))
+    return captured.get('result') == replayed.get('result')
+
+
+def replay(target: Any, records: Sequence[Dict[str, Any]], speed: float = 1.0,
+           max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+           drain_timeout: float = DEFAULT_TIMEOUT, clock=time.perf_counter) -> Dict[str, Any]:
+    """Re-send captured requests and compare the outcome with the capture.
+    
+    Args:
+        target: ``HTTPTarget``, ``GatewayTarget`` or anything with
+            ``send(server_id, message)``
+        records: Captured records in arrival order (``load_capture``)
+        speed: Replay this many times faster than captured; 0 sends
+            everything at once, ``max_in_flight`` at a time
+        max_in_flight: Requests sent at once; later ones wait
+        drain_timeout: Longest wait for requests still in flight at the
+            end; any left are reported as ``unfinished``
+    
+    Returns:
+        Report with captured and replayed latency percentiles, their
+        difference, how late requests were sent (a high ``start_lag_ms``
+        means the replayer could not keep up), outcome changes and errors
+    """
+    if speed < 0:
+        raise ValueError("speed must not be negative")
+    results: List[Optional[Tuple[float, float, Optional[str], Any]]] = [None] * len(records)
+    jobs: 'queue.Queue[Optional[Tuple[int, float]]]' = queue.Queue()
+    
+    def worker() -> None:
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            index, due = job
+            record = records[index]
+            began = clock()
+            try:
+                response = target.send(record['server'], record['request'])
+                kind = classify(response)
+            except Exception as e:
+                response, kind = None, classify(error=e)
+            results[index] = (began - due, clock() - began, kind, response)
+    
+    threads = [threading.Thread(target=worker, daemon=True, name=f'mcp-replay-{index}')
+               for index in range(max(1, min(max_in_flight, len(records))))]
+    for thread in threads:
+        thread.start()
+    
+    start = clock()
+    first = records[0]['t'] if records else 0.0
+    for index, record in enumerate(records):
+        due = start + ((record['t'] - first) / speed if speed else 0.0)
+        delay = due - clock()
+        if delay > 0:
+            time.sleep(delay)
+        jobs.put((index, due))
+    for _ in threads:
+        jobs.put(None)
+    deadline = time.monotonic() + drain_timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    elapsed = clock() - start
+    
+    captured, replayed, lag = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    operations: Dict[str, Dict[str, Any]] = {}
+    errors: Counter = Counter()
+    changes: Counter = Counter()
+    compared = mismatched = unfinished = 0
+    for record, result in zip(records, results):
+        if result is None:
+            unfinished += 1
+            continue
+        start_lag, service_time, kind, response = result
+        captured_latency = record.get('latencyMs', 0.0) / 1000
+        captured.record(captured_latency)
+        replayed.record(service_time)
+        lag.record(max(0.0, start_lag))
+        
+        stats = operations.get(operation_key(record))
+        if stats is None:
+            stats = operations[operation_key(record)] = {
+                'captured': LatencyHistogram(), 'replayed': LatencyHistogram(), 'errors': 0
+            }
+        stats['captured'].record(captured_latency)
+        stats['replayed'].record(service_time)
+        if kind is not None:
+            stats['errors'] += 1
+            errors[kind] += 1
+        
+        captured_error = record.get('error') is not None
+        if captured_error != (kind is not None):
+            changes['ok->error' if kind is not None else 'error->ok'] += 1
+        if 'response' in record and response is not None:
+            compared += 1
+            mismatched += not _same_outcome(record['response'], response)
+    
+    replayed_count = len(records) - unfinished
+    report = {
+        "target": getattr(target, 'name', type(target).__name__),
+        "speed": speed,
+        "requests": len(records),
+        "replayed": replayed_count,
+        "unfinished": unfinished,
+        "captured_duration_s": round(records[-1]['t'] - first, 3) if records else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(replayed_count / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": _compare(captured, replayed),
+        "start_lag_ms": summarize_latency(lag),
+        "errors": sum(errors.values()),
+        "errors_by_kind": dict(errors.most_common()),
+        "outcome_changes": dict(changes),
+        "operations": {
+            key: dict(requests=stats['captured'].count, errors=stats['errors'],
+                      **_compare(stats['captured'], stats['replayed']))
+            for key, stats in sorted(operations.items())
+        }
+    }
+    if compared:
+        report["responses_compared"] = compared
+        report["responses_changed"] = mismatched
+    return report
+
+
+def _compare(captured: LatencyHistogram, replayed: LatencyHistogram) -> Dict[str, Any]:
+    before = summarize_latency(captured)
+    after = summarize_latency(replayed)
+    return {
+        "captured": before,
+        "replayed": after,
+        "diff": {label: round(after[label] - before[label], 3) for label in before}
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: ``python -m api_gateway.replay``."""
+    parser = argparse.ArgumentParser(description="Replay captured MCP gateway traffic")
+    parser.add_argument('capture', help="Capture file written by the gateway")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help="Gateway /mcp endpoint to replay to over HTTP")
+    target.add_argument('--catalog', help="Replay to a gateway in this process built from "
+                                          "this catalog (the default, with the registry's)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Times faster than captured; 0 for as fast as possible")
+    parser.add_argument('--server', action='append',
+                        help="Only replay requests to this server (repeatable)")
+    parser.add_argument('--limit', type=int, help="Replay only the first N requests")
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--api-key', default=os.environ.get('GATEWAY_API_KEY'))
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+    
+    header, records = load_capture(args.capture)
+    if args.server:
+        records = [record for record in records if record['server'] in args.server]
+    if args.limit is not None:
+        records = records[:args.limit]
+    
+    gateway = None
+    if args.url:
+        replay_target = HTTPTarget(args.url, args.api_key, args.timeout)
+    else:
+        gateway = APIGateway(options={'catalog_path': args.catalog} if args.catalog else {})
+        for server_id in sorted({record['server'] for record in records}):
+            gateway.start_server(server_id)
+        replay_target = GatewayTarget(gateway, args.api_key)
+    
+    try:
+        report = replay(replay_target, records, args.speed, args.max_in_flight, args.timeout)
+    finally:
+        replay_target.close()
+        if gateway is not None:
+            gateway.close()
+    report["capture"] = {"path": args.capture, "sample_rate": header.get('sampleRate'),
+                         "started_at": header.get('startedAt')}
+    
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Replica pools: several connections/processes behind one server ID."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Consecutive failures after which a replica is taken out of rotation
+DEFAULT_FAILURE_THRESHOLD = 3
+# Seconds an unhealthy replica is skipped before it is tried again
+DEFAULT_UNHEALTHY_COOLDOWN = 10.0
+# Sticky sessions remembered per pool (least recently used are dropped)
+DEFAULT_MAX_SESSIONS = 10000
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class Replica:
+    """One connection (and, for stdio, one process) serving a server ID."""
+    
+    def __init__(self, index: int, connection_id: str, process_id: Optional[str] = None):
+        self.index = index
+        self.connection_id = connection_id
+        self.process_id = process_id
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.latency_ewma: Optional[float] = None
+        self.unhealthy_until = 0.0
+        self.draining = False
+    
+    def get_stats(self, now: float) -> Dict[str, Any]:
+        """Per-replica metrics and health."""
+        return {
+            "index": self.index,
+            "connectionId": self.connection_id,
+            "processId": self.process_id,
+            "healthy": now >= self.unhealthy_until,
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": round(self.latency_ewma * 1000, 3) if self.latency_ewma is not None else None
+        }
+
+
+class ReplicaPool:
+    """Routes requests across a server's replicas.
+    
+    Each request goes to the healthy replica with the fewest requests in
+    flight, ties broken by the lower average latency. For stateful servers
+    a session sticks to the replica that served its first request for as
+    long as that replica stays in the pool and healthy.
+    
+    A replica that fails ``failure_threshold`` times in a row is skipped for
+    ``unhealthy_cooldown`` seconds. If every replica is unhealthy, requests
+    are still routed rather than rejected; the circuit breaker decides when
+    to stop sending altogether.
+    """
+    
+    def __init__(self, stateful: bool = False,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 unhealthy_cooldown: float = DEFAULT_UNHEALTHY_COOLDOWN,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize an empty pool.
+        
+        Args:
+            stateful: Pin sessions to a replica
+            failure_threshold: Consecutive failures that mark a replica unhealthy
+            unhealthy_cooldown: Seconds an unhealthy replica is skipped
+            max_sessions: Sticky sessions remembered before the oldest is dropped
+            clock: Monotonic time source
+        """
+        self.stateful = stateful
+        self.failure_threshold = failure_threshold
+        self.unhealthy_cooldown = unhealthy_cooldown
+        self.max_sessions = max_sessions
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._replicas: List[Replica] = []
+        self._sessions: 'OrderedDict[str, Replica]' = OrderedDict()
+        self._next_index = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._replicas)
+    
+    @property
+    def replicas(self) -> List[Replica]:
+        """Snapshot of the replicas in the pool."""
+        with self._lock:
+            return list(self._replicas)
+    
+    def peek(self) -> List[Replica]:
+        """Replicas read without locking, for scrape-time metrics."""
+        return list(self._replicas)
+    
+    @property
+    def next_index(self) -> int:
+        """Index the next added replica will get."""
+        with self._lock:
+            return self._next_index
+    
+    @property
+    def in_flight(self) -> int:
+        """Requests in flight across all replicas."""
+        with self._lock:
+            return sum(replica.in_flight for replica in self._replicas)
+    
+    def add(self, connection_id: str, process_id: Optional[str] = None) -> Replica:
+        """Add a replica and return it."""
+        with self._lock:
+            replica = Replica(self._next_index, connection_id, process_id)
+            self._next_index += 1
+            self._replicas.append(replica)
+            return replica
+    
+    def remove(self, replica: Replica) -> None:
+        """Take a replica out of rotation; requests already on it finish."""
+        with self._lock:
+            replica.draining = True
+            if replica in self._replicas:
+                self._replicas.remove(replica)
+            for session_id in [s for s, r in self._sessions.items() if r is replica]:
+                del self._sessions[session_id]
+    
+    def acquire(self, session_id: Optional[str] = None,
+                exclude: Optional[Replica] = None) -> Replica:
+        """Pick a replica for a request and count it as in flight.
+        
+        Args:
+            session_id: Session to keep on one replica (stateful pools only)
+            exclude: Replica to avoid unless it is the only one, e.g. the
+                one already handling the original of a hedged request
+        
+        Raises:
+            LookupError: If the pool has no replicas
+        """
+        with self._lock:
+            if not self._replicas:
+                raise LookupError("No replicas available")
+            
+            now = self.clock()
+            sticky = self.stateful and session_id is not None
+            
+            replica = self._sessions.get(session_id) if sticky else None
+            if replica is not None and now >= replica.unhealthy_until:
+                self._sessions.move_to_end(session_id)
+            else:
+                candidates = [r for r in self._replicas if r is not exclude] or self._replicas
+                healthy = [r for r in candidates if now >= r.unhealthy_until]
+                replica = min(
+                    healthy or candidates,
+                    key=lambda r: (r.in_flight, r.latency_ewma or 0.0, r.index)
+                )
+                if sticky:
+                    self._sessions[session_id] = replica
+                    self._sessions.move_to_end(session_id)
+                    if len(self._sessions) > self.max_sessions:
+                        self._sessions.popitem(last=False)
+            
+            replica.in_flight += 1
+            replica.requests += 1
+            return replica
+    
+    def release(self, replica: Replica, latency: Optional[float] = None,
+                failed: bool = False) -> None:
+        """Finish a request on a replica and record its outcome.
+        
+        Args:
+            replica: Replica returned by ``acquire``
+            latency: Seconds the request took (None if it never completed)
+            failed: Whether the replica failed to answer
+        """
+        with self._lock:
+            replica.in_flight -= 1
+            
+            if failed:
+                replica.errors += 1
+                replica.consecutive_failures += 1
+                if replica.consecutive_failures >= self.failure_threshold:
+                    replica.unhealthy_until = self.clock() + self.unhealthy_cooldown
+                    replica.consecutive_failures = 0
+                return
+            
+            replica.consecutive_failures = 0
+            replica.unhealthy_until = 0.0
+            if latency is not None:
+                if replica.latency_ewma is None:
+                    replica.latency_ewma = latency
+                else:
+                    replica.latency_ewma += LATENCY_EWMA_ALPHA * (latency - replica.latency_ewma)
+    
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Metrics and health for each replica."""
+        with self._lock:
+            now = self.clock()
+            return [replica.get_stats(now) for replica in self._replicas]
@@ -0,0 +1,106 @@
+"""Weighted-fair scheduling of queued requests across priority classes."""
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+# Priority classes and their share of freed slots under contention
+PRIORITY_WEIGHTS = {
+    'interactive': 8,
+    'normal': 4,
+    'bulk': 1
+}
+
+DEFAULT_PRIORITY = 'normal'
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    """Map a requested priority onto a known class."""
+    if priority in PRIORITY_WEIGHTS:
+        return priority
+    return DEFAULT_PRIORITY
+
+
+def priority_weights(weights: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """PRIORITY_WEIGHTS with overrides applied.
+    
+    Raises:
+        ValueError: If a class is not one of PRIORITY_WEIGHTS (requests can
+            only name those) or a weight is not a positive number
+    """
+    unknown = sorted(set(weights or {}) - set(PRIORITY_WEIGHTS))
+    if unknown:
+        raise ValueError(f"Unknown priority class {', '.join(map(str, unknown))}; "
+                         f"expected one of {', '.join(PRIORITY_WEIGHTS)}")
+    merged = dict(PRIORITY_WEIGHTS, **(weights or {}))
+    for name, weight in merged.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight > 0:
+            raise ValueError(f"Weight of priority class {name} must be a positive number, "
+                             f"not {weight!r}")
+    return merged
+
+
+class WeightedFairQueue:
+    """Queue that dequeues across priority classes by weight.
+    
+    Uses stride scheduling: each class carries a virtual "pass" that
+    advances by ``1 / weight`` every time it is served, and the non-empty
+    class with the lowest pass goes next. Under contention interactive
+    requests get most slots while bulk requests still make steady progress
+    instead of starving. A class that has been idle rejoins at the current
+    virtual time, so it cannot bank credit while it had nothing queued.
+    """
+    
+    def __init__(self, weights: Optional[Dict[str, int]] = None):
+        """Initialize the queue.
+        
+        Args:
+            weights: Overrides for the PRIORITY_WEIGHTS class weights
+        
+        Raises:
+            ValueError: If a class is unknown or a weight is not a positive
+                number
+        """
+        self.weights = priority_weights(weights)
+        self._queues: Dict[str, Deque[Any]] = {name: deque() for name in self.weights}
+        self._pass: Dict[str, float] = {name: 0.0 for name in self.weights}
+        self._virtual_time = 0.0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def push(self, item: Any, priority: str) -> None:
+        """Queue an item in a priority class."""
+        queue = self._queues[priority]
+        if not queue:
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+        queue.append(item)
+        self._size += 1
+    
+    def pop(self) -> Any:
+        """Remove and return the next item by weighted-fair order.
+        
+        Raises:
+            IndexError: If the queue is empty
+        """
+        if not self._size:
+            raise IndexError("pop from an empty WeightedFairQueue")
+        
+        priority = min(
+            (name for name, queue in self._queues.items() if queue),
+            key=lambda name: (self._pass[name], -self.weights[name])
+        )
+        self._virtual_time = self._pass[priority]
+        self._pass[priority] += 1.0 / self.weights[priority]
+        self._size -= 1
+        return self._queues[priority].popleft()
+    
+    def remove(self, item: Any, priority: str) -> None:
+        """Remove a specific item, e.g. one whose wait timed out."""
+        self._queues[priority].remove(item)
+        self._size -= 1
+    
+    def depth_by_priority(self) -> Dict[str, int]:
+        """Queued items per priority class."""
+        return {name: len(queue) for name, queue in self._queues.items()}
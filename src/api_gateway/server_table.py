@@ -0,0 +1,179 @@
+"""Server registry table with secondary indexes for filtered listings."""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Fields servers are indexed by; 'tag' is multi-valued
+INDEXED_FIELDS = ('status', 'transport', 'category', 'tag')
+
+_MISSING = object()
+
+
+def _index_keys(record: Dict[str, Any]) -> Dict[str, Tuple[Any, ...]]:
+    """Values a server record is indexed under, per field."""
+    config = record.get('config') or {}
+    tags = config.get('tags') or ()
+    keys = {
+        'status': (record.get('status'),),
+        'transport': (record.get('transport'),),
+        'category': (config.get('category'),),
+        'tag': tuple(dict.fromkeys(tags)) if isinstance(tags, (list, tuple)) else ()
+    }
+    return {field: tuple(v for v in values if v is not None) for field, values in keys.items()}
+
+
+class ServerTable(dict):
+    """Server records by ID, indexed by status, transport, category and tag.
+    
+    Each index keeps the matching server IDs in sorted order, so counts are
+    a length lookup and a filtered page costs its own size rather than the
+    size of the registry. Records are indexed when they are stored; changes
+    to a stored record's status must go through ``set_status``, and other
+    indexed changes (transport, config) must be followed by ``reindex``.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._index: Dict[str, Dict[Any, List[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._keys: Dict[str, Dict[str, Tuple[Any, ...]]] = {}
+        self.update(*args, **kwargs)
+    
+    def __reduce__(self) -> Any:
+        return (type(self), (dict(self),))
+    
+    def __setitem__(self, server_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            if server_id in self:
+                self._unindex(server_id)
+            else:
+                insort(self._ids, server_id)
+            super().__setitem__(server_id, record)
+            self._add_index(server_id, record)
+    
+    def __delitem__(self, server_id: str) -> None:
+        with self._lock:
+            super().__delitem__(server_id)
+            self._unindex(server_id)
+            _remove_sorted(self._ids, server_id)
+    
+    def pop(self, server_id: str, default: Any = _MISSING) -> Any:
+        with self._lock:
+            if server_id not in self:
+                if default is _MISSING:
+                    raise KeyError(server_id)
+                return default
+            record = self[server_id]
+            del self[server_id]
+            return record
+    
+    def popitem(self) -> Tuple[str, Dict[str, Any]]:
+        with self._lock:
+            server_id = next(reversed(self))
+            return server_id, self.pop(server_id)
+    
+    def setdefault(self, server_id: str, record: Any = None) -> Any:
+        with self._lock:
+            if server_id not in self:
+                self[server_id] = record
+            return self[server_id]
+    
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        with self._lock:
+            for server_id, record in dict(*args, **kwargs).items():
+                self[server_id] = record
+    
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._ids.clear()
+            self._keys.clear()
+            for index in self._index.values():
+                index.clear()
+    
+    def set_status(self, server_id: str, status: str) -> None:
+        """Change a server's status and move it between status indexes."""
+        with self._lock:
+            self[server_id]['status'] = status
+            self.reindex(server_id)
+    
+    def reindex(self, server_id: str) -> None:
+        """Re-read the indexed fields of a record changed in place."""
+        with self._lock:
+            self._unindex(server_id)
+            self._add_index(server_id, self[server_id])
+    
+    def count(self, field: str, value: Any) -> int:
+        """Number of servers whose ``field`` is ``value``."""
+        return len(self._index[field].get(value, ()))
+    
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Number of servers per value of ``field``."""
+        with self._lock:
+            return {value: len(ids) for value, ids in self._index[field].items()}
+    
+    def select(self, limit: Optional[int] = None, after: Optional[str] = None,
+               **filters: Any) -> List[str]:
+        """IDs of the servers matching every filter, in ID order.
+        
+        Args:
+            limit: Most IDs to return (None for all)
+            after: Only IDs sorting after this one, to resume a listing
+            **filters: Indexed field values to match, e.g. status='running';
+                None values are ignored
+        
+        Returns:
+            Matching server IDs
+        """
+        filters = {field: value for field, value in filters.items() if value is not None}
+        for field in filters:
+            if field not in self._index:
+                raise ValueError(f"Servers are not indexed by {field!r}")
+        
+        with self._lock:
+            # Walk the smallest matching index and check the other filters
+            candidates = self._ids
+            for field, value in filters.items():
+                ids = self._index[field].get(value, [])
+                if len(ids) < len(candidates):
+                    candidates = ids
+            start = bisect_right(candidates, after) if after is not None else 0
+            
+            result = []
+            for position in range(start, len(candidates)):
+                server_id = candidates[position]
+                keys = self._keys[server_id]
+                if all(value in keys[field] for field, value in filters.items()):
+                    result.append(server_id)
+                    if limit is not None and len(result) >= limit:
+                        break
+            return result
+    
+    def _add_index(self, server_id: str, record: Dict[str, Any]) -> None:
+        keys = _index_keys(record)
+        self._keys[server_id] = keys
+        for field, values in keys.items():
+            index = self._index[field]
+            for value in values:
+                insort(index.setdefault(value, []), server_id)
+    
+    def _unindex(self, server_id: str) -> None:
+        keys = self._keys.pop(server_id, None)
+        if keys is None:
+            return
+        for field, values in keys.items():
+            index = self._index[field]
+            for value in values:
+                ids = index[value]
+                _remove_sorted(ids, server_id)
+                if not ids:
+                    del index[value]
+
+
+def _remove_sorted(ids: List[str], server_id: str) -> None:
+    position = bisect_left(ids, server_id)
+    if position < len(ids) and ids[position] == server_id:
+        del ids[position]
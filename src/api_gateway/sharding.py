@@ -0,0 +1,717 @@
+"""Multi-process gateway: catalog servers partitioned across worker processes."""
+
+import hashlib
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .gateway import CAPTURE_NAME, STATE_JOURNAL_NAME, APIGateway
+from .lifecycle import PeriodicTask
+from .registry_cache import default_cache_dir
+from .utils import parse_duration
+
+# Importable once .gateway has put mcp-local-setup on the path
+from contracts.api_gateway_contract import APIGatewayContract
+
+
+# Points each worker gets on the hash ring
+DEFAULT_VNODES = 64
+DEFAULT_MONITOR_INTERVAL = 1.0
+DEFAULT_WORKER_START_TIMEOUT = 30.0
+# Seconds a closing worker gets to exit before it is terminated
+_WORKER_EXIT_TIMEOUT = 5.0
+# Servers a worker scans per batch when listing only the ones it owns
+_LIST_BATCH = 256
+
+# Gateway methods a worker answers for a server it owns
+_FORWARDED = ('start_server', 'stop_server', 'send_request', 'get_server_info',
+              'add_replica', 'remove_replica', 'reload_catalog')
+
+# JSON-RPC error returned when the worker owning a server cannot be reached
+WORKER_UNAVAILABLE = -32603
+
+
+class WorkerUnavailableError(Exception):
+    """Raised when a gateway worker process cannot be reached."""
+
+
+class WorkerError(Exception):
+    """Raised when a call failed inside a gateway worker process."""
+
+
+def _hash(key: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring mapping keys (server IDs) to nodes (workers).
+    
+    Each node owns ``vnodes`` points on the ring, so keys spread evenly and
+    adding or removing a node only moves the keys that node gains or loses,
+    about 1/N of them. Lookups read an immutable snapshot of the ring and
+    need no lock.
+    """
+    
+    def __init__(self, nodes: Iterable[Any] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self._nodes: Set[Any] = set()
+        self._ring: Tuple[List[int], List[Any]] = ([], [])
+        for node in nodes:
+            self.add(node)
+    
+    @property
+    def nodes(self) -> List[Any]:
+        """Nodes on the ring, sorted."""
+        return sorted(self._nodes)
+    
+    def add(self, node: Any) -> None:
+        """Place a node on the ring."""
+        if node in self._nodes:
+            return
+        points, owners = list(self._ring[0]), list(self._ring[1])
+        for replica in range(self.vnodes):
+            point = _hash(f"{node}#{replica}")
+            position = bisect_left(points, point)
+            points.insert(position, point)
+            owners.insert(position, node)
+        self._nodes.add(node)
+        self._ring = (points, owners)
+    
+    def remove(self, node: Any) -> None:
+        """Take a node off the ring."""
+        if node not in self._nodes:
+            return
+        kept = [(point, owner) for point, owner in zip(*self._ring) if owner != node]
+        self._nodes.discard(node)
+        self._ring = ([point for point, _ in kept], [owner for _, owner in kept])
+    
+    def owner(self, key: str) -> Any:
+        """Node owning a key.
+        
+        Raises:
+            LookupError: If the ring has no nodes
+        """
+        points, owners = self._ring
+        if not points:
+            raise LookupError("Hash ring has no nodes")
+        return owners[bisect_right(points, _hash(key)) % len(points)]
+    
+    def copy(self) -> 'HashRing':
+        """Independent ring with the same nodes."""
+        ring = HashRing(vnodes=self.vnodes)
+        ring._nodes = set(self._nodes)
+        ring._ring = self._ring
+        return ring
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    def __contains__(self, node: Any) -> bool:
+        return node in self._nodes
+
+
+class _WorkerServer:
+    """Gateway worker answering its supervisor over a local socket."""
+    
+    def __init__(self, worker_id: int, gateway: APIGateway, nodes: Iterable[int], vnodes: int):
+        self.worker_id = worker_id
+        self.gateway = gateway
+        self.ring = HashRing(nodes, vnodes)
+        self._stopping = threading.Event()
+    
+    def owns(self, server_id: str) -> bool:
+        return self.ring.owner(server_id) == self.worker_id
+    
+    def serve(self, listener: Listener) -> None:
+        """Answer calls until the supervisor closes the worker."""
+        threading.Thread(target=self._accept, args=(listener,), name='mcp-worker-accept',
+                         daemon=True).start()
+        self._stopping.wait()
+    
+    def _accept(self, listener: Listener) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn = listener.accept()
+            except Exception:
+                # Failed handshakes and the like; keep serving
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+    
+    def _handle(self, conn: Any) -> None:
+        with conn:
+            while True:
+                try:
+                    op, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ('ok', self.dispatch(op, args, kwargs))
+                except Exception as e:
+                    reply = ('error', f"{type(e).__name__}: {e}")
+                try:
+                    conn.send(reply)
+                except (OSError, ValueError):
+                    return
+                if op == 'close':
+                    self._stopping.set()
+                    return
+    
+    def dispatch(self, op: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        if op in _FORWARDED:
+            return getattr(self.gateway, op)(*args, **kwargs)
+        handler = getattr(self, f"rpc_{op}", None)
+        if handler is None:
+            raise ValueError(f"Unknown worker call {op!r}")
+        return handler(*args, **kwargs)
+    
+    def rpc_ping(self) -> Dict[str, Any]:
+        return {"worker": self.worker_id, "pid": os.getpid()}
+    
+    def rpc_set_ring(self, nodes: List[int]) -> None:
+        self.ring = HashRing(nodes, self.ring.vnodes)
+    
+    def rpc_list_servers(self, cursor: Optional[str] = None, limit: Optional[int] = None,
+                         **filters: Any) -> List[Dict[str, Any]]:
+        """Owned servers matching the filters, in ID order."""
+        result: List[Dict[str, Any]] = []
+        while limit is None or len(result) < limit:
+            page = self.gateway.list_servers(cursor=cursor, limit=_LIST_BATCH, **filters)
+            result.extend(server for server in page if self.owns(server['id']))
+            if len(page) < _LIST_BATCH:
+                break
+            cursor = page[-1]['id']
+        return result[:limit] if limit is not None else result
+    
+    def rpc_get_metrics(self) -> Dict[str, Any]:
+        """Gateway metrics restricted to the servers this worker owns."""
+        metrics = self.gateway.get_metrics()
+        servers = self.gateway.servers
+        owned = [server_id for server_id in list(servers) if self.owns(server_id)]
+        metrics["servers_owned"] = len(owned)
+        metrics["servers_by_status"] = dict(Counter(
+            servers[server_id]['status'] for server_id in owned if server_id in servers
+        ))
+        for section in ('servers', 'admission', 'hedging'):
+            metrics[section] = {server_id: stats for server_id, stats in metrics[section].items()
+                                if self.owns(server_id)}
+        return metrics
+    
+    def rpc_close(self) -> None:
+        self.gateway.close()
+
+
+def _worker_main(worker_id: int, nodes: List[int], vnodes: int, options: Dict[str, Any],
+                 factories: Tuple[Optional[Callable[[], Any]], Optional[Callable[[], Any]]],
+                 authkey: bytes, ready: Any) -> None:
+    """Entry point of a worker process."""
+    try:
+        transport_factory, process_manager_factory = factories
+        gateway = APIGateway(
+            transport_factory() if transport_factory is not None else None,
+            process_manager_factory() if process_manager_factory is not None else None,
+            options=options
+        )
+        listener = Listener(authkey=authkey)
+    except Exception as e:
+        ready.send(('error', f"{type(e).__name__}: {e}"))
+        return
+    ready.send(('ok', listener.address))
+    ready.close()
+    
+    try:
+        _WorkerServer(worker_id, gateway, nodes, vnodes).serve(listener)
+    finally:
+        listener.close()
+
+
+class _WorkerHandle:
+    """Supervisor's view of one worker: its process and pooled connections."""
+    
+    def __init__(self, worker_id: int, process: Any, address: Any, authkey: bytes):
+        self.worker_id = worker_id
+        self.process = process
+        self.address = address
+        self.authkey = authkey
+        self._idle: 'queue.LifoQueue[Any]' = queue.LifoQueue()
+    
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+    
+    def call(self, op: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a call in the worker over a pooled connection.
+        
+        Raises:
+            WorkerUnavailableError: If the worker cannot be reached
+            WorkerError: If the call raised inside the worker
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = Client(self.address, authkey=self.authkey)
+            except OSError as e:
+                raise WorkerUnavailableError(f"Gateway worker {self.worker_id} is unavailable") from e
+        
+        try:
+            conn.send((op, args, kwargs))
+            status, value = conn.recv()
+        except (EOFError, OSError) as e:
+            conn.close()
+            raise WorkerUnavailableError(f"Gateway worker {self.worker_id} is unavailable") from e
+        
+        self._idle.put(conn)
+        if status != 'ok':
+            raise WorkerError(value)
+        return value
+    
+    def close_connections(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+            except OSError:
+                pass
+
+
+class ShardedGateway(APIGatewayContract):
+    """Gateway running as several worker processes behind one router.
+    
+    Every worker is a full ``APIGateway`` in its own process (and GIL).
+    Servers are partitioned across the workers by consistent hashing of
+    their IDs, and this router forwards each call to the owning worker over
+    a local socket. When a worker dies it is replaced at the same ring
+    position and the servers it was running are started again; adding or
+    removing workers moves only the servers whose owner changed.
+    """
+    
+    def __init__(self, workers: Optional[int] = None,
+                 options: Optional[Dict[str, Any]] = None,
+                 transport_factory: Optional[Callable[[], Any]] = None,
+                 process_manager_factory: Optional[Callable[[], Any]] = None):
+        """Start the worker processes.
+        
+        Args:
+            workers: Number of worker processes (default: one per CPU)
+            options: ``APIGateway`` options for every worker, plus:
+                - shard_vnodes: Hash ring points per worker
+                - worker_start_timeout: Longest wait for a worker to start
+                - worker_monitor_interval: Seconds between liveness checks
+                - respawn_workers: Replace workers that exit (default True)
+                - start_method: multiprocessing start method (default spawn)
+            transport_factory: Picklable callable creating a worker's
+                transport (default: the gateway's default)
+            process_manager_factory: Picklable callable creating a worker's
+                process manager (default: the gateway's default)
+        
+        Raises:
+            RuntimeError: If a worker fails to start
+        """
+        self.options = dict(options or {})
+        self.respawn = bool(self.options.get('respawn_workers', True))
+        self._context = multiprocessing.get_context(self.options.get('start_method', 'spawn'))
+        self._start_timeout = parse_duration(self.options.get('worker_start_timeout'),
+                                             DEFAULT_WORKER_START_TIMEOUT)
+        self._factories = (transport_factory, process_manager_factory)
+        self._authkey = os.urandom(32)
+        
+        self.ring = HashRing(vnodes=int(self.options.get('shard_vnodes', DEFAULT_VNODES)))
+        self._workers: Dict[int, _WorkerHandle] = {}
+        # Servers started through the router, restarted when their owner
+        # changes; guarded by _lock, which the worker monitor holds while
+        # it moves them
+        self._running: Set[str] = set()
+        self._lock = threading.RLock()
+        self._started_at = time.time()
+        self.moved = 0
+        self.respawned = 0
+        
+        count = workers or os.cpu_count() or 1
+        for worker_id in range(count):
+            self.ring.add(worker_id)
+        launched = [(worker_id, *self._launch(worker_id)) for worker_id in range(count)]
+        try:
+            for worker_id, process, ready in launched:
+                self._workers[worker_id] = self._await(worker_id, process, ready)
+        except Exception:
+            for _, process, _ in launched:
+                process.terminate()
+            raise
+        
+        self._monitor = PeriodicTask(
+            self.check_workers,
+            parse_duration(self.options.get('worker_monitor_interval'), DEFAULT_MONITOR_INTERVAL),
+            name='mcp-shard-monitor'
+        )
+        self._monitor.start()
+    
+    def _worker_options(self, worker_id: int) -> Dict[str, Any]:
+        options = dict(self.options)
+        journal = options.get('state_journal')
+        if journal:
+            # One journal per ring position, so a replacement finds its own
+            if journal is True:
+                journal = os.path.join(default_cache_dir(), STATE_JOURNAL_NAME)
+            root, ext = os.path.splitext(journal)
+            options['state_journal'] = f"{root}-{worker_id}{ext}"
+        capture = options.get('capture')
+        if capture:
+            # Workers append to files of their own
+            settings = dict(capture) if isinstance(capture, dict) else {}
+            if isinstance(capture, str):
+                settings['path'] = capture
+            path = settings.get('path') or os.path.join(default_cache_dir(), CAPTURE_NAME)
+            root, ext = os.path.splitext(path)
+            settings['path'] = f"{root}-{worker_id}{ext}"
+            options['capture'] = settings
+        return options
+    
+    def _launch(self, worker_id: int) -> Tuple[Any, Any]:
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main, name=f"mcp-gateway-worker-{worker_id}", daemon=True,
+            args=(worker_id, self.ring.nodes, self.ring.vnodes, self._worker_options(worker_id),
+                  self._factories, self._authkey, sender)
+        )
+        process.start()
+        sender.close()
+        return process, receiver
+    
+    def _await(self, worker_id: int, process: Any, ready: Any) -> _WorkerHandle:
+        try:
+            if not ready.poll(self._start_timeout):
+                process.terminate()
+                raise RuntimeError(
+                    f"Gateway worker {worker_id} did not start within {self._start_timeout:g}s"
+                )
+            status, value = ready.recv()
+        except EOFError:
+            status, value = 'error', f"exit code {process.exitcode}"
+        finally:
+            ready.close()
+        if status != 'ok':
+            process.join(_WORKER_EXIT_TIMEOUT)
+            raise RuntimeError(f"Gateway worker {worker_id} failed to start: {value}")
+        return _WorkerHandle(worker_id, process, value, self._authkey)
+    
+    def _spawn(self, worker_id: int) -> _WorkerHandle:
+        return self._await(worker_id, *self._launch(worker_id))
+    
+    def _owner(self, server_id: str) -> _WorkerHandle:
+        try:
+            return self._workers[self.ring.owner(server_id)]
+        except (LookupError, KeyError):
+            raise WorkerUnavailableError(f"No gateway worker owns {server_id}") from None
+    
+    def worker_for(self, server_id: str) -> int:
+        """ID of the worker that owns a server."""
+        return self.ring.owner(server_id)
+    
+    def start_server(self, server_id: str) -> Dict[str, Any]:
+        """Start a server on the worker that owns it."""
+        try:
+            result = self._owner(server_id).call('start_server', server_id)
+        except (WorkerUnavailableError, WorkerError) as e:
+            return {"success": False, "connectionId": None, "transport": "unknown",
+                    "message": f"Failed to start server {server_id}: {e}"}
+        if result.get('success'):
+            with self._lock:
+                self._running.add(server_id)
+        return result
+    
+    def stop_server(self, server_id: str) -> Dict[str, Any]:
+        """Stop a server on the worker that owns it."""
+        try:
+            result = self._owner(server_id).call('stop_server', server_id)
+        except (WorkerUnavailableError, WorkerError) as e:
+            return {"success": False, "message": f"Failed to stop server {server_id}: {e}"}
+        if result.get('success'):
+            with self._lock:
+                self._running.discard(server_id)
+        return result
+    
+    def send_request(self, server_id: str, request: Dict[str, Any],
+                     **kwargs: Any) -> Dict[str, Any]:
+        """Forward a request to the worker that owns its server.
+        
+        Accepts the same keyword arguments as ``APIGateway.send_request``.
+        Requests are not retried on another worker: one lost with its
+        worker may already have had effects.
+        """
+        try:
+            worker = self._owner(server_id)
+            return worker.call('send_request', server_id, request, **kwargs)
+        except (WorkerUnavailableError, WorkerError) as e:
+            data = {"worker": self.ring.owner(server_id)} if len(self.ring) else None
+            error = {"code": WORKER_UNAVAILABLE, "message": str(e)}
+            if data is not None:
+                error["data"] = data
+            return {"jsonrpc": "2.0", "id": request.get("id", 1), "error": error}
+    
+    def get_server_info(self, server_id: str) -> Dict[str, Any]:
+        """Get server information from the worker that owns it."""
+        try:
+            return self._owner(server_id).call('get_server_info', server_id)
+        except (WorkerUnavailableError, WorkerError):
+            return {
+                "id": server_id,
+                "name": server_id.replace('-', ' ').title(),
+                "transport": "unknown",
+                "status": "unavailable",
+                "connectionId": None,
+                "metrics": {}
+            }
+    
+    def add_replica(self, server_id: str) -> Dict[str, Any]:
+        """Start one more replica of a server on its worker."""
+        try:
+            return self._owner(server_id).call('add_replica', server_id)
+        except (WorkerUnavailableError, WorkerError) as e:
+            return {"success": False, "message": f"Failed to add replica: {e}"}
+    
+    def remove_replica(self, server_id: str) -> Dict[str, Any]:
+        """Remove a replica of a server on its worker."""
+        try:
+            return self._owner(server_id).call('remove_replica', server_id)
+        except (WorkerUnavailableError, WorkerError) as e:
+            return {"success": False, "message": f"Failed to remove replica: {e}"}
+    
+    def list_servers(self, filter_running: Optional[bool] = None,
+                     transport: Optional[str] = None,
+                     category: Optional[str] = None,
+                     tag: Optional[str] = None,
+                     cursor: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List registered servers across workers, in ID order.
+        
+        Takes the same filters and paging as ``APIGateway.list_servers``;
+        servers of an unreachable worker are left out.
+        """
+        pages = []
+        for worker in list(self._workers.values()):
+            try:
+                pages.append(worker.call('list_servers', filter_running=filter_running,
+                                         transport=transport, category=category, tag=tag,
+                                         cursor=cursor, limit=limit))
+            except (WorkerUnavailableError, WorkerError):
+                continue
+        merged = heapq.merge(*pages, key=lambda server: server['id'])
+        return list(itertools.islice(merged, limit))
+    
+    def reload_catalog(self) -> Dict[str, List[str]]:
+        """Reload the catalog in every worker.
+        
+        Workers that cannot be reached or fail to reload are skipped.
+        
+        Returns:
+            IDs of the added, changed and removed servers
+        """
+        diff: Dict[str, Set[str]] = {"added": set(), "changed": set(), "removed": set()}
+        for worker in list(self._workers.values()):
+            try:
+                result = worker.call('reload_catalog')
+            except (WorkerUnavailableError, WorkerError):
+                continue
+            for key, server_ids in result.items():
+                diff[key].update(server_ids)
+        with self._lock:
+            self._running.difference_update(diff["removed"])
+        return {key: sorted(server_ids) for key, server_ids in diff.items()}
+    
+    def add_worker(self) -> int:
+        """Start another worker and move the servers it now owns to it.
+        
+        Returns:
+            ID of the new worker
+        """
+        with self._lock:
+            worker_id = next(n for n in itertools.count() if n not in self._workers)
+            before = self.ring.copy()
+            self.ring.add(worker_id)
+            try:
+                self._workers[worker_id] = self._spawn(worker_id)
+            except Exception:
+                self.ring.remove(worker_id)
+                raise
+            self._publish_ring()
+            self._rebalance(before)
+            return worker_id
+    
+    def remove_worker(self, worker_id: int) -> None:
+        """Move a worker's servers to the others and stop it."""
+        with self._lock:
+            if worker_id not in self._workers:
+                raise KeyError(f"No gateway worker {worker_id}")
+            before = self.ring.copy()
+            self.ring.remove(worker_id)
+            self._publish_ring()
+            self._rebalance(before)
+            self._stop_worker(self._workers.pop(worker_id))
+    
+    def check_workers(self) -> List[int]:
+        """Replace workers whose process has exited.
+        
+        A replacement takes the same ring position and restarts the servers
+        that were running there. Without ``respawn_workers`` (or if the
+        replacement fails to start), the dead worker's servers move to the
+        remaining workers.
+        
+        Returns:
+            IDs of the workers found dead
+        """
+        with self._lock:
+            dead = [worker_id for worker_id, worker in self._workers.items() if not worker.alive]
+            for worker_id in dead:
+                self._workers.pop(worker_id).close_connections()
+                if self.respawn:
+                    try:
+                        self._workers[worker_id] = self._spawn(worker_id)
+                    except Exception:
+                        pass
+                    else:
+                        self.respawned += 1
+                        self._restart_owned(worker_id)
+                        continue
+                before = self.ring.copy()
+                self.ring.remove(worker_id)
+                self._publish_ring()
+                self._rebalance(before)
+            return dead
+    
+    def _publish_ring(self) -> None:
+        for worker in list(self._workers.values()):
+            try:
+                worker.call('set_ring', self.ring.nodes)
+            except (WorkerUnavailableError, WorkerError):
+                pass
+    
+    def _restart_owned(self, worker_id: int) -> None:
+        worker = self._workers[worker_id]
+        for server_id in sorted(self._running):
+            if self.ring.owner(server_id) == worker_id:
+                self._start_on(worker, server_id)
+    
+    def _rebalance(self, before: HashRing) -> None:
+        """Move running servers whose owner changed to their new worker.
+        
+        Like ``_restart_owned`` and ``_start_on``, called with ``_lock`` held.
+        """
+        for server_id in sorted(self._running):
+            new_owner = self.ring.owner(server_id) if len(self.ring) else None
+            old_owner = before.owner(server_id) if len(before) else None
+            if new_owner == old_owner:
+                continue
+            old = self._workers.get(old_owner)
+            if old is not None:
+                try:
+                    old.call('stop_server', server_id)
+                except (WorkerUnavailableError, WorkerError):
+                    pass
+            if new_owner is None:
+                self._running.discard(server_id)
+                continue
+            self._start_on(self._workers[new_owner], server_id)
+            self.moved += 1
+    
+    def _start_on(self, worker: _WorkerHandle, server_id: str) -> None:
+        try:
+            started = worker.call('start_server', server_id).get('success')
+        except (WorkerUnavailableError, WorkerError):
+            started = False
+        if not started:
+            self._running.discard(server_id)
+    
+    def _stop_worker(self, worker: _WorkerHandle) -> None:
+        try:
+            worker.call('close')
+        except (WorkerUnavailableError, WorkerError):
+            pass
+        worker.close_connections()
+        worker.process.join(_WORKER_EXIT_TIMEOUT)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(_WORKER_EXIT_TIMEOUT)
+    
+    def close(self) -> None:
+        """Close every worker's gateway and stop the worker processes."""
+        self._monitor.stop()
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), {}
+        for worker in workers:
+            self._stop_worker(worker)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Gateway metrics summed across workers.
+        
+        Per-server sections are merged (each server is reported by its
+        owner); settings-like sections (tracing, warm pool, state journal,
+        transport bridge) are listed per worker under ``workers``.
+        """
+        per_worker: Dict[int, Optional[Dict[str, Any]]] = {}
+        for worker_id, worker in sorted(self._workers.items()):
+            try:
+                per_worker[worker_id] = worker.call('get_metrics')
+            except (WorkerUnavailableError, WorkerError):
+                per_worker[worker_id] = None
+        
+        totals: Dict[str, Any] = {
+            "requests_total": 0,
+            "requests_per_transport": {},
+            "active_connections": 0,
+            "servers_by_status": {},
+            "uptime": int(time.time() - self._started_at),
+            "servers": {},
+            "admission": {},
+            "hedging": {},
+            "coalescing": {"upstream_calls": 0, "coalesced": 0},
+            "rate_limits": {}
+        }
+        workers = {}
+        for worker_id, metrics in per_worker.items():
+            worker = self._workers[worker_id]
+            workers[worker_id] = {"pid": worker.process.pid, "alive": metrics is not None}
+            if metrics is None:
+                continue
+            totals["requests_total"] += metrics["requests_total"]
+            totals["active_connections"] += metrics["active_connections"]
+            for section in ("requests_per_transport", "servers_by_status", "rate_limits"):
+                _add_counts(totals[section], metrics[section])
+            for section in ("servers", "admission", "hedging"):
+                totals[section].update(metrics[section])
+            for key in ("upstream_calls", "coalesced"):
+                totals["coalescing"][key] += metrics["coalescing"][key]
+            totals["coalescing"]["methods"] = metrics["coalescing"]["methods"]
+            workers[worker_id].update({
+                "servers": metrics["servers_owned"],
+                "requests_total": metrics["requests_total"],
+                "transport_ipc": metrics["transport_ipc"],
+                "tracing": metrics["tracing"],
+                "warm_pool": metrics["warm_pool"],
+                "state_journal": metrics["state_journal"],
+                "capture": metrics["capture"],
+                "profiling": metrics["profiling"]
+            })
+        
+        coalescing = totals["coalescing"]
+        calls = coalescing["upstream_calls"] + coalescing["coalesced"]
+        coalescing["hit_rate"] = coalescing["coalesced"] / calls if calls else 0.0
+        totals["workers"] = workers
+        totals["sharding"] = {"workers": len(self._workers), "moved": self.moved,
+                              "respawned": self.respawned}
+        return totals
+
+
+def _add_counts(total: Dict[str, Any], counts: Dict[str, Any]) -> None:
+    for key, value in counts.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
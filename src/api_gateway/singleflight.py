@@ -0,0 +1,77 @@
+"""Single-flight execution: concurrent callers with the same key share one call."""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """In-flight call shared by a leader and its followers."""
+    
+    __slots__ = ('done', 'result', 'error', 'followers')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into a single execution.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for it and receive the same result, or
+    the same exception. Once the call completes the key is forgotten, so
+    results are never cached beyond the lifetime of the call.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+    
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Run ``fn`` once for all concurrent callers using ``key``.
+        
+        Args:
+            key: Identity of the call
+            fn: Zero-argument callable executed by the leader
+            timeout: Seconds a follower waits for the leader before giving up
+        
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        
+        Raises:
+            TimeoutError: If a follower waited longer than ``timeout``
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.followers += 1
+                leader = False
+        
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        
+        return call.result, False
+    
+    def in_flight(self) -> int:
+        """Number of keys with a call currently running."""
+        return len(self._calls)
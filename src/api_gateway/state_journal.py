@@ -0,0 +1,260 @@
+"""Write-behind journal of running servers, for re-attaching after a restart."""
+
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import threading
+from typing import Any, Dict, Optional
+
+from .lifecycle import PeriodicTask
+
+
+# Bump when the recorded state layout changes; older journals are ignored
+JOURNAL_VERSION = 1
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Superseded records the file may hold before it is rewritten
+DEFAULT_COMPACT_AFTER = 1000
+
+
+class StateJournal:
+    """Server state by ID, appended to a JSON-lines file in the background.
+    
+    ``record`` only updates memory; a background thread appends the changed
+    entries every ``flush_interval``, so starting or stopping a server never
+    waits for the disk. Several changes to one server between flushes are
+    written as one record. The file starts with a version header followed
+    by ``{"id": ..., "state": ...}`` lines, a null state removing the
+    server; once it holds ``compact_after`` superseded records it is
+    rewritten with one line per server. A line torn by a crash is skipped
+    when loading.
+    
+    Records are not fsynced: they describe processes that do not survive
+    the machine anyway, and a crash of the gateway process alone leaves
+    written data in the page cache.
+    """
+    
+    def __init__(self, path: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 compact_after: int = DEFAULT_COMPACT_AFTER):
+        """Initialize the journal.
+        
+        Args:
+            path: Journal file
+            flush_interval: Seconds between background flushes
+            compact_after: Superseded records kept before rewriting the file
+        """
+        self.path = os.path.abspath(path)
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        # Serializes file writes, which happen outside ``_lock``
+        self._write_lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._records = 0
+        self._rewrite_needed = True
+        self._flusher = PeriodicTask(self.flush, flush_interval, name='mcp-state-journal')
+        
+        self.flushes = 0
+        self.compactions = 0
+        self.write_errors = 0
+    
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the journal file and adopt it as the current state.
+        
+        Returns:
+            State by server ID (empty if the file is missing or was written
+            by another journal version)
+        """
+        state: Dict[str, Dict[str, Any]] = {}
+        records = 0
+        clean = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                header = _parse(f.readline())
+                if isinstance(header, dict) and header.get('version') == JOURNAL_VERSION:
+                    clean = True
+                    for line in f:
+                        entry = _parse(line)
+                        if not isinstance(entry, dict) or 'id' not in entry:
+                            clean = False
+                            continue
+                        records += 1
+                        if entry.get('state') is None:
+                            state.pop(entry['id'], None)
+                        else:
+                            state[entry['id']] = entry['state']
+        except FileNotFoundError:
+            pass
+        
+        with self._lock:
+            self._state = dict(state)
+            self._pending.clear()
+            self._records = records
+            # Never append after a torn line or to a foreign file
+            self._rewrite_needed = not clean
+        return state
+    
+    def record(self, server_id: str, state: Optional[Dict[str, Any]]) -> None:
+        """Set a server's state (None to forget the server)."""
+        with self._lock:
+            if state is None:
+                if server_id not in self._state and server_id not in self._pending:
+                    return
+                self._state.pop(server_id, None)
+            else:
+                self._state[server_id] = state
+            self._pending[server_id] = state
+    
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Current state by server ID, including changes not yet written."""
+        with self._lock:
+            return dict(self._state)
+    
+    def flush(self) -> int:
+        """Write pending changes, rewriting the file when it is due.
+        
+        Returns:
+            Number of records written
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._pending and not self._rewrite_needed:
+                    return 0
+                pending, self._pending = self._pending, {}
+                state = dict(self._state)
+                rewrite = (self._rewrite_needed or
+                           self._records + len(pending) - len(state) > self.compact_after)
+            
+            try:
+                if rewrite:
+                    self._rewrite(state)
+                else:
+                    self._append(pending)
+            except OSError:
+                with self._lock:
+                    # Keep the changes for the next flush unless superseded
+                    for server_id, entry in pending.items():
+                        self._pending.setdefault(server_id, entry)
+                    self.write_errors += 1
+                return 0
+            
+            with self._lock:
+                if rewrite:
+                    self._records = len(state)
+                    self._rewrite_needed = False
+                    self.compactions += 1
+                else:
+                    self._records += len(pending)
+                self.flushes += 1
+            return len(state) if rewrite else len(pending)
+    
+    def _append(self, pending: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        lines = ''.join(_line(server_id, entry) for server_id, entry in pending.items())
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+    
+    def _rewrite(self, state: Dict[str, Dict[str, Any]]) -> None:
+        # Written beside the journal and renamed, so a crash keeps the old one
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'version': JOURNAL_VERSION}) + '\n')
+                f.write(''.join(_line(server_id, entry) for server_id, entry in state.items()))
+            os.replace(temp_path, self.path)
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def start(self) -> None:
+        """Start flushing in a background thread."""
+        self._flusher.start()
+    
+    def close(self) -> None:
+        """Stop the background thread and write what is pending."""
+        self._flusher.stop()
+        self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Journal counters for metrics."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "servers": len(self._state),
+                "pending": len(self._pending),
+                "records": self._records,
+                "flushes": self.flushes,
+                "compactions": self.compactions,
+                "write_errors": self.write_errors
+            }
+
+
+def _line(server_id: str, state: Optional[Dict[str, Any]]) -> str:
+    return json.dumps({'id': server_id, 'state': state}, separators=(',', ':')) + '\n'
+
+
+def _parse(line: str) -> Any:
+    if not line.endswith('\n'):
+        # Torn by a crash in the middle of a write
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def config_digest(config: Dict[str, Any]) -> str:
+    """Fingerprint of a catalog entry, to tell whether saved replicas match it."""
+    encoded = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def process_command_line(pid: Optional[int]) -> Optional[str]:
+    """Space-joined command line of a running process.
+    
+    Read from /proc where there is one, and from ``ps`` on other POSIX
+    systems.
+    
+    Returns:
+        Command line, or None if the process is not running (or exited and
+        was not reaped yet) or it cannot be read on this platform
+    """
+    if not isinstance(pid, int) or pid <= 0:
+        return None
+    if os.path.isdir('/proc/self'):
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                raw = f.read()
+        except OSError:
+            return None
+        return raw.rstrip(b'\0').replace(b'\0', b' ').decode(errors='replace') or None
+    if os.name != 'posix':
+        return None
+    try:
+        result = subprocess.run(['ps', '-o', 'args=', '-p', str(pid)],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def stop_saved_process(pid: Optional[int], command_line: Optional[str]) -> bool:
+    """Terminate a process a previous gateway left running.
+    
+    The process is only signalled while it still runs ``command_line``, so
+    a PID reused by an unrelated process since is left alone.
+    
+    Returns:
+        Whether the process was signalled
+    """
+    if not command_line or process_command_line(pid) != command_line:
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,325 @@
+"""In-process request tracing with head sampling and a ring buffer of spans."""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .utils import parse_duration
+
+
+DEFAULT_SAMPLE_RATE = 0.01
+# Traces at least this slow are kept whatever the sampling decision
+DEFAULT_SLOW_THRESHOLD = 1.0
+DEFAULT_BUFFER_SIZE = 10000
+SERVICE_NAME = 'mcp-gateway'
+
+# W3C Trace Context header: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_SAMPLED_FLAG = 0x01
+
+_active = threading.local()
+
+
+def _new_id(bits: int) -> str:
+    return format(random.getrandbits(bits) or 1, f'0{bits // 4}x')
+
+
+class Span:
+    """One timed step of a request."""
+    
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns',
+                 'attributes', 'error')
+    
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str,
+                 attributes: Optional[Dict[str, Any]] = None,
+                 start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error = False
+    
+    def end(self, error: bool = False, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self.error = self.error or error
+    
+    @property
+    def duration(self) -> float:
+        """Seconds the span took (up to now if it is still open)."""
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class Trace:
+    """The spans of one request while it is in flight.
+    
+    Spans are always recorded; whether they are kept is decided when the
+    trace finishes, so slow and failed requests can be kept even when the
+    head sampling decision was to drop them.
+    """
+    
+    __slots__ = ('trace_id', 'sampled', 'root', 'spans')
+    
+    def __init__(self, name: str, trace_id: Optional[str] = None,
+                 parent_id: Optional[str] = None, sampled: bool = False,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id or _new_id(128)
+        self.sampled = sampled
+        self.root = Span(self.trace_id, parent_id, name, attributes)
+        self.spans: List[Span] = [self.root]
+    
+    def start_span(self, name: str, parent: Optional[Span] = None,
+                   attributes: Optional[Dict[str, Any]] = None,
+                   start_ns: Optional[int] = None) -> Span:
+        """Open a child span (of ``parent``, default the root)."""
+        span = Span(self.trace_id, (parent or self.root).span_id, name, attributes, start_ns)
+        # list.append is atomic: hedged attempts add spans from their own threads
+        self.spans.append(span)
+        return span
+    
+    def traceparent(self, span: Optional[Span] = None) -> str:
+        """W3C ``traceparent`` value naming ``span`` as the parent."""
+        flags = _SAMPLED_FLAG if self.sampled else 0
+        return f"00-{self.trace_id}-{(span or self.root).span_id}-{flags:02x}"
+
+
+def parse_traceparent(value: Any) -> Optional[Dict[str, Any]]:
+    """Trace ID, parent span ID and sampled flag of a ``traceparent`` value."""
+    match = _TRACEPARENT.match(value.strip().lower()) if isinstance(value, str) else None
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return {
+        "trace_id": trace_id,
+        "parent_id": parent_id,
+        "sampled": bool(int(flags, 16) & _SAMPLED_FLAG)
+    }
+
+
+def with_traceparent(message: Dict[str, Any], traceparent: str) -> Dict[str, Any]:
+    """Copy of a JSON-RPC message carrying ``params._meta.traceparent``."""
+    params = message.get('params')
+    if params is not None and not isinstance(params, dict):
+        # Positional params have nowhere to carry _meta
+        return message
+    params = dict(params or {})
+    meta = params.get('_meta')
+    params['_meta'] = dict(meta if isinstance(meta, dict) else {}, traceparent=traceparent)
+    return dict(message, params=params)
+
+
+def activate(trace: Optional[Trace], span: Optional[Span] = None) -> None:
+    """Make a trace (and span) current for this thread, or clear it."""
+    _active.trace = trace
+    _active.span = span
+
+
+def current() -> Any:
+    """The thread's current (trace, span), either of which may be None."""
+    return getattr(_active, 'trace', None), getattr(_active, 'span', None)
+
+
+@contextmanager
+def span(trace: Optional[Trace], name: str,
+         attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span; no-op without a trace."""
+    if trace is None:
+        yield None
+        return
+    
+    previous_trace, parent = current()
+    child = trace.start_span(name, parent if previous_trace is trace else None, attributes)
+    activate(trace, child)
+    try:
+        yield child
+    except BaseException:
+        child.end(error=True)
+        raise
+    else:
+        child.end()
+    finally:
+        activate(previous_trace, parent)
+
+
+class Tracer:
+    """Head-sampled request tracing into a fixed-size span ring buffer.
+    
+    A share ``sample_rate`` of requests is picked for tracing when they
+    arrive (or as decided by an incoming ``traceparent``); requests that
+    end in an error or take at least ``slow_threshold`` are kept too.
+    Kept spans go into a preallocated ring: writers claim slots from an
+    atomic counter and overwrite the oldest spans, so recording takes no
+    lock and memory stays fixed.
+    """
+    
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE,
+                 slow_threshold: Optional[float] = DEFAULT_SLOW_THRESHOLD,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """Initialize the tracer.
+        
+        Args:
+            sample_rate: Share of requests traced (0.0 to 1.0)
+            slow_threshold: Seconds after which a request is always kept
+                (None to keep only sampled and failed requests)
+            buffer_size: Spans kept before the oldest are overwritten
+        """
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.buffer_size = buffer_size
+        
+        self._ring: List[Optional[Span]] = [None] * buffer_size
+        self._cursor = itertools.count()
+        self.traces_started = 0
+        self.traces_kept = 0
+    
+    @classmethod
+    def from_config(cls, config: Any) -> Optional['Tracer']:
+        """Build a tracer from the ``tracing`` gateway option.
+        
+        Args:
+            config: True for defaults, or a dict with sampleRate,
+                slowThreshold (duration) and bufferSize
+        
+        Returns:
+            Tracer, or None if tracing is off
+        """
+        if not config:
+            return None
+        settings = config if isinstance(config, dict) else {}
+        if not settings.get('enabled', True):
+            return None
+        
+        slow_threshold = settings.get('slowThreshold', DEFAULT_SLOW_THRESHOLD)
+        return cls(
+            sample_rate=float(settings.get('sampleRate', DEFAULT_SAMPLE_RATE)),
+            slow_threshold=parse_duration(slow_threshold) if slow_threshold is not None else None,
+            buffer_size=int(settings.get('bufferSize', DEFAULT_BUFFER_SIZE))
+        )
+    
+    def start(self, name: str, traceparent: Optional[str] = None,
+              attributes: Optional[Dict[str, Any]] = None) -> Trace:
+        """Begin a trace, continuing the caller's if it sent a ``traceparent``."""
+        self.traces_started += 1
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            return Trace(name, parent['trace_id'], parent['parent_id'],
+                         parent['sampled'] or random.random() < self.sample_rate,
+                         attributes)
+        return Trace(name, sampled=random.random() < self.sample_rate, attributes=attributes)
+    
+    def finish(self, trace: Trace, error: bool = False) -> bool:
+        """End a trace's root span and keep its spans if they qualify.
+        
+        Returns:
+            Whether the trace was kept
+        """
+        trace.root.end(error)
+        keep = (
+            trace.sampled or trace.root.error or
+            (self.slow_threshold is not None and trace.root.duration >= self.slow_threshold)
+        )
+        if not keep:
+            return False
+        
+        self.traces_kept += 1
+        for recorded in trace.spans:
+            if recorded.end_ns is None:
+                # Losing hedge attempts may still be running
+                recorded.end()
+            self._ring[next(self._cursor) % self.buffer_size] = recorded
+        return True
+    
+    def spans(self) -> List[Span]:
+        """Buffered spans, oldest first."""
+        # The list copy is atomic, so writers never wait on a reader
+        return sorted((s for s in self._ring[:] if s is not None), key=lambda s: s.start_ns)
+    
+    def export_json(self, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Buffered spans as plain dicts, optionally written to a JSON file."""
+        spans = [recorded.to_dict() for recorded in self.spans()]
+        if path:
+            with open(path, 'w') as f:
+                json.dump(spans, f, indent=2)
+        return spans
+    
+    def export_otlp(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Buffered spans in OTLP/JSON form, optionally written to a file.
+        
+        The file can be sent as-is to an OpenTelemetry collector's
+        ``/v1/traces`` endpoint or loaded by tools that read OTLP files.
+        """
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [_otlp_span(recorded) for recorded in self.spans()]
+                }]
+            }]
+        }
+        if path:
+            with open(path, 'w') as f:
+                json.dump(payload, f)
+        return payload
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Tracing counters for metrics."""
+        return {
+            "sample_rate": self.sample_rate,
+            "traces_started": self.traces_started,
+            "traces_kept": self.traces_kept,
+            "buffered_spans": sum(1 for s in self._ring[:] if s is not None)
+        }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            encoded.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            encoded.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            encoded.append({"key": key, "value": {"stringValue": str(value)}})
+    return encoded
+
+
+def _otlp_span(recorded: Span) -> Dict[str, Any]:
+    return {
+        "traceId": recorded.trace_id,
+        "spanId": recorded.span_id,
+        "parentSpanId": recorded.parent_id or "",
+        "name": recorded.name,
+        # SPAN_KIND_SERVER for the request, INTERNAL for its steps
+        "kind": 2 if recorded.name == 'gateway.request' else 1,
+        "startTimeUnixNano": str(recorded.start_ns),
+        "endTimeUnixNano": str(recorded.end_ns),
+        "attributes": _otlp_attributes(recorded.attributes),
+        # STATUS_CODE_ERROR / STATUS_CODE_UNSET
+        "status": {"code": 2 if recorded.error else 0}
+    }
@@ -0,0 +1,80 @@
+"""Transport detection for catalog entries without an explicit transport."""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Pattern, Tuple
+
+
+TRANSPORTS = ('stdio', 'http', 'websocket', 'sse')
+DEFAULT_TRANSPORT = 'http'
+
+# Ordered (field, words, transport) rules, first match wins. Words match
+# whole name segments ("ws-server", "@scope/ws"), not substrings, so IDs
+# such as "news" or "aws-tools" are not mistaken for WebSocket servers.
+DETECTION_RULES = (
+    ('package', ('stdio', 'snap'), 'stdio'),
+    ('id', ('stdio', 'snap'), 'stdio'),
+    ('id', ('websocket', 'ws'), 'websocket'),
+    ('id', ('sse', 'stream'), 'sse'),
+)
+
+# Entries with the same detection inputs share one result
+_MEMO_SIZE = 4096
+
+
+def _compile_rules(rules) -> Tuple[Tuple[str, Pattern[str], str], ...]:
+    compiled = []
+    for field, words, transport in rules:
+        alternatives = '|'.join(re.escape(word) for word in words)
+        pattern = re.compile(rf'(?:^|[-_./@])(?:{alternatives})(?:$|[-_./@])')
+        compiled.append((field, pattern, transport))
+    return tuple(compiled)
+
+
+_RULES = _compile_rules(DETECTION_RULES)
+
+
+def detect_transport(entry: Dict[str, Any]) -> str:
+    """Transport of a catalog entry.
+    
+    An explicit ``transport.type`` is used as declared. Otherwise the
+    ``MCP_MODE`` environment variable decides, then the detection rules,
+    unless the entry's transport block sets ``autoDetect: false``, in which
+    case it gets the default transport without any guessing.
+    
+    Args:
+        entry: Catalog entry
+    
+    Returns:
+        Transport type string
+    """
+    spec = entry.get('transport')
+    declared, auto_detect = None, True
+    if isinstance(spec, dict):
+        declared = spec.get('type') if isinstance(spec.get('type'), str) else None
+        auto_detect = spec.get('autoDetect', True)
+    
+    env = entry.get('config', {}).get('environment', {})
+    source = entry.get('source', {})
+    package = source.get('package', '') if source.get('type') == 'npm' else ''
+    return _detect(entry.get('id', ''), package, env.get('MCP_MODE', ''),
+                   declared, bool(auto_detect))
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _detect(server_id: str, package: str, mcp_mode: str,
+            declared: Optional[str], auto_detect: bool) -> str:
+    if declared in TRANSPORTS:
+        return declared
+    
+    mcp_mode = mcp_mode.lower()
+    if mcp_mode in ('http', 'websocket', 'sse'):
+        return mcp_mode
+    if not auto_detect:
+        return DEFAULT_TRANSPORT
+    
+    fields = {'id': server_id.lower(), 'package': package.lower()}
+    for field, pattern, transport in _RULES:
+        if pattern.search(fields[field]):
+            return transport
+    return DEFAULT_TRANSPORT
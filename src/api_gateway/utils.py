@@ -0,0 +1,67 @@
+"""Shared helpers for the API Gateway."""
+
+import re
+from typing import Any, Dict, Optional
+
+_DURATION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)?\s*$')
+
+_PLACEHOLDER_PATTERN = re.compile(r'\$\{(\w+)\}')
+
+_DURATION_MULTIPLIERS = {
+    'ms': 0.001,
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60
+}
+
+
+def parse_duration(value: Any, default: Optional[float] = None) -> Optional[float]:
+    """Parse a catalog duration into seconds.
+    
+    Accepts the registry string format ("500ms", "30s", "10m", "1h") as
+    well as plain numbers, which are taken to be seconds.
+    
+    Args:
+        value: Duration string or number
+        default: Value returned when ``value`` is missing or malformed
+    
+    Returns:
+        Duration in seconds
+    """
+    if value is None or isinstance(value, bool):
+        return default
+    
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    match = _DURATION_PATTERN.match(str(value))
+    if not match:
+        return default
+    
+    amount, unit = match.groups()
+    return float(amount) * _DURATION_MULTIPLIERS[unit or 's']
+
+
+def expand_placeholders(value: Any, variables: Dict[str, Any]) -> Any:
+    """Substitute ``${name}`` placeholders in catalog strings.
+    
+    Lists and dicts are expanded recursively; unknown placeholders are
+    left as they are.
+    
+    Args:
+        value: Catalog value
+        variables: Placeholder values by name
+    
+    Returns:
+        Copy of ``value`` with the placeholders replaced
+    """
+    if isinstance(value, str):
+        return _PLACEHOLDER_PATTERN.sub(
+            lambda match: str(variables.get(match.group(1), match.group(0))), value
+        )
+    if isinstance(value, list):
+        return [expand_placeholders(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: expand_placeholders(item, variables) for key, item in value.items()}
+    return value
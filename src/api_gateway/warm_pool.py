@@ -0,0 +1,287 @@
+"""Warm standby pool of pre-spawned stdio server processes."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+DEFAULT_REFILL_INTERVAL = 5.0
+# Memory (MB) assumed for a process before one has been measured
+DEFAULT_PROCESS_MEMORY = 100.0
+# Seconds a server's refills pause after a failed spawn
+DEFAULT_RETRY_DELAY = 30.0
+
+
+class WarmPool:
+    """Keeps spare, already-started replicas ready to be claimed.
+    
+    Each server has a target number of idle units (connection plus
+    process). Claiming one takes it out of the pool at once and wakes the
+    background thread, which spawns replacements. Idle units count against
+    ``memory_limit``: a unit is only spawned if its expected memory (the
+    last measured size of a process of the same server, else the catalog
+    estimate) still fits, so the pool shrinks rather than crowding out the
+    servers in use.
+    """
+    
+    def __init__(self, spawn: Callable[[str], Tuple[str, Optional[str], Optional[float]]],
+                 stop: Callable[[str, str, Optional[str]], None],
+                 is_alive: Callable[[Optional[str]], bool],
+                 memory_limit: Optional[float] = None,
+                 interval: float = DEFAULT_REFILL_INTERVAL,
+                 retry_delay: float = DEFAULT_RETRY_DELAY):
+        """Initialize the pool.
+        
+        Args:
+            spawn: Starts a unit for a server ID and waits until it is
+                ready; returns (connection ID, process ID, memory in MB or
+                None if unknown)
+            stop: Stops an idle unit: (server ID, connection ID, process ID)
+            is_alive: Whether a unit's process is still running
+            memory_limit: MB that idle units may use in total (None for no
+                limit)
+            interval: Seconds between refill passes when nothing is claimed
+            retry_delay: Seconds to wait before spawning again for a server
+                whose last spawn failed
+        """
+        self.spawn = spawn
+        self.stop_unit = stop
+        self.is_alive = is_alive
+        self.memory_limit = memory_limit
+        self.interval = interval
+        self.retry_delay = retry_delay
+        
+        self._lock = threading.Lock()
+        self._idle: Dict[str, Deque[Tuple[str, Optional[str], float]]] = {}
+        self._targets: Dict[str, int] = {}
+        self._estimates: Dict[str, float] = {}
+        self._measured: Dict[str, float] = {}
+        self._spawning: Dict[str, int] = {}
+        self._reserved = 0.0
+        self._retry_at: Dict[str, float] = {}
+        
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.claims = 0
+        self.misses = 0
+        self.spawned = 0
+        self.spawn_failures = 0
+        self.skipped_for_memory = 0
+    
+    @property
+    def running(self) -> bool:
+        """Whether the refill thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start refilling in a background thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='mcp-warm-pool', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the refill thread (idle units are kept)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+    
+    def close(self) -> None:
+        """Stop the refill thread and every idle unit."""
+        self.stop()
+        with self._lock:
+            server_ids = list(self._idle)
+            self._targets.clear()
+        for server_id in server_ids:
+            self.discard(server_id)
+    
+    def set_target(self, server_id: str, size: int,
+                   memory_estimate: Optional[float] = None) -> None:
+        """Set how many idle units to keep for a server.
+        
+        Args:
+            server_id: Server identifier
+            size: Idle units to keep (0 stops pooling the server)
+            memory_estimate: MB one process is expected to use, until one
+                has been measured
+        """
+        with self._lock:
+            if memory_estimate is not None:
+                self._estimates[server_id] = float(memory_estimate)
+            if size > 0:
+                changed = self._targets.get(server_id) != size
+                self._targets[server_id] = size
+            else:
+                changed = self._targets.pop(server_id, None) is not None
+        if size <= 0:
+            self.discard(server_id)
+        elif changed:
+            self._wake.set()
+    
+    def target(self, server_id: str) -> int:
+        """Idle units kept for a server."""
+        return self._targets.get(server_id, 0)
+    
+    def claim(self, server_id: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Take an idle unit of a server, if one is ready.
+        
+        Returns:
+            (connection ID, process ID), or None if none is available
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(server_id)
+                if not idle:
+                    self.misses += 1
+                    return None
+                connection_id, process_id, _ = idle.popleft()
+            
+            # Refill in the background whether or not this unit survived
+            self._wake.set()
+            if self._alive(process_id):
+                self.claims += 1
+                return connection_id, process_id
+            self._stop_quietly(server_id, connection_id, process_id)
+    
+    def discard(self, server_id: str) -> int:
+        """Stop a server's idle units, e.g. after its catalog entry changed.
+        
+        Returns:
+            Number of units stopped
+        """
+        with self._lock:
+            idle = self._idle.pop(server_id, None) or ()
+            self._measured.pop(server_id, None)
+        for connection_id, process_id, _ in idle:
+            self._stop_quietly(server_id, connection_id, process_id)
+        return len(idle)
+    
+    def idle_count(self, server_id: str) -> int:
+        """Idle units ready for a server."""
+        return len(self._idle.get(server_id, ()))
+    
+    def memory_in_use(self) -> float:
+        """MB used (or reserved for spawns) by idle units."""
+        with self._lock:
+            return self._memory_in_use()
+    
+    def refill(self, now: Optional[float] = None) -> int:
+        """Spawn units for servers below their target, within the memory limit.
+        
+        Returns:
+            Number of units spawned
+        """
+        now = time.monotonic() if now is None else now
+        spawned = 0
+        for server_id in list(self._targets):
+            while True:
+                reservation = self._reserve(server_id, now)
+                if reservation is None:
+                    break
+                if not self._spawn_one(server_id, reservation, now):
+                    break
+                spawned += 1
+        return spawned
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters for metrics."""
+        with self._lock:
+            return {
+                "idle": {server_id: len(idle) for server_id, idle in self._idle.items() if idle},
+                "targets": dict(self._targets),
+                "memory_mb": round(self._memory_in_use(), 1),
+                "memory_limit_mb": self.memory_limit,
+                "claims": self.claims,
+                "misses": self.misses,
+                "spawned": self.spawned,
+                "spawn_failures": self.spawn_failures,
+                "skipped_for_memory": self.skipped_for_memory
+            }
+    
+    def _memory_in_use(self) -> float:
+        idle = sum(memory for units in self._idle.values() for _, _, memory in units)
+        return idle + self._reserved
+    
+    def _estimate(self, server_id: str) -> float:
+        return self._measured.get(server_id,
+                                  self._estimates.get(server_id, DEFAULT_PROCESS_MEMORY))
+    
+    def _reserve(self, server_id: str, now: float) -> Optional[float]:
+        """Claim a spawn slot and its memory, or None if none is due."""
+        with self._lock:
+            target = self._targets.get(server_id, 0)
+            pending = len(self._idle.get(server_id, ())) + self._spawning.get(server_id, 0)
+            if pending >= target or now < self._retry_at.get(server_id, 0.0):
+                return None
+            
+            memory = self._estimate(server_id)
+            if (self.memory_limit is not None and
+                    self._memory_in_use() + memory > self.memory_limit):
+                self.skipped_for_memory += 1
+                return None
+            
+            self._spawning[server_id] = self._spawning.get(server_id, 0) + 1
+            self._reserved += memory
+            return memory
+    
+    def _spawn_one(self, server_id: str, reserved: float, now: float) -> bool:
+        try:
+            connection_id, process_id, measured = self.spawn(server_id)
+        except Exception:
+            with self._lock:
+                self._release(server_id, reserved)
+                self._retry_at[server_id] = now + self.retry_delay
+                self.spawn_failures += 1
+            return False
+        
+        memory = float(measured) if measured else reserved
+        with self._lock:
+            self._release(server_id, reserved)
+            if server_id in self._targets:
+                if measured:
+                    self._measured[server_id] = memory
+                self._idle.setdefault(server_id, deque()).append(
+                    (connection_id, process_id, memory)
+                )
+                self.spawned += 1
+                return True
+        
+        # Pooling was turned off for the server while it spawned
+        self._stop_quietly(server_id, connection_id, process_id)
+        return False
+    
+    def _release(self, server_id: str, reserved: float) -> None:
+        self._spawning[server_id] -= 1
+        if not self._spawning[server_id]:
+            del self._spawning[server_id]
+        self._reserved -= reserved
+    
+    def _alive(self, process_id: Optional[str]) -> bool:
+        try:
+            return self.is_alive(process_id)
+        except Exception:
+            return False
+    
+    def _stop_quietly(self, server_id: str, connection_id: str,
+                      process_id: Optional[str]) -> None:
+        try:
+            self.stop_unit(server_id, connection_id, process_id)
+        except Exception:
+            pass
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Cleared first, so claims made during the pass trigger another
+            self._wake.clear()
+            try:
+                self.refill()
+            except Exception:
+                # A failed pass must not kill the thread; retry next interval
+                pass
+            self._wake.wait(self.interval)
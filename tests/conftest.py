@@ -0,0 +1,16 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep gateway cache files out of the user's cache directory.
+    
+    Gateways built with default options write catalog snapshots (and,
+    when enabled, state journals, captures and profiles) under
+    ``$XDG_CACHE_HOME/mcp-platform``.
+    """
+    cache_dir = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(cache_dir))
+    return cache_dir
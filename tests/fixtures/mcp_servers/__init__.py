@@ -0,0 +1,35 @@
+"""Stand-in MCP servers for offline testing of the gateway and bridge.
+
+The servers implement ``initialize``, ``tools/list`` and ``tools/call``
+over stdio, HTTP, SSE and WebSocket. A ``Behavior`` sets their latency
+distribution, response size, error rate and progress notifications::
+    
+    from mcp_servers import Behavior, start_server, stdio_config
+    
+    with start_server('websocket', Behavior(latency='lognormal:5ms:0.5')) as server:
+        transport.create_connection(server.connection_config())
+    
+    transport.create_connection(stdio_config(Behavior(response_size='2MB')))
+
+From a shell (with ``tests/fixtures`` on ``PYTHONPATH``)::
+    
+    python -m mcp_servers http --port 3001 --latency uniform:1ms:20ms --error-rate 0.01
+"""
+
+from .behavior import Behavior, Latency, parse_duration, parse_size
+from .protocol import INJECTED_ERROR, MCPHandler
+from .servers import TRANSPORTS, FixtureServer, serve_stdio, start_server, stdio_config
+
+__all__ = [
+    'Behavior',
+    'Latency',
+    'MCPHandler',
+    'FixtureServer',
+    'INJECTED_ERROR',
+    'TRANSPORTS',
+    'parse_duration',
+    'parse_size',
+    'serve_stdio',
+    'start_server',
+    'stdio_config'
+]
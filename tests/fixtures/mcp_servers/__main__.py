@@ -0,0 +1,40 @@
+"""Run a fixture MCP server: python -m mcp_servers <transport> [options]."""
+
+import argparse
+import signal
+import sys
+import threading
+
+from .behavior import Behavior, add_arguments
+from .protocol import MCPHandler
+from .servers import TRANSPORTS, serve_stdio, start_server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m mcp_servers',
+                                     description="Stand-in MCP server for testing")
+    parser.add_argument('transport', choices=TRANSPORTS)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help="Port (default: a free one)")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    behavior = Behavior.from_args(args)
+    
+    if args.transport == 'stdio':
+        serve_stdio(MCPHandler(behavior))
+        return
+    
+    server = start_server(args.transport, behavior, args.host, args.port)
+    # The URL goes to stdout so a parent process can read where to connect
+    print(server.url, flush=True)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Tunable behavior of the fixture servers: latency, payloads and failures."""
+
+import argparse
+import base64
+import functools
+import math
+import random
+import re
+from typing import Any, List, Optional
+
+_DURATION = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*(us|ms|s)?\s*$')
+# Bare numbers are milliseconds
+_DURATION_UNITS = {'us': 1e-6, 'ms': 1e-3, 's': 1.0, None: 1e-3}
+_SIZE = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*([kKmM]?)i?[bB]?\s*$')
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 * 1024}
+
+
+def parse_duration(text: Any) -> float:
+    """Seconds in ``'250us'``, ``'5ms'``, ``'1.5s'`` or ``'5'`` (milliseconds)."""
+    if isinstance(text, (int, float)):
+        return float(text) / 1000
+    match = _DURATION.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+def parse_size(text: Any) -> int:
+    """Bytes in ``'512'``, ``'64k'`` or ``'2MB'``."""
+    if isinstance(text, int):
+        return text
+    match = _SIZE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+class Latency:
+    """Distribution of the delay before a server answers a request.
+    
+    Specs are ``kind:param:param`` with durations like ``5ms``:
+    
+    - ``5ms``: always 5 ms
+    - ``uniform:1ms:10ms``: evenly spread between the bounds
+    - ``normal:10ms:2ms``: mean and standard deviation (never negative)
+    - ``exponential:10ms``: mean
+    - ``lognormal:10ms:0.5``: median and sigma
+    - ``pareto:5ms:1.5``: minimum and shape, for heavy tails
+    """
+    
+    _PARAMS = {'constant': 1, 'uniform': 2, 'normal': 2, 'exponential': 1,
+               'lognormal': 2, 'pareto': 2}
+    
+    def __init__(self, spec: Any = 0):
+        self.spec = str(spec)
+        kind, *params = self.spec.split(':')
+        if not params:
+            kind, params = 'constant', [kind]
+        if self._PARAMS.get(kind) != len(params):
+            raise ValueError(f"Invalid latency: {spec!r}")
+        self.kind = kind
+        # Shape parameters are plain numbers, the rest durations
+        self.params = [float(param) if kind in ('lognormal', 'pareto') and index == 1
+                       else parse_duration(param) for index, param in enumerate(params)]
+    
+    def sample(self, rng: random.Random) -> float:
+        """One delay in seconds."""
+        kind, params = self.kind, self.params
+        if kind == 'constant':
+            return params[0]
+        if kind == 'uniform':
+            return rng.uniform(params[0], params[1])
+        if kind == 'normal':
+            return max(0.0, rng.gauss(params[0], params[1]))
+        if kind == 'exponential':
+            return rng.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+        if kind == 'lognormal':
+            return rng.lognormvariate(math.log(params[0]), params[1]) if params[0] > 0 else 0.0
+        return params[0] * rng.paretovariate(params[1])
+    
+    def __repr__(self) -> str:
+        return f"Latency({self.spec!r})"
+
+
+class Behavior:
+    """How a fixture server answers.
+    
+    Attributes:
+        latency: Delay before each request is answered
+        response_size: Characters of base64 image data added to every
+            ``tools/call`` result (0 for none)
+        error_rate: Fraction of ``tools/call`` requests answered with a
+            JSON-RPC error
+        notifications: ``notifications/progress`` messages sent right
+            before each ``tools/call`` result
+        tools: Tools listed, counting the built-in ``echo``,
+            ``screenshot`` and ``fail``
+        seed: Seed for latency and error sampling (None for a random one)
+    """
+    
+    def __init__(self, latency: Any = 0, response_size: Any = 0, error_rate: float = 0.0,
+                 notifications: int = 0, tools: int = 3, seed: Optional[int] = None):
+        self.latency = latency if isinstance(latency, Latency) else Latency(latency)
+        self.response_size = parse_size(response_size)
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.error_rate = error_rate
+        self.notifications = notifications
+        self.tools = tools
+        self.seed = seed
+    
+    def to_args(self) -> List[str]:
+        """Command-line arguments that give a server this behavior."""
+        args = ['--latency', self.latency.spec, '--response-size', str(self.response_size),
+                '--error-rate', repr(self.error_rate), '--notifications', str(self.notifications),
+                '--tools', str(self.tools)]
+        if self.seed is not None:
+            args += ['--seed', str(self.seed)]
+        return args
+    
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> 'Behavior':
+        return cls(latency=args.latency, response_size=args.response_size,
+                   error_rate=args.error_rate, notifications=args.notifications,
+                   tools=args.tools, seed=args.seed)
+    
+    def __repr__(self) -> str:
+        return (f"Behavior(latency={self.latency.spec!r}, response_size={self.response_size}, "
+                f"error_rate={self.error_rate}, notifications={self.notifications}, "
+                f"tools={self.tools}, seed={self.seed})")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of ``Behavior`` to a command-line parser."""
+    parser.add_argument('--latency', default='0',
+                        help="Delay before answering, e.g. 5ms or lognormal:10ms:0.5")
+    parser.add_argument('--response-size', default='0',
+                        help="Base64 image data added to each tools/call result, e.g. 2MB")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of tools/call requests that fail")
+    parser.add_argument('--notifications', type=int, default=0,
+                        help="Progress notifications sent before each tools/call result")
+    parser.add_argument('--tools', type=int, default=3, help="Tools to list")
+    parser.add_argument('--seed', type=int, help="Random seed")
+
+
+@functools.lru_cache(maxsize=8)
+def blob(size: int) -> str:
+    """Base64 text of ``size`` characters (rounded down to a multiple of 4).
+    
+    The data is random, like image data, so it does not shrink under
+    compression. Blobs are cached, so large responses cost the server
+    little after the first.
+    """
+    raw = random.Random(size).getrandbits(size // 4 * 3 * 8) if size >= 4 else 0
+    return base64.b64encode(raw.to_bytes(size // 4 * 3, 'little')).decode()
@@ -0,0 +1,165 @@
+"""MCP message handling shared by the fixture servers of every transport."""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .behavior import Behavior, blob
+
+PROTOCOL_VERSION = '2024-11-05'
+SERVER_INFO = {"name": "mcp-fixture", "version": "1.0.0"}
+# Default image size of the screenshot tool
+SCREENSHOT_SIZE = 1024 * 1024
+
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+# Code of failures injected by ``Behavior.error_rate``
+INJECTED_ERROR = -32000
+
+Emit = Callable[[Dict[str, Any]], None]
+
+
+def _tool(name: str, description: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": name, "description": description,
+            "inputSchema": {"type": "object", "properties": properties}}
+
+
+BUILTIN_TOOLS = [
+    _tool('echo', "Return the given text",
+          {"text": {"type": "string"}}),
+    _tool('screenshot', "Return a base64 PNG of the given size",
+          {"size": {"type": "integer", "description": "Characters of base64 data"}}),
+    _tool('fail', "Return a tool error",
+          {"message": {"type": "string"}})
+]
+
+
+class MCPHandler:
+    """Answers MCP messages the way a ``Behavior`` describes.
+    
+    Handles ``initialize``, ``ping``, ``tools/list`` and ``tools/call``;
+    notifications from the client are accepted and ignored. Calls from
+    several threads may run at once, each sleeping through its own sampled
+    latency.
+    """
+    
+    def __init__(self, behavior: Optional[Behavior] = None):
+        self.behavior = behavior or Behavior()
+        self.tools = list(BUILTIN_TOOLS)
+        for index in range(len(self.tools), self.behavior.tools):
+            self.tools.append(_tool(f'tool_{index}', f"Echo tool number {index}",
+                                    {"text": {"type": "string"}}))
+        self._tool_names = {tool['name'] for tool in self.tools}
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.notifications_sent = 0
+    
+    def handle(self, message: Dict[str, Any], emit: Optional[Emit] = None) -> Optional[Dict[str, Any]]:
+        """Answer one message.
+        
+        Args:
+            message: JSON-RPC message from the client
+            emit: Called with each notification the server sends before
+                its response (dropped when None)
+        
+        Returns:
+            Response, or None for notifications
+        """
+        if not isinstance(message, dict) or 'id' not in message:
+            return None
+        method = message.get('method')
+        params = message.get('params') or {}
+        
+        with self._lock:
+            self.requests += 1
+            delay = self.behavior.latency.sample(self._rng)
+            fail = (method == 'tools/call' and self.behavior.error_rate > 0 and
+                    self._rng.random() < self.behavior.error_rate)
+            if fail:
+                self.errors += 1
+        
+        if method == 'tools/call' and self.behavior.notifications:
+            self._progress(message, params, emit)
+        if delay > 0:
+            time.sleep(delay)
+        
+        if fail:
+            return _error(message, INJECTED_ERROR, "Injected failure")
+        if method == 'initialize':
+            return _result(message, {
+                "protocolVersion": params.get('protocolVersion', PROTOCOL_VERSION),
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": SERVER_INFO
+            })
+        if method == 'ping':
+            return _result(message, {})
+        if method == 'tools/list':
+            return _result(message, {"tools": self.tools})
+        if method == 'tools/call':
+            return self._call_tool(message, params)
+        return _error(message, METHOD_NOT_FOUND, f"Method not found: {method}")
+    
+    def _progress(self, message: Dict[str, Any], params: Dict[str, Any],
+                  emit: Optional[Emit]) -> None:
+        total = self.behavior.notifications
+        token = (params.get('_meta') or {}).get('progressToken', message['id'])
+        if emit is not None:
+            for progress in range(1, total + 1):
+                emit({"jsonrpc": "2.0", "method": "notifications/progress",
+                      "params": {"progressToken": token, "progress": progress, "total": total}})
+        with self._lock:
+            self.notifications_sent += total
+    
+    def _call_tool(self, message: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get('name')
+        arguments = params.get('arguments') or {}
+        if name not in self._tool_names:
+            return _error(message, INVALID_PARAMS, f"Unknown tool: {name}")
+        
+        if name == 'fail':
+            content = [_text(arguments.get('message', "Tool failed"))]
+            return _result(message, {"content": content, "isError": True})
+        if name == 'screenshot':
+            size = int(arguments.get('size') or self.behavior.response_size or SCREENSHOT_SIZE)
+            return _result(message, {"content": [_image(size)]})
+        
+        content = [_text(str(arguments.get('text', '')))]
+        if self.behavior.response_size:
+            content.append(_image(self.behavior.response_size))
+        return _result(message, {"content": content})
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors,
+                    "notifications": self.notifications_sent}
+
+
+def _text(text: str) -> Dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def _image(size: int) -> Dict[str, Any]:
+    return {"type": "image", "mimeType": "image/png", "data": blob(size)}
+
+
+def _result(message: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": message['id'], "result": result}
+
+
+def _error(message: Dict[str, Any], code: int, text: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": message['id'], "error": {"code": code, "message": text}}
+
+
+def handle_batch(handler: MCPHandler, payload: Any, emit: Optional[Emit] = None) -> Any:
+    """Answer a message or a batch; None when nothing needs an answer."""
+    if isinstance(payload, list):
+        responses: List[Dict[str, Any]] = []
+        for message in payload:
+            response = handler.handle(message, emit)
+            if response is not None:
+                responses.append(response)
+        return responses or None
+    return handler.handle(payload, emit)
@@ -0,0 +1,343 @@
+"""Fixture MCP servers over stdio, HTTP, SSE and WebSocket."""
+
+import base64
+import hashlib
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from typing import Any, Dict, List, Optional, TextIO
+
+from .behavior import Behavior
+from .protocol import MCPHandler, handle_batch
+
+TRANSPORTS = ('stdio', 'http', 'sse', 'websocket')
+# Directory to put on PYTHONPATH for ``python -m mcp_servers``
+FIXTURES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Path of the SSE stream; messages are posted to any other path
+SSE_PATH = '/sse'
+MESSAGE_PATH = '/message'
+# Seconds between comments that keep an idle SSE stream open
+SSE_KEEPALIVE = 15.0
+# Requests a stdio or WebSocket server answers at once
+MAX_CONCURRENT = 64
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def stdio_config(behavior: Optional[Behavior] = None) -> Dict[str, Any]:
+    """Connection settings (command, args, env) that spawn a stdio server."""
+    args = ['-m', 'mcp_servers', 'stdio'] + (behavior or Behavior()).to_args()
+    return {'command': sys.executable, 'args': args, 'env': {'PYTHONPATH': FIXTURES_DIR}}
+
+
+def serve_stdio(handler: MCPHandler, stdin: Optional[TextIO] = None,
+                stdout: Optional[TextIO] = None) -> None:
+    """Answer newline-delimited JSON-RPC until stdin closes.
+    
+    Requests are answered concurrently, so a slow one does not hold back
+    the rest; responses and notifications are written whole, one per line.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    write_lock = threading.Lock()
+    
+    def write(message: Any) -> None:
+        line = json.dumps(message) + '\n'
+        with write_lock:
+            stdout.write(line)
+            stdout.flush()
+    
+    def answer(payload: Any) -> None:
+        response = handle_batch(handler, payload, write)
+        if response is not None:
+            write(response)
+    
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT) as executor:
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                continue
+            executor.submit(answer, payload)
+
+
+class FixtureServer:
+    """A network fixture server running in background threads."""
+    
+    def __init__(self, transport: str, server: Any, url: str, handler: MCPHandler):
+        self.transport = transport
+        self.url = url
+        self.handler = handler
+        self._server = server
+    
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+    
+    def connection_config(self) -> Dict[str, Any]:
+        """Settings for the transport bridge's ``create_connection``."""
+        if self.transport == 'sse':
+            return {'url': self.url + MESSAGE_PATH, 'transport': 'sse', 'sseEndpoint': SSE_PATH}
+        return {'url': self.url}
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        for stream in list(getattr(self._server, 'streams', ())):
+            stream.put(None)
+        self._server.server_close()
+    
+    def __enter__(self) -> 'FixtureServer':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Set by start_server
+    handler: MCPHandler
+    streams: List['queue.Queue[Optional[str]]']
+    streams_lock: threading.Lock
+    
+    def broadcast(self, message: Dict[str, Any]) -> None:
+        event = _sse_event(message)
+        with self.streams_lock:
+            for stream in self.streams:
+                stream.put(event)
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    """Streamable HTTP: POST a message, get JSON or an SSE stream back.
+    
+    Clients that accept ``text/event-stream`` get the call's notifications
+    and then its response as events. Other clients get the response as
+    JSON, and the notifications go to the streams open at ``/sse`` (the
+    older HTTP+SSE transport, which announces ``/message`` as its endpoint).
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_json(400, {"jsonrpc": "2.0", "id": None,
+                                  "error": {"code": -32700, "message": "Parse error"}})
+            return
+        
+        if 'text/event-stream' in self.headers.get('Accept', ''):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            
+            def emit(message: Dict[str, Any]) -> None:
+                self.wfile.write(_sse_event(message).encode())
+                self.wfile.flush()
+            
+            response = handle_batch(self.server.handler, payload, emit)
+            if response is not None:
+                emit(response)
+            return
+        
+        response = handle_batch(self.server.handler, payload, self.server.broadcast)
+        if response is None:
+            self._send_json(202, None)
+        else:
+            self._send_json(200, response)
+    
+    def do_GET(self):
+        if self.path.split('?')[0] != SSE_PATH:
+            self._send_json(404, {"error": "Not found"})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        
+        stream: 'queue.Queue[Optional[str]]' = queue.Queue()
+        with self.server.streams_lock:
+            self.server.streams.append(stream)
+        try:
+            self.wfile.write(f"event: endpoint\ndata: {MESSAGE_PATH}\n\n".encode())
+            self.wfile.flush()
+            while True:
+                try:
+                    event = stream.get(timeout=SSE_KEEPALIVE)
+                except queue.Empty:
+                    event = ': keepalive\n\n'
+                if event is None:
+                    return
+                self.wfile.write(event.encode())
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            with self.server.streams_lock:
+                self.server.streams.remove(stream)
+    
+    def _send_json(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def _sse_event(message: Dict[str, Any]) -> str:
+    return f"event: message\ndata: {json.dumps(message)}\n\n"
+
+
+class _TCPServer(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    # Set by start_server
+    handler: MCPHandler
+
+
+class _WebSocketHandler(StreamRequestHandler):
+    """Minimal RFC 6455 endpoint: text and binary messages, ping and close.
+    
+    Each message is answered on a thread of its own, so requests on one
+    connection overlap like they do on a real server.
+    """
+    
+    disable_nagle_algorithm = True
+    server: _TCPServer
+    
+    def handle(self):
+        if not self._handshake():
+            return
+        self._write_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT) as executor:
+            message = b''
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    return
+                fin, opcode, payload = frame
+                if opcode == 0x8:
+                    self._send(0x8, payload[:2])
+                    return
+                if opcode == 0x9:
+                    self._send(0xA, payload)
+                elif opcode in (0x0, 0x1, 0x2):
+                    message += payload
+                    if fin:
+                        executor.submit(self._answer, message)
+                        message = b''
+    
+    def _handshake(self) -> bool:
+        self.rfile.readline()
+        headers = {}
+        for line in iter(self.rfile.readline, b'\r\n'):
+            if not line:
+                return False
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(
+            hashlib.sha1((headers.get('sec-websocket-key', '') + _WS_GUID).encode()).digest()
+        ).decode()
+        self.wfile.write(('HTTP/1.1 101 Switching Protocols\r\n'
+                          'Upgrade: websocket\r\nConnection: Upgrade\r\n'
+                          f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+        return True
+    
+    def _answer(self, data: bytes) -> None:
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return
+        emit = lambda message: self._send(0x1, json.dumps(message).encode())
+        response = handle_batch(self.server.handler, payload, emit)
+        if response is not None:
+            emit(response)
+    
+    def _read_exact(self, size: int) -> Optional[bytes]:
+        data = self.rfile.read(size)
+        return data if len(data) == size else None
+    
+    def _read_frame(self):
+        head = self._read_exact(2)
+        if head is None:
+            return None
+        fin, opcode = head[0] & 0x80, head[0] & 0x0F
+        length = head[1] & 0x7F
+        if length >= 126:
+            extended = self._read_exact(2 if length == 126 else 8)
+            if extended is None:
+                return None
+            length = int.from_bytes(extended, 'big')
+        mask = self._read_exact(4) if head[1] & 0x80 else None
+        payload = self._read_exact(length) if length else b''
+        if payload is None:
+            return None
+        if mask and length:
+            repeated = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^
+                       int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        return bool(fin), opcode, payload
+    
+    def _send(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        try:
+            with self._write_lock:
+                self.wfile.write(header + payload)
+        except OSError:
+            pass
+
+
+def start_server(transport: str, behavior: Optional[Behavior] = None,
+                 host: str = '127.0.0.1', port: int = 0) -> FixtureServer:
+    """Start an HTTP, SSE or WebSocket fixture server in background threads.
+    
+    Args:
+        transport: ``http``, ``sse`` or ``websocket``
+        behavior: How the server answers (instant, small responses if None)
+        host: Address to listen on
+        port: Port to listen on (0 for a free one)
+    
+    Returns:
+        The running server; stop it with ``stop()`` or a ``with`` block
+    """
+    handler = MCPHandler(behavior)
+    if transport in ('http', 'sse'):
+        server = _HTTPServer((host, port), _HTTPHandler)
+        server.streams = []
+        server.streams_lock = threading.Lock()
+        scheme = 'http'
+    elif transport == 'websocket':
+        server = _TCPServer((host, port), _WebSocketHandler)
+        scheme = 'ws'
+    else:
+        raise ValueError(f"Unknown fixture transport: {transport}")
+    server.handler = handler
+    threading.Thread(target=server.serve_forever, daemon=True,
+                     name=f'mcp-fixture-{transport}').start()
+    return FixtureServer(transport, server, f"{scheme}://{host}:{server.server_address[1]}",
+                         handler)
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""Gateway benchmarks, checked against stored baselines.
+
+Micro-benchmarks time the gateway's own work with ``TransportStub``:
+request overhead, catalog loading, server listings and metrics at several
+registry sizes, and JSON encoding of typical messages. Macro-benchmarks
+send requests through the Node.js ``TransportAdapter`` to the stdio,
+HTTP and WebSocket fixture servers of ``tests/fixtures/mcp_servers``.
+
+Usage:
+    python tests/performance/benchmarks.py                # micro suite, check
+    python tests/performance/benchmarks.py --suite all
+    python tests/performance/benchmarks.py --update       # store new baselines
+
+The check exits with status 1 when a benchmark's throughput drops or its
+p99 latency grows by more than the allowed fraction of its baseline, in
+the first run and again in a second run of its suite.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'mcp-local-setup'))
+sys.path.insert(0, os.path.join(ROOT, 'bridge', 'transports'))
+sys.path.insert(0, os.path.join(HERE, '..', 'fixtures'))
+
+from api_gateway import APIGateway
+from api_gateway import registry_cache
+from contracts.transport_stub import TransportStub
+
+
+BASELINE_PATH = os.path.join(HERE, 'baselines.json')
+BASELINE_VERSION = 1
+# Allowed drift before a benchmark counts as regressed: throughput may fall
+# by this fraction of its baseline, p99 latency may grow by this fraction
+DEFAULT_THRESHOLDS = {'throughput': 0.3, 'p99': 1.0}
+DEFAULT_SIZES = (10, 1000, 10000)
+# Seconds each round of a benchmark runs; each figure reported is the
+# median over ``repeat`` rounds
+DEFAULT_MIN_TIME = 0.3
+DEFAULT_REPEAT = 5
+DEFAULT_CONCURRENCY = 8
+SUITES = ('micro', 'macro')
+
+
+class SuiteSkipped(Exception):
+    """Raised when a suite cannot run in this environment."""
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+def summarize(name: str, latencies: List[float], elapsed: float,
+              concurrency: int = 1) -> Dict[str, Any]:
+    """Result of one benchmark round from per-call latencies in seconds."""
+    latencies.sort()
+    return {
+        "name": name,
+        "ops": len(latencies),
+        "concurrency": concurrency,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+        "max_us": round(latencies[-1] * 1e6, 1)
+    }
+
+
+def _run_round(op: Callable[[], Any], min_time: float, min_ops: int, concurrency: int,
+               cleanup: Optional[Callable[[Any], None]]):
+    clock = time.perf_counter
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    start = threading.Barrier(concurrency + 1)
+    bounds = {}
+    
+    def worker(samples: List[float]) -> None:
+        start.wait()
+        deadline = bounds['deadline']
+        while len(samples) < min_ops or clock() < deadline:
+            began = clock()
+            result = op()
+            samples.append(clock() - began)
+            if cleanup is not None:
+                cleanup(result)
+    
+    threads = [threading.Thread(target=worker, args=(samples,), daemon=True)
+               for samples in latencies]
+    for thread in threads:
+        thread.start()
+    bounds['started'] = clock()
+    bounds['deadline'] = bounds['started'] + min_time
+    start.wait()
+    for thread in threads:
+        thread.join()
+    return [latency for samples in latencies for latency in samples], clock() - bounds['started']
+
+
+def measure(name: str, op: Callable[[], Any], min_time: float = DEFAULT_MIN_TIME,
+            repeat: int = DEFAULT_REPEAT, concurrency: int = 1, min_ops: int = 5,
+            cleanup: Optional[Callable[[Any], None]] = None) -> Dict[str, Any]:
+    """Time repeated calls of ``op``.
+    
+    Each of ``repeat`` rounds calls ``op`` from ``concurrency`` threads,
+    each thread calling it again as soon as it returns, for ``min_time``
+    seconds and at least ``min_ops`` times. Each figure reported is its
+    median over the rounds, so one round disturbed by the machine's other
+    work does not skew it.
+    
+    Args:
+        name: Benchmark name
+        op: Call to time
+        min_time: Seconds per round
+        repeat: Rounds to run
+        concurrency: Threads calling ``op`` at once
+        min_ops: Calls per thread per round, however long they take
+        cleanup: Called with each result of ``op``, outside the timing
+    """
+    cleanup_result = cleanup or (lambda result: None)
+    # Warm caches and lazily built tables before timing
+    cleanup_result(op())
+    
+    rounds = []
+    for _ in range(max(repeat, 1)):
+        latencies, elapsed = _run_round(op, min_time, min_ops, concurrency, cleanup)
+        rounds.append(summarize(name, latencies, elapsed, concurrency))
+    result = dict(rounds[0], ops=sum(round_['ops'] for round_ in rounds))
+    for key in ('throughput', 'mean_us', 'p50_us', 'p99_us'):
+        result[key] = sorted(round_[key] for round_ in rounds)[len(rounds) // 2]
+    result['max_us'] = max(round_['max_us'] for round_ in rounds)
+    return result
+
+
+def write_catalog(directory: str, count: int, name: str = 'catalog.json') -> str:
+    """Write a catalog of ``count`` HTTP servers; returns its path."""
+    categories = ('tools', 'data', 'search', 'browser')
+    servers = [{
+        "id": f"server-{index:05d}",
+        "name": f"Server {index}",
+        "category": categories[index % len(categories)],
+        "tags": [f"group-{index % 16}"],
+        "transport": {"type": "http"},
+        "config": {"port": 3000 + index % 1000}
+    } for index in range(count)]
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        json.dump({"servers": servers}, f)
+    return path
+
+
+def stub_options(catalog_path: str, cache_dir: Any = False) -> Dict[str, Any]:
+    return {'catalog_path': catalog_path, 'registry_cache': cache_dir,
+            'transport_catalog_path': False}
+
+
+def cold_gateway(catalog_path: str, cache_dir: Any = False) -> APIGateway:
+    """Gateway that loads its catalog as the first one in a new process would.
+    
+    Tables loaded earlier in this process are forgotten, so the catalog is
+    parsed and compiled again, or read from its snapshot in ``cache_dir``.
+    """
+    registry_cache.clear_loaded()
+    return APIGateway(TransportStub(), options=stub_options(catalog_path, cache_dir))
+
+
+def stub_gateway(catalog_path: str, running: int) -> APIGateway:
+    """Gateway on ``TransportStub`` with the first ``running`` servers started."""
+    gateway = APIGateway(TransportStub(), options=stub_options(catalog_path))
+    for server_id in sorted(gateway.servers)[:running]:
+        gateway.start_server(server_id)
+    return gateway
+
+
+def _request_ids() -> Callable[[], int]:
+    # Requests in flight at once need distinct IDs on real transports
+    return itertools.count(1).__next__
+
+
+def sample_messages() -> Dict[str, Any]:
+    """Typical messages: a tool call, a tool listing and a screenshot result."""
+    schema = {"type": "object", "properties": {
+        "path": {"type": "string", "description": "File to read"},
+        "encoding": {"type": "string", "enum": ["utf-8", "base64"]}
+    }, "required": ["path"]}
+    tools = [{"name": f"tool_{index}", "description": f"Tool number {index}",
+              "inputSchema": schema} for index in range(50)]
+    # About 1 MB once encoded, like a full-page screenshot
+    screenshot = base64.b64encode(bytes(range(256)) * 3000).decode()
+    return {
+        "request": {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                    "params": {"name": "read_file", "arguments": {"path": "/tmp/x"}}},
+        "tools_list": {"jsonrpc": "2.0", "id": 2, "result": {"tools": tools}},
+        "screenshot": {"jsonrpc": "2.0", "id": 3, "result": {"content": [
+            {"type": "image", "mimeType": "image/png", "data": screenshot}
+        ]}}
+    }
+
+
+def micro_benchmarks(sizes: Iterable[int] = DEFAULT_SIZES, min_time: float = DEFAULT_MIN_TIME,
+                     repeat: int = DEFAULT_REPEAT,
+                     concurrency: int = DEFAULT_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Gateway overhead with ``TransportStub``."""
+    results = []
+    timing = {'min_time': min_time, 'repeat': repeat}
+    
+    with tempfile.TemporaryDirectory() as directory:
+        gateway = stub_gateway(write_catalog(directory, 10), running=1)
+        next_id = _request_ids()
+        
+        def send_request() -> Any:
+            return gateway.send_request('server-00000', {
+                "jsonrpc": "2.0", "id": next_id(), "method": "tools/call",
+                "params": {"name": "read_file", "arguments": {"path": "/tmp/x"}}
+            })
+        
+        results.append(measure('micro.send_request', send_request, **timing))
+        results.append(measure(f'micro.send_request.c{concurrency}', send_request,
+                               concurrency=concurrency, **timing))
+        gateway.close()
+        
+        for size in sizes:
+            catalog_path = write_catalog(directory, size, f'catalog-{size}.json')
+            cache_dir = os.path.join(directory, f'cache-{size}')
+            results.append(measure(
+                f'micro.catalog_load[{size}]', lambda: cold_gateway(catalog_path),
+                cleanup=APIGateway.close, **timing
+            ))
+            results.append(measure(
+                f'micro.catalog_load_cached[{size}]', lambda: cold_gateway(catalog_path, cache_dir),
+                cleanup=APIGateway.close, **timing
+            ))
+            
+            gateway = stub_gateway(catalog_path, running=max(1, size // 10))
+            results.append(measure(f'micro.list_servers[{size}]', gateway.list_servers, **timing))
+            results.append(measure(
+                f'micro.list_servers_page[{size}]',
+                lambda: gateway.list_servers(filter_running=True, limit=50), **timing
+            ))
+            results.append(measure(f'micro.get_metrics[{size}]', gateway.get_metrics, **timing))
+            gateway.close()
+    
+    for kind, message in sample_messages().items():
+        encoded = json.dumps(message)
+        results.append(measure(f'micro.json_encode[{kind}]',
+                               lambda message=message: json.dumps(message), **timing))
+        results.append(measure(f'micro.json_decode[{kind}]',
+                               lambda encoded=encoded: json.loads(encoded), **timing))
+    
+    return results
+
+
+def macro_benchmarks(min_time: float = DEFAULT_MIN_TIME, repeat: int = DEFAULT_REPEAT,
+                     concurrency: int = DEFAULT_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Round trips through the Node.js bridge to local fixture servers."""
+    if shutil.which('node') is None:
+        raise SuiteSkipped("node is not installed")
+    from transport_adapter import TransportAdapter
+    from mcp_servers import start_server, stdio_config
+    
+    transport = TransportAdapter()
+    try:
+        transport.initialize()
+    except RuntimeError as e:
+        raise SuiteSkipped(f"transport bridge did not start ({e}); run npm install")
+    
+    results = []
+    timing = {'min_time': min_time, 'repeat': repeat}
+    fixtures = [start_server('http'), start_server('websocket')]
+    settings = {'stdio': stdio_config(), 'http': fixtures[0].connection_config(),
+                'websocket': fixtures[1].connection_config()}
+    
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = os.path.join(directory, 'catalog.json')
+        with open(catalog_path, 'w') as f:
+            json.dump({"servers": [
+                {"id": server_id, "transport": {"type": server_id, server_id: config}}
+                for server_id, config in settings.items()
+            ]}, f)
+        gateway = APIGateway(transport, options=stub_options(catalog_path))
+        
+        try:
+            for server_id in ('stdio', 'http', 'websocket'):
+                started = gateway.start_server(server_id)
+                if not started['success']:
+                    raise RuntimeError(started['message'])
+                next_id = _request_ids()
+                
+                def send_request(server_id: str = server_id, tool: str = 'echo',
+                                 arguments: Any = {"text": "hello"}) -> Any:
+                    response = gateway.send_request(server_id, {
+                        "jsonrpc": "2.0", "id": next_id(), "method": "tools/call",
+                        "params": {"name": tool, "arguments": arguments}
+                    })
+                    if 'error' in response:
+                        raise RuntimeError(response['error'].get('message'))
+                    return response
+                
+                results.append(measure(f'macro.{server_id}', send_request, **timing))
+                results.append(measure(f'macro.{server_id}.c{concurrency}', send_request,
+                                       concurrency=concurrency, **timing))
+                # A full-page screenshot's worth of base64 data
+                results.append(measure(
+                    f'macro.{server_id}.screenshot',
+                    lambda: send_request(tool='screenshot', arguments={"size": 1024 * 1024}),
+                    **timing
+                ))
+        finally:
+            gateway.close()
+            for fixture in fixtures:
+                fixture.stop()
+            if transport.node_process is not None:
+                transport.node_process.terminate()
+                transport.node_process.wait()
+    
+    return results
+
+
+def machine_info() -> Dict[str, Any]:
+    """Where results were measured; baselines only carry over to the same."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count()
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    """Stored baselines, or an empty set if there are none."""
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return {"version": BASELINE_VERSION, "benchmarks": {}}
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {baseline.get('version')}")
+    return baseline
+
+
+def save_baseline(results: List[Dict[str, Any]], path: str = BASELINE_PATH,
+                  thresholds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Store results as baselines, keeping entries of benchmarks not run."""
+    baseline = load_baseline(path)
+    benchmarks = dict(baseline.get('benchmarks', {}))
+    for result in results:
+        benchmarks[result['name']] = {key: result[key] for key in
+                                      ('throughput', 'p50_us', 'p99_us', 'concurrency')}
+    baseline = {
+        "version": BASELINE_VERSION,
+        "machine": machine_info(),
+        "thresholds": thresholds or baseline.get('thresholds') or DEFAULT_THRESHOLDS,
+        "benchmarks": dict(sorted(benchmarks.items()))
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    return baseline
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+            thresholds: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Compare results with their baselines.
+    
+    Returns:
+        One row per result with the relative changes and a status:
+        ``ok``, ``regressed`` (with the ``metrics`` that drifted), or
+        ``new`` when there is no baseline
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}), **(thresholds or {})}
+    benchmarks = baseline.get('benchmarks', {})
+    rows = []
+    for result in results:
+        row = {"name": result['name'], "throughput": result['throughput'],
+               "p99_us": result['p99_us'], "status": "new"}
+        base = benchmarks.get(result['name'])
+        if base is not None:
+            row['throughput_change'] = result['throughput'] / base['throughput'] - 1
+            row['p99_change'] = result['p99_us'] / base['p99_us'] - 1
+            drifted = []
+            if row['throughput_change'] < -thresholds['throughput']:
+                drifted.append('throughput')
+            if row['p99_change'] > thresholds['p99']:
+                drifted.append('p99')
+            row['status'] = 'regressed' if drifted else 'ok'
+            if drifted:
+                row['metrics'] = drifted
+        rows.append(row)
+    return rows
+
+
+def best_of(result: Dict[str, Any], other: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Better figures of two runs of one benchmark."""
+    if other is None:
+        return result
+    return dict(result, ops=result['ops'] + other['ops'],
+                throughput=max(result['throughput'], other['throughput']),
+                mean_us=min(result['mean_us'], other['mean_us']),
+                p50_us=min(result['p50_us'], other['p50_us']),
+                p99_us=min(result['p99_us'], other['p99_us']),
+                max_us=min(result['max_us'], other['max_us']))
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """Comparison rows as a text table."""
+    lines = [f"{'benchmark':<36} {'ops/s':>12} {'change':>8} {'p99 us':>12} {'change':>8}  status"]
+    for row in rows:
+        def change(key: str) -> str:
+            return f"{row[key]:+.0%}" if key in row else '-'
+        lines.append(f"{row['name']:<36} {row['throughput']:>12,.1f} "
+                     f"{change('throughput_change'):>8} {row['p99_us']:>12,.1f} "
+                     f"{change('p99_change'):>8}  {row['status']}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--suite', choices=SUITES + ('all',), default='micro')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Registry sizes for the micro suite")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME,
+                        help="Seconds per benchmark round")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Rounds per benchmark (the median is kept)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update', action='store_true',
+                        help="Store the results as the new baselines")
+    parser.add_argument('--threshold', type=float,
+                        help="Allowed throughput drop, as a fraction of the baseline")
+    parser.add_argument('--p99-threshold', type=float,
+                        help="Allowed p99 growth, as a fraction of the baseline")
+    parser.add_argument('--output', help="Write results and comparison as JSON")
+    args = parser.parse_args(argv)
+    
+    thresholds = {}
+    if args.threshold is not None:
+        thresholds['throughput'] = args.threshold
+    if args.p99_threshold is not None:
+        thresholds['p99'] = args.p99_threshold
+    
+    def run_suite(suite: str) -> List[Dict[str, Any]]:
+        try:
+            if suite == 'micro':
+                sizes = [int(size) for size in args.sizes.split(',') if size]
+                return micro_benchmarks(sizes, args.min_time, args.repeat, args.concurrency)
+            return macro_benchmarks(args.min_time, args.repeat, args.concurrency)
+        except SuiteSkipped as e:
+            print(f"Skipped {suite} benchmarks: {e}", file=sys.stderr)
+            return []
+    
+    suites = SUITES if args.suite == 'all' else (args.suite,)
+    results = [result for suite in suites for result in run_suite(suite)]
+    
+    baseline = load_baseline(args.baseline)
+    if baseline.get('machine') and baseline['machine'] != machine_info():
+        print(f"Note: baselines were measured on {baseline['machine']}", file=sys.stderr)
+    rows = compare(results, baseline, thresholds)
+    
+    suspects = {row['name'] for row in rows if row['status'] == 'regressed'}
+    if suspects and not args.update:
+        # A slow run can be the machine's doing: only regressions that
+        # show again in a second run count
+        print(f"Running again to confirm: {', '.join(sorted(suspects))}", file=sys.stderr)
+        rerun = {}
+        for suite in suites:
+            if any(name.startswith(suite + '.') for name in suspects):
+                rerun.update((result['name'], result) for result in run_suite(suite))
+        results = [best_of(result, rerun.get(result['name'])) for result in results]
+        rows = compare(results, baseline, thresholds)
+    print(format_report(rows))
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"machine": machine_info(), "results": results, "comparison": rows},
+                      f, indent=2)
+    
+    if args.update:
+        save_baseline(results, args.baseline, {**DEFAULT_THRESHOLDS, **thresholds}
+                      if thresholds else None)
+        print(f"Baselines written to {args.baseline}")
+        return 0
+    
+    regressed = [row['name'] for row in rows if row['status'] == 'regressed']
+    if regressed:
+        print(f"Regressed: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,10 +9,12 @@ import time
 # Add paths for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'mcp-local-setup'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bridge', 'transports'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'fixtures'))
 
 from transport_adapter import TransportAdapter
 from contracts.process_manager_stub import ProcessManagerStub
 from contracts.api_gateway_stub import APIGatewayStub
+from mcp_servers import stdio_config
 
 
 def test_real_transport_basic_functionality():
@@ -23,13 +25,10 @@ def test_real_transport_basic_functionality():
     transport.initialize()
     assert transport.initialized == True
     
-    # Create a connection (using sleep command to keep it running)
-    config = {
-        'serverId': 'test-sleep-server',
-        'command': 'sleep',
-        'args': ['60'],  # Sleep for 60 seconds
-        'env': {'TEST_VAR': 'test_value'}
-    }
+    # Create a connection to a fixture server, which runs until closed
+    config = stdio_config()
+    config['serverId'] = 'test-fixture-server'
+    config['env']['TEST_VAR'] = 'test_value'
     
     connection_id = transport.create_connection(config)
     assert isinstance(connection_id, str)
@@ -141,29 +140,22 @@ def test_real_transport_message_handling():
     transport = TransportAdapter()
     transport.initialize()
     
-    # Create a simple stdio connection using cat command
-    config = {
-        'serverId': 'cat-server',
-        'command': 'cat',  # Cat will echo back what we send
-        'args': []
-    }
+    # Create a stdio connection to a fixture MCP server
+    config = stdio_config()
+    config['serverId'] = 'fixture-server'
     
     connection_id = transport.create_connection(config)
     
-    # Send a message (cat won't respond with proper JSON-RPC, but we can test the send)
     message = {
         "jsonrpc": "2.0",
-        "method": "test",
-        "params": {"data": "hello"},
+        "method": "tools/call",
+        "params": {"name": "echo", "arguments": {"text": "hello"}},
         "id": 1
     }
     
-    try:
-        # This might timeout since cat doesn't send proper JSON-RPC responses
-        response = transport.send_message(connection_id, message)
-    except Exception as e:
-        # Expected - cat doesn't send JSON-RPC responses
-        pass
+    response = transport.send_message(connection_id, message)
+    assert response['id'] == 1
+    assert response['result']['content'][0]['text'] == 'hello'
     
     # Close connection
     transport.close_connection(connection_id)
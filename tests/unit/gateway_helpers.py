@@ -0,0 +1,60 @@
+"""Stubs and helpers shared by the gateway unit tests."""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from contracts.transport_stub import TransportStub
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class BlockingTransport(TransportStub):
+    """Transport stub that blocks sends until released."""
+    
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.active = 0
+    
+    def send_message(self, connection_id, message):
+        self.active += 1
+        self.release.wait(5)
+        self.active -= 1
+        return super().send_message(connection_id, message)
+
+
+def add_server(gateway, scaling, transport='stdio', limits=None):
+    """Register a stopped ``test-server`` with the given scaling block."""
+    config = {
+        'id': 'test-server',
+        'source': {'type': 'npm', 'package': 'test-server'},
+        'scaling': scaling
+    }
+    if limits is not None:
+        config['limits'] = limits
+    gateway.servers['test-server'] = {
+        'config': config,
+        'status': 'stopped',
+        'transport': transport,
+        'connectionId': None,
+        'processId': None
+    }
+
+
+def wait_for(predicate, timeout=2.0):
+    """Poll until ``predicate`` holds, failing the test after ``timeout``."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
@@ -0,0 +1,134 @@
+"""Unit tests for per-server admission control."""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.admission import AdmissionController, OverloadedError
+from contracts.transport_stub import TransportStub
+from gateway_helpers import BlockingTransport, wait_for
+
+
+def test_from_config_without_limit_is_unlimited():
+    """Test servers without maxConcurrency get no controller."""
+    assert AdmissionController.from_config({}) is None
+    
+    controller = AdmissionController.from_config(
+        {'maxConcurrency': 2, 'maxQueueDepth': 4, 'queueTimeout': '500ms'}
+    )
+    assert controller.max_concurrency == 2
+    assert controller.max_queue_depth == 4
+    assert controller.queue_timeout == 0.5
+
+
+def test_full_queue_fails_fast():
+    """Test requests beyond the queue depth are rejected immediately."""
+    controller = AdmissionController(1, max_queue_depth=0)
+    controller.acquire()
+    
+    started = time.monotonic()
+    with pytest.raises(OverloadedError) as exc:
+        controller.acquire()
+    
+    assert exc.value.reason == 'queue_full'
+    assert time.monotonic() - started < 0.1
+    assert controller.get_stats()['rejected']['queue_full'] == 1
+
+
+def test_queue_timeout():
+    """Test queued requests give up after the queue timeout."""
+    controller = AdmissionController(1, max_queue_depth=1, queue_timeout=0.05)
+    controller.acquire()
+    
+    with pytest.raises(OverloadedError) as exc:
+        controller.acquire()
+    
+    assert exc.value.reason == 'queue_timeout'
+    assert controller.queue_depth == 0
+
+
+def test_released_slot_goes_to_oldest_waiter():
+    """Test slots are handed over in FIFO order."""
+    controller = AdmissionController(1, max_queue_depth=3, queue_timeout=2)
+    controller.acquire()
+    order = []
+    
+    def wait(name):
+        with controller.slot():
+            order.append(name)
+    
+    threads = []
+    for name in ['first', 'second', 'third']:
+        thread = threading.Thread(target=wait, args=(name,))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: controller.queue_depth == len(threads))
+    
+    controller.release()
+    for thread in threads:
+        thread.join()
+    
+    assert order == ['first', 'second', 'third']
+    assert controller.active == 0
+
+
+def test_gateway_returns_overload_error():
+    """Test the gateway enforces catalog limits and reports rejections."""
+    transport = BlockingTransport()
+    gateway = APIGateway(transport)
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server', 'limits': {'maxConcurrency': 1, 'maxQueueDepth': 1}},
+        'status': 'running',
+        'transport': 'stdio',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    
+    responses = []
+    threads = [
+        threading.Thread(target=lambda i=i: responses.append(gateway.send_request(
+            'test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": i}
+        )))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: transport.active == 1 and gateway._admission['test-server'].queue_depth == 1)
+    
+    rejected = gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": 99})
+    assert rejected['id'] == 99
+    assert rejected['error']['code'] == -32003
+    assert rejected['error']['data']['reason'] == 'queue_full'
+    
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    assert all('result' in r for r in responses)
+    
+    stats = gateway.get_metrics()['admission']['test-server']
+    assert stats['admitted'] == 2
+    assert stats['rejected']['queue_full'] == 1
+    assert stats['queue_depth'] == 0
+    assert gateway.get_server_info('test-server')['metrics']['admission']['admitted'] == 2
+
+
+def test_gateway_default_limits_from_options():
+    """Test gateway options supply limits for servers without a limits block."""
+    gateway = APIGateway(TransportStub(), options={'max_concurrency': 4})
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'running',
+        'transport': 'http',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "ping", "id": 1})
+    
+    assert gateway.get_metrics()['admission']['test-server']['max_concurrency'] == 4
@@ -0,0 +1,165 @@
+"""Unit tests for the ASGI HTTP front-end."""
+
+import sys
+import os
+import asyncio
+import gzip
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.asgi import GatewayApp, split_tool_name
+from contracts.transport_stub import TransportStub
+
+
+class RecordingTransport(TransportStub):
+    """Transport stub that keeps the messages it was sent."""
+    
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+    
+    def send_message(self, connection_id, message):
+        self.sent.append(message)
+        return super().send_message(connection_id, message)
+
+
+def call(app, method, path, body=None, headers=None, query=b''):
+    """Run one request through the app; returns status, headers and body."""
+    raw_headers = [(name.lower().encode(), value.encode())
+                   for name, value in (headers or {}).items()]
+    payload = json.dumps(body).encode() if body is not None and not isinstance(body, bytes) else body
+    messages = [{'type': 'http.request', 'body': payload or b'', 'more_body': False}]
+    sent = []
+    
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': raw_headers,
+             'query_string': query}
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    response_headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], response_headers, b''.join(m.get('body', b'') for m in sent[1:])
+
+
+@pytest.fixture
+def gateway(tmp_path):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': server_id, 'transport': {'type': 'http'}, 'config': {'port': 3000 + n},
+         'category': 'tools'}
+        for n, server_id in enumerate(['alpha', 'beta', 'gamma'])
+    ]}))
+    gateway = APIGateway(RecordingTransport(), options={
+        'catalog_path': str(catalog), 'registry_cache': False
+    })
+    gateway.start_server('alpha')
+    gateway.start_server('beta')
+    yield gateway
+    gateway.close()
+
+
+def _rpc(method, message_id=1, **params):
+    message = {"jsonrpc": "2.0", "method": method, "id": message_id}
+    if params:
+        message['params'] = params
+    return message
+
+
+def test_split_tool_name():
+    """Test both namespaced tool name forms of the Node gateway."""
+    assert split_tool_name('alpha:read') == ('alpha', 'read')
+    assert split_tool_name('mcp__alpha__read_file') == ('alpha', 'read_file')
+    assert split_tool_name('read') == (None, 'read')
+
+
+def test_mcp_routes_by_header_and_tool_name(gateway):
+    """Test X-MCP-Server and namespaced tool names select the server."""
+    app = GatewayApp(gateway)
+    
+    status, _, body = call(app, 'POST', '/mcp', _rpc('tools/list', 5),
+                           {'X-MCP-Server': 'alpha'})
+    assert status == 200
+    assert json.loads(body)['result']['connection'] == gateway.servers['alpha']['connectionId']
+    
+    status, _, body = call(app, 'POST', '/mcp', _rpc('tools/call', name='beta:search'))
+    assert json.loads(body)['result']['connection'] == gateway.servers['beta']['connectionId']
+    assert gateway.transport.sent[-1]['params']['name'] == 'search'
+    
+    status, _, body = call(app, 'POST', '/mcp', _rpc('tools/list'))
+    assert json.loads(body)['error']['code'] == -32602
+
+
+def test_mcp_batches(gateway):
+    """Test batches answer every request, skip notifications and flag bad items."""
+    app = GatewayApp(gateway)
+    batch = [_rpc('tools/list', 1), {"jsonrpc": "2.0", "method": "notifications/initialized"},
+             {"method": "no-version", "id": 3}]
+    
+    status, _, body = call(app, 'POST', '/mcp', batch, {'X-MCP-Server': 'alpha'})
+    
+    assert status == 200
+    responses = json.loads(body)
+    assert [response['id'] for response in responses] == [1, 3]
+    assert responses[1]['error']['code'] == -32600
+    
+    status, _, body = call(app, 'POST', '/mcp', batch[1], {'X-MCP-Server': 'alpha'})
+    assert (status, body) == (202, b'')
+    
+    status, _, body = call(app, 'POST', '/mcp', b'{"jsonrpc": ', {'X-MCP-Server': 'alpha'})
+    assert status == 400 and json.loads(body)['error']['code'] == -32700
+
+
+def test_mcp_streams_batches_with_progress(gateway):
+    """Test SSE clients get progress and each response as an event."""
+    app = GatewayApp(gateway)
+    batch = [_rpc('tools/list', 1, _meta={'progressToken': 'job'}), _rpc('tools/list', 2)]
+    
+    status, headers, body = call(app, 'POST', '/mcp', batch, {
+        'X-MCP-Server': 'alpha', 'Accept': 'application/json, text/event-stream'
+    })
+    
+    assert status == 200 and headers['content-type'] == 'text/event-stream'
+    events = [json.loads(chunk.split('data: ', 1)[1])
+              for chunk in body.decode().split('\n\n') if chunk.startswith('event: message')]
+    progress = [event['params']['progress'] for event in events
+                if event.get('method') == 'notifications/progress']
+    assert progress == [0, 1, 2]
+    assert sorted(event['id'] for event in events if 'id' in event) == [1, 2]
+
+
+def test_large_responses_are_gzipped(gateway):
+    """Test bodies over the threshold are compressed for gzip clients."""
+    app = GatewayApp(gateway, gzip_min_size=64)
+    
+    status, headers, body = call(app, 'GET', '/servers', headers={'Accept-Encoding': 'gzip'})
+    assert headers['content-encoding'] == 'gzip'
+    assert int(headers['content-length']) == len(body)
+    listing = json.loads(gzip.decompress(body))
+    assert [server['id'] for server in listing['servers']] == ['alpha', 'beta', 'gamma']
+    
+    status, headers, body = call(app, 'GET', '/servers', query=b'running=true&limit=1')
+    assert 'content-encoding' not in headers
+    assert json.loads(body) == {'servers': [{'id': 'alpha', 'transport': 'http',
+                                             'status': 'running'}], 'nextCursor': 'alpha'}
+
+
+def test_api_keys_are_checked(gateway):
+    """Test only listed keys get through, while /health stays open."""
+    app = GatewayApp(gateway, api_keys=['secret'])
+    
+    assert call(app, 'GET', '/metrics')[0] == 401
+    status, _, body = call(app, 'GET', '/metrics', headers={'X-API-Key': 'secret'})
+    assert status == 200 and json.loads(body)['active_connections'] == 2
+    
+    status, _, body = call(app, 'GET', '/health')
+    assert status == 200 and json.loads(body)['servers'] == {'running': 2, 'stopped': 1}
+    assert call(app, 'GET', '/mcp', headers={'X-API-Key': 'secret'})[0] == 405
+    assert call(app, 'GET', '/nowhere')[0] == 404
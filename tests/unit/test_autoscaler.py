@@ -0,0 +1,156 @@
+"""Unit tests for replica autoscaling."""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from api_gateway import APIGateway
+from api_gateway.autoscaler import ScalingPolicy
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+from gateway_helpers import BlockingTransport, FakeClock, add_server, wait_for
+
+
+LIMITS = {'maxConcurrency': 1, 'maxQueueDepth': 10}
+
+
+def test_desired_replicas_follow_load():
+    """Test the desired count tracks outstanding requests within bounds."""
+    policy = ScalingPolicy(min_replicas=1, max_replicas=5, target_in_flight=2)
+    
+    assert policy.desired_replicas(1, in_flight=0, queue_depth=0) == 1
+    assert policy.desired_replicas(1, in_flight=1, queue_depth=4) == 3
+    assert policy.desired_replicas(1, in_flight=2, queue_depth=40) == 5
+
+
+def test_high_latency_adds_a_replica_when_busy():
+    """Test slow, fully busy servers get another replica."""
+    policy = ScalingPolicy(min_replicas=1, max_replicas=5, target_in_flight=4,
+                           target_latency=1.0)
+    
+    assert policy.desired_replicas(2, in_flight=2, queue_depth=0, latency=2.0) == 3
+    assert policy.desired_replicas(2, in_flight=1, queue_depth=0, latency=2.0) == 1
+
+
+def test_scale_up_respects_cooldown():
+    """Test bursts scale up at once but not again until the cooldown passes."""
+    clock = FakeClock()
+    policy = ScalingPolicy(min_replicas=1, max_replicas=10, scale_up_cooldown=10, clock=clock)
+    
+    assert policy.decide(1, in_flight=1, queue_depth=3) == 4
+    assert policy.decide(4, in_flight=4, queue_depth=4) == 4
+    
+    clock.now += 10
+    assert policy.decide(4, in_flight=4, queue_depth=4) == 8
+
+
+def test_scale_down_waits_for_stable_low_load():
+    """Test replicas are removed one at a time after sustained low load."""
+    clock = FakeClock()
+    policy = ScalingPolicy(min_replicas=1, max_replicas=4, scale_down_cooldown=60, clock=clock)
+    assert policy.decide(1, in_flight=4, queue_depth=0) == 4
+    
+    clock.now += 30
+    assert policy.decide(4, in_flight=0, queue_depth=0) == 4
+    
+    clock.now += 31
+    assert policy.decide(4, in_flight=0, queue_depth=0) == 3
+    assert policy.decide(3, in_flight=0, queue_depth=0) == 3
+    
+    clock.now += 20
+    assert policy.decide(3, in_flight=3, queue_depth=0) == 3
+    clock.now += 45
+    assert policy.decide(3, in_flight=0, queue_depth=0) == 3
+
+
+def test_from_config():
+    """Test only entries with room to grow are autoscaled."""
+    assert ScalingPolicy.from_config({}) is None
+    assert ScalingPolicy.from_config({'replicas': 2}) is None
+    
+    policy = ScalingPolicy.from_config(
+        {'minReplicas': 1, 'maxReplicas': 4, 'scaleDownCooldown': '5m'},
+        {'targetInFlight': 2}
+    )
+    assert policy.max_replicas == 4
+    assert policy.target_in_flight == 2
+    assert policy.scale_down_cooldown == 300
+
+
+def test_gateway_scales_out_queued_burst_and_back_in():
+    """Test a queued burst adds replicas that take the queued requests."""
+    transport = BlockingTransport()
+    process_manager = ProcessManagerStub()
+    gateway = APIGateway(transport, process_manager, options={'autoscale_interval': 60})
+    add_server(gateway, {'minReplicas': 1, 'maxReplicas': 3,
+                         'scaleUpCooldown': '0s', 'scaleDownCooldown': '0s'}, limits=LIMITS)
+    gateway.start_server('test-server')
+    
+    threads = [
+        threading.Thread(target=gateway.send_request, args=(
+            'test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": i}
+        ))
+        for i in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: transport.active == 1 and gateway._admission['test-server'].queue_depth == 2)
+    
+    assert gateway.autoscale() == {'test-server': 3}
+    wait_for(lambda: transport.active == 3)
+    assert len(process_manager.processes) == 3
+    assert gateway.get_metrics()['admission']['test-server']['max_concurrency'] == 3
+    
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert gateway.autoscale() == {'test-server': 2}
+    assert gateway.autoscale() == {'test-server': 1}
+    assert gateway.autoscale() == {}
+    stopped = [p for p in process_manager.processes.values() if p['status'] == 'stopped']
+    assert len(stopped) == 2
+    gateway.close()
+
+
+def test_removed_replica_drains_before_stopping():
+    """Test a replica with requests in flight is stopped only once idle."""
+    transport = BlockingTransport()
+    process_manager = ProcessManagerStub()
+    gateway = APIGateway(transport, process_manager)
+    add_server(gateway, {'replicas': 2})
+    gateway.start_server('test-server')
+    
+    threads = [
+        threading.Thread(target=gateway.send_request, args=(
+            'test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": i}
+        ))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: transport.active == 2)
+    
+    assert gateway.remove_replica('test-server')['success']
+    assert gateway.get_server_info('test-server')['draining'] == 1
+    assert process_manager.processes['test-server-1']['status'] == 'running'
+    
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert gateway.stop_drained_replicas() == 1
+    assert process_manager.processes['test-server-1']['status'] == 'stopped'
+    assert gateway.remove_replica('test-server')['success'] is False
+
+
+def test_network_servers_are_not_autoscaled():
+    """Test only stdio servers get an autoscaling policy."""
+    gateway = APIGateway(TransportStub())
+    add_server(gateway, {'minReplicas': 1, 'maxReplicas': 3}, transport='http', limits=LIMITS)
+    gateway.start_server('test-server')
+    
+    assert gateway._scaling_policy_for('test-server') is None
+    assert gateway.autoscale() == {}
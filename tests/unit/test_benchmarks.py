@@ -0,0 +1,76 @@
+"""Unit tests for the benchmark harness and its baseline check."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'performance'))
+
+from benchmarks import (compare, measure, micro_benchmarks, percentile,
+                        save_baseline, load_baseline)
+
+
+def test_percentile_is_nearest_rank():
+    """Test percentiles pick an observed value."""
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+
+
+def test_measure_reports_median_rounds():
+    """Test measure runs every thread at least min_ops times per round."""
+    calls = []
+    result = measure('noop', lambda: calls.append(1), min_time=0, repeat=3,
+                     concurrency=2, min_ops=4)
+    
+    assert result['name'] == 'noop' and result['concurrency'] == 2
+    assert result['ops'] == 3 * 2 * 4
+    # One warm-up call before timing
+    assert len(calls) == result['ops'] + 1
+    assert result['p50_us'] <= result['p99_us'] <= result['max_us']
+
+
+def test_compare_flags_drift_beyond_thresholds():
+    """Test throughput drops and p99 growth past the thresholds regress."""
+    baseline = {"thresholds": {"throughput": 0.2, "p99": 0.5}, "benchmarks": {
+        "a": {"throughput": 1000, "p99_us": 100},
+        "b": {"throughput": 1000, "p99_us": 100},
+        "c": {"throughput": 1000, "p99_us": 100}
+    }}
+    results = [
+        {"name": "a", "throughput": 900, "p99_us": 140},
+        {"name": "b", "throughput": 700, "p99_us": 100},
+        {"name": "c", "throughput": 1100, "p99_us": 200},
+        {"name": "d", "throughput": 10, "p99_us": 1}
+    ]
+    
+    rows = {row['name']: row for row in compare(results, baseline)}
+    
+    assert rows['a']['status'] == 'ok'
+    assert rows['b']['metrics'] == ['throughput']
+    assert rows['c']['metrics'] == ['p99']
+    assert rows['d']['status'] == 'new'
+    assert compare(results[1:2], baseline, {'throughput': 0.5})[0]['status'] == 'ok'
+
+
+def test_save_baseline_keeps_other_benchmarks(tmp_path):
+    """Test updating one suite leaves the other suite's baselines alone."""
+    path = str(tmp_path / 'baselines.json')
+    result = {"throughput": 10.0, "p50_us": 1.0, "p99_us": 2.0, "concurrency": 1}
+    save_baseline([dict(result, name='macro.http')], path)
+    save_baseline([dict(result, name='micro.send_request', throughput=20.0)], path)
+    
+    baseline = load_baseline(path)
+    assert sorted(baseline['benchmarks']) == ['macro.http', 'micro.send_request']
+    assert baseline['benchmarks']['micro.send_request']['throughput'] == 20.0
+    assert baseline['machine']['cpus'] == os.cpu_count()
+
+
+def test_micro_suite_runs():
+    """Test the micro suite covers every registry size."""
+    results = micro_benchmarks(sizes=[2, 20], min_time=0, repeat=1, concurrency=2)
+    names = {result['name'] for result in results}
+    
+    assert {'micro.send_request', 'micro.send_request.c2', 'micro.list_servers[20]',
+            'micro.get_metrics[2]', 'micro.catalog_load_cached[20]',
+            'micro.json_decode[screenshot]'} <= names
+    assert all(result['throughput'] > 0 for result in results)
@@ -0,0 +1,157 @@
+"""Unit tests for traffic capture and replay."""
+
+import sys
+import os
+import json
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.capture import TrafficCapture, load_capture
+from api_gateway.loadgen import GatewayTarget
+from api_gateway.replay import replay
+from contracts.transport_stub import TransportStub
+
+
+def _gateway(tmp_path, capture):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': server_id, 'transport': {'type': 'http'}, 'config': {'port': 3000 + n}}
+        for n, server_id in enumerate(['alpha', 'beta'])
+    ]}))
+    gateway = APIGateway(TransportStub(), options={
+        'catalog_path': str(catalog), 'registry_cache': False, 'transport_catalog_path': False,
+        'capture': capture
+    })
+    gateway.start_server('alpha')
+    return gateway
+
+
+def _request(request_id, method='tools/list'):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method}
+
+
+class FakeTarget:
+    """Target that answers at once and remembers when each request came."""
+    
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, server_id, message):
+        self.sent.append((time.perf_counter(), server_id, message))
+        return {"jsonrpc": "2.0", "id": message['id'], "result": {}}
+
+
+def test_gateway_captures_requests(tmp_path):
+    """Answered requests are written with their server, timing and outcome."""
+    path = tmp_path / 'capture.jsonl'
+    gateway = _gateway(tmp_path, {'path': str(path), 'responses': True})
+    gateway.send_request('alpha', _request(1), api_key='secret-key')
+    gateway.send_request('beta', _request(2, 'ping'))
+    assert gateway.get_metrics()['capture']['pending'] == 2
+    gateway.close()
+    
+    assert 'secret-key' not in path.read_text()
+    header, records = load_capture(str(path))
+    assert header['version'] == 1 and header['sampleRate'] == 1.0
+    assert [(r['server'], r['request']['id']) for r in records] == [('alpha', 1), ('beta', 2)]
+    assert records[0]['error'] is None and records[0]['latencyMs'] >= 0
+    assert records[0]['t'] <= records[1]['t']
+    assert records[0]['responseBytes'] == len(json.dumps(records[0]['response'],
+                                                         separators=(',', ':')))
+    assert 'response' in records[1]
+
+
+def test_capture_sampling_and_limits(tmp_path):
+    """Unsampled requests are skipped; a full buffer or file drops the rest."""
+    capture = TrafficCapture(str(tmp_path / 'none.jsonl'), sample_rate=0.0)
+    capture.record('alpha', _request(1), {"result": {}}, time.monotonic(), 0.001)
+    capture.close()
+    assert load_capture(capture.path)[1] == []
+    
+    capture = TrafficCapture(str(tmp_path / 'small.jsonl'), buffer_size=2, max_bytes=1)
+    for request_id in range(3):
+        capture.record('alpha', _request(request_id), {"result": {}}, time.monotonic(), 0.001)
+    capture.flush()
+    capture.record('alpha', _request(9), {"result": {}}, time.monotonic(), 0.001)
+    capture.close()
+    stats = capture.get_stats()
+    assert (stats['captured'], stats['dropped'], stats['full']) == (2, 2, True)
+
+
+def test_capture_keeps_requests_as_recorded(tmp_path):
+    """Later changes to a request, bad messages and late records are not written."""
+    capture = TrafficCapture(str(tmp_path / 'capture.jsonl'))
+    request = _request(1)
+    capture.record('alpha', request, {"result": {}}, time.monotonic(), 0.001)
+    request['method'] = 'changed'
+    
+    circular = {"result": {}}
+    circular['result']['self'] = circular
+    capture.record('alpha', circular, {"result": {}}, time.monotonic(), 0.001)
+    capture.record('alpha', _request(2), circular, time.monotonic(), 0.001)
+    capture.close()
+    capture.record('alpha', _request(3), {"result": {}}, time.monotonic(), 0.001)
+    capture.flush()
+    
+    _, records = load_capture(capture.path)
+    assert [record['request'] for record in records] == [_request(1)]
+    stats = capture.get_stats()
+    assert (stats['captured'], stats['dropped'], stats['closed']) == (1, 3, True)
+
+
+def test_load_capture_joins_sessions(tmp_path):
+    """Later sessions continue after earlier ones; torn lines are skipped."""
+    path = tmp_path / 'capture.jsonl'
+    for _ in range(2):
+        capture = TrafficCapture(str(path))
+        capture.record('alpha', _request(1), {"result": {}}, capture._origin + 0.5, 0.001)
+        capture.close()
+    with open(path, 'a') as f:
+        f.write('{"t": 9, "server": "alp')
+    
+    _, records = load_capture(str(path))
+    assert [record['t'] for record in records] == [0.5, 1.0]
+
+
+def test_replay_keeps_spacing():
+    """Requests are re-sent with their captured spacing, divided by the speed."""
+    records = [{'t': 10.0, 'server': 'alpha', 'request': _request(1), 'latencyMs': 1.0,
+                'error': None},
+               {'t': 10.2, 'server': 'alpha', 'request': _request(2), 'latencyMs': 3.0,
+                'error': 0}]
+    for speed, gap in ((1.0, 0.2), (4.0, 0.05)):
+        target = FakeTarget()
+        report = replay(target, records, speed=speed)
+        assert [message['id'] for _, _, message in target.sent] == [1, 2]
+        assert target.sent[1][0] - target.sent[0][0] == pytest.approx(gap, abs=0.04)
+    
+    assert report['replayed'] == 2 and report['unfinished'] == 0
+    assert report['outcome_changes'] == {'error->ok': 1}
+    assert report['latency_ms']['captured']['max'] == pytest.approx(3.0, rel=0.05)
+    assert report['operations']['alpha tools/list']['requests'] == 2
+
+
+def test_capture_and_replay_round_trip(tmp_path):
+    """Captured traffic replays against a gateway with the same outcomes."""
+    path = tmp_path / 'capture.jsonl'
+    gateway = _gateway(tmp_path, False)
+    assert gateway.start_capture({'path': str(path), 'responses': True})['captured'] == 0
+    for request_id in range(5):
+        gateway.send_request('alpha', _request(request_id))
+    gateway.send_request('alpha', _request(5, 'tools/call'))
+    assert gateway.stop_capture()['captured'] == 6
+    assert gateway.get_metrics()['capture'] is None
+    
+    _, records = load_capture(str(path))
+    report = replay(GatewayTarget(gateway), records, speed=0)
+    gateway.close()
+    
+    assert report['replayed'] == 6 and report['errors'] == 0
+    assert report['outcome_changes'] == {}
+    assert report['responses_compared'] == 6
+    assert set(report['operations']) == {'alpha tools/list', 'alpha tools/call'}
+    assert set(report['latency_ms']['diff']) == {'mean', 'p50', 'p90', 'p99', 'p999', 'max'}
@@ -0,0 +1,151 @@
+"""Unit tests for hot reloading the server catalog."""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.catalog_watcher import CatalogWatcher
+from contracts.transport_stub import TransportStub
+
+
+def _write_catalog(path, servers):
+    path.write_text(json.dumps({'version': '2.0', 'servers': servers}))
+    # Make each write visible even within one mtime tick
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def _server(server_id, port=3000, **extra):
+    return {'id': server_id, 'config': {'port': port}, **extra}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'catalog.json'
+    _write_catalog(path, [_server('alpha'), _server('beta', 3001), _server('gamma', 3002)])
+    return path
+
+
+def _gateway(catalog, **options):
+    return APIGateway(TransportStub(), options={
+        'catalog_path': str(catalog), 'registry_cache': False, **options
+    })
+
+
+def test_reload_applies_only_the_diff(catalog):
+    """Test unchanged running servers keep their connection."""
+    gateway = _gateway(catalog)
+    gateway.start_server('alpha')
+    gateway.start_server('beta')
+    alpha_connection = gateway.servers['alpha']['connectionId']
+    
+    _write_catalog(catalog, [_server('alpha'), _server('beta', 3005), _server('delta', 3003)])
+    result = gateway.reload_catalog()
+    
+    assert result == {'added': ['delta'], 'changed': ['beta'], 'removed': ['gamma']}
+    assert gateway.servers['alpha']['connectionId'] == alpha_connection
+    assert gateway.servers['delta']['status'] == 'stopped'
+    assert 'gamma' not in gateway.servers
+    assert gateway.reload_catalog() == {'added': [], 'changed': [], 'removed': []}
+
+
+def test_changed_running_server_is_restarted_replica_by_replica(catalog):
+    """Test a changed server switches to new replicas and drains the old ones."""
+    gateway = _gateway(catalog)
+    gateway.start_server('beta')
+    old_connection = gateway.servers['beta']['connectionId']
+    
+    _write_catalog(catalog, [_server('alpha'), _server('beta', 3005), _server('gamma', 3002)])
+    gateway.reload_catalog()
+    
+    server = gateway.servers['beta']
+    assert server['status'] == 'running'
+    assert server['config']['config']['port'] == 3005
+    assert server['connectionId'] != old_connection
+    assert old_connection not in gateway.connections
+    assert gateway.transport.connections[server['connectionId']]['config']['url'] == (
+        'http://localhost:3005'
+    )
+    response = gateway.send_request('beta', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    assert 'result' in response
+
+
+def test_busy_replicas_drain_before_stopping(catalog):
+    """Test replicas with requests in flight are stopped only once idle."""
+    gateway = _gateway(catalog)
+    gateway.start_server('gamma')
+    replica = gateway._pool_for('gamma').replicas[0]
+    replica.in_flight = 1
+    
+    _write_catalog(catalog, [_server('alpha'), _server('beta', 3001)])
+    gateway.reload_catalog()
+    
+    assert replica.connection_id in gateway.connections
+    response = gateway.send_request('gamma', {"jsonrpc": "2.0", "method": "ping", "id": 1})
+    assert response['error']['code'] == -32001
+    
+    replica.in_flight = 0
+    assert gateway.stop_drained_replicas() == 1
+    assert replica.connection_id not in gateway.connections
+
+
+def test_servers_added_at_runtime_are_kept(catalog):
+    """Test reloads only remove servers that came from the catalog."""
+    gateway = _gateway(catalog)
+    gateway.servers['local'] = {
+        'config': {'id': 'local'}, 'status': 'stopped', 'transport': 'http',
+        'connectionId': None, 'processId': None
+    }
+    
+    _write_catalog(catalog, [_server('alpha')])
+    
+    assert gateway.reload_catalog()['removed'] == ['beta', 'gamma']
+    assert 'local' in gateway.servers
+
+
+def test_watcher_reloads_after_change(catalog):
+    """Test the polling watcher runs its callback once per change."""
+    calls = []
+    watcher = CatalogWatcher(str(catalog), lambda: calls.append(1), use_inotify=False)
+    
+    assert watcher.check() is False
+    _write_catalog(catalog, [_server('alpha')])
+    assert watcher.check() is True
+    assert watcher.check() is False
+    assert calls == [1]
+
+
+def test_watcher_retries_failed_reloads(catalog):
+    """Test a change is handled again after the callback fails."""
+    calls = []
+    
+    def on_change():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError('half written')
+    
+    watcher = CatalogWatcher(str(catalog), on_change, use_inotify=False)
+    _write_catalog(catalog, [_server('alpha')])
+    
+    with pytest.raises(ValueError):
+        watcher.check()
+    assert watcher.check() is True
+    assert len(calls) == 2
+
+
+def test_gateway_watches_catalog(catalog):
+    """Test the watch_catalog option starts and stops a watcher."""
+    gateway = _gateway(catalog, watch_catalog=True, catalog_poll_interval='1h')
+    try:
+        assert gateway._catalog_watcher.running
+        _write_catalog(catalog, [_server('alpha')])
+        assert gateway._catalog_watcher.check() is True
+        assert list(gateway.servers) == ['alpha']
+    finally:
+        gateway.close()
+    assert not gateway._catalog_watcher.running
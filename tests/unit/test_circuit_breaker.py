@@ -0,0 +1,206 @@
+"""Unit tests for the per-server circuit breaker."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.circuit_breaker import CircuitBreaker, CircuitOpenError
+from contracts.transport_stub import TransportStub
+from gateway_helpers import FakeClock
+
+
+class FlakyTransport(TransportStub):
+    """Transport stub that raises while ``failing`` is set."""
+    
+    def __init__(self):
+        super().__init__()
+        self.failing = True
+        self.calls = 0
+    
+    def send_message(self, connection_id, message):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("connection reset")
+        return super().send_message(connection_id, message)
+
+
+def test_trips_on_failure_rate():
+    """Test the breaker opens once the failure rate reaches the threshold."""
+    breaker = CircuitBreaker(window_size=10, min_calls=4, failure_rate=0.5)
+    
+    breaker.record_success(0.01)
+    breaker.record_failure()
+    breaker.record_success(0.01)
+    assert breaker.state == 'closed'
+    
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_trips_on_slow_calls():
+    """Test the breaker opens when too many calls exceed the latency threshold."""
+    breaker = CircuitBreaker(min_calls=3, slow_call_threshold=1.0, slow_call_rate=0.6)
+    
+    breaker.record_success(0.1)
+    breaker.record_success(2.0)
+    breaker.record_success(3.0)
+    
+    assert breaker.state == 'open'
+
+
+def test_old_outcomes_leave_the_window():
+    """Test only the most recent calls count toward the failure rate."""
+    breaker = CircuitBreaker(window_size=4, min_calls=4, failure_rate=0.75)
+    
+    for _ in range(2):
+        breaker.record_failure()
+    for _ in range(4):
+        breaker.record_success(0.01)
+    breaker.record_failure()
+    breaker.record_failure()
+    
+    assert breaker.state == 'closed'
+    assert breaker.get_stats()['failure_rate'] == 0.5
+
+
+def test_half_open_probes_close_the_circuit():
+    """Test successful probes after the open period close the circuit."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_duration=30, half_open_probes=2, clock=clock)
+    breaker.record_failure()
+    
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.allow()
+    assert exc.value.retry_after == 30
+    
+    clock.now += 30
+    assert breaker.state == 'half_open'
+    
+    breaker.allow()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    
+    breaker.record_success(0.01)
+    breaker.record_success(0.01)
+    assert breaker.state == 'closed'
+    breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    """Test a failing probe sends the circuit back to open."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_duration=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    
+    breaker.allow()
+    breaker.record_failure()
+    
+    assert breaker.state == 'open'
+    assert breaker.get_stats()['times_opened'] == 2
+
+
+def test_cancelled_probe_frees_its_slot():
+    """Test a probe rejected before reaching the server can be retried."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_duration=10, half_open_probes=1, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    
+    breaker.allow()
+    breaker.cancel()
+    breaker.allow()
+
+
+def test_disabled_from_config():
+    """Test a catalog entry can disable its breaker."""
+    assert CircuitBreaker.from_config({'enabled': False}) is None
+    assert CircuitBreaker.from_config(False, {'minCalls': 5}) is None
+    assert CircuitBreaker.from_config({'enabled': False}, {'minCalls': 5}) is None
+    
+    breaker = CircuitBreaker.from_config(
+        {'failureRate': 0.25, 'openDuration': '1m'}, {'minCalls': 5}
+    )
+    assert breaker.failure_rate == 0.25
+    assert breaker.open_duration == 60
+    assert breaker.min_calls == 5
+
+
+def test_gateway_fails_fast_when_open():
+    """Test the gateway stops forwarding to a failing server."""
+    transport = FlakyTransport()
+    gateway = APIGateway(transport, options={'circuit_breaker': {'minCalls': 3}})
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'running',
+        'transport': 'http',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    
+    for i in range(3):
+        response = gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "x", "id": i})
+        assert response['error']['code'] == -32603
+    
+    response = gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "x", "id": 9})
+    
+    assert response['id'] == 9
+    assert response['error']['code'] == -32004
+    assert response['error']['data']['retryAfter'] > 0
+    assert transport.calls == 3
+    
+    info = gateway.get_server_info('test-server')
+    assert info['circuitBreaker']['state'] == 'open'
+    assert info['circuitBreaker']['rejected'] == 1
+
+
+def test_off_unless_configured():
+    """Test servers get a breaker only when the catalog or gateway asks for one."""
+    assert CircuitBreaker.from_config(None) is None
+    assert CircuitBreaker.from_config(None, {}) is None
+    assert CircuitBreaker.from_config({}) is not None
+    assert CircuitBreaker.from_config(True).min_calls == 10
+    assert CircuitBreaker.from_config(None, True) is not None
+    
+    transport = FlakyTransport()
+    gateway = APIGateway(transport)
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'running',
+        'transport': 'http',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    for i in range(12):
+        response = gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "x", "id": i})
+        assert response['error']['code'] == -32603
+    assert transport.calls == 12
+    
+    gateway.servers['other-server'] = dict(gateway.servers['test-server'], config={
+        'id': 'other-server', 'circuitBreaker': {'minCalls': 2}
+    })
+    for i in range(3):
+        gateway.send_request('other-server', {"jsonrpc": "2.0", "method": "x", "id": i})
+    assert transport.calls == 14
+    assert gateway.get_server_info('other-server')['circuitBreaker']['state'] == 'open'
+
+
+def test_server_info_reports_closed_breaker_by_default():
+    """Test breaker state is visible before any traffic."""
+    gateway = APIGateway()
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'stopped',
+        'transport': 'http',
+        'connectionId': None,
+        'processId': None
+    }
+    
+    assert gateway.get_server_info('test-server')['circuitBreaker']['state'] == 'closed'
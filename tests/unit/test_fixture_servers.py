@@ -0,0 +1,165 @@
+"""Unit tests for the stand-in MCP servers in tests/fixtures."""
+
+import sys
+import os
+import base64
+import json
+import random
+import socket
+import struct
+import subprocess
+import urllib.request
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'fixtures'))
+
+import pytest
+
+from mcp_servers import (INJECTED_ERROR, Behavior, Latency, MCPHandler, start_server,
+                         stdio_config)
+
+
+def _call(message_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": message_id, "method": "tools/call",
+            "params": {"name": name, "arguments": arguments}}
+
+
+def _post(url, message, accept='application/json'):
+    request = urllib.request.Request(url, data=json.dumps(message).encode(),
+                                     headers={'Content-Type': 'application/json',
+                                              'Accept': accept})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, response.headers['Content-Type'], response.read().decode()
+
+
+def _events(body):
+    return [json.loads(line[6:]) for line in body.splitlines() if line.startswith('data: {')]
+
+
+class _WebSocketClient:
+    """Just enough of a WebSocket client to talk to the fixture server."""
+    
+    def __init__(self, url):
+        host, port = url[len('ws://'):].split(':')
+        self.sock = socket.create_connection((host, int(port)), timeout=10)
+        self.sock.sendall(b"GET / HTTP/1.1\r\nHost: fixture\r\nUpgrade: websocket\r\n"
+                          b"Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n"
+                          b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n")
+        self.stream = self.sock.makefile('rb')
+        assert b'101' in self.stream.readline()
+        while self.stream.readline() != b'\r\n':
+            pass
+    
+    def send(self, message):
+        payload = json.dumps(message).encode()
+        mask = os.urandom(4)
+        masked = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+        self.sock.sendall(struct.pack('!BBQ', 0x81, 0x80 | 127, len(payload)) + mask + masked)
+    
+    def receive(self):
+        head = self.stream.read(2)
+        length = head[1] & 0x7F
+        if length >= 126:
+            length = int.from_bytes(self.stream.read(2 if length == 126 else 8), 'big')
+        return json.loads(self.stream.read(length))
+    
+    def close(self):
+        self.sock.close()
+
+
+def test_latency_specs():
+    """Test every latency distribution parses and samples sensibly."""
+    rng = random.Random(1)
+    assert Latency('5ms').sample(rng) == pytest.approx(0.005)
+    assert Latency(0).sample(rng) == 0
+    assert 0.001 <= Latency('uniform:1ms:10ms').sample(rng) <= 0.010
+    assert Latency('pareto:5ms:1.5').sample(rng) >= 0.005
+    for spec in ('normal:10ms:2ms', 'exponential:10ms', 'lognormal:10ms:0.5', '250us'):
+        assert Latency(spec).sample(rng) >= 0
+    with pytest.raises(ValueError):
+        Latency('uniform:1ms')
+
+
+def test_handler_answers_mcp_methods():
+    """Test initialize, tools/list, tools/call and unknown methods."""
+    handler = MCPHandler(Behavior(tools=5, response_size='1k'))
+    
+    initialized = handler.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                                  "params": {"protocolVersion": "2025-03-26"}})
+    assert initialized['result']['protocolVersion'] == '2025-03-26'
+    tools = handler.handle({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})['result']['tools']
+    assert [tool['name'] for tool in tools] == ['echo', 'screenshot', 'fail', 'tool_3', 'tool_4']
+    
+    content = handler.handle(_call(3, 'echo', text='hi'))['result']['content']
+    assert content[0] == {"type": "text", "text": "hi"}
+    assert len(content[1]['data']) == 1024
+    base64.b64decode(content[1]['data'], validate=True)
+    assert handler.handle(_call(4, 'fail'))['result']['isError'] is True
+    assert handler.handle(_call(5, 'nope'))['error']['code'] == -32602
+    assert handler.handle({"jsonrpc": "2.0", "id": 6, "method": "x"})['error']['code'] == -32601
+    assert handler.handle({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+
+
+def test_handler_injects_errors_and_notifications():
+    """Test error rate and progress bursts apply to tool calls."""
+    handler = MCPHandler(Behavior(error_rate=1.0, notifications=3))
+    sent = []
+    
+    response = handler.handle(_call(7, 'echo'), sent.append)
+    
+    assert response['error']['code'] == INJECTED_ERROR
+    assert [note['params']['progress'] for note in sent] == [1, 2, 3]
+    assert sent[0]['params']['progressToken'] == 7
+    assert handler.handle({"jsonrpc": "2.0", "id": 8, "method": "ping"})['result'] == {}
+    assert handler.get_stats() == {"requests": 2, "errors": 1, "notifications": 3}
+
+
+def test_stdio_server():
+    """Test the stdio server answers every request and sends notifications."""
+    config = stdio_config(Behavior(notifications=2, latency='1ms'))
+    requests = [_call(1, 'echo', text='a'), {"jsonrpc": "2.0", "method": "notifications/x"},
+                {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}]
+    
+    process = subprocess.run([config['command']] + config['args'],
+                             input=''.join(json.dumps(r) + '\n' for r in requests),
+                             capture_output=True, text=True, timeout=30,
+                             env={**os.environ, **config['env']})
+    
+    messages = [json.loads(line) for line in process.stdout.splitlines()]
+    assert sorted(m['id'] for m in messages if 'id' in m) == [1, 2]
+    assert sum(m.get('method') == 'notifications/progress' for m in messages) == 2
+
+
+def test_http_and_sse_servers():
+    """Test JSON responses, streamed responses and the /sse notification stream."""
+    with start_server('sse', Behavior(notifications=2)) as server:
+        stream = urllib.request.urlopen(server.url + '/sse', timeout=10)
+        assert stream.readline() == b'event: endpoint\n'
+        
+        status, content_type, body = _post(server.url + '/message', _call(1, 'echo', text='x'))
+        assert status == 200 and content_type == 'application/json'
+        assert json.loads(body)['result']['content'][0]['text'] == 'x'
+        broadcast = [stream.readline() for _ in range(7)]
+        assert sum(line.startswith(b'data: {') for line in broadcast) == 2
+        stream.close()
+        
+        status, content_type, body = _post(server.url, _call(2, 'echo'),
+                                           accept='application/json, text/event-stream')
+        assert content_type == 'text/event-stream'
+        events = _events(body)
+        assert [e.get('method') for e in events] == ['notifications/progress'] * 2 + [None]
+        assert events[-1]['id'] == 2
+        
+        assert server.connection_config()['sseEndpoint'] == '/sse'
+
+
+def test_websocket_server_sends_large_blobs():
+    """Test multi-megabyte screenshots over the WebSocket server."""
+    with start_server('websocket', Behavior(notifications=1)) as server:
+        client = _WebSocketClient(server.url)
+        try:
+            client.send(_call(1, 'screenshot', size=3 * 1024 * 1024))
+            assert client.receive()['method'] == 'notifications/progress'
+            response = client.receive()
+        finally:
+            client.close()
+    
+    assert len(response['result']['content'][0]['data']) == 3 * 1024 * 1024
@@ -0,0 +1,192 @@
+"""Unit tests for on-demand server lifecycle in the API Gateway."""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from api_gateway import APIGateway
+from api_gateway.utils import parse_duration
+from contracts.transport_stub import TransportStub
+
+
+class SlowStartTransport(TransportStub):
+    """Transport stub whose connections take a while to come up."""
+    
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.created = 0
+    
+    def create_connection(self, config):
+        self.created += 1
+        time.sleep(self.delay)
+        return super().create_connection(config)
+
+
+def _add_server(gateway, server_id='lazy-server', lifecycle=None):
+    if lifecycle is None:
+        lifecycle = {'onDemand': True}
+    gateway.servers[server_id] = {
+        'config': {'id': server_id, 'lifecycle': lifecycle},
+        'status': 'stopped',
+        'transport': 'http',
+        'connectionId': None,
+        'processId': None
+    }
+
+
+def test_parse_duration():
+    """Test parsing of catalog duration strings."""
+    assert parse_duration('30s') == 30
+    assert parse_duration('10m') == 600
+    assert parse_duration('1h') == 3600
+    assert parse_duration('250ms') == 0.25
+    assert parse_duration(5) == 5.0
+    assert parse_duration('soon', 7) == 7
+    assert parse_duration(None) is None
+
+
+def test_request_starts_on_demand_server():
+    """Test the first request to a stopped on-demand server starts it."""
+    gateway = APIGateway(TransportStub())
+    _add_server(gateway)
+    
+    request = {"jsonrpc": "2.0", "method": "tools/list", "id": 7}
+    response = gateway.send_request('lazy-server', request)
+    
+    assert response['id'] == 7
+    assert 'result' in response
+    assert gateway.servers['lazy-server']['status'] == 'running'
+    gateway.close()
+
+
+def test_request_to_stopped_server_without_on_demand():
+    """Test servers not marked on-demand still reject requests when stopped."""
+    gateway = APIGateway(TransportStub())
+    _add_server(gateway, lifecycle={})
+    
+    response = gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 1})
+    
+    assert response['error']['code'] == -32002
+    assert gateway.servers['lazy-server']['status'] == 'stopped'
+
+
+def test_gateway_wide_on_demand_option():
+    """Test the on_demand option applies to servers without lifecycle config."""
+    gateway = APIGateway(TransportStub(), options={'on_demand': True})
+    _add_server(gateway, lifecycle={})
+    
+    response = gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 1})
+    
+    assert 'result' in response
+    gateway.close()
+
+
+def test_concurrent_first_requests_share_one_start():
+    """Test concurrent callers queue behind a single start."""
+    transport = SlowStartTransport()
+    gateway = APIGateway(transport)
+    _add_server(gateway)
+    
+    responses = []
+    
+    def call(i):
+        responses.append(gateway.send_request(
+            'lazy-server', {"jsonrpc": "2.0", "method": "tools/list", "id": i}
+        ))
+    
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert transport.created == 1
+    assert len(responses) == 8
+    assert all('result' in r for r in responses)
+    gateway.close()
+
+
+def test_reap_idle_servers():
+    """Test idle on-demand servers are stopped after their quiet period."""
+    gateway = APIGateway(TransportStub())
+    _add_server(gateway, lifecycle={'onDemand': True, 'idleTimeout': '30s'})
+    _add_server(gateway, 'always-on', lifecycle={})
+    gateway.start_server('always-on')
+    
+    gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 1})
+    now = time.monotonic()
+    
+    assert gateway.reap_idle_servers(now=now + 5) == []
+    assert gateway.reap_idle_servers(now=now + 31) == ['lazy-server']
+    assert gateway.servers['lazy-server']['status'] == 'stopped'
+    assert gateway.servers['always-on']['status'] == 'running'
+    gateway.close()
+
+
+def test_reap_skips_servers_with_requests_in_flight():
+    """Test the reaper never stops a server that is serving a request."""
+    gateway = APIGateway(TransportStub())
+    _add_server(gateway, lifecycle={'onDemand': True, 'idleTimeout': '1s'})
+    gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 1})
+    
+    gateway._in_flight['lazy-server'] = 1
+    assert gateway.reap_idle_servers(now=time.monotonic() + 60) == []
+    
+    gateway._in_flight['lazy-server'] = 0
+    assert gateway.reap_idle_servers(now=time.monotonic() + 60) == ['lazy-server']
+    gateway.close()
+
+
+def test_explicitly_started_on_demand_server_is_reaped():
+    """Test a server started by hand idles out like one started by a request."""
+    gateway = APIGateway(TransportStub(), options={'on_demand': True, 'idle_timeout': '1s'})
+    assert gateway._reaper.running
+    _add_server(gateway, lifecycle={})
+    
+    assert gateway.start_server('lazy-server')['success']
+    assert gateway.reap_idle_servers(now=time.monotonic() + 3600) == ['lazy-server']
+    gateway.close()
+
+
+class SlowCloseTransport(TransportStub):
+    """Transport stub whose connections take a while to close."""
+    
+    def __init__(self):
+        super().__init__()
+        self.closing = threading.Event()
+        self.release = threading.Event()
+    
+    def close_connection(self, connection_id):
+        self.closing.set()
+        self.release.wait(5)
+        return super().close_connection(connection_id)
+
+
+def test_reaper_stops_servers_outside_the_lock():
+    """Test other servers keep serving while an idle one is being stopped."""
+    transport = SlowCloseTransport()
+    gateway = APIGateway(transport)
+    _add_server(gateway, lifecycle={'onDemand': True, 'idleTimeout': '1s'})
+    _add_server(gateway, 'always-on', lifecycle={})
+    gateway.start_server('always-on')
+    gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 1})
+    
+    reaped = []
+    reaper = threading.Thread(target=lambda: reaped.extend(
+        gateway.reap_idle_servers(now=time.monotonic() + 60)))
+    reaper.start()
+    assert transport.closing.wait(5)
+    
+    response = gateway.send_request('always-on', {"jsonrpc": "2.0", "method": "x", "id": 2})
+    assert 'result' in response
+    response = gateway.send_request('lazy-server', {"jsonrpc": "2.0", "method": "x", "id": 3})
+    assert response['error']['code'] == -32002
+    
+    transport.release.set()
+    reaper.join()
+    assert reaped == ['lazy-server']
+    gateway.close()
@@ -0,0 +1,199 @@
+"""Unit tests for hedged requests."""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from api_gateway import APIGateway
+from api_gateway.hedging import HedgePolicy, LatencyWindow
+from contracts.transport_stub import TransportStub
+from gateway_helpers import add_server, wait_for
+
+
+class SlowTransport(TransportStub):
+    """Transport stub with a configurable delay per connection."""
+    
+    def __init__(self):
+        super().__init__()
+        self.delays = {}
+        self.sent = []
+        self.lock = threading.Lock()
+    
+    def send_message(self, connection_id, message):
+        with self.lock:
+            self.sent.append((connection_id, message))
+        time.sleep(self.delays.get(connection_id, 0))
+        return super().send_message(connection_id, message)
+    
+    def sent_methods(self, connection_id):
+        with self.lock:
+            return [m['method'] for c, m in self.sent if c == connection_id]
+
+
+def _gateway(hedging, replicas=2, limits=None, options=None):
+    transport = SlowTransport()
+    gateway = APIGateway(transport, options={'hedging': hedging, **(options or {})})
+    add_server(gateway, {'replicas': replicas}, transport='http', limits=limits)
+    gateway.start_server('test-server')
+    return gateway, transport
+
+
+def test_latency_window_quantile():
+    """Test quantiles come from the most recent samples only."""
+    window = LatencyWindow(size=100)
+    for i in range(200):
+        window.record(float(i))
+    
+    assert len(window) == 100
+    assert window.quantile(0.0) == 100.0
+    assert window.quantile(0.95) == 195.0
+    assert window.quantile(1.0) == 199.0
+
+
+def test_from_config():
+    """Test methods may be listed or configured individually."""
+    assert HedgePolicy.from_config({}) is None
+    
+    policy = HedgePolicy.from_config({'methods': ['tools/list']}, {'budget': 0.1})
+    assert policy.methods == {'tools/list': {}}
+    assert policy.budget == 0.1
+    
+    policy = HedgePolicy.from_config({'methods': {
+        'resources/read': {'quantile': 0.9},
+        'tools/list': {'enabled': False}
+    }})
+    assert list(policy.methods) == ['resources/read']
+
+
+def test_delay_waits_for_enough_samples():
+    """Test quantile-based hedging starts once the window has data."""
+    policy = HedgePolicy({'tools/list': {}}, min_samples=10)
+    for _ in range(9):
+        policy.record('tools/list', 0.01)
+    assert policy.delay('tools/list') is None
+    
+    policy.record('tools/list', 0.5)
+    assert policy.delay('tools/list') == 0.5
+    
+    fixed = HedgePolicy({'tools/list': {'delay': '200ms'}})
+    assert fixed.delay('tools/list') == 0.2
+
+
+def test_budget_caps_hedges():
+    """Test hedges cannot exceed the budgeted share of requests."""
+    policy = HedgePolicy({'tools/list': {}}, budget=0.25)
+    
+    allowed = 0
+    for _ in range(40):
+        policy.count_request()
+        allowed += policy.try_hedge()
+    
+    assert allowed == 10
+    assert policy.get_stats()['budget_exhausted'] == 30
+
+
+def test_slow_replica_is_hedged_and_cancelled():
+    """Test a stalled read is answered by the hedge on another replica."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '20ms'}}, 'budget': 1.0})
+    primary, second = [r['connectionId'] for r in gateway.get_server_info('test-server')['replicas']]
+    transport.delays[primary] = 1.0
+    
+    started = time.monotonic()
+    response = gateway.send_request(
+        'test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 7}
+    )
+    
+    assert time.monotonic() - started < 0.5
+    assert response['id'] == 7
+    assert response['result']['connection'] == second
+    wait_for(lambda: 'notifications/cancelled' in transport.sent_methods(primary))
+    cancel = [m for c, m in transport.sent if m['method'] == 'notifications/cancelled'][0]
+    assert cancel['params']['requestId'] == 7
+    
+    stats = gateway.get_metrics()['hedging']['test-server']
+    assert stats['hedged'] == 1
+    assert stats['hedge_wins'] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    """Test requests answered before the delay are sent once."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '500ms'}}, 'budget': 1.0})
+    
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 1})
+    
+    assert len(transport.sent) == 1
+    assert gateway.get_metrics()['hedging']['test-server']['hedged'] == 0
+
+
+def test_exhausted_budget_waits_for_primary():
+    """Test no hedge is sent without budget."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '10ms'}}, 'budget': 0.01})
+    primary = gateway.get_server_info('test-server')['replicas'][0]['connectionId']
+    transport.delays[primary] = 0.1
+    
+    response = gateway.send_request(
+        'test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 1}
+    )
+    
+    assert response['result']['connection'] == primary
+    assert len(transport.sent) == 1
+    assert gateway.get_metrics()['hedging']['test-server']['budget_exhausted'] == 1
+
+
+def test_only_configured_methods_and_pools_are_hedged():
+    """Test writes and single-replica servers are never duplicated."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '1ms'}}, 'budget': 1.0})
+    transport.delays = {conn: 0.05 for conn in gateway.connections}
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": 1})
+    assert len(transport.sent) == 1
+    
+    single, single_transport = _gateway(
+        {'methods': {'resources/read': {'delay': '1ms'}}, 'budget': 1.0}, replicas=1
+    )
+    single_transport.delays = {conn: 0.05 for conn in single.connections}
+    single.send_request('test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 1})
+    assert len(single_transport.sent) == 1
+
+
+def test_hedge_needs_a_free_admission_slot():
+    """Test a hedge is skipped when the server has no slot to spare."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '10ms'}}, 'budget': 1.0},
+                                  limits={'maxConcurrency': 1})
+    primary = gateway.get_server_info('test-server')['replicas'][0]['connectionId']
+    transport.delays[primary] = 0.1
+    admission = gateway._admission_for('test-server')
+    admission.acquire()
+    
+    response = gateway.send_request(
+        'test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 1}
+    )
+    
+    assert response['result']['connection'] == primary
+    assert len(transport.sent) == 1
+    admission.release()
+    
+    transport.delays = {conn: 0.1 for conn in gateway.connections}
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 2})
+    
+    assert [m['id'] for c, m in transport.sent if m['method'] == 'resources/read'] == [1, 2, 2]
+    assert gateway.get_metrics()['hedging']['test-server']['hedged'] == 1
+    wait_for(lambda: admission.active == 0)
+
+
+def test_busy_hedge_workers_send_reads_once():
+    """Test reads are not hedged while the shared workers are all busy."""
+    gateway, transport = _gateway({'methods': {'resources/read': {'delay': '10ms'}}, 'budget': 1.0},
+                                  options={'hedge_workers': 1})
+    primary = gateway.get_server_info('test-server')['replicas'][0]['connectionId']
+    transport.delays[primary] = 0.1
+    
+    response = gateway.send_request(
+        'test-server', {"jsonrpc": "2.0", "method": "resources/read", "id": 1}
+    )
+    
+    assert response['result']['connection'] == primary
+    assert len(transport.sent) == 1
+    assert gateway.get_metrics()['hedging']['test-server']['hedged'] == 0
@@ -0,0 +1,134 @@
+"""Unit tests for the gateway load generator."""
+
+import sys
+import os
+import json
+import socket
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'fixtures'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.loadgen import (GatewayTarget, HTTPTarget, LoadGenerator, classify,
+                                 compare_reports, parse_mix)
+from api_gateway.metrics import LatencyHistogram
+from contracts.transport_stub import TransportStub
+from mcp_servers import Behavior, start_server
+
+
+@pytest.fixture
+def gateway(tmp_path):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': 'alpha', 'transport': {'type': 'http'}, 'config': {'port': 3000}}
+    ]}))
+    gateway = APIGateway(TransportStub(), options={
+        'catalog_path': str(catalog), 'registry_cache': False, 'transport_catalog_path': False
+    })
+    gateway.start_server('alpha')
+    yield gateway
+    gateway.close()
+
+
+def test_parse_mix(tmp_path):
+    """Mix specs give weighted operations with tools and servers."""
+    operations = parse_mix('tools/call:echo=8, tools/list@beta=2', server='alpha')
+    assert [(op.name, op.server, op.weight) for op in operations] == [
+        ('tools/call:echo', 'alpha', 8.0), ('tools/list', 'beta', 2.0)]
+    assert operations[0].message(7) == {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+                                        "params": {"name": "echo", "arguments": {}}}
+    
+    mix_file = tmp_path / 'mix.json'
+    mix_file.write_text(json.dumps([{'method': 'tools/call', 'tool': 'echo',
+                                     'arguments': {'text': 'hi'}, 'name': 'say-hi'}]))
+    [operation] = parse_mix(str(mix_file), server='alpha')
+    assert operation.name == 'say-hi'
+    assert operation.params == {"name": "echo", "arguments": {"text": "hi"}}
+    
+    with pytest.raises(ValueError):
+        parse_mix('tools/list:echo')
+    with pytest.raises(ValueError):
+        parse_mix('tools/list=0')
+
+
+def test_corrected_histogram_fills_in_stalls():
+    """A stall is joined by the requests a waiting caller never sent."""
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.record(0.001)
+    histogram.record(0.1)
+    
+    corrected = histogram.corrected(0.001)
+    assert histogram.quantile(0.9) < 0.002
+    # The 100 ms stall hid about 98 requests that would have waited 1-98 ms
+    assert 190 <= corrected.count <= 200
+    assert corrected.quantile(0.9) > 0.05
+    assert corrected.max_us == histogram.max_us
+    
+    merged = LatencyHistogram()
+    merged.merge(histogram)
+    merged.merge(histogram)
+    assert merged.count == 200
+    assert merged.quantile(0.5) == histogram.quantile(0.5)
+
+
+def test_closed_loop_in_process(gateway):
+    """A closed loop against a gateway object reports per-operation results."""
+    generator = LoadGenerator(GatewayTarget(gateway), parse_mix('tools/list=3,ping=1', 'alpha'),
+                              seed=1)
+    report = generator.closed_loop(concurrency=2, duration=0.2, warmup=0.05)
+    
+    assert report['mode'] == 'closed'
+    assert report['requests'] > 0 and report['errors'] == 0
+    assert set(report['operations']) == {'tools/list', 'ping'}
+    assert report['operations']['tools/list']['requests'] > report['operations']['ping']['requests']
+    assert report['latency_ms']['p99'] >= report['service_time_ms']['p50']
+
+
+def test_open_loop_counts_queueing_as_latency():
+    """Open-loop latency runs from when a request was due, not when it was sent."""
+    with start_server('http', Behavior(latency='20ms')) as server:
+        target = HTTPTarget(server.url)
+        generator = LoadGenerator(target, parse_mix('tools/call:echo'), seed=1)
+        # One at a time at 100/s against a 20 ms server: the queue keeps growing
+        report = generator.open_loop(rate=100, duration=0.4, max_in_flight=1)
+        target.close()
+    
+    assert report['mode'] == 'open'
+    assert report['scheduled'] == 40 and report['unfinished'] == 0
+    assert report['errors'] == 0
+    assert 15 <= report['service_time_ms']['p50'] <= 100
+    assert report['latency_ms']['p99'] > 3 * report['service_time_ms']['p99']
+
+
+def test_errors_by_kind():
+    """Failures are counted by JSON-RPC code, HTTP status, timeout or exception."""
+    with start_server('http', Behavior(error_rate=1.0)) as server:
+        target = HTTPTarget(server.url)
+        report = LoadGenerator(target, parse_mix('tools/call:echo=1,tools/list=1')).closed_loop(
+            concurrency=2, duration=0.2)
+        target.close()
+    assert report['errors_by_kind'] == {'jsonrpc:-32000': report['operations']['tools/call:echo']['requests']}
+    assert report['operations']['tools/list']['errors'] == 0
+    
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    report = LoadGenerator(HTTPTarget(f'http://127.0.0.1:{port}/mcp'),
+                           parse_mix('ping')).closed_loop(concurrency=1, duration=0.05)
+    assert report['errors'] == report['requests'] > 0
+    assert list(report['errors_by_kind']) == ['exception:ConnectionRefusedError']
+    
+    assert classify(error=socket.timeout()) == 'timeout'
+    assert classify({"jsonrpc": "2.0", "id": 1, "result": {}}) is None
+
+
+def test_compare_reports():
+    """Throughput drops and latency or error rises past the threshold are regressions."""
+    baseline = {'throughput_rps': 1000, 'latency_ms': {'p99': 10.0}, 'error_rate': 0.0}
+    assert compare_reports(baseline, baseline) == []
+    worse = {'throughput_rps': 700, 'latency_ms': {'p99': 15.0}, 'error_rate': 0.01}
+    findings = compare_reports(baseline, worse, threshold=0.2)
+    assert [finding.split()[0] for finding in findings] == ['throughput', 'p99', 'error']
@@ -0,0 +1,138 @@
+"""Unit tests for the Prometheus metrics exporter."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.exporter import LATENCY_BUCKETS, histogram_buckets
+from api_gateway.metrics import LatencyHistogram
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+from gateway_helpers import add_server
+
+
+class CountingProcessManager(ProcessManagerStub):
+    """Process manager stub that counts status calls."""
+    
+    def __init__(self):
+        super().__init__()
+        self.status_calls = 0
+    
+    def get_process_status(self, process_id):
+        self.status_calls += 1
+        return super().get_process_status(process_id)
+
+
+class ObservedTransport(TransportStub):
+    """Transport stub that reports its calls like the Node.js adapter."""
+    
+    def __init__(self):
+        super().__init__()
+        self.call_observer = None
+    
+    def send_message(self, connection_id, message):
+        response = super().send_message(connection_id, message)
+        if self.call_observer is not None:
+            self.call_observer('send_message', 0.002, False, 0.001)
+        return response
+
+
+def _gateway(transport=None):
+    gateway = APIGateway(transport or TransportStub(), options={
+        'circuit_breaker': {'minCalls': 1}
+    })
+    add_server(gateway, {}, limits={'maxConcurrency': 2})
+    gateway.start_server('test-server')
+    return gateway
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test exported buckets count latencies at or below each bound."""
+    histogram = LatencyHistogram()
+    for latency in (0.0005, 0.003, 0.003, 0.2, 90.0):
+        histogram.record(latency)
+    
+    buckets, total = histogram_buckets(histogram)
+    by_bound = dict(buckets)
+    
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert by_bound['0.001'] == 1
+    assert by_bound['0.005'] == 3
+    assert by_bound['0.25'] == 4
+    assert by_bound['60.0'] == 4
+    assert by_bound['+Inf'] == 5
+    assert total == pytest.approx(90.2065, rel=0.001)
+
+
+def test_transport_calls_are_timed():
+    """Test transports exposing call_observer report bridge round trips."""
+    transport = ObservedTransport()
+    gateway = _gateway(transport)
+    
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    
+    ipc = gateway.get_metrics()['transport_ipc']
+    assert ipc['send_message']['requests'] == 1
+    assert APIGateway(TransportStub()).get_metrics()['transport_ipc'] == {}
+
+
+def test_collector_exposes_gateway_metrics():
+    """Test a scrape reports request, admission, breaker and process metrics."""
+    pytest.importorskip('prometheus_client')
+    from prometheus_client import CollectorRegistry, generate_latest
+    from api_gateway.exporter import GatewayCollector
+    
+    gateway = _gateway(ObservedTransport())
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": 1,
+                                         "params": {"name": "read_file"}})
+    registry = CollectorRegistry()
+    registry.register(GatewayCollector(gateway))
+    
+    text = generate_latest(registry).decode()
+    
+    assert ('mcp_gateway_requests_total{server="test-server",transport="stdio",'
+            'method="tools/call:read_file"} 1.0') in text
+    assert 'mcp_gateway_request_duration_seconds_bucket{' in text
+    assert 'mcp_gateway_ipc_duration_seconds_count{call="send_message"}' in text
+    assert 'mcp_gateway_admission_max_concurrency{server="test-server"} 2.0' in text
+    assert 'mcp_gateway_circuit_breaker_state{server="test-server",state="closed"} 1.0' in text
+    assert 'mcp_gateway_process_resident_memory_bytes{server="test-server",replica="0"}' in text
+    assert 'mcp_gateway_servers{status="running"} 1.0' in text
+
+
+def test_registry_adds_gateway_process_metrics():
+    """Test the served registry reports the gateway's own process and caches."""
+    pytest.importorskip('prometheus_client')
+    from prometheus_client import generate_latest
+    from api_gateway.exporter import metrics_registry
+    
+    text = generate_latest(metrics_registry(_gateway())).decode()
+    
+    assert 'mcp_gateway_registry_cache_lookups_total{level="memo",result="hit"}' in text
+    if sys.platform.startswith('linux'):
+        assert 'process_resident_memory_bytes ' in text
+
+
+def test_server_processes_are_read_from_a_snapshot():
+    """Test scrapes reuse the process snapshot instead of calling the manager."""
+    pytest.importorskip('prometheus_client')
+    from prometheus_client import CollectorRegistry, generate_latest
+    from api_gateway.exporter import GatewayCollector
+    
+    gateway = _gateway()
+    gateway.process_manager = CountingProcessManager()
+    collector = GatewayCollector(gateway, process_interval=60)
+    registry = CollectorRegistry()
+    registry.register(collector)
+    
+    generate_latest(registry)
+    generate_latest(registry)
+    assert gateway.process_manager.status_calls == 1
+    
+    collector.refresh_processes()
+    assert gateway.process_manager.status_calls == 2
+    collector.close()
@@ -0,0 +1,155 @@
+"""Unit tests for priority-aware request scheduling."""
+
+import sys
+import os
+import threading
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.admission import AdmissionController
+from api_gateway.scheduler import WeightedFairQueue, normalize_priority
+from contracts.transport_stub import TransportStub
+from gateway_helpers import wait_for
+
+
+class RecordingTransport(TransportStub):
+    """Transport stub that blocks until released and records send order."""
+    
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.order = []
+    
+    def send_message(self, connection_id, message):
+        self.release.wait(5)
+        self.order.append(message['id'])
+        return super().send_message(connection_id, message)
+
+
+def test_normalize_priority():
+    """Test unknown priorities fall back to the normal class."""
+    assert normalize_priority('interactive') == 'interactive'
+    assert normalize_priority('bulk') == 'bulk'
+    assert normalize_priority('urgent') == 'normal'
+    assert normalize_priority(None) == 'normal'
+
+
+def test_dequeue_shares_follow_weights():
+    """Test classes are served in proportion to their weights."""
+    queue = WeightedFairQueue()
+    for i in range(100):
+        for priority in ['interactive', 'normal', 'bulk']:
+            queue.push((priority, i), priority)
+    
+    served = Counter(queue.pop()[0] for _ in range(130))
+    
+    assert served['interactive'] == 80
+    assert served['normal'] == 40
+    assert served['bulk'] == 10
+
+
+def test_bulk_is_not_starved():
+    """Test bulk work still progresses under sustained interactive load."""
+    queue = WeightedFairQueue()
+    queue.push('bulk-job', 'bulk')
+    for i in range(50):
+        queue.push(f'ide-{i}', 'interactive')
+    
+    first_twenty = [queue.pop() for _ in range(20)]
+    
+    assert 'bulk-job' in first_twenty
+
+
+def test_idle_class_cannot_bank_credit():
+    """Test a class returning from idle does not monopolise the queue."""
+    queue = WeightedFairQueue()
+    for i in range(40):
+        queue.push(('normal', i), 'normal')
+    for _ in range(30):
+        queue.pop()
+    
+    for i in range(10):
+        queue.push(('bulk', i), 'bulk')
+    served = [queue.pop()[0] for _ in range(10)]
+    
+    assert served.count('bulk') <= 2
+
+
+def test_fifo_within_class_and_remove():
+    """Test order within a class is preserved and removal works."""
+    queue = WeightedFairQueue()
+    queue.push('a', 'bulk')
+    queue.push('b', 'bulk')
+    queue.push('c', 'bulk')
+    queue.remove('b', 'bulk')
+    
+    assert len(queue) == 2
+    assert queue.pop() == 'a'
+    assert queue.pop() == 'c'
+
+
+def test_weights_must_be_positive():
+    """Test zero, negative or non-numeric weights are rejected up front."""
+    for weight in (0, -1, 'high', None):
+        with pytest.raises(ValueError):
+            WeightedFairQueue({'bulk': weight})
+    with pytest.raises(ValueError):
+        AdmissionController.from_config({'maxConcurrency': 1},
+                                        {'priority_weights': {'interactive': 0}})
+    with pytest.raises(ValueError):
+        APIGateway(TransportStub(), options={'priority_weights': {'normal': -2},
+                                             'registry_cache': False})
+    assert WeightedFairQueue({'bulk': 0.5}).weights['bulk'] == 0.5
+
+
+def test_weights_of_unknown_classes_are_rejected():
+    """Test a class requests could never name is a configuration error."""
+    with pytest.raises(ValueError, match='critical'):
+        WeightedFairQueue({'critical': 16})
+    with pytest.raises(ValueError, match='critical'):
+        APIGateway(TransportStub(), options={'priority_weights': {'critical': 16},
+                                             'registry_cache': False})
+
+
+def test_gateway_serves_interactive_before_queued_bulk():
+    """Test interactive requests overtake queued bulk work at the gateway."""
+    transport = RecordingTransport()
+    gateway = APIGateway(transport, options={'api_key_priorities': {'batch-key': 'bulk'}})
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server', 'limits': {'maxConcurrency': 1, 'maxQueueDepth': 10}},
+        'status': 'running',
+        'transport': 'stdio',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    
+    def send(request_id, api_key=None, priority=None):
+        request = {"jsonrpc": "2.0", "method": "tools/call", "id": request_id}
+        if priority:
+            request['params'] = {'_meta': {'priority': priority}}
+        gateway.send_request('test-server', request, api_key=api_key)
+    
+    threads = [threading.Thread(target=send, args=('running',))]
+    threads[0].start()
+    wait_for(lambda: gateway._admission.get('test-server') is not None
+              and gateway._admission['test-server'].active == 1)
+    
+    queued = [('bulk-1', 'batch-key', None), ('bulk-2', 'batch-key', None),
+              ('ide-1', None, 'interactive')]
+    for request_id, api_key, priority in queued:
+        thread = threading.Thread(target=send, args=(request_id, api_key, priority))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: gateway._admission['test-server'].queue_depth == len(threads) - 1)
+    
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert transport.order == ['running', 'ide-1', 'bulk-1', 'bulk-2']
+    stats = gateway.get_metrics()['admission']['test-server']
+    assert stats['admitted_by_priority'] == {'interactive': 1, 'normal': 1, 'bulk': 2}
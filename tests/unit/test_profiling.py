@@ -0,0 +1,150 @@
+"""Unit tests for on-demand gateway profiling."""
+
+import sys
+import os
+import json
+import pstats
+import signal
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.profiling import StackSampler
+from contracts.transport_stub import TransportStub
+
+
+@pytest.fixture
+def make_gateway(tmp_path):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': server_id, 'transport': {'type': 'http'}, 'config': {'port': 3000 + n}}
+        for n, server_id in enumerate(['alpha', 'beta'])
+    ]}))
+    gateways = []
+    
+    def make(**options):
+        gateway = APIGateway(TransportStub(), options=dict({
+            'catalog_path': str(catalog), 'registry_cache': False,
+            'transport_catalog_path': False
+        }, **options))
+        gateway.start_server('alpha')
+        gateway.start_server('beta')
+        gateways.append(gateway)
+        return gateway
+    
+    yield make
+    for gateway in gateways:
+        gateway.close()
+
+
+def _request(request_id, method='tools/list'):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method}
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_writes_collapsed_stacks(tmp_path):
+    """Sampled stacks are written root first, one count per line."""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name='busy;worker')
+    worker.start()
+    sampler = StackSampler(interval=0.005)
+    sampler.run(0.2)
+    stop.set()
+    worker.join()
+    
+    path = tmp_path / 'cpu.collapsed'
+    sampler.write(str(path))
+    lines = path.read_text().splitlines()
+    assert sampler.samples >= 5 and lines
+    busy = [line for line in lines if line.startswith('busy_worker;')]
+    assert busy and all(line.split(';')[1].startswith('_bootstrap ') for line in busy)
+    assert any('_busy_worker (test_profiling.py:' in line for line in busy)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in busy) <= sampler.samples
+
+
+def test_profile_cpu(make_gateway, tmp_path):
+    """A CPU window runs in the background and writes its file when it ends."""
+    gateway = make_gateway()
+    path = tmp_path / 'cpu.collapsed'
+    assert gateway.profile_cpu(0.3, str(path), wait=False) == {"path": str(path),
+                                                               "running": True}
+    with pytest.raises(RuntimeError):
+        gateway.profile_cpu(0.1)
+    assert gateway.get_metrics()['profiling']['cpu']['running']
+    
+    deadline = time.monotonic() + 5
+    while gateway.get_metrics()['profiling']['cpu']['running'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert path.read_text()
+    assert gateway.get_metrics()['profiling']['cpu']['samples'] > 0
+    
+    result = gateway.profile_cpu(0.05, str(tmp_path / 'second.collapsed'))
+    assert not result['running'] and result['samples'] > 0
+
+
+def test_profile_requests_matching_filter(make_gateway, tmp_path):
+    """Only matching requests are profiled, up to the requested count."""
+    gateway = make_gateway()
+    assert gateway.get_metrics()['profiling'] == {
+        "signal": None, "cpu": None, "requests": None, "allocation_tracing": False}
+    path = tmp_path / 'requests.prof'
+    gateway.profile_requests('alpha', 'tools/list', count=2, path=str(path), top=5)
+    
+    gateway.send_request('beta', _request(1))
+    gateway.send_request('alpha', _request(2, 'ping'))
+    for request_id in range(3, 6):
+        response = gateway.send_request('alpha', _request(request_id))
+        assert response['id'] == request_id
+    
+    results = gateway.get_request_profiles()
+    assert results['done'] and results['profiled'] == 2
+    assert [entry['method'] for entry in results['requests']] == ['tools/list'] * 2
+    assert len(results['requests'][0]['functions']) == 5
+    assert any('_send' in entry['function'] for entry in results['requests'][0]['functions'])
+    assert pstats.Stats(str(path)).total_calls > 0
+    
+    assert gateway.stop_request_profiling()['path'] == str(path)
+    assert gateway.get_request_profiles() is None
+
+
+def test_allocation_snapshot(make_gateway):
+    """Snapshots list the top allocation sites and, later, their growth."""
+    gateway = make_gateway()
+    first = gateway.allocation_snapshot(top=5)
+    assert 'growth' not in first
+    kept = [bytearray(4096) for _ in range(200)]
+    second = gateway.allocation_snapshot(top=5)
+    assert gateway.get_metrics()['profiling']['allocation_tracing']
+    gateway.stop_allocation_tracing()
+    
+    assert second['traced_bytes'] >= 200 * 4096
+    assert second['growth'][0]['location'].startswith('test_profiling.py:')
+    assert second['growth'][0]['size_diff'] >= 200 * 4096
+    assert not gateway.get_metrics()['profiling']['allocation_tracing']
+    del kept
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR2'), reason="needs SIGUSR2")
+def test_profiling_signal(make_gateway, tmp_path, monkeypatch):
+    """The profiling signal starts a CPU window; close restores the old handler."""
+    monkeypatch.setattr('api_gateway.gateway.default_cache_dir', lambda: str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR2)
+    gateway = make_gateway(profiling_signal=True, profile_duration=0.1)
+    assert gateway.get_metrics()['profiling']['signal'] == 'SIGUSR2'
+    
+    os.kill(os.getpid(), signal.SIGUSR2)
+    deadline = time.monotonic() + 5
+    while not list((tmp_path / 'profiles').glob('*.collapsed')) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert list((tmp_path / 'profiles').glob(f'gateway-{os.getpid()}-*.collapsed'))
+    
+    gateway.close()
+    assert signal.getsignal(signal.SIGUSR2) == previous
@@ -0,0 +1,147 @@
+"""Unit tests for token-bucket rate limiting."""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.rate_limit import RateLimitedError, RateLimiter, RateRule, load_rate_limits
+from contracts.transport_stub import TransportStub
+from gateway_helpers import FakeClock, add_server
+
+
+def test_rule_from_limits_js_window():
+    """Test limits.js windows become a rate with the window as burst."""
+    rule = RateRule.from_config({'windowMs': 60000, 'maxRequests': 120})
+    
+    assert rule.rate == 2.0
+    assert rule.burst == 120
+    assert RateRule.from_config({'requestsPerSecond': 5}).burst == 5
+    assert RateRule.from_config({'window': '1m', 'maxRequests': 30, 'burst': 3}).burst == 3
+    assert RateRule.from_config({'skip': True}) is None
+    assert RateRule.from_config({'windowMs': 1000, 'maxRequests': -1}) is None
+
+
+def test_rule_rejects_invalid_values():
+    """Test malformed limits fail with a ValueError naming the setting."""
+    assert RateRule.from_config({'windowMs': 1000, 'maxRequests': '10'}).rate == 10
+    
+    with pytest.raises(ValueError, match='maxRequests'):
+        RateRule.from_config({'windowMs': 1000, 'maxRequests': 'many'})
+    with pytest.raises(ValueError, match='window must be positive'):
+        RateRule.from_config({'windowMs': 0, 'maxRequests': 10})
+    with pytest.raises(ValueError, match='requestsPerSecond'):
+        RateRule.from_config({'requestsPerSecond': None})
+
+
+def test_bucket_refills_lazily():
+    """Test tokens come back with elapsed time and retry-after is exact."""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    checks = [(('key',), RateRule(rate=2.0, burst=2))]
+    
+    limiter.acquire(checks)
+    limiter.acquire(checks)
+    with pytest.raises(RateLimitedError) as exc_info:
+        limiter.acquire(checks)
+    assert exc_info.value.retry_after == pytest.approx(0.5)
+    
+    clock.now += 0.5
+    limiter.acquire(checks)
+    assert limiter.get_stats()['rejected'] == 1
+
+
+def test_rejection_takes_no_tokens():
+    """Test a call refused by one bucket leaves the others untouched."""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    wide = (('key',), RateRule(rate=1.0, burst=10))
+    narrow = (('key', 'server'), RateRule(rate=1.0, burst=1))
+    
+    limiter.acquire([wide, narrow])
+    for _ in range(3):
+        with pytest.raises(RateLimitedError):
+            limiter.acquire([wide, narrow])
+    
+    limiter.acquire([wide])
+    assert limiter._buckets[('key',)].tokens == 8
+
+
+def test_idle_keys_are_evicted():
+    """Test refilled buckets are dropped and the key count stays bounded."""
+    clock = FakeClock()
+    limiter = RateLimiter(max_keys=3, clock=clock)
+    rule = RateRule(rate=1.0, burst=5)
+    
+    for i in range(10):
+        limiter.acquire([((f"key-{i}",), rule)])
+    assert len(limiter) == 3
+    
+    clock.now += 10
+    limiter.acquire([(('fresh',), rule)])
+    assert len(limiter) == 1
+    assert limiter.get_stats()['evicted'] == 10
+
+
+def _gateway(options, rate_limit):
+    gateway = APIGateway(TransportStub(), options=options)
+    add_server(gateway, {}, transport='http', limits={'rateLimit': rate_limit})
+    gateway.start_server('test-server')
+    return gateway
+
+
+def _call(gateway, api_key, method='tools/list', **params):
+    request = {"jsonrpc": "2.0", "method": method, "id": 1}
+    if params:
+        request['params'] = params
+    return gateway.send_request('test-server', request, api_key=api_key)
+
+
+def test_gateway_rejects_with_retry_after():
+    """Test limited calls get -32005 with retryAfter, per API key."""
+    gateway = _gateway({}, {'requestsPerSecond': 1, 'burst': 2})
+    
+    assert 'result' in _call(gateway, 'alice')
+    assert 'result' in _call(gateway, 'alice')
+    response = _call(gateway, 'alice')
+    
+    assert response['error']['code'] == -32005
+    assert 0 < response['error']['data']['retryAfter'] <= 1
+    assert 'result' in _call(gateway, 'bob')
+    assert gateway.get_metrics()['rate_limits']['rejected'] == 1
+    # Rejected calls never reach the server
+    assert gateway.transport.message_count == 3
+
+
+def test_gateway_method_limits():
+    """Test method patterns limit each matching method separately."""
+    gateway = _gateway({'rate_limits': {'methods': {'tools/call:*': {'requestsPerSecond': 1}}}},
+                       {'methods': {'tools/call:slow': {'window': '1h', 'maxRequests': 1}}})
+    
+    assert 'result' in _call(gateway, 'alice', 'tools/call', name='slow')
+    assert _call(gateway, 'alice', 'tools/call', name='slow')['error']['code'] == -32005
+    assert 'result' in _call(gateway, 'alice', 'tools/call', name='fast')
+    assert _call(gateway, 'alice', 'tools/call', name='fast')['error']['code'] == -32005
+    assert 'result' in _call(gateway, 'alice', 'tools/list')
+
+
+def test_gateway_reads_limits_export(tmp_path):
+    """Test per-tier limits from a JSON export of limits.js."""
+    export = tmp_path / 'limits.json'
+    export.write_text(json.dumps({'rateLimit': {
+        'global': {'windowMs': 900000, 'maxRequests': 1000},
+        'endpoints': {'/health': {'skip': True}},
+        'perUser': {'free': {'windowMs': 3600000, 'maxRequests': 2}}
+    }}))
+    assert list(load_rate_limits(str(export))) == ['global', 'endpoints', 'perUser']
+    
+    gateway = _gateway({'rate_limits': str(export), 'api_key_tiers': {'trial': 'free'}}, None)
+    
+    assert 'result' in _call(gateway, 'trial')
+    assert 'result' in _call(gateway, 'trial')
+    assert _call(gateway, 'trial')['error']['code'] == -32005
+    assert 'result' in _call(gateway, 'paying')
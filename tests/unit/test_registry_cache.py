@@ -0,0 +1,162 @@
+"""Unit tests for the compiled registry cache."""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway import registry_cache
+from api_gateway.registry_cache import load_servers
+from contracts.transport_stub import TransportStub
+
+
+class CountingCompiler:
+    """Compile function that counts the entries it compiles."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self, server):
+        self.calls += 1
+        return {'config': server, 'transport': 'stdio' if 'stdio' in server['id'] else 'http'}
+
+
+@pytest.fixture(autouse=True)
+def clear_loaded():
+    registry_cache.clear_loaded()
+    yield
+    registry_cache.clear_loaded()
+
+
+def _write_catalog(path, count, prefix='server'):
+    servers = [{'id': f"{prefix}-{i}", 'name': f"Server {i}"} for i in range(count)]
+    servers.append({'id': 'stdio-server', 'source': {'type': 'npm', 'package': 'x'}})
+    path.write_text(json.dumps({'version': '2.0', 'servers': servers}))
+
+
+def test_snapshot_skips_parsing_unchanged_catalog(tmp_path):
+    """Test a large catalog is compiled once and then loaded from its snapshot."""
+    catalog = tmp_path / 'catalog.json'
+    _write_catalog(catalog, 5000)
+    compiler = CountingCompiler()
+    
+    first = load_servers(str(catalog), compiler, str(tmp_path / 'cache'))
+    registry_cache.clear_loaded()
+    second = load_servers(str(catalog), compiler, str(tmp_path / 'cache'))
+    
+    assert compiler.calls == 5001
+    assert second == first
+    assert list(second)[:2] == ['server-0', 'server-1']
+    assert second['stdio-server']['transport'] == 'stdio'
+
+
+def test_loads_return_independent_copies(tmp_path):
+    """Test callers can modify the table without affecting later loads."""
+    catalog = tmp_path / 'catalog.json'
+    _write_catalog(catalog, 3)
+    compiler = CountingCompiler()
+    
+    first = load_servers(str(catalog), compiler)
+    first['server-0']['config']['name'] = 'changed'
+    second = load_servers(str(catalog), compiler)
+    
+    assert second['server-0']['config']['name'] == 'Server 0'
+    assert compiler.calls == 4
+
+
+def test_in_memory_tables_are_bounded(tmp_path):
+    """Test only the most recently loaded catalogs stay in memory."""
+    compiler = CountingCompiler()
+    paths = []
+    for i in range(registry_cache.MAX_LOADED_CATALOGS + 3):
+        paths.append(tmp_path / f'catalog-{i}.json')
+        _write_catalog(paths[-1], 1)
+        load_servers(str(paths[-1]), compiler)
+    
+    assert len(registry_cache._loaded) == registry_cache.MAX_LOADED_CATALOGS
+    assert str(paths[0]) not in registry_cache._loaded
+    assert str(paths[-1]) in registry_cache._loaded
+
+
+def test_changed_catalog_is_recompiled(tmp_path):
+    """Test edits invalidate the snapshot while a touch does not."""
+    catalog = tmp_path / 'catalog.json'
+    cache_dir = str(tmp_path / 'cache')
+    _write_catalog(catalog, 3)
+    compiler = CountingCompiler()
+    load_servers(str(catalog), compiler, cache_dir)
+    
+    stat = os.stat(catalog)
+    os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    registry_cache.clear_loaded()
+    load_servers(str(catalog), compiler, cache_dir)
+    assert compiler.calls == 4
+    
+    _write_catalog(catalog, 3, prefix='renamed')
+    registry_cache.clear_loaded()
+    servers = load_servers(str(catalog), compiler, cache_dir)
+    assert compiler.calls == 8
+    assert 'renamed-0' in servers
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path):
+    """Test unreadable snapshots fall back to parsing the catalog."""
+    catalog = tmp_path / 'catalog.json'
+    cache_dir = tmp_path / 'cache'
+    _write_catalog(catalog, 3)
+    compiler = CountingCompiler()
+    load_servers(str(catalog), compiler, str(cache_dir))
+    
+    for snapshot in cache_dir.iterdir():
+        snapshot.write_bytes(b'not a snapshot')
+    registry_cache.clear_loaded()
+    
+    assert len(load_servers(str(catalog), compiler, str(cache_dir))) == 4
+    assert compiler.calls == 8
+
+
+def test_lookups_are_counted(tmp_path):
+    """Test memory and snapshot hits and misses are counted per load."""
+    catalog = tmp_path / 'catalog.json'
+    cache_dir = str(tmp_path / 'cache')
+    _write_catalog(catalog, 3)
+    before = registry_cache.get_stats()
+    
+    load_servers(str(catalog), CountingCompiler(), cache_dir)
+    load_servers(str(catalog), CountingCompiler(), cache_dir)
+    registry_cache.clear_loaded()
+    load_servers(str(catalog), CountingCompiler(), cache_dir)
+    
+    after = registry_cache.get_stats()
+    assert {name: after[name] - before[name] for name in after} == {
+        'memo_hits': 1, 'memo_misses': 2, 'snapshot_hits': 1, 'snapshot_misses': 1
+    }
+
+
+def test_gateway_loads_catalog_through_cache(tmp_path):
+    """Test gateways built from the same catalog get separate server tables."""
+    catalog = tmp_path / 'catalog.json'
+    _write_catalog(catalog, 3)
+    options = {'catalog_path': str(catalog), 'registry_cache': str(tmp_path / 'cache')}
+    
+    gateway = APIGateway(TransportStub(), options=options)
+    gateway.start_server('stdio-server')
+    other = APIGateway(TransportStub(), options=options)
+    
+    assert list(other.servers) == ['server-0', 'server-1', 'server-2', 'stdio-server']
+    assert other.servers['stdio-server']['transport'] == 'stdio'
+    assert other.servers['stdio-server']['status'] == 'stopped'
+    assert gateway.servers['stdio-server']['status'] == 'running'
+
+
+def test_missing_catalog_uses_default_servers(tmp_path):
+    """Test the built-in fallback servers are still used without a catalog."""
+    gateway = APIGateway(TransportStub(), options={
+        'catalog_path': str(tmp_path / 'missing.json'), 'registry_cache': False
+    })
+    
+    assert 'filesystem' in gateway.servers
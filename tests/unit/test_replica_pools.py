@@ -0,0 +1,252 @@
+"""Unit tests for per-server replica pools."""
+
+import sys
+import os
+import gc
+import shutil
+import threading
+import time
+import weakref
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'bridge', 'transports'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.replicas import ReplicaPool
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+from gateway_helpers import BlockingTransport, FakeClock, add_server, wait_for
+
+
+def test_routes_to_least_outstanding_replica():
+    """Test each request goes to the replica with the fewest in flight."""
+    pool = ReplicaPool()
+    for connection_id in ['conn_1', 'conn_2', 'conn_3']:
+        pool.add(connection_id)
+    
+    first = pool.acquire()
+    second = pool.acquire()
+    third = pool.acquire()
+    assert {first.connection_id, second.connection_id, third.connection_id} == {
+        'conn_1', 'conn_2', 'conn_3'
+    }
+    
+    pool.release(second, 0.01)
+    assert pool.acquire() is second
+
+
+def test_ties_prefer_faster_replica():
+    """Test idle replicas are ranked by average latency."""
+    pool = ReplicaPool()
+    slow = pool.add('conn_1')
+    fast = pool.add('conn_2')
+    pool.release(pool.acquire(), 0.5)
+    pool.release(pool.acquire(), 0.01)
+    
+    assert slow.latency_ewma == 0.5
+    assert pool.acquire() is fast
+
+
+def test_failing_replica_leaves_rotation_until_cooldown():
+    """Test consecutive failures mark a replica unhealthy for a while."""
+    clock = FakeClock()
+    pool = ReplicaPool(failure_threshold=2, unhealthy_cooldown=10, clock=clock)
+    bad = pool.add('conn_1')
+    good = pool.add('conn_2')
+    
+    for _ in range(2):
+        replica = pool.acquire()
+        assert replica is bad
+        pool.release(replica, failed=True)
+    
+    assert pool.get_stats()[0]['healthy'] is False
+    assert pool.acquire() is good
+    pool.release(good, 0.01)
+    assert pool.acquire() is good
+    
+    clock.now += 10
+    assert pool.get_stats()[0]['healthy'] is True
+
+
+def test_sticky_sessions_for_stateful_pools():
+    """Test a session stays on its replica in a stateful pool."""
+    pool = ReplicaPool(stateful=True)
+    pool.add('conn_1')
+    pool.add('conn_2')
+    
+    home = pool.acquire('session-a')
+    for _ in range(5):
+        assert pool.acquire('session-a') is home
+    
+    stateless = ReplicaPool()
+    stateless.add('conn_1')
+    stateless.add('conn_2')
+    assert stateless.acquire('session-a') is not stateless.acquire('session-a')
+
+
+def test_removed_replica_releases_its_sessions():
+    """Test sessions pinned to a removed replica move elsewhere."""
+    pool = ReplicaPool(stateful=True)
+    pool.add('conn_1')
+    pool.add('conn_2')
+    home = pool.acquire('session-a')
+    pool.release(home, 0.01)
+    
+    pool.remove(home)
+    
+    assert pool.acquire('session-a') is not home
+    assert len(pool) == 1
+
+
+def test_gateway_starts_and_stops_all_replicas():
+    """Test a scaled catalog entry spawns one process and connection per replica."""
+    transport = TransportStub()
+    process_manager = ProcessManagerStub()
+    gateway = APIGateway(transport, process_manager)
+    add_server(gateway, {'replicas': 3})
+    
+    result = gateway.start_server('test-server')
+    
+    assert result['success']
+    assert len(gateway.connections) == 3
+    assert sorted(p['config']['id'] for p in process_manager.processes.values()) == [
+        'test-server', 'test-server-1', 'test-server-2'
+    ]
+    info = gateway.get_server_info('test-server')
+    assert [r['index'] for r in info['replicas']] == [0, 1, 2]
+    assert info['replicas'][0]['connectionId'] == result['connectionId']
+    
+    assert gateway.stop_server('test-server')['success']
+    assert gateway.connections == {}
+    assert all(c['status'] == 'disconnected' for c in transport.connections.values())
+    assert gateway.get_server_info('test-server')['replicas'] == []
+
+
+def test_gateway_spreads_concurrent_requests():
+    """Test concurrent requests land on different replicas."""
+    transport = BlockingTransport()
+    gateway = APIGateway(transport)
+    add_server(gateway, {'replicas': 2}, transport='http')
+    gateway.start_server('test-server')
+    
+    responses = []
+    threads = [
+        threading.Thread(target=lambda i=i: responses.append(gateway.send_request(
+            'test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": i}
+        )))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: all(r['in_flight'] == 1
+                          for r in gateway.get_server_info('test-server')['replicas']))
+    
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert {r['result']['connection'] for r in responses} == set(gateway.connections)
+    stats = gateway.get_server_info('test-server')['replicas']
+    assert [r['requests'] for r in stats] == [1, 1]
+    assert all(r['latency_ms'] is not None for r in stats)
+
+
+def test_gateway_pins_sessions_of_stateful_servers():
+    """Test requests with the same session ID reach the same replica."""
+    gateway = APIGateway(TransportStub())
+    add_server(gateway, {'replicas': 3, 'stateful': True}, transport='http')
+    gateway.start_server('test-server')
+    
+    def send(i, session):
+        request = {"jsonrpc": "2.0", "method": "tools/call", "id": i,
+                   "params": {"_meta": {"sessionId": session}}}
+        return gateway.send_request('test-server', request)['result']['connection']
+    
+    assert len({send(i, 'session-a') for i in range(5)}) == 1
+    assert gateway.send_request(
+        'test-server', {"jsonrpc": "2.0", "method": "x", "id": 9}, session_id='session-a'
+    )['result']['connection'] == send(10, 'session-a')
+
+
+def test_single_replica_by_default():
+    """Test servers without a scaling block keep one connection."""
+    gateway = APIGateway(TransportStub())
+    add_server(gateway, {}, transport='http')
+    
+    gateway.start_server('test-server')
+    
+    assert len(gateway.get_server_info('test-server')['replicas']) == 1
+
+
+RUNNER = """
+const readline = require('readline');
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+    const { id, method, args } = JSON.parse(line);
+    if (method === 'exit') process.exit(0);
+    if (method === 'hang') return;
+    const delay = method === 'send_message' ? args.message.params.delay : 0;
+    setTimeout(() => {
+        console.log('log line');
+        console.log(JSON.stringify({ id, result: method === 'send_message' ? args.message.id : null }));
+    }, delay);
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node not installed")
+def test_adapter_calls_do_not_wait_for_each_other(tmp_path):
+    """Test concurrent adapter calls are pipelined over the runner."""
+    from transport_adapter import TransportAdapter
+    
+    runner = tmp_path / 'runner.js'
+    runner.write_text(RUNNER)
+    adapter = TransportAdapter()
+    adapter.runner_path = str(runner)
+    adapter.initialize()
+    
+    finished = []
+    
+    def send(request_id, delay):
+        message = {"jsonrpc": "2.0", "id": request_id, "params": {"delay": delay}}
+        finished.append(adapter.send_message('conn_1', message))
+    
+    slow = threading.Thread(target=send, args=('slow', 500))
+    slow.start()
+    time.sleep(0.05)
+    send('fast', 0)
+    
+    assert finished == ['fast']
+    slow.join()
+    assert finished == ['fast', 'slow']
+    
+    with pytest.raises(RuntimeError):
+        adapter._call_js('exit', {})
+    with pytest.raises(RuntimeError):
+        adapter.send_message('conn_1', {"id": 1, "params": {"delay": 0}})
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node not installed")
+def test_adapter_times_out_calls_and_stops_runner_when_dropped(tmp_path):
+    """Test unanswered calls fail and a dropped adapter stops its runner."""
+    from transport_adapter import TransportAdapter
+    
+    runner = tmp_path / 'runner.js'
+    runner.write_text(RUNNER)
+    adapter = TransportAdapter(call_timeout=0.2)
+    adapter.runner_path = str(runner)
+    adapter.initialize()
+    
+    with pytest.raises(TimeoutError):
+        adapter._call_js('hang', {})
+    assert adapter._pending.calls == {}
+    assert adapter.send_message('conn_1', {"id": 'after', "params": {"delay": 0}}) == 'after'
+    
+    process = adapter.node_process
+    dropped = weakref.ref(adapter)
+    del adapter
+    gc.collect()
+    assert dropped() is None
+    assert process.wait(5) is not None
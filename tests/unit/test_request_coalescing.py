@@ -0,0 +1,181 @@
+"""Unit tests for single-flight request coalescing."""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from api_gateway import APIGateway
+from api_gateway.coalescing import RequestCoalescer
+from contracts.transport_stub import TransportStub
+
+
+class GatedTransport(TransportStub):
+    """Transport stub that holds every send until released."""
+    
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.sent = []
+    
+    def send_message(self, connection_id, message):
+        self.sent.append(message)
+        self.release.wait(5)
+        return super().send_message(connection_id, message)
+
+
+def _running_gateway(transport, methods):
+    gateway = APIGateway(transport, options={'coalesce_methods': methods})
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'running',
+        'transport': 'http',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    return gateway
+
+
+def _send_concurrently(gateway, requests):
+    responses = {}
+    
+    def call(request):
+        responses[request['id']] = gateway.send_request('test-server', request)
+    
+    threads = [threading.Thread(target=call, args=(r,)) for r in requests]
+    for thread in threads:
+        thread.start()
+    return threads, responses
+
+
+def _wait_for_followers(gateway, count):
+    calls = gateway._coalescer._flights._calls
+    while sum(call.followers for call in list(calls.values())) < count:
+        time.sleep(0.001)
+
+
+def test_identical_reads_share_one_upstream_call():
+    """Test concurrent identical reads produce a single upstream call."""
+    transport = GatedTransport()
+    gateway = _running_gateway(transport, ['resources/read'])
+    
+    requests = [
+        {"jsonrpc": "2.0", "method": "resources/read",
+         "params": {"uri": "file:///a.txt"}, "id": i}
+        for i in range(1, 6)
+    ]
+    threads, responses = _send_concurrently(gateway, requests)
+    
+    _wait_for_followers(gateway, 4)
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(transport.sent) == 1
+    assert sorted(responses) == [1, 2, 3, 4, 5]
+    for request_id, response in responses.items():
+        assert response['id'] == request_id
+        assert response['result']['status'] == 'ok'
+    assert gateway.metrics['requests_total'] == 5
+    assert gateway.get_metrics()['coalescing']['coalesced'] == 4
+
+
+def test_reads_of_different_callers_are_not_shared():
+    """Test identical reads under different API keys each go upstream."""
+    transport = GatedTransport()
+    gateway = _running_gateway(transport, ['resources/read'])
+    request = {"jsonrpc": "2.0", "method": "resources/read", "params": {"uri": "file:///a.txt"}}
+    responses = {}
+    
+    def call(request_id, api_key):
+        responses[request_id] = gateway.send_request('test-server', dict(request, id=request_id),
+                                                     api_key=api_key)
+    
+    threads = [threading.Thread(target=call, args=(i, key))
+               for i, key in enumerate(['alice', 'bob', 'alice'])]
+    for thread in threads:
+        thread.start()
+    _wait_for_followers(gateway, 1)
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(transport.sent) == 2
+    assert sorted(responses) == [0, 1, 2]
+    assert gateway.get_metrics()['coalescing']['coalesced'] == 1
+
+
+def test_methods_not_opted_in_are_not_coalesced():
+    """Test coalescing only applies to configured methods."""
+    transport = GatedTransport()
+    transport.release.set()
+    gateway = _running_gateway(transport, ['tools/list'])
+    
+    requests = [
+        {"jsonrpc": "2.0", "method": "tools/call",
+         "params": {"name": "screenshot"}, "id": i}
+        for i in range(1, 4)
+    ]
+    threads, responses = _send_concurrently(gateway, requests)
+    for thread in threads:
+        thread.join()
+    
+    assert len(transport.sent) == 3
+    assert gateway.get_metrics()['coalescing']['coalesced'] == 0
+
+
+def test_coalescing_key_ignores_id_and_meta():
+    """Test request identity depends only on server, method and params."""
+    coalescer = RequestCoalescer(['resources/read'])
+    
+    a = {"method": "resources/read", "params": {"uri": "x", "_meta": {"progressToken": 1}}, "id": 1}
+    b = {"method": "resources/read", "params": {"uri": "x"}, "id": 2}
+    c = {"method": "resources/read", "params": {"uri": "y"}, "id": 3}
+    
+    assert coalescer.key('s1', a) == coalescer.key('s1', b)
+    assert coalescer.key('s1', a) != coalescer.key('s1', c)
+    assert coalescer.key('s1', a) != coalescer.key('s2', a)
+
+
+def test_coalescing_key_separates_callers_and_sessions():
+    """Test requests of different API keys or sessions never share a response."""
+    coalescer = RequestCoalescer(['resources/read'])
+    request = {"method": "resources/read", "params": {"uri": "x"}, "id": 1}
+    
+    assert coalescer.key('s1', request, ('alice', None)) == coalescer.key('s1', request, ('alice', None))
+    assert coalescer.key('s1', request, ('alice', None)) != coalescer.key('s1', request, ('bob', None))
+    assert coalescer.key('s1', request, ('alice', 'a')) != coalescer.key('s1', request, ('alice', 'b'))
+
+
+def test_notifications_are_never_coalesced():
+    """Test requests without an id bypass coalescing."""
+    coalescer = RequestCoalescer(['tools/list'])
+    
+    assert coalescer.enabled_for({"method": "tools/list", "id": 1})
+    assert not coalescer.enabled_for({"method": "tools/list"})
+    assert not coalescer.enabled_for({"method": "tools/call", "id": 1})
+
+
+def test_upstream_errors_reach_every_caller():
+    """Test a failed shared call returns an error to each waiting caller."""
+    class FailingTransport(GatedTransport):
+        def send_message(self, connection_id, message):
+            self.sent.append(message)
+            self.release.wait(5)
+            raise RuntimeError("server crashed")
+    
+    transport = FailingTransport()
+    gateway = _running_gateway(transport, ['tools/list'])
+    
+    requests = [{"jsonrpc": "2.0", "method": "tools/list", "id": i} for i in range(1, 4)]
+    threads, responses = _send_concurrently(gateway, requests)
+    _wait_for_followers(gateway, 2)
+    transport.release.set()
+    for thread in threads:
+        thread.join()
+    
+    for request_id, response in responses.items():
+        assert response['id'] == request_id
+        assert response['error']['code'] == -32603
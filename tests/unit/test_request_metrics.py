@@ -0,0 +1,162 @@
+"""Unit tests for per-server, per-method request metrics."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.metrics import LatencyHistogram, RateCounter, RequestMetrics
+from contracts.transport_stub import TransportStub
+
+
+class ErrorTransport(TransportStub):
+    """Transport stub that answers tools/call with a JSON-RPC error."""
+    
+    def send_message(self, connection_id, message):
+        if message.get('method') == 'tools/call':
+            return {"jsonrpc": "2.0", "id": message['id'],
+                    "error": {"code": -32000, "message": "tool failed"}}
+        return super().send_message(connection_id, message)
+
+
+@pytest.mark.parametrize('value', [0, 1, 63, 64, 65, 127, 128, 1000, 12345, 10 ** 6, 2 ** 32 - 1])
+def test_bucket_bounds_contain_value(value):
+    """Test every value lands in a bucket whose bounds contain it."""
+    index = LatencyHistogram.bucket_index(value)
+    low, high = LatencyHistogram.bucket_bounds(index)
+    
+    assert low <= value <= high
+    assert high - low <= max(1, value / 32)
+
+
+def test_buckets_are_contiguous():
+    """Test consecutive buckets cover the value range without gaps."""
+    previous_high = -1
+    for index in range(200):
+        low, high = LatencyHistogram.bucket_bounds(index)
+        assert low == previous_high + 1
+        previous_high = high
+
+
+def test_quantiles_are_accurate():
+    """Test reported quantiles are within the bucket precision."""
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.03)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.03)
+    assert histogram.max_us == 1_000_000
+    assert histogram.mean == pytest.approx(0.5005, rel=0.001)
+
+
+def test_histogram_size_is_fixed():
+    """Test recording does not grow the histogram."""
+    histogram = LatencyHistogram()
+    size = len(histogram.counts)
+    
+    for i in range(10000):
+        histogram.record(i * 0.37)
+    
+    assert len(histogram.counts) == size
+    assert histogram.count == 10000
+
+
+def test_counts_do_not_overflow_32_bits():
+    """Test bucket counts past 2**32 survive recording, merging and correction."""
+    histogram = LatencyHistogram()
+    index = LatencyHistogram.bucket_index(500000)
+    histogram.counts[index] = 2 ** 32 - 1
+    histogram.count = 2 ** 32 - 1
+    histogram.record(0.5)
+    
+    merged = LatencyHistogram()
+    merged.merge(histogram)
+    merged.merge(histogram)
+    assert merged.counts[index] == 2 ** 33
+    assert merged.corrected(0.1).count > merged.count
+    
+    counter = RateCounter(window=10)
+    counter._seconds[0] = 100
+    counter._counts[0] = 2 ** 32 - 1
+    counter.add(100)
+    assert counter._counts[0] == 2 ** 32
+
+
+def test_rate_counter_window():
+    """Test the rate only counts events inside the window."""
+    counter = RateCounter(window=10)
+    for second in range(20):
+        counter.add(100 + second)
+        counter.add(100 + second)
+    
+    assert counter.rate(119.5) == 2.0
+    assert counter.rate(125) == 0.8
+    assert counter.rate(200) == 0.0
+
+
+def test_tools_are_keyed_by_name_with_bounded_cardinality():
+    """Test tool calls are split by tool up to the per-server cap."""
+    metrics = RequestMetrics(max_methods=3)
+    for i in range(10):
+        request = {"method": "tools/call", "params": {"name": f"tool-{i}"}}
+        metrics.record('fs', request, 0.01, error=False)
+    metrics.record('fs', {"method": "tools/call", "params": {"name": "tool-0"}}, 0.01, error=True)
+    
+    methods = metrics.server_summary('fs')['methods']
+    
+    assert sorted(methods) == [
+        '(other)', 'tools/call:tool-0', 'tools/call:tool-1', 'tools/call:tool-2'
+    ]
+    assert methods['tools/call:tool-0']['requests'] == 2
+    assert methods['tools/call:tool-0']['errors'] == 1
+    assert methods['(other)']['requests'] == 7
+
+
+def test_gateway_reports_real_request_metrics():
+    """Test get_server_info and get_metrics reflect actual traffic."""
+    gateway = APIGateway(ErrorTransport())
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'running',
+        'transport': 'http',
+        'connectionId': 'conn_1',
+        'processId': None
+    }
+    
+    for i in range(4):
+        gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": i})
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/call", "id": 9,
+                                         "params": {"name": "read_file"}})
+    
+    metrics = gateway.get_server_info('test-server')['metrics']
+    
+    assert metrics['requests'] == 5
+    assert metrics['errors'] == 1
+    assert metrics['error_rate'] == 0.2
+    assert metrics['requests_per_second'] > 0
+    assert set(metrics['latency_percentiles_ms']) == {'p50', 'p90', 'p99', 'max'}
+    assert metrics['methods']['tools/list']['requests'] == 4
+    assert metrics['methods']['tools/call:read_file']['errors'] == 1
+    assert gateway.get_metrics()['servers']['test-server']['requests'] == 5
+
+
+def test_server_without_traffic_reports_zeros():
+    """Test idle servers report empty statistics instead of placeholders."""
+    gateway = APIGateway()
+    gateway.servers['test-server'] = {
+        'config': {'id': 'test-server'},
+        'status': 'stopped',
+        'transport': 'http',
+        'connectionId': None,
+        'processId': None
+    }
+    
+    metrics = gateway.get_server_info('test-server')['metrics']
+    
+    assert metrics['requests'] == 0
+    assert metrics['latency_ms'] == 0
+    assert metrics['methods'] == {}
@@ -0,0 +1,115 @@
+"""Unit tests for the indexed server table."""
+
+import sys
+import os
+import pickle
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.server_table import ServerTable
+from contracts.transport_stub import TransportStub
+
+
+def _record(server_id, status='stopped', transport='http', category=None, tags=()):
+    return {
+        'config': {'id': server_id, 'category': category, 'tags': list(tags)},
+        'status': status,
+        'transport': transport,
+        'connectionId': None,
+        'processId': None
+    }
+
+
+@pytest.fixture
+def table():
+    return ServerTable({
+        'gamma': _record('gamma', 'running', 'stdio', 'data', ['files']),
+        'alpha': _record('alpha', 'running', 'http', 'data', ['files', 'search']),
+        'beta': _record('beta', 'stopped', 'stdio', 'web', ['search']),
+        'delta': _record('delta', 'stopped', 'http'),
+    })
+
+
+def test_counts_follow_status_changes(table):
+    """Test counters stay in step with status changes and removals."""
+    assert table.counts('status') == {'running': 2, 'stopped': 2}
+    
+    table.set_status('beta', 'running')
+    del table['gamma']
+    
+    assert table.count('status', 'running') == 2
+    assert table.count('status', 'stopped') == 1
+    assert table.select(status='running') == ['alpha', 'beta']
+    assert table.count('transport', 'stdio') == 1
+
+
+def test_select_combines_filters(table):
+    """Test filters on several indexes match all of them."""
+    assert table.select(tag='files') == ['alpha', 'gamma']
+    assert table.select(tag='search', transport='stdio') == ['beta']
+    assert table.select(category='data', status='stopped') == []
+    assert table.select(category='unknown') == []
+    with pytest.raises(ValueError):
+        table.select(name='alpha')
+
+
+def test_select_pages_by_cursor(table):
+    """Test listings resume after the last ID of the previous page."""
+    first = table.select(limit=3)
+    second = table.select(limit=3, after=first[-1])
+    
+    assert first == ['alpha', 'beta', 'delta']
+    assert second == ['gamma']
+    assert table.select(limit=3, after='gamma') == []
+
+
+def test_reindex_after_config_change(table):
+    """Test records changed in place are moved between indexes."""
+    table['delta']['config']['tags'] = ['files']
+    table['delta']['transport'] = 'stdio'
+    table.reindex('delta')
+    
+    assert table.select(tag='files') == ['alpha', 'delta', 'gamma']
+    assert table.count('transport', 'http') == 1
+
+
+def test_replacing_and_popping_records(table):
+    """Test stored and removed records leave no stale index entries."""
+    table['alpha'] = _record('alpha', 'stopped', 'sse')
+    
+    assert table.count('transport', 'sse') == 1
+    assert 'alpha' not in table.select(tag='files')
+    assert table.pop('missing', None) is None
+    assert table.pop('alpha')['transport'] == 'sse'
+    assert table.counts('transport') == {'stdio': 2, 'http': 1}
+    
+    copy = pickle.loads(pickle.dumps(table))
+    assert copy.select(status='stopped') == ['beta', 'delta']
+
+
+def test_gateway_lists_filtered_pages():
+    """Test list_servers filters and pages through the indexes."""
+    gateway = APIGateway(TransportStub())
+    gateway.servers.clear()
+    for i in range(25):
+        tags = ['even'] if i % 2 == 0 else []
+        gateway.servers[f"server-{i:02d}"] = _record(f"server-{i:02d}", tags=tags)
+    gateway.start_server('server-04')
+    
+    page = gateway.list_servers(tag='even', limit=5)
+    rest = gateway.list_servers(tag='even', cursor=page[-1]['id'])
+    
+    assert [s['id'] for s in page] == [f"server-{i:02d}" for i in range(0, 10, 2)]
+    assert len(rest) == 8
+    assert gateway.list_servers(filter_running=True) == [
+        {"id": 'server-04', "transport": 'http', "status": 'running'}
+    ]
+    metrics = gateway.get_metrics()
+    assert metrics['active_connections'] == 1
+    assert metrics['servers_by_status'] == {'stopped': 24, 'running': 1}
+    
+    gateway.stop_server('server-04')
+    assert gateway.list_servers(filter_running=True) == []
@@ -0,0 +1,129 @@
+"""Unit tests for the multi-process sharded gateway."""
+
+import sys
+import os
+import json
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import ShardedGateway
+from api_gateway.sharding import HashRing
+
+
+SERVER_IDS = [f"server-{n}" for n in range(12)]
+
+
+def test_ring_spreads_keys_evenly():
+    """Test every node gets a fair share of the keys."""
+    ring = HashRing(range(4))
+    counts = Counter(ring.owner(f"server-{n}") for n in range(4000))
+    
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 600
+
+
+def test_ring_moves_only_the_keys_of_changed_nodes():
+    """Test adding or removing a node only reassigns that node's keys."""
+    keys = [f"server-{n}" for n in range(2000)]
+    ring = HashRing(range(4))
+    before = {key: ring.owner(key) for key in keys}
+    
+    ring.add(4)
+    moved = [key for key in keys if ring.owner(key) != before[key]]
+    assert all(ring.owner(key) == 4 for key in moved)
+    assert 200 < len(moved) < 600
+    
+    ring.remove(4)
+    assert {key: ring.owner(key) for key in keys} == before
+    
+    ring.remove(1)
+    assert all(ring.owner(key) == before[key] for key in keys if before[key] != 1)
+
+
+@pytest.fixture(scope='module')
+def gateway(tmp_path_factory):
+    catalog = tmp_path_factory.mktemp('sharding') / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': server_id, 'transport': {'type': 'http'}, 'config': {'port': 3000 + n}}
+        for n, server_id in enumerate(SERVER_IDS)
+    ]}))
+    gateway = ShardedGateway(workers=2, options={
+        'catalog_path': str(catalog), 'registry_cache': False,
+        'worker_monitor_interval': 60
+    })
+    yield gateway
+    gateway.close()
+
+
+def test_requests_reach_the_owning_worker(gateway):
+    """Test servers run on their owner and metrics add up across workers."""
+    for server_id in SERVER_IDS[:6]:
+        assert gateway.start_server(server_id)['success']
+    for server_id in SERVER_IDS[:6]:
+        response = gateway.send_request(server_id, {"jsonrpc": "2.0", "method": "ping", "id": 7})
+        assert response['id'] == 7 and 'result' in response
+    
+    metrics = gateway.get_metrics()
+    assert metrics['requests_total'] == 6
+    assert metrics['active_connections'] == 6
+    assert metrics['servers_by_status'] == {'running': 6, 'stopped': 6}
+    assert sorted(metrics['servers']) == SERVER_IDS[:6]
+    assert sum(worker['servers'] for worker in metrics['workers'].values()) == 12
+    
+    listed = gateway.list_servers(filter_running=True)
+    assert [server['id'] for server in listed] == sorted(SERVER_IDS[:6])
+    page = gateway.list_servers(limit=5)
+    assert [server['id'] for server in page] == sorted(SERVER_IDS)[:5]
+    assert gateway.list_servers(cursor=page[-1]['id'], limit=5)[0]['id'] == sorted(SERVER_IDS)[5]
+
+
+def test_workers_rebalance_when_they_come_and_go(gateway):
+    """Test running servers follow their owner as workers change."""
+    running = {server['id'] for server in gateway.list_servers(filter_running=True)}
+    
+    worker_id = gateway.add_worker()
+    moved = [server_id for server_id in running if gateway.worker_for(server_id) == worker_id]
+    assert {server['id'] for server in gateway.list_servers(filter_running=True)} == running
+    for server_id in moved:
+        assert gateway.get_server_info(server_id)['status'] == 'running'
+    
+    gateway.remove_worker(worker_id)
+    assert {server['id'] for server in gateway.list_servers(filter_running=True)} == running
+    assert gateway.get_metrics()['sharding']['moved'] == 2 * len(moved)
+
+
+def test_failed_catalog_reload_is_skipped(gateway):
+    """Test a worker that fails to reload does not break the others' reload."""
+    catalog = gateway.options['catalog_path']
+    with open(catalog) as f:
+        valid = f.read()
+    with open(catalog, 'w') as f:
+        f.write('{"servers": [')
+    try:
+        assert gateway.reload_catalog() == {'added': [], 'changed': [], 'removed': []}
+    finally:
+        with open(catalog, 'w') as f:
+            f.write(valid)
+    assert gateway.list_servers(filter_running=True)
+
+
+def test_dead_worker_is_replaced(gateway):
+    """Test calls to a worker that exits fail cleanly until it is respawned."""
+    running = {server['id'] for server in gateway.list_servers(filter_running=True)}
+    victim = gateway.worker_for(sorted(running)[0])
+    gateway._workers[victim].process.kill()
+    gateway._workers[victim].process.join()
+    
+    response = gateway.send_request(sorted(running)[0], {"jsonrpc": "2.0", "method": "ping", "id": 1})
+    assert response['error']['data'] == {'worker': victim}
+    for result in (gateway.add_replica(sorted(running)[0]),
+                   gateway.remove_replica(sorted(running)[0])):
+        assert not result['success']
+        assert f"Gateway worker {victim} is unavailable" in result['message']
+    
+    assert gateway.check_workers() == [victim]
+    assert {server['id'] for server in gateway.list_servers(filter_running=True)} == running
+    assert gateway.get_metrics()['sharding']['respawned'] == 1
@@ -0,0 +1,282 @@
+"""Unit tests for the gateway state journal and re-attach on restart."""
+
+import sys
+import os
+import json
+import subprocess
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway.state_journal import StateJournal, process_command_line, stop_saved_process
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+
+
+class SpawningProcessManager(ProcessManagerStub):
+    """Process manager stub that runs real processes."""
+    
+    def __init__(self):
+        super().__init__()
+        self.children = {}
+    
+    def spawn_process(self, config):
+        child = subprocess.Popen([config['command']] + config['args'])
+        process_id = super().spawn_process(config)
+        self.processes[process_id]['pid'] = child.pid
+        self.children[process_id] = child
+        return process_id
+    
+    def stop_process(self, process_id, timeout=5000):
+        child = self.children.pop(process_id, None)
+        if child is not None:
+            child.terminate()
+            child.wait()
+        return super().stop_process(process_id, timeout)
+
+
+class LockCheckingProcessManager(ProcessManagerStub):
+    """Process manager stub that notes whether the gateway lock is free."""
+    
+    def __init__(self):
+        super().__init__()
+        self.gateway = None
+        self.lock_held = []
+    
+    def get_process_status(self, process_id):
+        if self.gateway is not None:
+            # Another thread can only take the lock if the caller does not hold it
+            free = []
+            probe = threading.Thread(target=lambda: free.append(self._try_lock()))
+            probe.start()
+            probe.join()
+            self.lock_held.append(not free[0])
+        return super().get_process_status(process_id)
+    
+    def _try_lock(self):
+        if self.gateway._lock.acquire(blocking=False):
+            self.gateway._lock.release()
+            return True
+        return False
+
+
+def _lines(path):
+    return path.read_text().splitlines()
+
+
+def test_journal_round_trip(tmp_path):
+    """Test flushed state is read back and removals are kept."""
+    path = tmp_path / 'state.jsonl'
+    journal = StateJournal(str(path))
+    journal.record('alpha', {'replicas': [1]})
+    journal.record('beta', {'replicas': [2]})
+    assert journal.flush() == 2
+    
+    journal.record('alpha', None)
+    journal.record('gamma', None)
+    assert journal.flush() == 1
+    
+    assert StateJournal(str(path)).load() == {'beta': {'replicas': [2]}}
+
+
+def test_changes_between_flushes_are_written_once(tmp_path):
+    """Test several changes to one server append a single record."""
+    path = tmp_path / 'state.jsonl'
+    journal = StateJournal(str(path))
+    journal.load()
+    journal.flush()
+    
+    for count in range(5):
+        journal.record('alpha', {'replicas': count})
+    journal.flush()
+    
+    assert len(_lines(path)) == 2
+    assert StateJournal(str(path)).load() == {'alpha': {'replicas': 4}}
+
+
+def test_journal_is_compacted(tmp_path):
+    """Test superseded records are dropped once enough pile up."""
+    path = tmp_path / 'state.jsonl'
+    journal = StateJournal(str(path), compact_after=3)
+    for count in range(10):
+        journal.record('alpha', {'replicas': count})
+        journal.record('beta', {'replicas': count})
+        journal.flush()
+    
+    assert len(_lines(path)) <= 1 + 2 + 3 + 2
+    assert journal.get_stats()['compactions'] > 1
+    assert StateJournal(str(path)).load()['beta'] == {'replicas': 9}
+
+
+def test_torn_line_is_skipped_and_rewritten(tmp_path):
+    """Test a record cut short by a crash is ignored and not appended to."""
+    path = tmp_path / 'state.jsonl'
+    journal = StateJournal(str(path))
+    journal.record('alpha', {'replicas': 1})
+    journal.flush()
+    with open(path, 'a') as f:
+        f.write('{"id": "beta", "sta')
+    
+    journal = StateJournal(str(path))
+    assert journal.load() == {'alpha': {'replicas': 1}}
+    journal.record('gamma', {'replicas': 3})
+    journal.flush()
+    
+    assert [json.loads(line) for line in _lines(path)][1:] == [
+        {'id': 'alpha', 'state': {'replicas': 1}},
+        {'id': 'gamma', 'state': {'replicas': 3}}
+    ]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'catalog.json'
+    path.write_text(json.dumps({'servers': [
+        {'id': 'echo', 'source': {'type': 'npm', 'package': 'echo'},
+         'transport': {'type': 'stdio'}, 'scaling': {'replicas': 2}},
+        {'id': 'web', 'transport': {'type': 'http'}, 'config': {'port': 3100}}
+    ]}))
+    return path
+
+
+def _gateway(catalog, transport, process_manager):
+    return APIGateway(transport, process_manager, options={
+        'catalog_path': str(catalog),
+        'registry_cache': False,
+        'state_journal': str(catalog.parent / 'state.jsonl')
+    })
+
+
+def test_restart_reattaches_live_replicas(catalog):
+    """Test a new gateway adopts the processes and connections left running."""
+    transport, process_manager = TransportStub(), ProcessManagerStub()
+    gateway = _gateway(catalog, transport, process_manager)
+    gateway.start_server('echo')
+    gateway.start_server('web')
+    connection_id = gateway.servers['echo']['connectionId']
+    gateway.close()
+    
+    restarted = _gateway(catalog, transport, process_manager)
+    
+    assert restarted.servers['echo']['status'] == 'running'
+    assert restarted.servers['echo']['connectionId'] == connection_id
+    assert len(restarted._pools['echo']) == 2
+    assert len(transport.connections) == 3
+    assert len(process_manager.processes) == 2
+    assert restarted.get_metrics()['state_journal']['restored']['reattached'] == ['echo', 'web']
+    assert 'result' in restarted.send_request('echo', {"jsonrpc": "2.0", "method": "ping", "id": 1})
+
+
+def test_restart_replaces_dead_replicas(catalog):
+    """Test dead processes are replaced and lost connections reopened."""
+    transport, process_manager = TransportStub(), ProcessManagerStub()
+    gateway = _gateway(catalog, transport, process_manager)
+    gateway.start_server('echo')
+    gateway.start_server('web')
+    gateway.close()
+    
+    # One echo replica died; the bridge holding the HTTP connection restarted
+    process_manager.processes['echo-1']['status'] = 'stopped'
+    transport.connections.pop(gateway.servers['web']['connectionId'])
+    restarted = _gateway(catalog, transport, process_manager)
+    
+    assert len(restarted._pools['echo']) == 2
+    assert restarted._pools['echo'].replicas[0].process_id == 'echo'
+    assert restarted.servers['web']['status'] == 'running'
+    assert restarted.get_metrics()['state_journal']['restored']['reattached'] == ['echo', 'web']
+
+
+def test_state_is_resolved_outside_the_gateway_lock(catalog):
+    """Test saving replicas never calls the process manager under the lock."""
+    process_manager = LockCheckingProcessManager()
+    gateway = _gateway(catalog, TransportStub(), process_manager)
+    process_manager.gateway = gateway
+    
+    gateway.start_server('echo')
+    assert gateway.add_replica('echo')['success']
+    gateway.remove_replica('echo')
+    
+    assert process_manager.lock_held and not any(process_manager.lock_held)
+    assert len(gateway._journal.state()['echo']['replicas']) == 2
+
+
+def test_changed_entries_start_fresh(catalog):
+    """Test replicas of a changed or removed entry are stopped, not adopted."""
+    transport, process_manager = TransportStub(), ProcessManagerStub()
+    gateway = _gateway(catalog, transport, process_manager)
+    gateway.start_server('echo')
+    gateway.start_server('web')
+    gateway.close()
+    
+    catalog.write_text(json.dumps({'servers': [
+        {'id': 'echo', 'source': {'type': 'npm', 'package': 'echo'},
+         'transport': {'type': 'stdio'}, 'scaling': {'replicas': 1}}
+    ]}))
+    restarted = _gateway(catalog, transport, process_manager)
+    
+    restored = restarted.get_metrics()['state_journal']['restored']
+    assert restored == {'reattached': [], 'restarted': ['echo'], 'stopped': ['web']}
+    assert process_manager.processes['echo-1']['status'] == 'stopped'
+    restarted.close()
+    assert StateJournal(str(catalog.parent / 'state.jsonl')).load().keys() == {'echo'}
+
+
+@pytest.mark.skipif(process_command_line(os.getpid()) is None,
+                    reason="cannot read process command lines here")
+def test_restart_with_new_bridges_stops_orphaned_processes(tmp_path):
+    """Test processes a restarted process manager lost are stopped and replaced."""
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'servers': [
+        {'id': 'sleeper', 'transport': {'type': 'stdio', 'stdio': {
+            'command': sys.executable, 'args': ['-c', 'import time; time.sleep(60)']
+        }}, 'scaling': {'replicas': 2}},
+        {'id': 'web', 'transport': {'type': 'http'}, 'config': {'port': 3100}}
+    ]}))
+    process_manager = SpawningProcessManager()
+    gateway = _gateway(catalog, TransportStub(), process_manager)
+    gateway.start_server('sleeper')
+    gateway.start_server('web')
+    gateway.close()
+    orphans = list(process_manager.children.values())
+    
+    # The transport bridge and process manager restarted with the gateway
+    fresh_manager = SpawningProcessManager()
+    restarted = _gateway(catalog, TransportStub(), fresh_manager)
+    try:
+        for orphan in orphans:
+            assert orphan.wait(5) is not None
+        restored = restarted.get_metrics()['state_journal']['restored']
+        assert restored == {'reattached': ['web'], 'restarted': ['sleeper'], 'stopped': []}
+        assert len(restarted._pools['sleeper']) == 2
+        assert all(child.poll() is None for child in fresh_manager.children.values())
+    finally:
+        restarted.stop_server('sleeper')
+        restarted.close()
+
+
+@pytest.mark.skipif(process_command_line(os.getpid()) is None,
+                    reason="cannot read process command lines here")
+def test_saved_process_is_only_stopped_while_it_runs_the_same_command():
+    """Test a reused PID running something else is left alone."""
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    try:
+        deadline = time.monotonic() + 5
+        while 'time.sleep' not in (process_command_line(child.pid) or ''):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        command_line = process_command_line(child.pid)
+        
+        assert not stop_saved_process(child.pid, command_line + ' --other')
+        assert not stop_saved_process(child.pid, None)
+        assert child.poll() is None
+        assert stop_saved_process(child.pid, command_line)
+        assert child.wait(5) is not None
+        assert not stop_saved_process(child.pid, command_line)
+    finally:
+        if child.poll() is None:
+            child.kill()
+            child.wait()
@@ -0,0 +1,169 @@
+"""Unit tests for request tracing."""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway import tracing
+from api_gateway.tracing import Tracer, parse_traceparent, with_traceparent
+from contracts.transport_stub import TransportStub
+from gateway_helpers import add_server
+
+
+TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+
+class RecordingTransport(TransportStub):
+    """Transport stub that keeps sent messages and reports bridge timings."""
+    
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.call_observer = None
+    
+    def send_message(self, connection_id, message):
+        self.sent.append(message)
+        if message.get('method') == 'tools/call':
+            return {"jsonrpc": "2.0", "id": message['id'],
+                    "error": {"code": -32000, "message": "tool failed"}}
+        response = super().send_message(connection_id, message)
+        if self.call_observer is not None:
+            self.call_observer('send_message', 0.004, False, 0.003)
+        return response
+
+
+def _gateway(tracing_options):
+    transport = RecordingTransport()
+    gateway = APIGateway(transport, options={'tracing': tracing_options})
+    add_server(gateway, {}, transport='http', limits={'maxConcurrency': 4})
+    gateway.start_server('test-server')
+    return gateway, transport
+
+
+def test_parse_traceparent():
+    """Test W3C traceparent values are validated."""
+    parsed = parse_traceparent(TRACEPARENT)
+    
+    assert parsed == {
+        "trace_id": '4bf92f3577b34da6a3ce929d0e0e4736',
+        "parent_id": '00f067aa0ba902b7',
+        "sampled": True
+    }
+    assert parse_traceparent('00-' + '0' * 32 + '-00f067aa0ba902b7-01') is None
+    assert parse_traceparent('garbage') is None
+    assert parse_traceparent(None) is None
+
+
+def test_with_traceparent_copies_the_message():
+    """Test the trace context is added without touching the caller's request."""
+    request = {"jsonrpc": "2.0", "method": "tools/list", "id": 1,
+               "params": {"_meta": {"priority": "bulk"}}}
+    
+    traced = with_traceparent(request, TRACEPARENT)
+    
+    assert traced['params']['_meta'] == {"priority": "bulk", "traceparent": TRACEPARENT}
+    assert request['params']['_meta'] == {"priority": "bulk"}
+    assert with_traceparent({"method": "ping"}, TRACEPARENT)['params']['_meta'] == {
+        "traceparent": TRACEPARENT
+    }
+
+
+def test_unsampled_traces_are_kept_only_when_slow_or_failed():
+    """Test tail overrides for the head sampling decision."""
+    tracer = Tracer(sample_rate=0.0, slow_threshold=60)
+    
+    assert tracer.finish(tracer.start('fast')) is False
+    assert tracer.finish(tracer.start('failed'), error=True) is True
+    
+    slow = tracer.start('slow')
+    slow.root.start_ns -= 61 * 10 ** 9
+    assert tracer.finish(slow) is True
+    assert tracer.get_stats()['traces_kept'] == 2
+
+
+def test_ring_buffer_keeps_newest_spans():
+    """Test the buffer overwrites the oldest spans once full."""
+    tracer = Tracer(sample_rate=1.0, buffer_size=3)
+    for i in range(5):
+        tracer.finish(tracer.start(f'request-{i}'))
+    
+    assert [span.name for span in tracer.spans()] == ['request-2', 'request-3', 'request-4']
+
+
+def test_gateway_records_request_spans():
+    """Test a sampled request records queue, transport and bridge spans."""
+    gateway, transport = _gateway({'sampleRate': 1.0})
+    
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    
+    spans = {span['name']: span for span in gateway.export_traces()}
+    assert set(spans) == {'gateway.request', 'gateway.queue', 'transport.send',
+                          'bridge.ipc', 'server'}
+    root = spans['gateway.request']
+    assert root['attributes'] == {'server': 'test-server', 'method': 'tools/list'}
+    assert spans['transport.send']['parentSpanId'] == root['spanId']
+    assert spans['bridge.ipc']['parentSpanId'] == spans['transport.send']['spanId']
+    assert spans['server']['parentSpanId'] == spans['bridge.ipc']['spanId']
+    assert spans['server']['durationMs'] < spans['bridge.ipc']['durationMs']
+    
+    meta = transport.sent[0]['params']['_meta']
+    assert meta['traceparent'] == (
+        f"00-{root['traceId']}-{spans['transport.send']['spanId']}-01"
+    )
+
+
+def test_gateway_continues_incoming_trace_and_keeps_errors():
+    """Test callers' trace IDs are reused and failed requests always kept."""
+    gateway, _ = _gateway({'sampleRate': 0.0})
+    
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    gateway.send_request('test-server', {
+        "jsonrpc": "2.0", "method": "tools/call", "id": 2,
+        "params": {"name": "read_file", "_meta": {"traceparent": TRACEPARENT[:-2] + '00'}}
+    })
+    
+    spans = gateway.export_traces()
+    assert {span['traceId'] for span in spans} == {'4bf92f3577b34da6a3ce929d0e0e4736'}
+    root = next(span for span in spans if span['name'] == 'gateway.request')
+    assert root['parentSpanId'] == '00f067aa0ba902b7'
+    assert root['error'] is True
+
+
+def test_trace_is_finished_when_sending_raises():
+    """Test a request that raises still ends its trace and restores the thread's."""
+    gateway, _ = _gateway({'sampleRate': 1.0})
+    
+    def fail(*args):
+        raise RuntimeError("bridge crashed")
+    
+    gateway._send = fail
+    with pytest.raises(RuntimeError):
+        gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    
+    assert tracing.current() == (None, None)
+    root = gateway.export_traces()[0]
+    assert root['name'] == 'gateway.request'
+    assert root['error'] is True
+    stats = gateway.get_metrics()['servers']['test-server']['methods']['tools/list']
+    assert stats['errors'] == 1
+
+
+def test_export_otlp(tmp_path):
+    """Test spans can be written in the OTLP/JSON layout."""
+    gateway, _ = _gateway(True)
+    gateway._tracer.sample_rate = 1.0
+    gateway.send_request('test-server', {"jsonrpc": "2.0", "method": "tools/list", "id": 1})
+    path = tmp_path / 'traces.json'
+    
+    gateway.export_traces(str(path), format='otlp')
+    
+    payload = json.loads(path.read_text())
+    spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+    assert len(spans) == 5
+    assert all(len(span['traceId']) == 32 and len(span['spanId']) == 16 for span in spans)
+    assert APIGateway(TransportStub()).export_traces() is None
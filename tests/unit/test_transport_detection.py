@@ -0,0 +1,125 @@
+"""Unit tests for explicit transport specs and detection rules."""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+import pytest
+
+from api_gateway import APIGateway
+from api_gateway import registry_cache
+from api_gateway.transport_detection import _detect, detect_transport
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+
+
+@pytest.fixture(autouse=True)
+def clear_loaded():
+    registry_cache.clear_loaded()
+    yield
+    registry_cache.clear_loaded()
+
+
+def test_rules_match_whole_name_segments():
+    """Test substrings inside longer words do not select a transport."""
+    assert detect_transport({'id': 'news'}) == 'http'
+    assert detect_transport({'id': 'aws-tools'}) == 'http'
+    assert detect_transport({'id': 'livestreams'}) == 'http'
+    assert detect_transport({'id': 'chat.ws'}) == 'websocket'
+    assert detect_transport({'id': 'x', 'source': {'type': 'npm', 'package': '@acme/snap'}}) == 'stdio'
+
+
+def test_explicit_transport_wins():
+    """Test a declared transport type overrides MCP_MODE and the rules."""
+    entry = {
+        'id': 'ws-bridge',
+        'config': {'environment': {'MCP_MODE': 'http'}},
+        'transport': {'type': 'stdio', 'autoDetect': False}
+    }
+    
+    assert detect_transport(entry) == 'stdio'
+
+
+def test_auto_detect_false_skips_guessing():
+    """Test entries that opt out of detection get the default transport."""
+    entry = {'id': 'ws-server', 'transport': {'autoDetect': False}}
+    
+    assert detect_transport(entry) == 'http'
+    assert detect_transport({'id': 'ws-server', 'transport': {'autoDetect': True}}) == 'websocket'
+
+
+def test_detection_is_memoized():
+    """Test entries with the same detection inputs reuse one result."""
+    _detect.cache_clear()
+    for _ in range(3):
+        detect_transport({'id': 'stream-server', 'name': 'ignored'})
+    
+    assert _detect.cache_info().hits == 2
+
+
+def _write(path, servers):
+    path.write_text(json.dumps({'version': '2.0', 'servers': servers}))
+
+
+def test_gateway_uses_transport_catalog(tmp_path):
+    """Test transport blocks beside the catalog set transport and connection."""
+    _write(tmp_path / 'catalog.json', [
+        {'id': 'news', 'config': {'port': 4100, 'environment': {'MCP_MODE': 'http'}}},
+        {'id': 'local', 'config': {'port': 4101}}
+    ])
+    _write(tmp_path / 'transport-catalog.json', [{'id': 'news', 'transport': {
+        'type': 'websocket',
+        'websocket': {'url': 'ws://localhost:${port}/mcp', 'pingInterval': 30000},
+        'autoDetect': False
+    }}])
+    options = {'catalog_path': str(tmp_path / 'catalog.json'),
+               'registry_cache': str(tmp_path / 'cache')}
+    
+    gateway = APIGateway(TransportStub(), options=options)
+    
+    assert gateway.servers['news']['transport'] == 'websocket'
+    assert gateway.servers['local']['transport'] == 'http'
+    config = gateway._create_connection_config(gateway.servers['news'])
+    assert config == {'serverId': 'news', 'url': 'ws://localhost:4100/mcp',
+                      'pingInterval': 30000}
+    
+    # Editing only the transport catalog invalidates the compiled snapshot
+    _write(tmp_path / 'transport-catalog.json', [{'id': 'local', 'transport': {
+        'type': 'sse', 'sse': {'url': 'http://localhost:${port}/events'}
+    }}])
+    registry_cache.clear_loaded()
+    gateway = APIGateway(TransportStub(), options=options)
+    
+    assert gateway.servers['news']['transport'] == 'http'
+    assert gateway._create_connection_config(gateway.servers['local'])['url'] == (
+        'http://localhost:4101/events'
+    )
+    disabled = APIGateway(TransportStub(), options=dict(options, transport_catalog_path=False))
+    assert disabled.servers['local']['transport'] == 'http'
+
+
+def test_stdio_process_runs_the_explicit_command(tmp_path):
+    """Test a stdio server's process is spawned with its transport settings."""
+    _write(tmp_path / 'catalog.json', [{
+        'id': 'files',
+        'source': {'type': 'npm', 'package': '@acme/files'},
+        'config': {'port': 4102, 'environment': {'LOG_LEVEL': 'debug'}},
+        'transport': {'type': 'stdio', 'stdio': {
+            'command': 'npx', 'args': ['-y', '@acme/files', '--port', '${port}'],
+            'env': {'FILES_ROOT': '/srv'}
+        }}
+    }])
+    process_manager = ProcessManagerStub()
+    gateway = APIGateway(TransportStub(), process_manager, options={
+        'catalog_path': str(tmp_path / 'catalog.json'), 'registry_cache': False,
+        'transport_catalog_path': False
+    })
+    
+    assert gateway.start_server('files')['success']
+    spawned = process_manager.processes[gateway.servers['files']['processId']]['config']
+    assert spawned['command'] == 'npx'
+    assert spawned['args'] == ['-y', '@acme/files', '--port', '4102']
+    assert spawned['env'] == {'NODE_ENV': 'production', 'LOG_LEVEL': 'debug',
+                              'FILES_ROOT': '/srv'}
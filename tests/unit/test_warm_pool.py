@@ -0,0 +1,156 @@
+"""Unit tests for the warm standby process pool."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-local-setup'))
+
+from api_gateway import APIGateway
+from api_gateway.warm_pool import WarmPool
+from contracts.process_manager_stub import ProcessManagerStub
+from contracts.transport_stub import TransportStub
+
+
+class FakeSpawner:
+    """Spawn/stop callbacks that record units and can be told to fail."""
+    
+    def __init__(self, memory=50.0):
+        self.memory = memory
+        self.count = 0
+        self.stopped = []
+        self.dead = set()
+        self.fail = False
+    
+    def spawn(self, server_id):
+        if self.fail:
+            raise RuntimeError('spawn failed')
+        self.count += 1
+        return f"conn-{self.count}", f"{server_id}-{self.count}", self.memory
+    
+    def stop(self, server_id, connection_id, process_id):
+        self.stopped.append(process_id)
+    
+    def is_alive(self, process_id):
+        return process_id not in self.dead
+
+
+def _pool(spawner, **kwargs):
+    return WarmPool(spawner.spawn, spawner.stop, spawner.is_alive, **kwargs)
+
+
+def test_claim_takes_a_ready_unit_and_refill_replaces_it():
+    """Test claimed units are replaced up to the target."""
+    spawner = FakeSpawner()
+    pool = _pool(spawner)
+    pool.set_target('echo', 2)
+    
+    assert pool.refill() == 2
+    assert pool.claim('echo') == ('conn-1', 'echo-1')
+    assert pool.idle_count('echo') == 1
+    assert pool.refill() == 1
+    assert pool.refill() == 0
+    assert pool.claim('other') is None
+    assert pool.get_stats()['claims'] == 1
+
+
+def test_memory_limit_caps_idle_units():
+    """Test spawning stops once idle units would exceed the memory limit."""
+    spawner = FakeSpawner(memory=120.0)
+    pool = _pool(spawner, memory_limit=300)
+    pool.set_target('echo', 2, memory_estimate=100)
+    pool.set_target('todo', 2, memory_estimate=100)
+    
+    pool.refill()
+    
+    # The first unit is measured at 120 MB, which the next ones are sized by
+    assert spawner.count == 2
+    assert pool.memory_in_use() == 240.0
+    assert pool.get_stats()['skipped_for_memory'] >= 1
+
+
+def test_dead_units_are_skipped_on_claim():
+    """Test a unit whose process exited is stopped rather than handed out."""
+    spawner = FakeSpawner()
+    pool = _pool(spawner)
+    pool.set_target('echo', 2)
+    pool.refill()
+    spawner.dead.add('echo-1')
+    
+    assert pool.claim('echo') == ('conn-2', 'echo-2')
+    assert spawner.stopped == ['echo-1']
+
+
+def test_failed_spawns_back_off():
+    """Test a failing server is not retried until the retry delay passes."""
+    spawner = FakeSpawner()
+    pool = _pool(spawner, retry_delay=30)
+    pool.set_target('echo', 1)
+    spawner.fail = True
+    
+    assert pool.refill(now=100.0) == 0
+    spawner.fail = False
+    assert pool.refill(now=110.0) == 0
+    assert pool.refill(now=131.0) == 1
+
+
+def test_disabling_a_server_stops_its_idle_units():
+    """Test a zero target discards the server's spares."""
+    spawner = FakeSpawner()
+    pool = _pool(spawner)
+    pool.set_target('echo', 2)
+    pool.refill()
+    
+    pool.set_target('echo', 0)
+    
+    assert sorted(spawner.stopped) == ['echo-1', 'echo-2']
+    assert pool.get_stats()['idle'] == {}
+
+
+def _gateway(warm_pool, **config):
+    process_manager = ProcessManagerStub()
+    gateway = APIGateway(TransportStub(), process_manager, options={'warm_pool': warm_pool})
+    # Drive refills by hand
+    gateway._warm_pool.stop()
+    gateway.servers['echo'] = {
+        'config': {'id': 'echo', 'source': {'type': 'npm', 'package': 'echo'}, **config},
+        'status': 'stopped',
+        'transport': 'stdio',
+        'connectionId': None,
+        'processId': None
+    }
+    return gateway, process_manager
+
+
+def test_gateway_starts_servers_from_warm_processes():
+    """Test start_server claims a pre-spawned process and the pool refills."""
+    gateway, process_manager = _gateway({'size': 1}, warmPool={'size': 1})
+    gateway._update_warm_target('echo')
+    gateway._warm_pool.refill()
+    warm_process = gateway._warm_pool._idle['echo'][0][1]
+    
+    result = gateway.start_server('echo')
+    
+    assert result['success']
+    assert gateway.servers['echo']['processId'] == warm_process
+    assert gateway._warm_pool.refill() == 1
+    assert gateway.get_metrics()['warm_pool']['claims'] == 1
+    
+    gateway.close()
+    assert gateway._warm_pool.get_stats()['idle'] == {}
+    stopped = [pid for pid, proc in process_manager.processes.items()
+               if proc['status'] == 'stopped']
+    assert stopped == ['echo-warm2']
+
+
+def test_gateway_pools_hot_servers_only():
+    """Test servers join the pool once started unless marked non-poolable."""
+    gateway, _ = _gateway(True)
+    gateway._update_warm_target('echo')
+    assert gateway._warm_pool.target('echo') == 0
+    
+    gateway.start_server('echo')
+    assert gateway._warm_pool.target('echo') == 1
+    
+    gateway.servers['echo']['config']['warmPool'] = {'poolable': False}
+    gateway._update_warm_target('echo')
+    assert gateway._warm_pool.target('echo') == 0